@@ -744,3206 +744,8 @@ class PersonalizedDiscountViewSet(viewsets.ModelViewSet):
             'savings': original_price - discounted_price
         })
 
-from django.shortcuts import get_object_or_404
 from django.http import JsonResponse
 from django.contrib.auth.decorators import login_required
-from django.views.decorators.http import require_POST
-from django.shortcuts import redirect
-from django.contrib import messages
-import json
-from .models import Product, Cart, CartItem
-
-@login_required
-@require_POST
-def add_to_cart(request, product_id):
-    product = get_object_or_404(Product, id=product_id)
-    cart, created = Cart.objects.get_or_create(user=request.user)
-    
-    cart_item, created = CartItem.objects.get_or_create(
-        cart=cart,
-        product=product,
-        defaults={'quantity': 1}
-    )
-    
-    if not created:
-        cart_item.quantity += 1
-        cart_item.save()
-    
-    if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
-        return JsonResponse({
-            'success': True,
-            'message': f'{product.name} added to cart',
-            'cart_total': float(cart.get_total()),
-            'cart_items': cart.get_items_count()
-        })
-    
-    messages.success(request, f'{product.name} added to cart')
-    return redirect('products')
-
-@login_required
-@require_POST
-def remove_from_cart(request, item_id):
-    cart_item = get_object_or_404(CartItem, id=item_id, cart__user=request.user)
-    cart = cart_item.cart
-    cart_item.delete()
-    
-    return JsonResponse({
-        'success': True,
-        'message': 'Item removed from cart',
-        'cart_total': float(cart.get_total()),
-        'cart_items': cart.get_items_count()
-    })
-
-@login_required
-@require_POST
-def update_cart_quantity(request, item_id):
-    cart_item = get_object_or_404(CartItem, id=item_id, cart__user=request.user)
-    
-    try:
-        data = json.loads(request.body)
-        quantity = int(data.get('quantity', 1))
-        if quantity < 1:
-            return JsonResponse({
-                'success': False,
-                'error': 'Quantity must be at least 1'
-            }, status=400)
-        
-        cart_item.quantity = quantity
-        cart_item.save()
-        
-        cart = cart_item.cart
-        return JsonResponse({
-            'success': True,
-            'message': 'Cart updated',
-            'cart_total': float(cart.get_total()),
-            'cart_items': cart.get_items_count()
-        })
-    except (ValueError, json.JSONDecodeError):
-        return JsonResponse({
-            'success': False,
-            'error': 'Invalid quantity'
-        }, status=400)
-
-from django.shortcuts import get_object_or_404
-from django.http import JsonResponse
-from django.contrib.auth.decorators import login_required
-from .models import Product, Cart, CartItem
-
-@login_required
-def get_recommendations(request):
-    # Simple recommendation: return 4 random products
-    products = Product.objects.order_by('?')[:4]
-    recommendations = []
-    for product in products:
-        recommendations.append({
-            'id': product.id,
-            'name': product.name,
-            'price': str(product.price),
-            'description': product.description,
-            'image_url': product.image.url if product.image else None,
-        })
-    return JsonResponse({'recommendations': recommendations})
-
-@login_required
-def add_to_cart(request, product_id):
-    if request.method == 'POST':
-        product = get_object_or_404(Product, id=product_id)
-        cart, created = Cart.objects.get_or_create(user=request.user)
-        
-        cart_item, created = CartItem.objects.get_or_create(
-            cart=cart,
-            product=product,
-            defaults={'quantity': 1}
-        )
-        
-        if not created:
-            cart_item.quantity += 1
-            cart_item.save()
-        
-        # Calculate cart total
-        cart_total = sum(item.product.price * item.quantity for item in cart.items.all())
-        cart_items = cart.items.count()
-        
-        return JsonResponse({
-            'message': f'Added {product.name} to cart',
-            'cart_total': f'{cart_total:.2f}',
-            'cart_items': cart_items
-        })
-    
-    return JsonResponse({'error': 'Invalid request method'}, status=400)
-
-@login_required
-def remove_from_cart(request, product_id):
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Item removed from cart',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-@login_required
-def update_cart_item(request, product_id):
-    try:
-        quantity = int(request.POST.get('quantity', 1))
-    except ValueError:
-        return JsonResponse({'error': 'Invalid quantity'}, status=400)
-    
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    
-    if quantity > 0:
-        cart_item.quantity = quantity
-        cart_item.save()
-    else:
-        cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Cart updated',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-from django.shortcuts import get_object_or_404
-from django.http import JsonResponse
-from django.contrib.auth.decorators import login_required
-from .models import Product, Cart, CartItem
-
-@login_required
-def get_recommendations(request):
-    # Simple recommendation: return 4 random products
-    products = Product.objects.order_by('?')[:4]
-    recommendations = []
-    for product in products:
-        recommendations.append({
-            'id': product.id,
-            'name': product.name,
-            'price': str(product.price),
-            'description': product.description,
-            'image_url': product.image.url if product.image else None,
-        })
-    return JsonResponse({'recommendations': recommendations})
-
-@login_required
-def add_to_cart(request, product_id):
-    if request.method == 'POST':
-        product = get_object_or_404(Product, id=product_id)
-        cart, created = Cart.objects.get_or_create(user=request.user)
-        
-        cart_item, created = CartItem.objects.get_or_create(
-            cart=cart,
-            product=product,
-            defaults={'quantity': 1}
-        )
-        
-        if not created:
-            cart_item.quantity += 1
-            cart_item.save()
-        
-        # Calculate cart total
-        cart_total = sum(item.product.price * item.quantity for item in cart.items.all())
-        cart_items = cart.items.count()
-        
-        return JsonResponse({
-            'message': f'Added {product.name} to cart',
-            'cart_total': f'{cart_total:.2f}',
-            'cart_items': cart_items
-        })
-    
-    return JsonResponse({'error': 'Invalid request method'}, status=400)
-
-@login_required
-def remove_from_cart(request, product_id):
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Item removed from cart',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-@login_required
-def update_cart_item(request, product_id):
-    try:
-        quantity = int(request.POST.get('quantity', 1))
-    except ValueError:
-        return JsonResponse({'error': 'Invalid quantity'}, status=400)
-    
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    
-    if quantity > 0:
-        cart_item.quantity = quantity
-        cart_item.save()
-    else:
-        cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Cart updated',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-from django.shortcuts import get_object_or_404
-from django.http import JsonResponse
-from django.contrib.auth.decorators import login_required
-from .models import Product, Cart, CartItem
-
-@login_required
-def get_recommendations(request):
-    # Simple recommendation: return 4 random products
-    products = Product.objects.order_by('?')[:4]
-    recommendations = []
-    for product in products:
-        recommendations.append({
-            'id': product.id,
-            'name': product.name,
-            'price': str(product.price),
-            'description': product.description,
-            'image_url': product.image.url if product.image else None,
-        })
-    return JsonResponse({'recommendations': recommendations})
-
-@login_required
-def add_to_cart(request, product_id):
-    if request.method == 'POST':
-        product = get_object_or_404(Product, id=product_id)
-        cart, created = Cart.objects.get_or_create(user=request.user)
-        
-        cart_item, created = CartItem.objects.get_or_create(
-            cart=cart,
-            product=product,
-            defaults={'quantity': 1}
-        )
-        
-        if not created:
-            cart_item.quantity += 1
-            cart_item.save()
-        
-        # Calculate cart total
-        cart_total = sum(item.product.price * item.quantity for item in cart.items.all())
-        cart_items = cart.items.count()
-        
-        return JsonResponse({
-            'message': f'Added {product.name} to cart',
-            'cart_total': f'{cart_total:.2f}',
-            'cart_items': cart_items
-        })
-    
-    return JsonResponse({'error': 'Invalid request method'}, status=400)
-
-@login_required
-def remove_from_cart(request, product_id):
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Item removed from cart',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-@login_required
-def update_cart_item(request, product_id):
-    try:
-        quantity = int(request.POST.get('quantity', 1))
-    except ValueError:
-        return JsonResponse({'error': 'Invalid quantity'}, status=400)
-    
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    
-    if quantity > 0:
-        cart_item.quantity = quantity
-        cart_item.save()
-    else:
-        cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Cart updated',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-from django.shortcuts import get_object_or_404
-from django.http import JsonResponse
-from django.contrib.auth.decorators import login_required
-from .models import Product, Cart, CartItem
-
-@login_required
-def get_recommendations(request):
-    # Simple recommendation: return 4 random products
-    products = Product.objects.order_by('?')[:4]
-    recommendations = []
-    for product in products:
-        recommendations.append({
-            'id': product.id,
-            'name': product.name,
-            'price': str(product.price),
-            'description': product.description,
-            'image_url': product.image.url if product.image else None,
-        })
-    return JsonResponse({'recommendations': recommendations})
-
-@login_required
-def add_to_cart(request, product_id):
-    if request.method == 'POST':
-        product = get_object_or_404(Product, id=product_id)
-        cart, created = Cart.objects.get_or_create(user=request.user)
-        
-        cart_item, created = CartItem.objects.get_or_create(
-            cart=cart,
-            product=product,
-            defaults={'quantity': 1}
-        )
-        
-        if not created:
-            cart_item.quantity += 1
-            cart_item.save()
-        
-        # Calculate cart total
-        cart_total = sum(item.product.price * item.quantity for item in cart.items.all())
-        cart_items = cart.items.count()
-        
-        return JsonResponse({
-            'message': f'Added {product.name} to cart',
-            'cart_total': f'{cart_total:.2f}',
-            'cart_items': cart_items
-        })
-    
-    return JsonResponse({'error': 'Invalid request method'}, status=400)
-
-@login_required
-def remove_from_cart(request, product_id):
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Item removed from cart',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-@login_required
-def update_cart_item(request, product_id):
-    try:
-        quantity = int(request.POST.get('quantity', 1))
-    except ValueError:
-        return JsonResponse({'error': 'Invalid quantity'}, status=400)
-    
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    
-    if quantity > 0:
-        cart_item.quantity = quantity
-        cart_item.save()
-    else:
-        cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Cart updated',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-from django.shortcuts import get_object_or_404
-from django.http import JsonResponse
-from django.contrib.auth.decorators import login_required
-from .models import Product, Cart, CartItem
-
-@login_required
-def get_recommendations(request):
-    # Simple recommendation: return 4 random products
-    products = Product.objects.order_by('?')[:4]
-    recommendations = []
-    for product in products:
-        recommendations.append({
-            'id': product.id,
-            'name': product.name,
-            'price': str(product.price),
-            'description': product.description,
-            'image_url': product.image.url if product.image else None,
-        })
-    return JsonResponse({'recommendations': recommendations})
-
-@login_required
-def add_to_cart(request, product_id):
-    if request.method == 'POST':
-        product = get_object_or_404(Product, id=product_id)
-        cart, created = Cart.objects.get_or_create(user=request.user)
-        
-        cart_item, created = CartItem.objects.get_or_create(
-            cart=cart,
-            product=product,
-            defaults={'quantity': 1}
-        )
-        
-        if not created:
-            cart_item.quantity += 1
-            cart_item.save()
-        
-        # Calculate cart total
-        cart_total = sum(item.product.price * item.quantity for item in cart.items.all())
-        cart_items = cart.items.count()
-        
-        return JsonResponse({
-            'message': f'Added {product.name} to cart',
-            'cart_total': f'{cart_total:.2f}',
-            'cart_items': cart_items
-        })
-    
-    return JsonResponse({'error': 'Invalid request method'}, status=400)
-
-@login_required
-def remove_from_cart(request, product_id):
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Item removed from cart',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-@login_required
-def update_cart_item(request, product_id):
-    try:
-        quantity = int(request.POST.get('quantity', 1))
-    except ValueError:
-        return JsonResponse({'error': 'Invalid quantity'}, status=400)
-    
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    
-    if quantity > 0:
-        cart_item.quantity = quantity
-        cart_item.save()
-    else:
-        cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Cart updated',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-from django.shortcuts import get_object_or_404
-from django.http import JsonResponse
-from django.contrib.auth.decorators import login_required
-from .models import Product, Cart, CartItem
-
-@login_required
-def get_recommendations(request):
-    # Simple recommendation: return 4 random products
-    products = Product.objects.order_by('?')[:4]
-    recommendations = []
-    for product in products:
-        recommendations.append({
-            'id': product.id,
-            'name': product.name,
-            'price': str(product.price),
-            'description': product.description,
-            'image_url': product.image.url if product.image else None,
-        })
-    return JsonResponse({'recommendations': recommendations})
-
-@login_required
-def add_to_cart(request, product_id):
-    if request.method == 'POST':
-        product = get_object_or_404(Product, id=product_id)
-        cart, created = Cart.objects.get_or_create(user=request.user)
-        
-        cart_item, created = CartItem.objects.get_or_create(
-            cart=cart,
-            product=product,
-            defaults={'quantity': 1}
-        )
-        
-        if not created:
-            cart_item.quantity += 1
-            cart_item.save()
-        
-        # Calculate cart total
-        cart_total = sum(item.product.price * item.quantity for item in cart.items.all())
-        cart_items = cart.items.count()
-        
-        return JsonResponse({
-            'message': f'Added {product.name} to cart',
-            'cart_total': f'{cart_total:.2f}',
-            'cart_items': cart_items
-        })
-    
-    return JsonResponse({'error': 'Invalid request method'}, status=400)
-
-@login_required
-def remove_from_cart(request, product_id):
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Item removed from cart',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-@login_required
-def update_cart_item(request, product_id):
-    try:
-        quantity = int(request.POST.get('quantity', 1))
-    except ValueError:
-        return JsonResponse({'error': 'Invalid quantity'}, status=400)
-    
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    
-    if quantity > 0:
-        cart_item.quantity = quantity
-        cart_item.save()
-    else:
-        cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Cart updated',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-from django.shortcuts import get_object_or_404
-from django.http import JsonResponse
-from django.contrib.auth.decorators import login_required
-from .models import Product, Cart, CartItem
-
-@login_required
-def get_recommendations(request):
-    # Simple recommendation: return 4 random products
-    products = Product.objects.order_by('?')[:4]
-    recommendations = []
-    for product in products:
-        recommendations.append({
-            'id': product.id,
-            'name': product.name,
-            'price': str(product.price),
-            'description': product.description,
-            'image_url': product.image.url if product.image else None,
-        })
-    return JsonResponse({'recommendations': recommendations})
-
-@login_required
-def add_to_cart(request, product_id):
-    if request.method == 'POST':
-        product = get_object_or_404(Product, id=product_id)
-        cart, created = Cart.objects.get_or_create(user=request.user)
-        
-        cart_item, created = CartItem.objects.get_or_create(
-            cart=cart,
-            product=product,
-            defaults={'quantity': 1}
-        )
-        
-        if not created:
-            cart_item.quantity += 1
-            cart_item.save()
-        
-        # Calculate cart total
-        cart_total = sum(item.product.price * item.quantity for item in cart.items.all())
-        cart_items = cart.items.count()
-        
-        return JsonResponse({
-            'message': f'Added {product.name} to cart',
-            'cart_total': f'{cart_total:.2f}',
-            'cart_items': cart_items
-        })
-    
-    return JsonResponse({'error': 'Invalid request method'}, status=400)
-
-@login_required
-def remove_from_cart(request, product_id):
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Item removed from cart',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-@login_required
-def update_cart_item(request, product_id):
-    try:
-        quantity = int(request.POST.get('quantity', 1))
-    except ValueError:
-        return JsonResponse({'error': 'Invalid quantity'}, status=400)
-    
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    
-    if quantity > 0:
-        cart_item.quantity = quantity
-        cart_item.save()
-    else:
-        cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Cart updated',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-from django.shortcuts import get_object_or_404
-from django.http import JsonResponse
-from django.contrib.auth.decorators import login_required
-from .models import Product, Cart, CartItem
-
-@login_required
-def get_recommendations(request):
-    # Simple recommendation: return 4 random products
-    products = Product.objects.order_by('?')[:4]
-    recommendations = []
-    for product in products:
-        recommendations.append({
-            'id': product.id,
-            'name': product.name,
-            'price': str(product.price),
-            'description': product.description,
-            'image_url': product.image.url if product.image else None,
-        })
-    return JsonResponse({'recommendations': recommendations})
-
-@login_required
-def add_to_cart(request, product_id):
-    if request.method == 'POST':
-        product = get_object_or_404(Product, id=product_id)
-        cart, created = Cart.objects.get_or_create(user=request.user)
-        
-        cart_item, created = CartItem.objects.get_or_create(
-            cart=cart,
-            product=product,
-            defaults={'quantity': 1}
-        )
-        
-        if not created:
-            cart_item.quantity += 1
-            cart_item.save()
-        
-        # Calculate cart total
-        cart_total = sum(item.product.price * item.quantity for item in cart.items.all())
-        cart_items = cart.items.count()
-        
-        return JsonResponse({
-            'message': f'Added {product.name} to cart',
-            'cart_total': f'{cart_total:.2f}',
-            'cart_items': cart_items
-        })
-    
-    return JsonResponse({'error': 'Invalid request method'}, status=400)
-
-@login_required
-def remove_from_cart(request, product_id):
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Item removed from cart',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-@login_required
-def update_cart_item(request, product_id):
-    try:
-        quantity = int(request.POST.get('quantity', 1))
-    except ValueError:
-        return JsonResponse({'error': 'Invalid quantity'}, status=400)
-    
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    
-    if quantity > 0:
-        cart_item.quantity = quantity
-        cart_item.save()
-    else:
-        cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Cart updated',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-from django.shortcuts import get_object_or_404
-from django.http import JsonResponse
-from django.contrib.auth.decorators import login_required
-from .models import Product, Cart, CartItem
-
-@login_required
-def get_recommendations(request):
-    # Simple recommendation: return 4 random products
-    products = Product.objects.order_by('?')[:4]
-    recommendations = []
-    for product in products:
-        recommendations.append({
-            'id': product.id,
-            'name': product.name,
-            'price': str(product.price),
-            'description': product.description,
-            'image_url': product.image.url if product.image else None,
-        })
-    return JsonResponse({'recommendations': recommendations})
-
-@login_required
-def add_to_cart(request, product_id):
-    if request.method == 'POST':
-        product = get_object_or_404(Product, id=product_id)
-        cart, created = Cart.objects.get_or_create(user=request.user)
-        
-        cart_item, created = CartItem.objects.get_or_create(
-            cart=cart,
-            product=product,
-            defaults={'quantity': 1}
-        )
-        
-        if not created:
-            cart_item.quantity += 1
-            cart_item.save()
-        
-        # Calculate cart total
-        cart_total = sum(item.product.price * item.quantity for item in cart.items.all())
-        cart_items = cart.items.count()
-        
-        return JsonResponse({
-            'message': f'Added {product.name} to cart',
-            'cart_total': f'{cart_total:.2f}',
-            'cart_items': cart_items
-        })
-    
-    return JsonResponse({'error': 'Invalid request method'}, status=400)
-
-@login_required
-def remove_from_cart(request, product_id):
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Item removed from cart',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-@login_required
-def update_cart_item(request, product_id):
-    try:
-        quantity = int(request.POST.get('quantity', 1))
-    except ValueError:
-        return JsonResponse({'error': 'Invalid quantity'}, status=400)
-    
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    
-    if quantity > 0:
-        cart_item.quantity = quantity
-        cart_item.save()
-    else:
-        cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Cart updated',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-from django.shortcuts import get_object_or_404
-from django.http import JsonResponse
-from django.contrib.auth.decorators import login_required
-from .models import Product, Cart, CartItem
-
-@login_required
-def get_recommendations(request):
-    # Simple recommendation: return 4 random products
-    products = Product.objects.order_by('?')[:4]
-    recommendations = []
-    for product in products:
-        recommendations.append({
-            'id': product.id,
-            'name': product.name,
-            'price': str(product.price),
-            'description': product.description,
-            'image_url': product.image.url if product.image else None,
-        })
-    return JsonResponse({'recommendations': recommendations})
-
-@login_required
-def add_to_cart(request, product_id):
-    if request.method == 'POST':
-        product = get_object_or_404(Product, id=product_id)
-        cart, created = Cart.objects.get_or_create(user=request.user)
-        
-        cart_item, created = CartItem.objects.get_or_create(
-            cart=cart,
-            product=product,
-            defaults={'quantity': 1}
-        )
-        
-        if not created:
-            cart_item.quantity += 1
-            cart_item.save()
-        
-        # Calculate cart total
-        cart_total = sum(item.product.price * item.quantity for item in cart.items.all())
-        cart_items = cart.items.count()
-        
-        return JsonResponse({
-            'message': f'Added {product.name} to cart',
-            'cart_total': f'{cart_total:.2f}',
-            'cart_items': cart_items
-        })
-    
-    return JsonResponse({'error': 'Invalid request method'}, status=400)
-
-@login_required
-def remove_from_cart(request, product_id):
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Item removed from cart',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-@login_required
-def update_cart_item(request, product_id):
-    try:
-        quantity = int(request.POST.get('quantity', 1))
-    except ValueError:
-        return JsonResponse({'error': 'Invalid quantity'}, status=400)
-    
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    
-    if quantity > 0:
-        cart_item.quantity = quantity
-        cart_item.save()
-    else:
-        cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Cart updated',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-from django.shortcuts import get_object_or_404
-from django.http import JsonResponse
-from django.contrib.auth.decorators import login_required
-from .models import Product, Cart, CartItem
-
-@login_required
-def get_recommendations(request):
-    # Simple recommendation: return 4 random products
-    products = Product.objects.order_by('?')[:4]
-    recommendations = []
-    for product in products:
-        recommendations.append({
-            'id': product.id,
-            'name': product.name,
-            'price': str(product.price),
-            'description': product.description,
-            'image_url': product.image.url if product.image else None,
-        })
-    return JsonResponse({'recommendations': recommendations})
-
-@login_required
-def add_to_cart(request, product_id):
-    if request.method == 'POST':
-        product = get_object_or_404(Product, id=product_id)
-        cart, created = Cart.objects.get_or_create(user=request.user)
-        
-        cart_item, created = CartItem.objects.get_or_create(
-            cart=cart,
-            product=product,
-            defaults={'quantity': 1}
-        )
-        
-        if not created:
-            cart_item.quantity += 1
-            cart_item.save()
-        
-        # Calculate cart total
-        cart_total = sum(item.product.price * item.quantity for item in cart.items.all())
-        cart_items = cart.items.count()
-        
-        return JsonResponse({
-            'message': f'Added {product.name} to cart',
-            'cart_total': f'{cart_total:.2f}',
-            'cart_items': cart_items
-        })
-    
-    return JsonResponse({'error': 'Invalid request method'}, status=400)
-
-@login_required
-def remove_from_cart(request, product_id):
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Item removed from cart',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-@login_required
-def update_cart_item(request, product_id):
-    try:
-        quantity = int(request.POST.get('quantity', 1))
-    except ValueError:
-        return JsonResponse({'error': 'Invalid quantity'}, status=400)
-    
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    
-    if quantity > 0:
-        cart_item.quantity = quantity
-        cart_item.save()
-    else:
-        cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Cart updated',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-from django.shortcuts import get_object_or_404
-from django.http import JsonResponse
-from django.contrib.auth.decorators import login_required
-from .models import Product, Cart, CartItem
-
-@login_required
-def get_recommendations(request):
-    # Simple recommendation: return 4 random products
-    products = Product.objects.order_by('?')[:4]
-    recommendations = []
-    for product in products:
-        recommendations.append({
-            'id': product.id,
-            'name': product.name,
-            'price': str(product.price),
-            'description': product.description,
-            'image_url': product.image.url if product.image else None,
-        })
-    return JsonResponse({'recommendations': recommendations})
-
-@login_required
-def add_to_cart(request, product_id):
-    if request.method == 'POST':
-        product = get_object_or_404(Product, id=product_id)
-        cart, created = Cart.objects.get_or_create(user=request.user)
-        
-        cart_item, created = CartItem.objects.get_or_create(
-            cart=cart,
-            product=product,
-            defaults={'quantity': 1}
-        )
-        
-        if not created:
-            cart_item.quantity += 1
-            cart_item.save()
-        
-        # Calculate cart total
-        cart_total = sum(item.product.price * item.quantity for item in cart.items.all())
-        cart_items = cart.items.count()
-        
-        return JsonResponse({
-            'message': f'Added {product.name} to cart',
-            'cart_total': f'{cart_total:.2f}',
-            'cart_items': cart_items
-        })
-    
-    return JsonResponse({'error': 'Invalid request method'}, status=400)
-
-@login_required
-def remove_from_cart(request, product_id):
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Item removed from cart',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-@login_required
-def update_cart_item(request, product_id):
-    try:
-        quantity = int(request.POST.get('quantity', 1))
-    except ValueError:
-        return JsonResponse({'error': 'Invalid quantity'}, status=400)
-    
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    
-    if quantity > 0:
-        cart_item.quantity = quantity
-        cart_item.save()
-    else:
-        cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Cart updated',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-from django.shortcuts import get_object_or_404
-from django.http import JsonResponse
-from django.contrib.auth.decorators import login_required
-from .models import Product, Cart, CartItem
-
-@login_required
-def get_recommendations(request):
-    # Simple recommendation: return 4 random products
-    products = Product.objects.order_by('?')[:4]
-    recommendations = []
-    for product in products:
-        recommendations.append({
-            'id': product.id,
-            'name': product.name,
-            'price': str(product.price),
-            'description': product.description,
-            'image_url': product.image.url if product.image else None,
-        })
-    return JsonResponse({'recommendations': recommendations})
-
-@login_required
-def add_to_cart(request, product_id):
-    if request.method == 'POST':
-        product = get_object_or_404(Product, id=product_id)
-        cart, created = Cart.objects.get_or_create(user=request.user)
-        
-        cart_item, created = CartItem.objects.get_or_create(
-            cart=cart,
-            product=product,
-            defaults={'quantity': 1}
-        )
-        
-        if not created:
-            cart_item.quantity += 1
-            cart_item.save()
-        
-        # Calculate cart total
-        cart_total = sum(item.product.price * item.quantity for item in cart.items.all())
-        cart_items = cart.items.count()
-        
-        return JsonResponse({
-            'message': f'Added {product.name} to cart',
-            'cart_total': f'{cart_total:.2f}',
-            'cart_items': cart_items
-        })
-    
-    return JsonResponse({'error': 'Invalid request method'}, status=400)
-
-@login_required
-def remove_from_cart(request, product_id):
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Item removed from cart',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-@login_required
-def update_cart_item(request, product_id):
-    try:
-        quantity = int(request.POST.get('quantity', 1))
-    except ValueError:
-        return JsonResponse({'error': 'Invalid quantity'}, status=400)
-    
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    
-    if quantity > 0:
-        cart_item.quantity = quantity
-        cart_item.save()
-    else:
-        cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Cart updated',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-from django.shortcuts import get_object_or_404
-from django.http import JsonResponse
-from django.contrib.auth.decorators import login_required
-from .models import Product, Cart, CartItem
-
-@login_required
-def get_recommendations(request):
-    # Simple recommendation: return 4 random products
-    products = Product.objects.order_by('?')[:4]
-    recommendations = []
-    for product in products:
-        recommendations.append({
-            'id': product.id,
-            'name': product.name,
-            'price': str(product.price),
-            'description': product.description,
-            'image_url': product.image.url if product.image else None,
-        })
-    return JsonResponse({'recommendations': recommendations})
-
-@login_required
-def add_to_cart(request, product_id):
-    if request.method == 'POST':
-        product = get_object_or_404(Product, id=product_id)
-        cart, created = Cart.objects.get_or_create(user=request.user)
-        
-        cart_item, created = CartItem.objects.get_or_create(
-            cart=cart,
-            product=product,
-            defaults={'quantity': 1}
-        )
-        
-        if not created:
-            cart_item.quantity += 1
-            cart_item.save()
-        
-        # Calculate cart total
-        cart_total = sum(item.product.price * item.quantity for item in cart.items.all())
-        cart_items = cart.items.count()
-        
-        return JsonResponse({
-            'message': f'Added {product.name} to cart',
-            'cart_total': f'{cart_total:.2f}',
-            'cart_items': cart_items
-        })
-    
-    return JsonResponse({'error': 'Invalid request method'}, status=400)
-
-@login_required
-def remove_from_cart(request, product_id):
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Item removed from cart',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-@login_required
-def update_cart_item(request, product_id):
-    try:
-        quantity = int(request.POST.get('quantity', 1))
-    except ValueError:
-        return JsonResponse({'error': 'Invalid quantity'}, status=400)
-    
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    
-    if quantity > 0:
-        cart_item.quantity = quantity
-        cart_item.save()
-    else:
-        cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Cart updated',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-from django.shortcuts import get_object_or_404
-from django.http import JsonResponse
-from django.contrib.auth.decorators import login_required
-from .models import Product, Cart, CartItem
-
-@login_required
-def get_recommendations(request):
-    # Simple recommendation: return 4 random products
-    products = Product.objects.order_by('?')[:4]
-    recommendations = []
-    for product in products:
-        recommendations.append({
-            'id': product.id,
-            'name': product.name,
-            'price': str(product.price),
-            'description': product.description,
-            'image_url': product.image.url if product.image else None,
-        })
-    return JsonResponse({'recommendations': recommendations})
-
-@login_required
-def add_to_cart(request, product_id):
-    if request.method == 'POST':
-        product = get_object_or_404(Product, id=product_id)
-        cart, created = Cart.objects.get_or_create(user=request.user)
-        
-        cart_item, created = CartItem.objects.get_or_create(
-            cart=cart,
-            product=product,
-            defaults={'quantity': 1}
-        )
-        
-        if not created:
-            cart_item.quantity += 1
-            cart_item.save()
-        
-        # Calculate cart total
-        cart_total = sum(item.product.price * item.quantity for item in cart.items.all())
-        cart_items = cart.items.count()
-        
-        return JsonResponse({
-            'message': f'Added {product.name} to cart',
-            'cart_total': f'{cart_total:.2f}',
-            'cart_items': cart_items
-        })
-    
-    return JsonResponse({'error': 'Invalid request method'}, status=400)
-
-@login_required
-def remove_from_cart(request, product_id):
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Item removed from cart',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-@login_required
-def update_cart_item(request, product_id):
-    try:
-        quantity = int(request.POST.get('quantity', 1))
-    except ValueError:
-        return JsonResponse({'error': 'Invalid quantity'}, status=400)
-    
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    
-    if quantity > 0:
-        cart_item.quantity = quantity
-        cart_item.save()
-    else:
-        cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Cart updated',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-from django.shortcuts import get_object_or_404
-from django.http import JsonResponse
-from django.contrib.auth.decorators import login_required
-from .models import Product, Cart, CartItem
-
-@login_required
-def get_recommendations(request):
-    # Simple recommendation: return 4 random products
-    products = Product.objects.order_by('?')[:4]
-    recommendations = []
-    for product in products:
-        recommendations.append({
-            'id': product.id,
-            'name': product.name,
-            'price': str(product.price),
-            'description': product.description,
-            'image_url': product.image.url if product.image else None,
-        })
-    return JsonResponse({'recommendations': recommendations})
-
-@login_required
-def add_to_cart(request, product_id):
-    if request.method == 'POST':
-        product = get_object_or_404(Product, id=product_id)
-        cart, created = Cart.objects.get_or_create(user=request.user)
-        
-        cart_item, created = CartItem.objects.get_or_create(
-            cart=cart,
-            product=product,
-            defaults={'quantity': 1}
-        )
-        
-        if not created:
-            cart_item.quantity += 1
-            cart_item.save()
-        
-        # Calculate cart total
-        cart_total = sum(item.product.price * item.quantity for item in cart.items.all())
-        cart_items = cart.items.count()
-        
-        return JsonResponse({
-            'message': f'Added {product.name} to cart',
-            'cart_total': f'{cart_total:.2f}',
-            'cart_items': cart_items
-        })
-    
-    return JsonResponse({'error': 'Invalid request method'}, status=400)
-
-@login_required
-def remove_from_cart(request, product_id):
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Item removed from cart',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-@login_required
-def update_cart_item(request, product_id):
-    try:
-        quantity = int(request.POST.get('quantity', 1))
-    except ValueError:
-        return JsonResponse({'error': 'Invalid quantity'}, status=400)
-    
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    
-    if quantity > 0:
-        cart_item.quantity = quantity
-        cart_item.save()
-    else:
-        cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Cart updated',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-from django.shortcuts import get_object_or_404
-from django.http import JsonResponse
-from django.contrib.auth.decorators import login_required
-from .models import Product, Cart, CartItem
-
-@login_required
-def get_recommendations(request):
-    # Simple recommendation: return 4 random products
-    products = Product.objects.order_by('?')[:4]
-    recommendations = []
-    for product in products:
-        recommendations.append({
-            'id': product.id,
-            'name': product.name,
-            'price': str(product.price),
-            'description': product.description,
-            'image_url': product.image.url if product.image else None,
-        })
-    return JsonResponse({'recommendations': recommendations})
-
-@login_required
-def add_to_cart(request, product_id):
-    if request.method == 'POST':
-        product = get_object_or_404(Product, id=product_id)
-        cart, created = Cart.objects.get_or_create(user=request.user)
-        
-        cart_item, created = CartItem.objects.get_or_create(
-            cart=cart,
-            product=product,
-            defaults={'quantity': 1}
-        )
-        
-        if not created:
-            cart_item.quantity += 1
-            cart_item.save()
-        
-        # Calculate cart total
-        cart_total = sum(item.product.price * item.quantity for item in cart.items.all())
-        cart_items = cart.items.count()
-        
-        return JsonResponse({
-            'message': f'Added {product.name} to cart',
-            'cart_total': f'{cart_total:.2f}',
-            'cart_items': cart_items
-        })
-    
-    return JsonResponse({'error': 'Invalid request method'}, status=400)
-
-@login_required
-def remove_from_cart(request, product_id):
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Item removed from cart',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-@login_required
-def update_cart_item(request, product_id):
-    try:
-        quantity = int(request.POST.get('quantity', 1))
-    except ValueError:
-        return JsonResponse({'error': 'Invalid quantity'}, status=400)
-    
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    
-    if quantity > 0:
-        cart_item.quantity = quantity
-        cart_item.save()
-    else:
-        cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Cart updated',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-from django.shortcuts import get_object_or_404
-from django.http import JsonResponse
-from django.contrib.auth.decorators import login_required
-from .models import Product, Cart, CartItem
-
-@login_required
-def get_recommendations(request):
-    # Simple recommendation: return 4 random products
-    products = Product.objects.order_by('?')[:4]
-    recommendations = []
-    for product in products:
-        recommendations.append({
-            'id': product.id,
-            'name': product.name,
-            'price': str(product.price),
-            'description': product.description,
-            'image_url': product.image.url if product.image else None,
-        })
-    return JsonResponse({'recommendations': recommendations})
-
-@login_required
-def add_to_cart(request, product_id):
-    if request.method == 'POST':
-        product = get_object_or_404(Product, id=product_id)
-        cart, created = Cart.objects.get_or_create(user=request.user)
-        
-        cart_item, created = CartItem.objects.get_or_create(
-            cart=cart,
-            product=product,
-            defaults={'quantity': 1}
-        )
-        
-        if not created:
-            cart_item.quantity += 1
-            cart_item.save()
-        
-        # Calculate cart total
-        cart_total = sum(item.product.price * item.quantity for item in cart.items.all())
-        cart_items = cart.items.count()
-        
-        return JsonResponse({
-            'message': f'Added {product.name} to cart',
-            'cart_total': f'{cart_total:.2f}',
-            'cart_items': cart_items
-        })
-    
-    return JsonResponse({'error': 'Invalid request method'}, status=400)
-
-@login_required
-def remove_from_cart(request, product_id):
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Item removed from cart',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-@login_required
-def update_cart_item(request, product_id):
-    try:
-        quantity = int(request.POST.get('quantity', 1))
-    except ValueError:
-        return JsonResponse({'error': 'Invalid quantity'}, status=400)
-    
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    
-    if quantity > 0:
-        cart_item.quantity = quantity
-        cart_item.save()
-    else:
-        cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Cart updated',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-from django.shortcuts import get_object_or_404
-from django.http import JsonResponse
-from django.contrib.auth.decorators import login_required
-from .models import Product, Cart, CartItem
-
-@login_required
-def get_recommendations(request):
-    # Simple recommendation: return 4 random products
-    products = Product.objects.order_by('?')[:4]
-    recommendations = []
-    for product in products:
-        recommendations.append({
-            'id': product.id,
-            'name': product.name,
-            'price': str(product.price),
-            'description': product.description,
-            'image_url': product.image.url if product.image else None,
-        })
-    return JsonResponse({'recommendations': recommendations})
-
-@login_required
-def add_to_cart(request, product_id):
-    if request.method == 'POST':
-        product = get_object_or_404(Product, id=product_id)
-        cart, created = Cart.objects.get_or_create(user=request.user)
-        
-        cart_item, created = CartItem.objects.get_or_create(
-            cart=cart,
-            product=product,
-            defaults={'quantity': 1}
-        )
-        
-        if not created:
-            cart_item.quantity += 1
-            cart_item.save()
-        
-        # Calculate cart total
-        cart_total = sum(item.product.price * item.quantity for item in cart.items.all())
-        cart_items = cart.items.count()
-        
-        return JsonResponse({
-            'message': f'Added {product.name} to cart',
-            'cart_total': f'{cart_total:.2f}',
-            'cart_items': cart_items
-        })
-    
-    return JsonResponse({'error': 'Invalid request method'}, status=400)
-
-@login_required
-def remove_from_cart(request, product_id):
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Item removed from cart',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-@login_required
-def update_cart_item(request, product_id):
-    try:
-        quantity = int(request.POST.get('quantity', 1))
-    except ValueError:
-        return JsonResponse({'error': 'Invalid quantity'}, status=400)
-    
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    
-    if quantity > 0:
-        cart_item.quantity = quantity
-        cart_item.save()
-    else:
-        cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Cart updated',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-from django.shortcuts import get_object_or_404
-from django.http import JsonResponse
-from django.contrib.auth.decorators import login_required
-from .models import Product, Cart, CartItem
-
-@login_required
-def get_recommendations(request):
-    # Simple recommendation: return 4 random products
-    products = Product.objects.order_by('?')[:4]
-    recommendations = []
-    for product in products:
-        recommendations.append({
-            'id': product.id,
-            'name': product.name,
-            'price': str(product.price),
-            'description': product.description,
-            'image_url': product.image.url if product.image else None,
-        })
-    return JsonResponse({'recommendations': recommendations})
-
-@login_required
-def add_to_cart(request, product_id):
-    if request.method == 'POST':
-        product = get_object_or_404(Product, id=product_id)
-        cart, created = Cart.objects.get_or_create(user=request.user)
-        
-        cart_item, created = CartItem.objects.get_or_create(
-            cart=cart,
-            product=product,
-            defaults={'quantity': 1}
-        )
-        
-        if not created:
-            cart_item.quantity += 1
-            cart_item.save()
-        
-        # Calculate cart total
-        cart_total = sum(item.product.price * item.quantity for item in cart.items.all())
-        cart_items = cart.items.count()
-        
-        return JsonResponse({
-            'message': f'Added {product.name} to cart',
-            'cart_total': f'{cart_total:.2f}',
-            'cart_items': cart_items
-        })
-    
-    return JsonResponse({'error': 'Invalid request method'}, status=400)
-
-@login_required
-def remove_from_cart(request, product_id):
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Item removed from cart',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-@login_required
-def update_cart_item(request, product_id):
-    try:
-        quantity = int(request.POST.get('quantity', 1))
-    except ValueError:
-        return JsonResponse({'error': 'Invalid quantity'}, status=400)
-    
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    
-    if quantity > 0:
-        cart_item.quantity = quantity
-        cart_item.save()
-    else:
-        cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Cart updated',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-from django.shortcuts import get_object_or_404
-from django.http import JsonResponse
-from django.contrib.auth.decorators import login_required
-from .models import Product, Cart, CartItem
-
-@login_required
-def get_recommendations(request):
-    # Simple recommendation: return 4 random products
-    products = Product.objects.order_by('?')[:4]
-    recommendations = []
-    for product in products:
-        recommendations.append({
-            'id': product.id,
-            'name': product.name,
-            'price': str(product.price),
-            'description': product.description,
-            'image_url': product.image.url if product.image else None,
-        })
-    return JsonResponse({'recommendations': recommendations})
-
-@login_required
-def add_to_cart(request, product_id):
-    if request.method == 'POST':
-        product = get_object_or_404(Product, id=product_id)
-        cart, created = Cart.objects.get_or_create(user=request.user)
-        
-        cart_item, created = CartItem.objects.get_or_create(
-            cart=cart,
-            product=product,
-            defaults={'quantity': 1}
-        )
-        
-        if not created:
-            cart_item.quantity += 1
-            cart_item.save()
-        
-        # Calculate cart total
-        cart_total = sum(item.product.price * item.quantity for item in cart.items.all())
-        cart_items = cart.items.count()
-        
-        return JsonResponse({
-            'message': f'Added {product.name} to cart',
-            'cart_total': f'{cart_total:.2f}',
-            'cart_items': cart_items
-        })
-    
-    return JsonResponse({'error': 'Invalid request method'}, status=400)
-
-@login_required
-def remove_from_cart(request, product_id):
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Item removed from cart',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-@login_required
-def update_cart_item(request, product_id):
-    try:
-        quantity = int(request.POST.get('quantity', 1))
-    except ValueError:
-        return JsonResponse({'error': 'Invalid quantity'}, status=400)
-    
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    
-    if quantity > 0:
-        cart_item.quantity = quantity
-        cart_item.save()
-    else:
-        cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Cart updated',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-from django.shortcuts import get_object_or_404
-from django.http import JsonResponse
-from django.contrib.auth.decorators import login_required
-from .models import Product, Cart, CartItem
-
-@login_required
-def get_recommendations(request):
-    # Simple recommendation: return 4 random products
-    products = Product.objects.order_by('?')[:4]
-    recommendations = []
-    for product in products:
-        recommendations.append({
-            'id': product.id,
-            'name': product.name,
-            'price': str(product.price),
-            'description': product.description,
-            'image_url': product.image.url if product.image else None,
-        })
-    return JsonResponse({'recommendations': recommendations})
-
-@login_required
-def add_to_cart(request, product_id):
-    if request.method == 'POST':
-        product = get_object_or_404(Product, id=product_id)
-        cart, created = Cart.objects.get_or_create(user=request.user)
-        
-        cart_item, created = CartItem.objects.get_or_create(
-            cart=cart,
-            product=product,
-            defaults={'quantity': 1}
-        )
-        
-        if not created:
-            cart_item.quantity += 1
-            cart_item.save()
-        
-        # Calculate cart total
-        cart_total = sum(item.product.price * item.quantity for item in cart.items.all())
-        cart_items = cart.items.count()
-        
-        return JsonResponse({
-            'message': f'Added {product.name} to cart',
-            'cart_total': f'{cart_total:.2f}',
-            'cart_items': cart_items
-        })
-    
-    return JsonResponse({'error': 'Invalid request method'}, status=400)
-
-@login_required
-def remove_from_cart(request, product_id):
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Item removed from cart',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-@login_required
-def update_cart_item(request, product_id):
-    try:
-        quantity = int(request.POST.get('quantity', 1))
-    except ValueError:
-        return JsonResponse({'error': 'Invalid quantity'}, status=400)
-    
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    
-    if quantity > 0:
-        cart_item.quantity = quantity
-        cart_item.save()
-    else:
-        cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Cart updated',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-from django.shortcuts import get_object_or_404
-from django.http import JsonResponse
-from django.contrib.auth.decorators import login_required
-from .models import Product, Cart, CartItem
-
-@login_required
-def get_recommendations(request):
-    # Simple recommendation: return 4 random products
-    products = Product.objects.order_by('?')[:4]
-    recommendations = []
-    for product in products:
-        recommendations.append({
-            'id': product.id,
-            'name': product.name,
-            'price': str(product.price),
-            'description': product.description,
-            'image_url': product.image.url if product.image else None,
-        })
-    return JsonResponse({'recommendations': recommendations})
-
-@login_required
-def add_to_cart(request, product_id):
-    if request.method == 'POST':
-        product = get_object_or_404(Product, id=product_id)
-        cart, created = Cart.objects.get_or_create(user=request.user)
-        
-        cart_item, created = CartItem.objects.get_or_create(
-            cart=cart,
-            product=product,
-            defaults={'quantity': 1}
-        )
-        
-        if not created:
-            cart_item.quantity += 1
-            cart_item.save()
-        
-        # Calculate cart total
-        cart_total = sum(item.product.price * item.quantity for item in cart.items.all())
-        cart_items = cart.items.count()
-        
-        return JsonResponse({
-            'message': f'Added {product.name} to cart',
-            'cart_total': f'{cart_total:.2f}',
-            'cart_items': cart_items
-        })
-    
-    return JsonResponse({'error': 'Invalid request method'}, status=400)
-
-@login_required
-def remove_from_cart(request, product_id):
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Item removed from cart',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-@login_required
-def update_cart_item(request, product_id):
-    try:
-        quantity = int(request.POST.get('quantity', 1))
-    except ValueError:
-        return JsonResponse({'error': 'Invalid quantity'}, status=400)
-    
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    
-    if quantity > 0:
-        cart_item.quantity = quantity
-        cart_item.save()
-    else:
-        cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Cart updated',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-from django.shortcuts import get_object_or_404
-from django.http import JsonResponse
-from django.contrib.auth.decorators import login_required
-from .models import Product, Cart, CartItem
-
-@login_required
-def get_recommendations(request):
-    # Simple recommendation: return 4 random products
-    products = Product.objects.order_by('?')[:4]
-    recommendations = []
-    for product in products:
-        recommendations.append({
-            'id': product.id,
-            'name': product.name,
-            'price': str(product.price),
-            'description': product.description,
-            'image_url': product.image.url if product.image else None,
-        })
-    return JsonResponse({'recommendations': recommendations})
-
-@login_required
-def add_to_cart(request, product_id):
-    if request.method == 'POST':
-        product = get_object_or_404(Product, id=product_id)
-        cart, created = Cart.objects.get_or_create(user=request.user)
-        
-        cart_item, created = CartItem.objects.get_or_create(
-            cart=cart,
-            product=product,
-            defaults={'quantity': 1}
-        )
-        
-        if not created:
-            cart_item.quantity += 1
-            cart_item.save()
-        
-        # Calculate cart total
-        cart_total = sum(item.product.price * item.quantity for item in cart.items.all())
-        cart_items = cart.items.count()
-        
-        return JsonResponse({
-            'message': f'Added {product.name} to cart',
-            'cart_total': f'{cart_total:.2f}',
-            'cart_items': cart_items
-        })
-    
-    return JsonResponse({'error': 'Invalid request method'}, status=400)
-
-@login_required
-def remove_from_cart(request, product_id):
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Item removed from cart',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-@login_required
-def update_cart_item(request, product_id):
-    try:
-        quantity = int(request.POST.get('quantity', 1))
-    except ValueError:
-        return JsonResponse({'error': 'Invalid quantity'}, status=400)
-    
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    
-    if quantity > 0:
-        cart_item.quantity = quantity
-        cart_item.save()
-    else:
-        cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Cart updated',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-from django.shortcuts import get_object_or_404
-from django.http import JsonResponse
-from django.contrib.auth.decorators import login_required
-from .models import Product, Cart, CartItem
-
-@login_required
-def get_recommendations(request):
-    # Simple recommendation: return 4 random products
-    products = Product.objects.order_by('?')[:4]
-    recommendations = []
-    for product in products:
-        recommendations.append({
-            'id': product.id,
-            'name': product.name,
-            'price': str(product.price),
-            'description': product.description,
-            'image_url': product.image.url if product.image else None,
-        })
-    return JsonResponse({'recommendations': recommendations})
-
-@login_required
-def add_to_cart(request, product_id):
-    if request.method == 'POST':
-        product = get_object_or_404(Product, id=product_id)
-        cart, created = Cart.objects.get_or_create(user=request.user)
-        
-        cart_item, created = CartItem.objects.get_or_create(
-            cart=cart,
-            product=product,
-            defaults={'quantity': 1}
-        )
-        
-        if not created:
-            cart_item.quantity += 1
-            cart_item.save()
-        
-        # Calculate cart total
-        cart_total = sum(item.product.price * item.quantity for item in cart.items.all())
-        cart_items = cart.items.count()
-        
-        return JsonResponse({
-            'message': f'Added {product.name} to cart',
-            'cart_total': f'{cart_total:.2f}',
-            'cart_items': cart_items
-        })
-    
-    return JsonResponse({'error': 'Invalid request method'}, status=400)
-
-@login_required
-def remove_from_cart(request, product_id):
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Item removed from cart',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-@login_required
-def update_cart_item(request, product_id):
-    try:
-        quantity = int(request.POST.get('quantity', 1))
-    except ValueError:
-        return JsonResponse({'error': 'Invalid quantity'}, status=400)
-    
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    
-    if quantity > 0:
-        cart_item.quantity = quantity
-        cart_item.save()
-    else:
-        cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Cart updated',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-from django.shortcuts import get_object_or_404
-from django.http import JsonResponse
-from django.contrib.auth.decorators import login_required
-from .models import Product, Cart, CartItem
-
-@login_required
-def get_recommendations(request):
-    # Simple recommendation: return 4 random products
-    products = Product.objects.order_by('?')[:4]
-    recommendations = []
-    for product in products:
-        recommendations.append({
-            'id': product.id,
-            'name': product.name,
-            'price': str(product.price),
-            'description': product.description,
-            'image_url': product.image.url if product.image else None,
-        })
-    return JsonResponse({'recommendations': recommendations})
-
-@login_required
-def add_to_cart(request, product_id):
-    if request.method == 'POST':
-        product = get_object_or_404(Product, id=product_id)
-        cart, created = Cart.objects.get_or_create(user=request.user)
-        
-        cart_item, created = CartItem.objects.get_or_create(
-            cart=cart,
-            product=product,
-            defaults={'quantity': 1}
-        )
-        
-        if not created:
-            cart_item.quantity += 1
-            cart_item.save()
-        
-        # Calculate cart total
-        cart_total = sum(item.product.price * item.quantity for item in cart.items.all())
-        cart_items = cart.items.count()
-        
-        return JsonResponse({
-            'message': f'Added {product.name} to cart',
-            'cart_total': f'{cart_total:.2f}',
-            'cart_items': cart_items
-        })
-    
-    return JsonResponse({'error': 'Invalid request method'}, status=400)
-
-@login_required
-def remove_from_cart(request, product_id):
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Item removed from cart',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-@login_required
-def update_cart_item(request, product_id):
-    try:
-        quantity = int(request.POST.get('quantity', 1))
-    except ValueError:
-        return JsonResponse({'error': 'Invalid quantity'}, status=400)
-    
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    
-    if quantity > 0:
-        cart_item.quantity = quantity
-        cart_item.save()
-    else:
-        cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Cart updated',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-from django.shortcuts import get_object_or_404
-from django.http import JsonResponse
-from django.contrib.auth.decorators import login_required
-from .models import Product, Cart, CartItem
-
-@login_required
-def get_recommendations(request):
-    # Simple recommendation: return 4 random products
-    products = Product.objects.order_by('?')[:4]
-    recommendations = []
-    for product in products:
-        recommendations.append({
-            'id': product.id,
-            'name': product.name,
-            'price': str(product.price),
-            'description': product.description,
-            'image_url': product.image.url if product.image else None,
-        })
-    return JsonResponse({'recommendations': recommendations})
-
-@login_required
-def add_to_cart(request, product_id):
-    if request.method == 'POST':
-        product = get_object_or_404(Product, id=product_id)
-        cart, created = Cart.objects.get_or_create(user=request.user)
-        
-        cart_item, created = CartItem.objects.get_or_create(
-            cart=cart,
-            product=product,
-            defaults={'quantity': 1}
-        )
-        
-        if not created:
-            cart_item.quantity += 1
-            cart_item.save()
-        
-        # Calculate cart total
-        cart_total = sum(item.product.price * item.quantity for item in cart.items.all())
-        cart_items = cart.items.count()
-        
-        return JsonResponse({
-            'message': f'Added {product.name} to cart',
-            'cart_total': f'{cart_total:.2f}',
-            'cart_items': cart_items
-        })
-    
-    return JsonResponse({'error': 'Invalid request method'}, status=400)
-
-@login_required
-def remove_from_cart(request, product_id):
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Item removed from cart',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-@login_required
-def update_cart_item(request, product_id):
-    try:
-        quantity = int(request.POST.get('quantity', 1))
-    except ValueError:
-        return JsonResponse({'error': 'Invalid quantity'}, status=400)
-    
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    
-    if quantity > 0:
-        cart_item.quantity = quantity
-        cart_item.save()
-    else:
-        cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Cart updated',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-from django.shortcuts import get_object_or_404
-from django.http import JsonResponse
-from django.contrib.auth.decorators import login_required
-from .models import Product, Cart, CartItem
-
-@login_required
-def get_recommendations(request):
-    # Simple recommendation: return 4 random products
-    products = Product.objects.order_by('?')[:4]
-    recommendations = []
-    for product in products:
-        recommendations.append({
-            'id': product.id,
-            'name': product.name,
-            'price': str(product.price),
-            'description': product.description,
-            'image_url': product.image.url if product.image else None,
-        })
-    return JsonResponse({'recommendations': recommendations})
-
-@login_required
-def add_to_cart(request, product_id):
-    if request.method == 'POST':
-        product = get_object_or_404(Product, id=product_id)
-        cart, created = Cart.objects.get_or_create(user=request.user)
-        
-        cart_item, created = CartItem.objects.get_or_create(
-            cart=cart,
-            product=product,
-            defaults={'quantity': 1}
-        )
-        
-        if not created:
-            cart_item.quantity += 1
-            cart_item.save()
-        
-        # Calculate cart total
-        cart_total = sum(item.product.price * item.quantity for item in cart.items.all())
-        cart_items = cart.items.count()
-        
-        return JsonResponse({
-            'message': f'Added {product.name} to cart',
-            'cart_total': f'{cart_total:.2f}',
-            'cart_items': cart_items
-        })
-    
-    return JsonResponse({'error': 'Invalid request method'}, status=400)
-
-@login_required
-def remove_from_cart(request, product_id):
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Item removed from cart',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-@login_required
-def update_cart_item(request, product_id):
-    try:
-        quantity = int(request.POST.get('quantity', 1))
-    except ValueError:
-        return JsonResponse({'error': 'Invalid quantity'}, status=400)
-    
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    
-    if quantity > 0:
-        cart_item.quantity = quantity
-        cart_item.save()
-    else:
-        cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Cart updated',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-from django.shortcuts import get_object_or_404
-from django.http import JsonResponse
-from django.contrib.auth.decorators import login_required
-from .models import Product, Cart, CartItem
-
-@login_required
-def get_recommendations(request):
-    # Simple recommendation: return 4 random products
-    products = Product.objects.order_by('?')[:4]
-    recommendations = []
-    for product in products:
-        recommendations.append({
-            'id': product.id,
-            'name': product.name,
-            'price': str(product.price),
-            'description': product.description,
-            'image_url': product.image.url if product.image else None,
-        })
-    return JsonResponse({'recommendations': recommendations})
-
-@login_required
-def add_to_cart(request, product_id):
-    if request.method == 'POST':
-        product = get_object_or_404(Product, id=product_id)
-        cart, created = Cart.objects.get_or_create(user=request.user)
-        
-        cart_item, created = CartItem.objects.get_or_create(
-            cart=cart,
-            product=product,
-            defaults={'quantity': 1}
-        )
-        
-        if not created:
-            cart_item.quantity += 1
-            cart_item.save()
-        
-        # Calculate cart total
-        cart_total = sum(item.product.price * item.quantity for item in cart.items.all())
-        cart_items = cart.items.count()
-        
-        return JsonResponse({
-            'message': f'Added {product.name} to cart',
-            'cart_total': f'{cart_total:.2f}',
-            'cart_items': cart_items
-        })
-    
-    return JsonResponse({'error': 'Invalid request method'}, status=400)
-
-@login_required
-def remove_from_cart(request, product_id):
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Item removed from cart',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-@login_required
-def update_cart_item(request, product_id):
-    try:
-        quantity = int(request.POST.get('quantity', 1))
-    except ValueError:
-        return JsonResponse({'error': 'Invalid quantity'}, status=400)
-    
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    
-    if quantity > 0:
-        cart_item.quantity = quantity
-        cart_item.save()
-    else:
-        cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Cart updated',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-from django.shortcuts import get_object_or_404
-from django.http import JsonResponse
-from django.contrib.auth.decorators import login_required
-from .models import Product, Cart, CartItem
-
-@login_required
-def get_recommendations(request):
-    # Simple recommendation: return 4 random products
-    products = Product.objects.order_by('?')[:4]
-    recommendations = []
-    for product in products:
-        recommendations.append({
-            'id': product.id,
-            'name': product.name,
-            'price': str(product.price),
-            'description': product.description,
-            'image_url': product.image.url if product.image else None,
-        })
-    return JsonResponse({'recommendations': recommendations})
-
-@login_required
-def add_to_cart(request, product_id):
-    if request.method == 'POST':
-        product = get_object_or_404(Product, id=product_id)
-        cart, created = Cart.objects.get_or_create(user=request.user)
-        
-        cart_item, created = CartItem.objects.get_or_create(
-            cart=cart,
-            product=product,
-            defaults={'quantity': 1}
-        )
-        
-        if not created:
-            cart_item.quantity += 1
-            cart_item.save()
-        
-        # Calculate cart total
-        cart_total = sum(item.product.price * item.quantity for item in cart.items.all())
-        cart_items = cart.items.count()
-        
-        return JsonResponse({
-            'message': f'Added {product.name} to cart',
-            'cart_total': f'{cart_total:.2f}',
-            'cart_items': cart_items
-        })
-    
-    return JsonResponse({'error': 'Invalid request method'}, status=400)
-
-@login_required
-def remove_from_cart(request, product_id):
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Item removed from cart',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-@login_required
-def update_cart_item(request, product_id):
-    try:
-        quantity = int(request.POST.get('quantity', 1))
-    except ValueError:
-        return JsonResponse({'error': 'Invalid quantity'}, status=400)
-    
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    
-    if quantity > 0:
-        cart_item.quantity = quantity
-        cart_item.save()
-    else:
-        cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Cart updated',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-from django.shortcuts import get_object_or_404
-from django.http import JsonResponse
-from django.contrib.auth.decorators import login_required
-from .models import Product, Cart, CartItem
-
-@login_required
-def get_recommendations(request):
-    # Simple recommendation: return 4 random products
-    products = Product.objects.order_by('?')[:4]
-    recommendations = []
-    for product in products:
-        recommendations.append({
-            'id': product.id,
-            'name': product.name,
-            'price': str(product.price),
-            'description': product.description,
-            'image_url': product.image.url if product.image else None,
-        })
-    return JsonResponse({'recommendations': recommendations})
-
-@login_required
-def add_to_cart(request, product_id):
-    if request.method == 'POST':
-        product = get_object_or_404(Product, id=product_id)
-        cart, created = Cart.objects.get_or_create(user=request.user)
-        
-        cart_item, created = CartItem.objects.get_or_create(
-            cart=cart,
-            product=product,
-            defaults={'quantity': 1}
-        )
-        
-        if not created:
-            cart_item.quantity += 1
-            cart_item.save()
-        
-        # Calculate cart total
-        cart_total = sum(item.product.price * item.quantity for item in cart.items.all())
-        cart_items = cart.items.count()
-        
-        return JsonResponse({
-            'message': f'Added {product.name} to cart',
-            'cart_total': f'{cart_total:.2f}',
-            'cart_items': cart_items
-        })
-    
-    return JsonResponse({'error': 'Invalid request method'}, status=400)
-
-@login_required
-def remove_from_cart(request, product_id):
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Item removed from cart',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-@login_required
-def update_cart_item(request, product_id):
-    try:
-        quantity = int(request.POST.get('quantity', 1))
-    except ValueError:
-        return JsonResponse({'error': 'Invalid quantity'}, status=400)
-    
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    
-    if quantity > 0:
-        cart_item.quantity = quantity
-        cart_item.save()
-    else:
-        cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Cart updated',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-from django.shortcuts import get_object_or_404
-from django.http import JsonResponse
-from django.contrib.auth.decorators import login_required
-from .models import Product, Cart, CartItem
-
-@login_required
-def get_recommendations(request):
-    # Simple recommendation: return 4 random products
-    products = Product.objects.order_by('?')[:4]
-    recommendations = []
-    for product in products:
-        recommendations.append({
-            'id': product.id,
-            'name': product.name,
-            'price': str(product.price),
-            'description': product.description,
-            'image_url': product.image.url if product.image else None,
-        })
-    return JsonResponse({'recommendations': recommendations})
-
-@login_required
-def add_to_cart(request, product_id):
-    if request.method == 'POST':
-        product = get_object_or_404(Product, id=product_id)
-        cart, created = Cart.objects.get_or_create(user=request.user)
-        
-        cart_item, created = CartItem.objects.get_or_create(
-            cart=cart,
-            product=product,
-            defaults={'quantity': 1}
-        )
-        
-        if not created:
-            cart_item.quantity += 1
-            cart_item.save()
-        
-        # Calculate cart total
-        cart_total = sum(item.product.price * item.quantity for item in cart.items.all())
-        cart_items = cart.items.count()
-        
-        return JsonResponse({
-            'message': f'Added {product.name} to cart',
-            'cart_total': f'{cart_total:.2f}',
-            'cart_items': cart_items
-        })
-    
-    return JsonResponse({'error': 'Invalid request method'}, status=400)
-
-@login_required
-def remove_from_cart(request, product_id):
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Item removed from cart',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-@login_required
-def update_cart_item(request, product_id):
-    try:
-        quantity = int(request.POST.get('quantity', 1))
-    except ValueError:
-        return JsonResponse({'error': 'Invalid quantity'}, status=400)
-    
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    
-    if quantity > 0:
-        cart_item.quantity = quantity
-        cart_item.save()
-    else:
-        cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Cart updated',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-from django.shortcuts import get_object_or_404
-from django.http import JsonResponse
-from django.contrib.auth.decorators import login_required
-from .models import Product, Cart, CartItem
-
-@login_required
-def get_recommendations(request):
-    # Simple recommendation: return 4 random products
-    products = Product.objects.order_by('?')[:4]
-    recommendations = []
-    for product in products:
-        recommendations.append({
-            'id': product.id,
-            'name': product.name,
-            'price': str(product.price),
-            'description': product.description,
-            'image_url': product.image.url if product.image else None,
-        })
-    return JsonResponse({'recommendations': recommendations})
-
-@login_required
-def add_to_cart(request, product_id):
-    if request.method == 'POST':
-        product = get_object_or_404(Product, id=product_id)
-        cart, created = Cart.objects.get_or_create(user=request.user)
-        
-        cart_item, created = CartItem.objects.get_or_create(
-            cart=cart,
-            product=product,
-            defaults={'quantity': 1}
-        )
-        
-        if not created:
-            cart_item.quantity += 1
-            cart_item.save()
-        
-        # Calculate cart total
-        cart_total = sum(item.product.price * item.quantity for item in cart.items.all())
-        cart_items = cart.items.count()
-        
-        return JsonResponse({
-            'message': f'Added {product.name} to cart',
-            'cart_total': f'{cart_total:.2f}',
-            'cart_items': cart_items
-        })
-    
-    return JsonResponse({'error': 'Invalid request method'}, status=400)
-
-@login_required
-def remove_from_cart(request, product_id):
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Item removed from cart',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-@login_required
-def update_cart_item(request, product_id):
-    try:
-        quantity = int(request.POST.get('quantity', 1))
-    except ValueError:
-        return JsonResponse({'error': 'Invalid quantity'}, status=400)
-    
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    
-    if quantity > 0:
-        cart_item.quantity = quantity
-        cart_item.save()
-    else:
-        cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Cart updated',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-from django.shortcuts import get_object_or_404
-from django.http import JsonResponse
-from django.contrib.auth.decorators import login_required
-from .models import Product, Cart, CartItem
-
-@login_required
-def get_recommendations(request):
-    # Simple recommendation: return 4 random products
-    products = Product.objects.order_by('?')[:4]
-    recommendations = []
-    for product in products:
-        recommendations.append({
-            'id': product.id,
-            'name': product.name,
-            'price': str(product.price),
-            'description': product.description,
-            'image_url': product.image.url if product.image else None,
-        })
-    return JsonResponse({'recommendations': recommendations})
-
-@login_required
-def add_to_cart(request, product_id):
-    if request.method == 'POST':
-        product = get_object_or_404(Product, id=product_id)
-        cart, created = Cart.objects.get_or_create(user=request.user)
-        
-        cart_item, created = CartItem.objects.get_or_create(
-            cart=cart,
-            product=product,
-            defaults={'quantity': 1}
-        )
-        
-        if not created:
-            cart_item.quantity += 1
-            cart_item.save()
-        
-        # Calculate cart total
-        cart_total = sum(item.product.price * item.quantity for item in cart.items.all())
-        cart_items = cart.items.count()
-        
-        return JsonResponse({
-            'message': f'Added {product.name} to cart',
-            'cart_total': f'{cart_total:.2f}',
-            'cart_items': cart_items
-        })
-    
-    return JsonResponse({'error': 'Invalid request method'}, status=400)
-
-@login_required
-def remove_from_cart(request, product_id):
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Item removed from cart',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-@login_required
-def update_cart_item(request, product_id):
-    try:
-        quantity = int(request.POST.get('quantity', 1))
-    except ValueError:
-        return JsonResponse({'error': 'Invalid quantity'}, status=400)
-    
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    
-    if quantity > 0:
-        cart_item.quantity = quantity
-        cart_item.save()
-    else:
-        cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Cart updated',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-from django.shortcuts import get_object_or_404
-from django.http import JsonResponse
-from django.contrib.auth.decorators import login_required
-from .models import Product, Cart, CartItem
-
-@login_required
-def get_recommendations(request):
-    # Simple recommendation: return 4 random products
-    products = Product.objects.order_by('?')[:4]
-    recommendations = []
-    for product in products:
-        recommendations.append({
-            'id': product.id,
-            'name': product.name,
-            'price': str(product.price),
-            'description': product.description,
-            'image_url': product.image.url if product.image else None,
-        })
-    return JsonResponse({'recommendations': recommendations})
-
-@login_required
-def add_to_cart(request, product_id):
-    if request.method == 'POST':
-        product = get_object_or_404(Product, id=product_id)
-        cart, created = Cart.objects.get_or_create(user=request.user)
-        
-        cart_item, created = CartItem.objects.get_or_create(
-            cart=cart,
-            product=product,
-            defaults={'quantity': 1}
-        )
-        
-        if not created:
-            cart_item.quantity += 1
-            cart_item.save()
-        
-        # Calculate cart total
-        cart_total = sum(item.product.price * item.quantity for item in cart.items.all())
-        cart_items = cart.items.count()
-        
-        return JsonResponse({
-            'message': f'Added {product.name} to cart',
-            'cart_total': f'{cart_total:.2f}',
-            'cart_items': cart_items
-        })
-    
-    return JsonResponse({'error': 'Invalid request method'}, status=400)
-
-@login_required
-def remove_from_cart(request, product_id):
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Item removed from cart',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-@login_required
-def update_cart_item(request, product_id):
-    try:
-        quantity = int(request.POST.get('quantity', 1))
-    except ValueError:
-        return JsonResponse({'error': 'Invalid quantity'}, status=400)
-    
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    
-    if quantity > 0:
-        cart_item.quantity = quantity
-        cart_item.save()
-    else:
-        cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Cart updated',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-from django.shortcuts import get_object_or_404
-from django.http import JsonResponse
-from django.contrib.auth.decorators import login_required
-from .models import Product, Cart, CartItem
-
-@login_required
-def get_recommendations(request):
-    # Simple recommendation: return 4 random products
-    products = Product.objects.order_by('?')[:4]
-    recommendations = []
-    for product in products:
-        recommendations.append({
-            'id': product.id,
-            'name': product.name,
-            'price': str(product.price),
-            'description': product.description,
-            'image_url': product.image.url if product.image else None,
-        })
-    return JsonResponse({'recommendations': recommendations})
-
-@login_required
-def add_to_cart(request, product_id):
-    if request.method == 'POST':
-        product = get_object_or_404(Product, id=product_id)
-        cart, created = Cart.objects.get_or_create(user=request.user)
-        
-        cart_item, created = CartItem.objects.get_or_create(
-            cart=cart,
-            product=product,
-            defaults={'quantity': 1}
-        )
-        
-        if not created:
-            cart_item.quantity += 1
-            cart_item.save()
-        
-        # Calculate cart total
-        cart_total = sum(item.product.price * item.quantity for item in cart.items.all())
-        cart_items = cart.items.count()
-        
-        return JsonResponse({
-            'message': f'Added {product.name} to cart',
-            'cart_total': f'{cart_total:.2f}',
-            'cart_items': cart_items
-        })
-    
-    return JsonResponse({'error': 'Invalid request method'}, status=400)
-
-@login_required
-def remove_from_cart(request, product_id):
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Item removed from cart',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-@login_required
-def update_cart_item(request, product_id):
-    try:
-        quantity = int(request.POST.get('quantity', 1))
-    except ValueError:
-        return JsonResponse({'error': 'Invalid quantity'}, status=400)
-    
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    
-    if quantity > 0:
-        cart_item.quantity = quantity
-        cart_item.save()
-    else:
-        cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Cart updated',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-from django.shortcuts import get_object_or_404
-from django.http import JsonResponse
-from django.contrib.auth.decorators import login_required
-from .models import Product, Cart, CartItem
-
-@login_required
-def get_recommendations(request):
-    # Simple recommendation: return 4 random products
-    products = Product.objects.order_by('?')[:4]
-    recommendations = []
-    for product in products:
-        recommendations.append({
-            'id': product.id,
-            'name': product.name,
-            'price': str(product.price),
-            'description': product.description,
-            'image_url': product.image.url if product.image else None,
-        })
-    return JsonResponse({'recommendations': recommendations})
-
-@login_required
-def add_to_cart(request, product_id):
-    if request.method == 'POST':
-        product = get_object_or_404(Product, id=product_id)
-        cart, created = Cart.objects.get_or_create(user=request.user)
-        
-        cart_item, created = CartItem.objects.get_or_create(
-            cart=cart,
-            product=product,
-            defaults={'quantity': 1}
-        )
-        
-        if not created:
-            cart_item.quantity += 1
-            cart_item.save()
-        
-        # Calculate cart total
-        cart_total = sum(item.product.price * item.quantity for item in cart.items.all())
-        cart_items = cart.items.count()
-        
-        return JsonResponse({
-            'message': f'Added {product.name} to cart',
-            'cart_total': f'{cart_total:.2f}',
-            'cart_items': cart_items
-        })
-    
-    return JsonResponse({'error': 'Invalid request method'}, status=400)
-
-@login_required
-def remove_from_cart(request, product_id):
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Item removed from cart',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-@login_required
-def update_cart_item(request, product_id):
-    try:
-        quantity = int(request.POST.get('quantity', 1))
-    except ValueError:
-        return JsonResponse({'error': 'Invalid quantity'}, status=400)
-    
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    
-    if quantity > 0:
-        cart_item.quantity = quantity
-        cart_item.save()
-    else:
-        cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Cart updated',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-from django.shortcuts import get_object_or_404
-from django.http import JsonResponse
-from django.contrib.auth.decorators import login_required
-from .models import Product, Cart, CartItem
-
-@login_required
-def get_recommendations(request):
-    # Simple recommendation: return 4 random products
-    products = Product.objects.order_by('?')[:4]
-    recommendations = []
-    for product in products:
-        recommendations.append({
-            'id': product.id,
-            'name': product.name,
-            'price': str(product.price),
-            'description': product.description,
-            'image_url': product.image.url if product.image else None,
-        })
-    return JsonResponse({'recommendations': recommendations})
-
-@login_required
-def add_to_cart(request, product_id):
-    if request.method == 'POST':
-        product = get_object_or_404(Product, id=product_id)
-        cart, created = Cart.objects.get_or_create(user=request.user)
-        
-        cart_item, created = CartItem.objects.get_or_create(
-            cart=cart,
-            product=product,
-            defaults={'quantity': 1}
-        )
-        
-        if not created:
-            cart_item.quantity += 1
-            cart_item.save()
-        
-        # Calculate cart total
-        cart_total = sum(item.product.price * item.quantity for item in cart.items.all())
-        cart_items = cart.items.count()
-        
-        return JsonResponse({
-            'message': f'Added {product.name} to cart',
-            'cart_total': f'{cart_total:.2f}',
-            'cart_items': cart_items
-        })
-    
-    return JsonResponse({'error': 'Invalid request method'}, status=400)
-
-@login_required
-def remove_from_cart(request, product_id):
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Item removed from cart',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-@login_required
-def update_cart_item(request, product_id):
-    try:
-        quantity = int(request.POST.get('quantity', 1))
-    except ValueError:
-        return JsonResponse({'error': 'Invalid quantity'}, status=400)
-    
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    
-    if quantity > 0:
-        cart_item.quantity = quantity
-        cart_item.save()
-    else:
-        cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Cart updated',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-from django.shortcuts import get_object_or_404
-from django.http import JsonResponse
-from django.contrib.auth.decorators import login_required
-from .models import Product, Cart, CartItem
 
 @login_required
 def get_recommendations(request):
@@ -3959,69 +761,3 @@ def get_recommendations(request):
             'image_url': product.image.url if product.image else None,
         })
     return JsonResponse({'recommendations': recommendations})
-
-@login_required
-def add_to_cart(request, product_id):
-    if request.method == 'POST':
-        product = get_object_or_404(Product, id=product_id)
-        cart, created = Cart.objects.get_or_create(user=request.user)
-        
-        cart_item, created = CartItem.objects.get_or_create(
-            cart=cart,
-            product=product,
-            defaults={'quantity': 1}
-        )
-        
-        if not created:
-            cart_item.quantity += 1
-            cart_item.save()
-        
-        # Calculate cart total
-        cart_total = sum(item.product.price * item.quantity for item in cart.items.all())
-        cart_items = cart.items.count()
-        
-        return JsonResponse({
-            'message': f'Added {product.name} to cart',
-            'cart_total': f'{cart_total:.2f}',
-            'cart_items': cart_items
-        })
-    
-    return JsonResponse({'error': 'Invalid request method'}, status=400)
-
-@login_required
-def remove_from_cart(request, product_id):
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Item removed from cart',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-@login_required
-def update_cart_item(request, product_id):
-    try:
-        quantity = int(request.POST.get('quantity', 1))
-    except ValueError:
-        return JsonResponse({'error': 'Invalid quantity'}, status=400)
-    
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    
-    if quantity > 0:
-        cart_item.quantity = quantity
-        cart_item.save()
-    else:
-        cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Cart updated',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-from django.shortcuts import get_object_or_404
-from django.http import JsonResponse
-from django.contrib.auth.decorators import login_required
@@ -0,0 +1,97 @@
+"""
+In-process counters flushed to the database in the background.
+
+``BufferedCounter.add`` only touches a dict, so request handlers never
+write.  Each key holds ``(count, first_seen, last_seen)``.  A daemon thread
+per process hands the whole batch to the ``apply`` function every
+``flush_interval`` seconds (or sooner once ``max_pending`` keys are
+waiting), and the process flushes once more on exit.  If ``apply`` raises,
+the batch is merged back into the buffer and retried on the next flush, so
+``apply`` must write everything in one transaction.  A crash loses at most
+one interval of counts.
+"""
+import atexit
+import logging
+import os
+import threading
+
+from django.db import close_old_connections
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+FLUSH_INTERVAL = 5.0
+MAX_PENDING = 10000
+
+
+class BufferedCounter:
+    def __init__(self, name, apply, flush_interval=FLUSH_INTERVAL, max_pending=MAX_PENDING):
+        self.name = name
+        self.apply = apply
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._worker_pid = None
+        atexit.register(self._flush_at_exit)
+
+    def add(self, *keys, when=None):
+        """Count one occurrence at ``when`` for each of ``keys``"""
+        when = when or timezone.now()
+        with self._lock:
+            for key in keys:
+                count, first, last = self._pending.get(key, (0, when, when))
+                self._pending[key] = (count + 1, min(first, when), max(last, when))
+            full = len(self._pending) >= self.max_pending
+        self._ensure_worker()
+        if full:
+            self._wake.set()
+
+    def _ensure_worker(self):
+        # One flusher per process; forked workers start their own
+        if self._worker_pid == os.getpid():
+            return
+        with self._lock:
+            if self._worker_pid == os.getpid():
+                return
+            self._worker_pid = os.getpid()
+        threading.Thread(target=self._run, name=f'{self.name}-flush', daemon=True).start()
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception('Failed to flush %s', self.name)
+            finally:
+                close_old_connections()
+
+    def _restore(self, pending):
+        with self._lock:
+            for key, (count, first, last) in pending.items():
+                current = self._pending.get(key, (0, first, last))
+                self._pending[key] = (current[0] + count, min(current[1], first), max(current[2], last))
+
+    def flush(self):
+        """Apply everything buffered so far; returns the number of keys"""
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+            if not pending:
+                return 0
+            try:
+                self.apply(pending)
+            except BaseException:
+                self._restore(pending)
+                raise
+            return len(pending)
+
+    def _flush_at_exit(self):
+        try:
+            self.flush()
+        except Exception:
+            logger.exception('Failed to flush %s at exit', self.name)
@@ -0,0 +1,177 @@
+"""
+Cart writes, each in one transaction.
+
+Adding a product or changing a line's quantity starts by moving the cart's
+``item_count`` and ``subtotal`` with ``F()`` arithmetic (the price comes
+from a subquery), which also takes the cart row's write lock: concurrent
+writes to the same cart queue there instead of racing, so no increment is
+lost and a product never gets two lines.  The line is then updated with
+another ``F()`` expression (or inserted), and one final SELECT returns the
+new totals together with the line.  That is three queries per call, four
+when the line is new.
+
+These writes bypass the ``CartItem`` signals; ``cart_changed`` is sent
+instead.  Removing a line goes through ``delete()`` so cascades and the
+other receivers run, with ``cart_totals`` told that the totals have already
+been moved.
+
+Nothing here imports models: both the API app and the storefront pass their
+own saved ``Cart``, which gets the new ``item_count``/``subtotal`` in place.
+"""
+from django.db import transaction
+from django.db.models import Exists, F, Subquery
+from django.dispatch import Signal
+
+from .cart_totals import ZERO, touch
+
+# Sent with ``cart`` and the changed ``line`` after ``add_item``/``set_quantity``
+cart_changed = Signal()
+
+
+class CartError(ValueError):
+    pass
+
+
+class CartLine:
+    """A cart line as it stands after a change"""
+
+    def __init__(self, item_id, product_id, quantity, price):
+        self.item_id = item_id
+        self.product_id = product_id
+        self.quantity = quantity
+        self.price = price
+
+    @property
+    def total(self):
+        return self.price * self.quantity
+
+
+def _models(cart_model):
+    item_model = cart_model._meta.get_field('items').related_model
+    return item_model, item_model._meta.get_field('product').related_model
+
+
+def _lines(cart, product_id=None, item_id=None):
+    item_model, _ = _models(cart._meta.model)
+    lines = item_model.objects.filter(cart_id=cart.pk)
+    if item_id is not None:
+        return lines.filter(pk=item_id)
+    return lines.filter(product_id=product_id)
+
+
+def _move_totals(cart, condition, quantity_delta, price):
+    """
+    Add ``quantity_delta`` units at ``price`` (expressions) to the cart's
+    counters if ``condition`` holds; False if it doesn't.
+    """
+    cart_model = cart._meta.model
+    touched = touch(cart_model)
+    moved = cart_model.objects.filter(pk=cart.pk).filter(condition).update(
+        item_count=F('item_count') + quantity_delta,
+        subtotal=F('subtotal') + quantity_delta * price,
+        **touched
+    )
+    for name, value in touched.items():
+        setattr(cart, name, value)
+    return bool(moved)
+
+
+def _refresh(cart, lines=None, limit_to_stock=False):
+    """
+    Read the cart's counters back into ``cart`` and, if given, the line in
+    ``lines``, in one query.  Raises ``CartError`` if ``limit_to_stock`` and
+    the line holds more than the product's stock.
+    """
+    annotations = {}
+    if lines is not None:
+        annotations = {
+            'line_id': Subquery(lines.values('pk')[:1]),
+            'line_product_id': Subquery(lines.values('product_id')[:1]),
+            'line_quantity': Subquery(lines.values('quantity')[:1]),
+            'line_price': Subquery(lines.values('product__price')[:1]),
+        }
+        if limit_to_stock:
+            annotations['line_stock'] = Subquery(lines.values('product__stock')[:1])
+    row = cart._meta.model.objects.filter(pk=cart.pk).values('item_count', 'subtotal', **annotations).get()
+    cart.item_count = row['item_count']
+    # SQLite hands back Decimal('-0.00') once the arithmetic returns to zero
+    cart.subtotal = row['subtotal'] + ZERO
+    if lines is None:
+        return None
+
+    if limit_to_stock and row['line_quantity'] > row['line_stock']:
+        raise CartError(f"Only {row['line_stock']} items available")
+    return CartLine(row['line_id'], row['line_product_id'], row['line_quantity'], row['line_price'])
+
+
+def add_item(cart, product_id, quantity=1, limit_to_stock=False):
+    """
+    Add ``quantity`` of the product to ``cart``, creating its line if
+    needed, and return the line.  Raises the product model's
+    ``DoesNotExist`` for an unknown product and ``CartError`` for a bad
+    quantity (or, with ``limit_to_stock``, more than is in stock).
+    """
+    if quantity < 1:
+        raise CartError('Quantity must be at least 1')
+    cart_model = cart._meta.model
+    item_model, product_model = _models(cart_model)
+    products = product_model.objects.filter(pk=product_id)
+    lines = _lines(cart, product_id=product_id)
+
+    with transaction.atomic():
+        price = Subquery(products.values('price')[:1])
+        if not _move_totals(cart, Exists(products), quantity, price):
+            raise product_model.DoesNotExist('Product matching query does not exist.')
+        if not lines.update(quantity=F('quantity') + quantity, **touch(item_model)):
+            item_model.objects.bulk_create([
+                item_model(cart_id=cart.pk, product_id=product_id, quantity=quantity)
+            ])
+        line = _refresh(cart, lines, limit_to_stock)
+        cart_changed.send(sender=cart_model, cart=cart, line=line)
+    return line
+
+
+def set_quantity(cart, quantity, product_id=None, item_id=None, limit_to_stock=False):
+    """
+    Set the quantity of the cart's line for ``item_id`` (or for
+    ``product_id``) and return the line; a quantity of 0 removes it and
+    returns None.  Raises the item model's ``DoesNotExist`` if the cart has
+    no such line.
+    """
+    if quantity < 0:
+        raise CartError('Quantity cannot be negative')
+    if quantity == 0:
+        return remove_item(cart, product_id=product_id, item_id=item_id)
+    cart_model = cart._meta.model
+    item_model, _ = _models(cart_model)
+    lines = _lines(cart, product_id, item_id)
+
+    with transaction.atomic():
+        delta = quantity - Subquery(lines.values('quantity')[:1])
+        price = Subquery(lines.values('product__price')[:1])
+        if not _move_totals(cart, Exists(lines), delta, price):
+            raise item_model.DoesNotExist('CartItem matching query does not exist.')
+        lines.update(quantity=quantity, **touch(item_model))
+        line = _refresh(cart, lines, limit_to_stock)
+        cart_changed.send(sender=cart_model, cart=cart, line=line)
+    return line
+
+
+def remove_item(cart, product_id=None, item_id=None):
+    """
+    Remove the cart's line for ``item_id`` (or for ``product_id``).  Raises
+    the item model's ``DoesNotExist`` if the cart has no such line.
+    """
+    item_model, _ = _models(cart._meta.model)
+    lines = _lines(cart, product_id, item_id)
+
+    with transaction.atomic():
+        delta = -Subquery(lines.values('quantity')[:1])
+        price = Subquery(lines.values('product__price')[:1])
+        if not _move_totals(cart, Exists(lines), delta, price):
+            raise item_model.DoesNotExist('CartItem matching query does not exist.')
+        for item in lines:
+            item.cart = cart
+            item._cart_totals_recorded = True
+            item.delete()
+        _refresh(cart)
@@ -0,0 +1,122 @@
+"""
+Denormalized ``Cart.item_count`` and ``Cart.subtotal``.
+
+When a ``CartItem`` is saved or deleted, its cart's counters are recomputed
+from the cart's lines inside one UPDATE, after locking the cart row with
+``select_for_update``: concurrent changes to one cart queue on that lock and
+each recompute sees the lines committed before it, so the totals never
+drift.  The recompute also stamps the cart's ``auto_now`` fields, so
+``updated_at`` reflects item activity as it does for ``cart_service``
+writes.  Moving a line to another cart recomputes both; the cart a line was
+loaded with is noted in ``post_init`` (``remember_item``), so saves don't
+read anything back first.  Product price changes go through
+``reconcile_cart_totals`` for the carts holding the product, and only when
+the stored price actually changed (``remember_price``/``price_changed``).
+
+Nothing here imports models: both the API app and the storefront pass their
+own ``Cart``/``CartItem`` (any cart with ``item_count``, ``subtotal`` and
+``items`` holding ``product`` and ``quantity``).
+"""
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import DecimalField, F, IntegerField, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+ZERO = Decimal('0.00')
+
+
+def _money():
+    return DecimalField(max_digits=12, decimal_places=2)
+
+
+def touch(model):
+    """Queryset updates skip auto_now; return those fields stamped as save() would"""
+    now = timezone.now()
+    return {
+        field.attname: now for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now', False)
+    }
+
+
+def _cart_model(item):
+    return type(item)._meta.get_field('cart').related_model
+
+
+def remember_item(item):
+    """``post_init``: note the cart ``item`` was loaded with"""
+    # Read from __dict__ so a deferred cart_id isn't fetched.  _state.adding
+    # is only cleared after post_init, so new and loaded lines look alike;
+    # for a new line this is just the cart it is created in.
+    item._stored_cart_id = item.__dict__.get('cart_id')
+
+
+def recompute_carts(cart_model, *cart_ids):
+    """Lock the carts' rows and recompute their counters from their lines"""
+    cart_ids = sorted({cart_id for cart_id in cart_ids if cart_id is not None})
+    if not cart_ids:
+        return
+    with transaction.atomic():
+        carts = cart_model.objects.filter(pk__in=cart_ids)
+        # Locked in a statement of its own, so the recompute below reads the
+        # lines committed by whoever held the lock before
+        list(carts.select_for_update().values_list('pk', flat=True))
+        carts.update(**_totals(cart_model), **touch(cart_model))
+
+
+def _refresh_cached_cart(item):
+    # Keep a cart instance the caller already holds in step with the row
+    if type(item).cart.is_cached(item) and item.cart is not None:
+        item.cart.refresh_from_db(fields=['item_count', 'subtotal'])
+
+
+def item_saved(item, created):
+    previous_cart_id = getattr(item, '_stored_cart_id', None)
+    recompute_carts(_cart_model(item), item.cart_id, previous_cart_id)
+    item._stored_cart_id = item.cart_id
+    _refresh_cached_cart(item)
+
+
+def item_deleted(item):
+    if getattr(item, '_cart_totals_recorded', False):
+        # cart_service.remove_item moved the totals before deleting
+        return
+    recompute_carts(_cart_model(item), item.cart_id)
+    _refresh_cached_cart(item)
+
+
+def remember_price(product, update_fields=None):
+    """``pre_save``: note the stored price of ``product`` if it may change"""
+    product._stored_price = None
+    if product.pk and (update_fields is None or 'price' in update_fields):
+        product._stored_price = type(product).objects.filter(
+            pk=product.pk
+        ).values_list('price', flat=True).first()
+
+
+def price_changed(product):
+    stored = getattr(product, '_stored_price', None)
+    return stored is not None and stored != product.price
+
+
+def _totals(cart_model):
+    item_model = cart_model._meta.get_field('items').related_model
+    items = item_model.objects.filter(cart=OuterRef('pk')).values('cart')
+    return dict(
+        item_count=Coalesce(
+            Subquery(items.annotate(total=Sum('quantity')).values('total')[:1]), 0,
+            output_field=IntegerField()
+        ),
+        subtotal=Coalesce(
+            Subquery(items.annotate(
+                total=Sum(F('quantity') * F('product__price'), output_field=_money())
+            ).values('total')[:1]), ZERO,
+            output_field=_money()
+        ),
+    )
+
+
+def reconcile_cart_totals(queryset):
+    """Recompute the counters of the carts in ``queryset``; returns rows updated"""
+    return queryset.update(**_totals(queryset.model))
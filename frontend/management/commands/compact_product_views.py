@@ -0,0 +1,56 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Max, Min
+from django.db.models.functions import TruncDate
+from frontend.models import ProductView
+from frontend.view_tracking import apply_view_counts
+
+class Command(BaseCommand):
+    help = 'Folds raw ProductView rows into the aggregated view tables and deletes them'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=10000,
+            help='Raw rows folded per transaction'
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        last_id = 0
+        compacted = 0
+
+        while True:
+            ids = list(
+                ProductView.objects.filter(pk__gt=last_id)
+                .order_by('pk')
+                .values_list('pk', flat=True)[:chunk_size]
+            )
+            if not ids:
+                break
+
+            # Clear the model's default ordering so it doesn't split the groups
+            chunk = ProductView.objects.filter(pk__gte=ids[0], pk__lte=ids[-1]).order_by()
+            stats = {
+                (row['user'], row['product']): (row['count'], row['first'], row['last'])
+                for row in chunk.values('user', 'product').annotate(
+                    count=Count('id'), first=Min('viewed_at'), last=Max('viewed_at')
+                )
+            }
+            daily = {
+                (row['product'], row['date']): row['count']
+                for row in chunk.annotate(date=TruncDate('viewed_at'))
+                .values('product', 'date')
+                .annotate(count=Count('id'))
+            }
+
+            with transaction.atomic():
+                apply_view_counts(stats, daily)
+                chunk.delete()
+
+            compacted += len(ids)
+            last_id = ids[-1]
+            self.stdout.write(f'Compacted {compacted} views...')
+
+        self.stdout.write(self.style.SUCCESS(f'Successfully compacted {compacted} product views'))
@@ -0,0 +1,56 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from frontend.models import Cart
+
+class Command(BaseCommand):
+    help = 'Deletes empty carts that have not been touched for a while'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=7,
+            help='Only purge carts untouched for this many days'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=10000,
+            help='Carts deleted per statement'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Count the carts that would be purged without deleting them'
+        )
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        # Every item change stamps its cart's updated_at; item_count is
+        # denormalized, so the item check guards against drift
+        abandoned = Cart.objects.filter(updated_at__lt=cutoff, item_count=0, items__isnull=True)
+
+        if options['dry_run']:
+            self.stdout.write(f'Would purge {abandoned.count()} empty carts')
+            return
+
+        last_id = 0
+        purged = 0
+        while True:
+            ids = list(
+                abandoned.filter(pk__gt=last_id)
+                .order_by('pk')
+                .values_list('pk', flat=True)[:options['chunk_size']]
+            )
+            if not ids:
+                break
+
+            # Carts that gained items since the SELECT are left alone
+            _, deleted = abandoned.filter(pk__in=ids).delete()
+            purged += deleted.get(Cart._meta.label, 0)
+            last_id = ids[-1]
+            self.stdout.write(f'Purged {purged} carts...')
+
+        self.stdout.write(self.style.SUCCESS(f'Successfully purged {purged} empty carts'))
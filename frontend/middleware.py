@@ -1,32 +1,52 @@
+from django.utils.functional import SimpleLazyObject
+
 from .models import Cart
 
+CART_SESSION_KEY = 'cart_id'
+
+
+def get_cart(request):
+    """
+    Return the visitor's cart without creating one: their saved cart, or an
+    unsaved empty ``Cart`` that ``ensure_cart`` persists on the first add.
+    """
+    if request.user.is_authenticated:
+        cart = Cart.objects.filter(user=request.user).order_by('pk').first()
+        return cart or Cart(user=request.user)
+
+    cart_id = request.session.get(CART_SESSION_KEY)
+    if cart_id:
+        cart = Cart.objects.filter(pk=cart_id, user__isnull=True).first()
+        if cart:
+            return cart
+    return Cart()
+
+
+def ensure_cart(request):
+    """Return ``request.cart``, saving it first if this is the visitor's first add"""
+    cart = request.cart
+    if cart.pk is not None:
+        return cart
+
+    if request.user.is_authenticated:
+        cart, _ = Cart.objects.get_or_create(user=request.user)
+    else:
+        cart = Cart.objects.create()
+        request.session[CART_SESSION_KEY] = cart.pk
+    request.cart = cart
+    return cart
+
+
 class CartMiddleware:
+    """
+    Attach ``request.cart`` lazily: nothing is queried unless a view or
+    template reads it, and nothing is written (no cart, no session) until
+    ``ensure_cart`` is called.
+    """
+
     def __init__(self, get_response):
         self.get_response = get_response
 
     def __call__(self, request):
-        # Try to get cart from session
-        cart_id = request.session.get('cart_id')
-        
-        if request.user.is_authenticated:
-            # If user is logged in, get or create their cart
-            cart, created = Cart.objects.get_or_create(user=request.user)
-            request.session['cart_id'] = cart.id
-            request.cart = cart
-        elif cart_id:
-            # If there's a cart in session, try to get it
-            try:
-                cart = Cart.objects.get(id=cart_id)
-                request.cart = cart
-            except Cart.DoesNotExist:
-                cart = Cart.objects.create()
-                request.session['cart_id'] = cart.id
-                request.cart = cart
-        else:
-            # Create a new cart
-            cart = Cart.objects.create()
-            request.session['cart_id'] = cart.id
-            request.cart = cart
-
-        response = self.get_response(request)
-        return response
+        request.cart = SimpleLazyObject(lambda: get_cart(request))
+        return self.get_response(request)
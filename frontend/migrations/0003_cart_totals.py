@@ -0,0 +1,48 @@
+from django.db import migrations, models
+from django.db.models import DecimalField, F, IntegerField, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+
+def populate_totals(apps, schema_editor):
+    Cart = apps.get_model("frontend", "Cart")
+    CartItem = apps.get_model("frontend", "CartItem")
+
+    items = CartItem.objects.filter(cart=OuterRef("pk")).values("cart")
+    Cart.objects.update(
+        item_count=Coalesce(
+            Subquery(items.annotate(total=Sum("quantity")).values("total")[:1]), 0,
+            output_field=IntegerField(),
+        ),
+        subtotal=Coalesce(
+            Subquery(
+                items.annotate(
+                    total=Sum(
+                        F("quantity") * F("product__price"),
+                        output_field=DecimalField(max_digits=12, decimal_places=2),
+                    )
+                ).values("total")[:1]
+            ),
+            0,
+            output_field=DecimalField(max_digits=12, decimal_places=2),
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("frontend", "0002_dailyproductviews_productviewstat"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="cart",
+            name="item_count",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="cart",
+            name="subtotal",
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=12),
+        ),
+        migrations.RunPython(populate_totals, migrations.RunPython.noop),
+    ]
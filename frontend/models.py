@@ -1,8 +1,10 @@
 from django.db import models
 from django.contrib.auth.models import User
-from django.db.models.signals import post_save
+from django.db.models.signals import post_init, pre_save, post_save, post_delete
 from django.dispatch import receiver
 
+from common import cart_totals
+
 class Category(models.Model):
     name = models.CharField(max_length=200)
     description = models.TextField(blank=True)
@@ -82,8 +84,8 @@ class Product(models.Model):
 
         # Get products from user's viewing history
         viewed_products = Product.objects.filter(
-            productview__user=user
-        ).exclude(id=self.id).order_by('-productview__viewed_at')[:limit]
+            view_stats__user=user
+        ).exclude(id=self.id).order_by('-view_stats__last_viewed_at')[:limit]
 
         # If not enough viewed products, add similar products
         if viewed_products.count() < limit:
@@ -101,6 +103,9 @@ class ProductImage(models.Model):
 
 class Cart(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True)
+    # Denormalized from CartItem, kept in sync by the receivers below
+    item_count = models.IntegerField(default=0)
+    subtotal = models.DecimalField(max_digits=12, decimal_places=2, default=0)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -108,7 +113,7 @@ class Cart(models.Model):
         return f"Cart {self.id}"
     
     def get_total_price(self):
-        return sum(item.get_total_price() for item in self.items.all())
+        return self.subtotal
 
 class CartItem(models.Model):
     cart = models.ForeignKey(Cart, related_name='items', on_delete=models.CASCADE)
@@ -141,6 +146,7 @@ class Order(models.Model):
     def __str__(self):
         return f"Order {self.id} by {self.user.username}"
 
+# Legacy raw view log, folded into ProductViewStat by compact_product_views
 class ProductView(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     product = models.ForeignKey(Product, on_delete=models.CASCADE)
@@ -152,6 +158,38 @@ class ProductView(models.Model):
     def __str__(self):
         return f"{self.user.username} viewed {self.product.name}"
 
+class ProductViewStat(models.Model):
+    """Aggregated views of a product by one user (replaces a row per view)"""
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='view_stats')
+    view_count = models.PositiveIntegerField(default=0)
+    first_viewed_at = models.DateTimeField()
+    last_viewed_at = models.DateTimeField()
+
+    class Meta:
+        unique_together = ('user', 'product')
+        indexes = [
+            models.Index(fields=['user', '-last_viewed_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.user.username} viewed {self.product.name} {self.view_count} times"
+
+class DailyProductViews(models.Model):
+    """Per-product view totals per day for analytics"""
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='daily_views')
+    date = models.DateField()
+    view_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ('product', 'date')
+        indexes = [
+            models.Index(fields=['date']),
+        ]
+
+    def __str__(self):
+        return f"{self.product.name} on {self.date}: {self.view_count} views"
+
 class UserProfile(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE)
     default_billing_address = models.TextField(null=True, blank=True)
@@ -173,3 +211,36 @@ def create_user_profile(sender, instance, created, **kwargs):
 @receiver(post_save, sender=User)
 def save_user_profile(sender, instance, **kwargs):
     instance.userprofile.save()
+
+@receiver([post_save, post_delete], sender=Product)
+def reindex_product(sender, instance, **kwargs):
+    from .search import mark_products_dirty
+    mark_products_dirty(instance.pk)
+
+@receiver(post_save, sender=Category)
+def reindex_category_products(sender, instance, **kwargs):
+    from .search import mark_products_dirty
+    mark_products_dirty(*instance.product_set.values_list('pk', flat=True))
+
+@receiver(post_init, sender=CartItem)
+def remember_previous_cart_item(sender, instance, **kwargs):
+    cart_totals.remember_item(instance)
+
+@receiver(post_save, sender=CartItem)
+def update_cart_totals(sender, instance, created, **kwargs):
+    cart_totals.item_saved(instance, created)
+
+@receiver(post_delete, sender=CartItem)
+def remove_cart_totals(sender, instance, **kwargs):
+    cart_totals.item_deleted(instance)
+
+@receiver(pre_save, sender=Product)
+def remember_product_price(sender, instance, update_fields=None, **kwargs):
+    cart_totals.remember_price(instance, update_fields)
+
+@receiver(post_save, sender=Product)
+def reprice_carts(sender, instance, created, update_fields=None, **kwargs):
+    if created or (update_fields is not None and 'price' not in update_fields):
+        return
+    if cart_totals.price_changed(instance):
+        cart_totals.reconcile_cart_totals(Cart.objects.filter(items__product=instance))
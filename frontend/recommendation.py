@@ -1,4 +1,4 @@
-from .models import Product, ProductView
+from .models import Product, ProductViewStat
 
 class RecommendationEngine:
     @staticmethod
@@ -28,7 +28,7 @@ class RecommendationEngine:
             return Product.objects.filter(featured=True)[:limit]
         
         # Get user's recently viewed products
-        recent_views = ProductView.objects.filter(user=user).select_related('product')[:5]
+        recent_views = ProductViewStat.objects.filter(user=user).select_related('product').order_by('-last_viewed_at')[:5]
         
         if not recent_views:
             return Product.objects.filter(featured=True)[:limit]
@@ -0,0 +1,60 @@
+"""
+Storefront product search.
+
+Uses the same in-process BM25 index as the API (``SearchIndex`` has no
+model dependencies) over this app's ``Product``: name, description and
+category.  Product and category signals queue changed products so every
+worker updates its index incrementally.  Products also carry category,
+price bucket and in-stock facets.
+"""
+from recommendations.facets import CATEGORY, product_facets
+from recommendations.search_index import LiveIndex
+
+from .models import Product
+
+FIELD_WEIGHTS = {
+    'name': 3.0,
+    'category': 2.0,
+    'description': 1.0,
+}
+# Id lists bound into SQL (``pk__in``) stay below database parameter limits
+MAX_FILTER_RESULTS = 1000
+
+
+def _load_products(ids):
+    queryset = Product.objects.select_related('category')
+    if ids is not None:
+        queryset = queryset.filter(pk__in=ids)
+    for product in queryset.iterator(chunk_size=2000):
+        fields = {
+            'name': product.name,
+            'description': product.description,
+            'category': product.category.name,
+        }
+        meta = {
+            'category': product.category_id,
+            'facets': product_facets(product.category_id, product.price, product.stock),
+        }
+        yield product.pk, fields, meta
+
+
+_live_index = LiveIndex('storefront-products', FIELD_WEIGHTS, _load_products)
+
+
+def mark_products_dirty(*product_ids):
+    _live_index.mark_dirty(*product_ids)
+
+
+def search_product_ids(query, category=None, limit=None):
+    """Ids of products matching every word of ``query``, best match first"""
+    filter_func = None
+    if category is not None:
+        filter_func = lambda meta: meta['category'] == category
+    return _live_index.get().search(query, filter_func=filter_func, limit=limit)
+
+
+def category_counts(query=None):
+    """``{category_id: count}`` over the products matching ``query`` (all when empty)"""
+    index = _live_index.get()
+    ids = index.match(query)[0] if query else None
+    return index.facet_counts(ids).get(CATEGORY, {})
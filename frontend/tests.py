@@ -0,0 +1,180 @@
+import io
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth.models import AnonymousUser, User
+from django.contrib.sessions.backends.db import SessionStore
+from django.core.management import call_command
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase
+from django.utils import timezone
+
+from common import cart_service
+from common.buffered_counter import BufferedCounter
+
+from . import view_tracking
+from .middleware import CART_SESSION_KEY, CartMiddleware
+from .models import Cart, CartItem, Category, DailyProductViews, Product, ProductViewStat
+
+
+@mock.patch.object(BufferedCounter, '_ensure_worker')
+class ViewTrackingTests(TestCase):
+    def setUp(self):
+        category = Category.objects.create(name='Audio')
+        self.product = Product.objects.create(
+            name='Headphones', description='', category=category, price=Decimal('2.50')
+        )
+        self.user = User.objects.create(username='shopper')
+        self.tracker = BufferedCounter('test-views', view_tracking._write_views)
+        patcher = mock.patch.object(view_tracking, '_tracker', self.tracker)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_flush_folds_views_into_stats_and_daily_totals(self, ensure_worker):
+        for _ in range(3):
+            view_tracking.record_product_view(self.user.pk, self.product.pk)
+        self.assertFalse(ProductViewStat.objects.exists())
+        view_tracking.flush_product_views()
+
+        stat = ProductViewStat.objects.get(user=self.user, product=self.product)
+        self.assertEqual(stat.view_count, 3)
+        self.assertLessEqual(stat.first_viewed_at, stat.last_viewed_at)
+        self.assertEqual(DailyProductViews.objects.get(product=self.product).view_count, 3)
+
+        view_tracking.record_product_view(self.user.pk, self.product.pk)
+        view_tracking.flush_product_views()
+        self.assertEqual(ProductViewStat.objects.get(pk=stat.pk).view_count, 4)
+
+    def test_apply_keeps_the_earliest_and_latest_view(self, ensure_worker):
+        now = timezone.now()
+        earlier, later = now - timedelta(days=2), now + timedelta(hours=1)
+        view_tracking.apply_view_counts({(self.user.pk, self.product.pk): (1, now, now)}, {})
+        view_tracking.apply_view_counts({(self.user.pk, self.product.pk): (2, earlier, later)}, {})
+
+        stat = ProductViewStat.objects.get()
+        self.assertEqual((stat.view_count, stat.first_viewed_at, stat.last_viewed_at), (3, earlier, later))
+
+    def test_views_of_deleted_products_are_dropped(self, ensure_worker):
+        view_tracking.record_product_view(self.user.pk, self.product.pk)
+        self.product.delete()
+        self.assertEqual(view_tracking.flush_product_views(), 2)
+        self.assertFalse(ProductViewStat.objects.exists())
+        self.assertFalse(DailyProductViews.objects.exists())
+
+    def test_failed_flush_keeps_the_views_buffered(self, ensure_worker):
+        view_tracking.record_product_view(self.user.pk, self.product.pk)
+        with mock.patch.object(view_tracking, 'apply_view_counts', side_effect=RuntimeError), \
+                self.assertRaises(RuntimeError):
+            view_tracking.flush_product_views()
+        view_tracking.flush_product_views()
+        self.assertEqual(ProductViewStat.objects.get().view_count, 1)
+
+
+class LazyCartTests(TestCase):
+    def setUp(self):
+        category = Category.objects.create(name='Audio')
+        self.product = Product.objects.create(
+            name='Headphones', description='', category=category, price=Decimal('2.50'), stock=5
+        )
+
+    def test_requests_that_ignore_the_cart_never_query_it(self):
+        request = RequestFactory().get('/')
+        request.user = AnonymousUser()
+        request.session = SessionStore()
+        with self.assertNumQueries(0):
+            CartMiddleware(lambda request: HttpResponse())(request)
+        self.assertIsNone(request.cart.pk)
+        self.assertFalse(Cart.objects.exists())
+        self.assertFalse(request.session.modified)
+
+    def test_first_add_creates_the_cart(self):
+        response = self.client.post('/cart/add/0/')
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(Cart.objects.exists())
+        self.assertNotIn(CART_SESSION_KEY, self.client.session)
+
+        self.client.post(f'/cart/add/{self.product.pk}/')
+        response = self.client.post(f'/cart/add/{self.product.pk}/', {'quantity': 2})
+        cart = Cart.objects.get()
+        self.assertEqual(self.client.session[CART_SESSION_KEY], cart.pk)
+        self.assertEqual(response.json()['cart_count'], 3)
+        self.assertEqual(CartItem.objects.get(cart=cart).quantity, 3)
+
+    def test_purge_deletes_only_old_empty_carts(self):
+        old = timezone.now() - timedelta(days=30)
+        empty, recent, filled = Cart.objects.create(), Cart.objects.create(), Cart.objects.create()
+        CartItem.objects.create(cart=filled, product=self.product)
+        Cart.objects.filter(pk__in=[empty.pk, filled.pk]).update(updated_at=old)
+
+        out = io.StringIO()
+        call_command('purge_empty_carts', '--dry-run', stdout=out)
+        self.assertIn('Would purge 1 empty carts', out.getvalue())
+        call_command('purge_empty_carts', '--chunk-size', '1', stdout=io.StringIO())
+        self.assertEqual(set(Cart.objects.values_list('pk', flat=True)), {recent.pk, filled.pk})
+
+    def test_item_changes_keep_the_cart_from_being_purged(self):
+        cart = Cart.objects.create()
+        Cart.objects.filter(pk=cart.pk).update(updated_at=timezone.now() - timedelta(days=30))
+        item = CartItem.objects.create(cart=cart, product=self.product)
+        item.delete()
+        call_command('purge_empty_carts', stdout=io.StringIO())
+        self.assertTrue(Cart.objects.filter(pk=cart.pk).exists())
+
+
+class CartServiceTests(TestCase):
+    def setUp(self):
+        category = Category.objects.create(name='Audio')
+        self.product = Product.objects.create(
+            name='Headphones', description='', category=category, price=Decimal('2.50'), stock=5
+        )
+        self.cart = Cart.objects.create()
+
+    def assertTotals(self, item_count, subtotal):
+        cart = Cart.objects.get(pk=self.cart.pk)
+        self.assertEqual(cart.item_count, item_count)
+        self.assertEqual(cart.subtotal, Decimal(subtotal))
+
+    def test_add_from_stale_instances_loses_no_update(self):
+        # Two requests holding their own copy of the same cart
+        first = Cart.objects.get(pk=self.cart.pk)
+        second = Cart.objects.get(pk=self.cart.pk)
+        cart_service.add_item(first, self.product.pk, 1)
+        line = cart_service.add_item(second, self.product.pk, 2)
+
+        self.assertEqual(line.quantity, 3)
+        self.assertEqual(CartItem.objects.filter(cart=self.cart).count(), 1)
+        self.assertEqual(second.item_count, 3)
+        self.assertEqual(second.subtotal, Decimal('7.50'))
+        self.assertTotals(3, '7.50')
+
+    def test_stock_error_rolls_back(self):
+        cart_service.add_item(self.cart, self.product.pk, 4, limit_to_stock=True)
+        with self.assertRaises(cart_service.CartError):
+            cart_service.add_item(self.cart, self.product.pk, 2, limit_to_stock=True)
+
+        self.assertEqual(CartItem.objects.get(cart=self.cart).quantity, 4)
+        self.assertTotals(4, '10.00')
+
+    def test_unknown_product_leaves_cart_untouched(self):
+        with self.assertRaises(Product.DoesNotExist):
+            cart_service.add_item(self.cart, self.product.pk + 1)
+        self.assertFalse(CartItem.objects.filter(cart=self.cart).exists())
+        self.assertTotals(0, '0.00')
+
+    def test_remove(self):
+        line = cart_service.add_item(self.cart, self.product.pk, 3)
+        cart_service.remove_item(self.cart, item_id=line.item_id)
+
+        self.assertFalse(CartItem.objects.filter(cart=self.cart).exists())
+        self.assertEqual(self.cart.item_count, 0)
+        self.assertEqual(str(self.cart.subtotal), '0.00')
+        self.assertTotals(0, '0.00')
+        with self.assertRaises(CartItem.DoesNotExist):
+            cart_service.remove_item(self.cart, item_id=line.item_id)
+
+    def test_set_quantity_zero_removes_line(self):
+        cart_service.add_item(self.cart, self.product.pk, 2)
+        self.assertIsNone(cart_service.set_quantity(self.cart, 0, product_id=self.product.pk))
+        self.assertEqual(str(self.cart.subtotal), '0.00')
+        self.assertTotals(0, '0.00')
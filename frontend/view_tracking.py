@@ -0,0 +1,154 @@
+"""
+Aggregated product view tracking.
+
+Page views are counted in an in-process buffer (``common.buffered_counter``)
+and flushed in the background into ``ProductViewStat`` (one row per user and
+product) and ``DailyProductViews`` (one row per product and day), instead of
+inserting a ``ProductView`` row per page view.  ``apply_view_counts`` is also used by
+the ``compact_product_views`` command to fold legacy raw rows in.
+"""
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Case, DateTimeField, F, PositiveIntegerField, Value, When
+from django.db.models.functions import Greatest, Least
+from django.utils import timezone
+
+from common.buffered_counter import BufferedCounter
+
+from .models import DailyProductViews, Product, ProductViewStat
+
+UPDATE_CHUNK_SIZE = 500
+
+# Buffer key kinds: (STAT, user_id, product_id) and (DAILY, product_id, date)
+STAT = 'stat'
+DAILY = 'daily'
+
+
+def _per_row(values, output_field):
+    return Case(
+        *[When(pk=pk, then=Value(value)) for pk, value in values.items()],
+        output_field=output_field
+    )
+
+
+def _chunks(items, size):
+    items = list(items)
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _apply_stats(stats):
+    user_ids = {user_id for user_id, _ in stats}
+    product_ids = {product_id for _, product_id in stats}
+
+    def existing_rows():
+        rows = ProductViewStat.objects.filter(
+            user_id__in=user_ids, product_id__in=product_ids
+        ).values_list('pk', 'user_id', 'product_id')
+        return {(user_id, product_id): pk for pk, user_id, product_id in rows}
+
+    existing = existing_rows()
+    missing = [key for key in stats if key not in existing]
+    if missing:
+        # Insert at zero, then add like any other row so racing writers
+        # never overwrite each other's counts
+        ProductViewStat.objects.bulk_create([
+            ProductViewStat(
+                user_id=user_id, product_id=product_id, view_count=0,
+                first_viewed_at=stats[user_id, product_id][1],
+                last_viewed_at=stats[user_id, product_id][2],
+            )
+            for user_id, product_id in missing
+        ], ignore_conflicts=True)
+        existing = existing_rows()
+
+    for keys in _chunks(stats, UPDATE_CHUNK_SIZE):
+        pks = {existing[key]: stats[key] for key in keys}
+        ProductViewStat.objects.filter(pk__in=pks).update(
+            view_count=F('view_count') + _per_row(
+                {pk: value[0] for pk, value in pks.items()}, PositiveIntegerField()
+            ),
+            first_viewed_at=Least(F('first_viewed_at'), _per_row(
+                {pk: value[1] for pk, value in pks.items()}, DateTimeField()
+            )),
+            last_viewed_at=Greatest(F('last_viewed_at'), _per_row(
+                {pk: value[2] for pk, value in pks.items()}, DateTimeField()
+            )),
+        )
+
+
+def _apply_daily(daily):
+    product_ids = {product_id for product_id, _ in daily}
+    dates = {date for _, date in daily}
+
+    def existing_rows():
+        rows = DailyProductViews.objects.filter(
+            product_id__in=product_ids, date__in=dates
+        ).values_list('pk', 'product_id', 'date')
+        return {(product_id, date): pk for pk, product_id, date in rows}
+
+    existing = existing_rows()
+    missing = [key for key in daily if key not in existing]
+    if missing:
+        DailyProductViews.objects.bulk_create([
+            DailyProductViews(product_id=product_id, date=date, view_count=0)
+            for product_id, date in missing
+        ], ignore_conflicts=True)
+        existing = existing_rows()
+
+    for keys in _chunks(daily, UPDATE_CHUNK_SIZE):
+        counts = {existing[key]: daily[key] for key in keys}
+        DailyProductViews.objects.filter(pk__in=counts).update(
+            view_count=F('view_count') + _per_row(counts, PositiveIntegerField())
+        )
+
+
+def apply_view_counts(stats, daily):
+    """
+    Add view counts in one transaction.
+
+    ``stats``: ``{(user_id, product_id): (count, first_viewed_at, last_viewed_at)}``
+    ``daily``: ``{(product_id, date): count}``
+    """
+    with transaction.atomic():
+        if stats:
+            _apply_stats(stats)
+        if daily:
+            _apply_daily(daily)
+
+
+def _write_views(pending):
+    stats, daily = {}, {}
+    for key, (count, first, last) in pending.items():
+        if key[0] == STAT:
+            stats[key[1:]] = (count, first, last)
+        else:
+            daily[key[1:]] = count
+
+    # Skip products or users deleted since the view was recorded
+    product_ids = set(Product.objects.filter(
+        pk__in={product_id for _, product_id in stats}
+    ).values_list('pk', flat=True))
+    user_ids = set(User.objects.filter(
+        pk__in={user_id for user_id, _ in stats}
+    ).values_list('pk', flat=True))
+    stats = {k: v for k, v in stats.items() if k[0] in user_ids and k[1] in product_ids}
+    daily = {k: v for k, v in daily.items() if k[0] in product_ids}
+
+    apply_view_counts(stats, daily)
+
+
+_tracker = BufferedCounter('view-tracker', _write_views)
+
+
+def record_product_view(user_id, product_id):
+    when = timezone.now()
+    _tracker.add(
+        (STAT, user_id, product_id),
+        (DAILY, product_id, timezone.localdate(when)),
+        when=when
+    )
+
+
+def flush_product_views():
+    return _tracker.flush()
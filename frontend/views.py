@@ -6,42 +6,14 @@ from django.contrib.auth.decorators import login_required
 from django.contrib.auth import logout
 from django.contrib import messages
 from django.contrib.auth.forms import UserCreationForm
-from .models import Product, CartItem, Cart, Category, Order, ProductView, UserProfile
+from .models import Product, CartItem, Cart, Category, Order, ProductViewStat, UserProfile
+from .view_tracking import record_product_view
+from .search import MAX_FILTER_RESULTS, category_counts, search_product_ids
 from .forms import CustomUserCreationForm
+from .middleware import ensure_cart
+from common import cart_service
 import json
 
-def get_or_create_cart(request):
-    """Get or create a cart for the current user or session."""
-    if not request.session.session_key:
-        request.session.create()
-        print(f"Created new session: {request.session.session_key}")
-    
-    try:
-        if request.user.is_authenticated:
-            cart, created = Cart.objects.get_or_create(user=request.user)
-            print(f"Got cart for authenticated user: {cart.id} (created: {created})")
-        else:
-            cart_id = request.session.get('cart_id')
-            if cart_id:
-                try:
-                    cart = Cart.objects.get(id=cart_id)
-                    print(f"Got existing cart from session: {cart.id}")
-                except Cart.DoesNotExist:
-                    cart = Cart.objects.create()
-                    request.session['cart_id'] = cart.id
-                    print(f"Created new cart (session cart not found): {cart.id}")
-            else:
-                cart = Cart.objects.create()
-                request.session['cart_id'] = cart.id
-                print(f"Created new cart (no session cart): {cart.id}")
-        
-        return cart
-    except Exception as e:
-        print(f"Error in get_or_create_cart: {str(e)}")
-        import traceback
-        print(f"Traceback: {traceback.format_exc()}")
-        return None
-
 def get_similar_products(product, limit=4):
     # Get products in the same category
     similar_products = Product.objects.filter(
@@ -67,7 +39,7 @@ def get_personalized_recommendations(user, limit=4):
         return Product.objects.filter(featured=True)[:limit]
     
     # Get user's recently viewed products
-    recent_views = ProductView.objects.filter(user=user).select_related('product')[:5]
+    recent_views = ProductViewStat.objects.filter(user=user).select_related('product').order_by('-last_viewed_at')[:5]
     
     if not recent_views:
         return Product.objects.filter(featured=True)[:limit]
@@ -103,10 +75,6 @@ def products(request):
         # Start with all products
         products = Product.objects.select_related('category').all()
         
-        # Apply search filter
-        if search_query:
-            products = products.filter(name__icontains=search_query)
-        
         # Apply category filter
         if category_id:
             try:
@@ -122,10 +90,30 @@ def products(request):
             'name': 'name',
             'newest': '-created_at'
         }
-        products = products.order_by(valid_sort_options.get(sort_by, '-created_at'))
         
-        # Get all categories for the filter dropdown
+        # Apply search filter from the search index; without an explicit
+        # sort the results keep their relevance order
+        if search_query:
+            search_ids = search_product_ids(
+                search_query,
+                category=category_id if isinstance(category_id, int) else None,
+                limit=MAX_FILTER_RESULTS
+            )
+            products = products.filter(pk__in=search_ids)
+            if sort_by in valid_sort_options:
+                products = products.order_by(valid_sort_options[sort_by])
+            else:
+                found = products.in_bulk(search_ids)
+                products = [found[pk] for pk in search_ids if pk in found]
+        else:
+            products = products.order_by(valid_sort_options.get(sort_by, '-created_at'))
+        
+        # Get all categories for the filter dropdown, with product counts
+        # for the current search from the index
         categories = Category.objects.all()
+        counts = category_counts(search_query)
+        for category in categories:
+            category.product_count = counts.get(category.pk, 0)
         
         # Calculate discount for each product
         for product in products:
@@ -175,9 +163,9 @@ def product_detail(request, product_id):
     try:
         product = Product.objects.get(id=product_id)
         
-        # Record the view if user is authenticated
+        # Record the view if user is authenticated (buffered, aggregated per user and day)
         if request.user.is_authenticated:
-            ProductView.objects.create(user=request.user, product=product)
+            record_product_view(request.user.pk, product.pk)
         
         # Get recommendations with error handling
         try:
@@ -215,134 +203,40 @@ def product_detail(request, product_id):
 @require_POST
 def add_to_cart(request, product_id):
     """Add a product to the cart."""
-    print("\n=== Adding to Cart ===")
-    print(f"Session ID: {request.session.session_key}")
-    print(f"Product ID: {product_id}")
-    print(f"Request Method: {request.method}")
-    print(f"Content Type: {request.content_type}")
-    print(f"POST data: {request.POST}")
+    try:
+        if request.content_type == 'application/json':
+            quantity = int(json.loads(request.body).get('quantity', 1))
+        else:
+            quantity = int(request.POST.get('quantity', 1))
+    except (ValueError, TypeError, json.JSONDecodeError):
+        return JsonResponse({'success': False, 'error': 'Invalid quantity'}, status=400)
+    if quantity < 1:
+        return JsonResponse({'success': False, 'error': 'Invalid quantity'}, status=400)
+    
+    # No cart (or session entry) is created for an unknown product
+    if not Product.objects.filter(pk=product_id).exists():
+        return JsonResponse({'success': False, 'error': 'Product not found'}, status=404)
     
+    # First add for this visitor creates the cart (and session entry)
+    cart = ensure_cart(request)
     try:
-        # Make sure we have a session
-        if not request.session.session_key:
-            request.session.create()
-            request.session.save()
-            print(f"Created new session: {request.session.session_key}")
-        
-        # Get the product first
-        try:
-            product = Product.objects.select_related('category').get(id=product_id)
-            print(f"Found product: {product.name} (ID: {product.id}, Stock: {product.stock})")
-        except Product.DoesNotExist:
-            print(f"Product not found: {product_id}")
-            return JsonResponse({
-                'success': False,
-                'error': 'Product not found'
-            }, status=404)
-        except Exception as e:
-            print(f"Error getting product: {str(e)}")
-            return JsonResponse({
-                'success': False,
-                'error': 'Error accessing product'
-            }, status=500)
-        
-        # Get quantity from POST data or JSON data
-        try:
-            if request.content_type == 'application/json':
-                data = json.loads(request.body)
-                quantity = int(data.get('quantity', 1))
-            else:
-                quantity = int(request.POST.get('quantity', 1))
-            
-            print(f"Quantity: {quantity}")
-            
-            if quantity < 1:
-                return JsonResponse({
-                    'success': False,
-                    'error': 'Invalid quantity'
-                }, status=400)
-        except (ValueError, json.JSONDecodeError) as e:
-            print(f"Error parsing quantity: {str(e)}")
-            return JsonResponse({
-                'success': False,
-                'error': 'Invalid quantity'
-            }, status=400)
-        
-        # Check stock
-        if quantity > product.stock:
-            print(f"Not enough stock. Requested: {quantity}, Available: {product.stock}")
-            return JsonResponse({
-                'success': False,
-                'error': f'Only {product.stock} items available'
-            }, status=400)
-        
-        # Get or create cart
-        try:
-            cart = get_or_create_cart(request)
-            if not cart:
-                print("Error creating cart")
-                return JsonResponse({
-                    'success': False,
-                    'error': 'Error creating cart'
-                }, status=500)
-            
-            print(f"Cart ID: {cart.id}")
-            print(f"Cart Items: {cart.items.count()}")
-            
-            # Get or create cart item
-            cart_item, created = CartItem.objects.get_or_create(
-                cart=cart,
-                product=product,
-                defaults={'quantity': quantity}
-            )
-            
-            if not created:
-                cart_item.quantity += quantity
-                if cart_item.quantity > product.stock:
-                    print(f"Total quantity exceeds stock. Total: {cart_item.quantity}, Stock: {product.stock}")
-                    return JsonResponse({
-                        'success': False,
-                        'error': f'Only {product.stock} items available'
-                    }, status=400)
-                cart_item.save()
-            
-            print(f"Cart item {'created' if created else 'updated'}: {cart_item.quantity}x {product.name}")
-            
-            # Save the cart ID in session
-            request.session['cart_id'] = cart.id
-            request.session.save()
-            
-            # Return success response
-            response_data = {
-                'success': True,
-                'cart_count': cart.items.count(),
-                'message': 'Product added to cart successfully'
-            }
-            print(f"Success! Cart count: {response_data['cart_count']}")
-            return JsonResponse(response_data)
-            
-        except Exception as e:
-            print(f"Error managing cart: {str(e)}")
-            import traceback
-            print(f"Traceback: {traceback.format_exc()}")
-            return JsonResponse({
-                'success': False,
-                'error': 'Error updating cart'
-            }, status=500)
-        
-    except Exception as e:
-        print(f"Error in add_to_cart: {str(e)}")
-        import traceback
-        print(f"Traceback: {traceback.format_exc()}")
-        return JsonResponse({
-            'success': False,
-            'error': str(e)
-        }, status=500)
+        cart_service.add_item(cart, product_id, quantity, limit_to_stock=True)
+    except Product.DoesNotExist:
+        return JsonResponse({'success': False, 'error': 'Product not found'}, status=404)
+    except cart_service.CartError as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
+    
+    return JsonResponse({
+        'success': True,
+        'cart_count': cart.item_count,
+        'cart_total': float(cart.get_total_price()),
+        'message': 'Product added to cart successfully'
+    })
 
 @login_required
 def view_cart(request):
-    cart = get_or_create_cart(request)
-    cart_items = cart.items.select_related('product', 'product__category').all()
+    cart = request.cart
+    cart_items = CartItem.objects.filter(cart_id=cart.pk).select_related('product', 'product__category')
     
     context = {
         'cart': cart,
@@ -352,8 +246,8 @@ def view_cart(request):
 
 @login_required
 def checkout(request):
-    cart = get_or_create_cart(request)
-    cart_items = cart.items.select_related('product').all()
+    cart = request.cart
+    cart_items = CartItem.objects.filter(cart_id=cart.pk).select_related('product')
     
     if not cart_items:
         messages.warning(request, 'Your cart is empty')
@@ -369,59 +263,47 @@ def checkout(request):
 @require_POST
 def update_cart(request, item_id):
     try:
-        data = json.loads(request.body)
-        quantity = int(data.get('quantity', 1))
-        
-        if quantity < 1:
-            return JsonResponse({'success': False, 'error': 'Quantity must be at least 1'})
-        
-        cart = get_or_create_cart(request)
-        cart_item = cart.items.get(id=item_id)
-        
-        # Check if we have enough stock
-        if quantity > cart_item.product.stock:
-            return JsonResponse({
-                'success': False, 
-                'error': f'Only {cart_item.product.stock} items available'
-            })
-        
-        cart_item.quantity = quantity
-        cart_item.save()
-        
-        return JsonResponse({
-            'success': True,
-            'item_total': float(cart_item.get_total()),
-            'cart_total': float(cart.get_total()),
-            'cart_subtotal': float(cart.get_total()),
-            'cart_count': cart.total_items
-        })
-        
+        quantity = int(json.loads(request.body).get('quantity', 1))
+    except (ValueError, TypeError, json.JSONDecodeError):
+        return JsonResponse({'success': False, 'error': 'Invalid request'})
+    if quantity < 1:
+        return JsonResponse({'success': False, 'error': 'Quantity must be at least 1'})
+    
+    cart = request.cart
+    if cart.pk is None:
+        return JsonResponse({'success': False, 'error': 'Item not found'})
+    try:
+        line = cart_service.set_quantity(cart, quantity, item_id=item_id, limit_to_stock=True)
     except CartItem.DoesNotExist:
         return JsonResponse({'success': False, 'error': 'Item not found'})
-    except json.JSONDecodeError:
-        return JsonResponse({'success': False, 'error': 'Invalid request'})
-    except Exception as e:
+    except cart_service.CartError as e:
         return JsonResponse({'success': False, 'error': str(e)})
+    
+    return JsonResponse({
+        'success': True,
+        'item_total': float(line.total),
+        'cart_total': float(cart.get_total_price()),
+        'cart_subtotal': float(cart.get_total_price()),
+        'cart_count': cart.item_count
+    })
 
 @csrf_exempt
 @require_POST
 def remove_from_cart(request, item_id):
+    cart = request.cart
+    if cart.pk is None:
+        return JsonResponse({'success': False, 'error': 'Item not found'})
     try:
-        cart = get_or_create_cart(request)
-        cart_item = cart.items.get(id=item_id)
-        cart_item.delete()
-        
-        return JsonResponse({
-            'success': True,
-            'cart_total': float(cart.get_total()),
-            'cart_subtotal': float(cart.get_total()),
-            'cart_count': cart.total_items
-        })
-        
+        cart_service.remove_item(cart, item_id=item_id)
     except CartItem.DoesNotExist:
         return JsonResponse({'success': False, 'error': 'Item not found'})
-    except Exception as e:
-        return JsonResponse({'success': False, 'error': str(e)})
+    
+    return JsonResponse({
+        'success': True,
+        'cart_total': float(cart.get_total_price()),
+        'cart_subtotal': float(cart.get_total_price()),
+        'cart_count': cart.item_count
+    })
 
 @login_required
 def profile(request):
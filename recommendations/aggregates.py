@@ -0,0 +1,114 @@
+"""
+Denormalized rating and view counters on ``Product``.
+
+Writes to ``ProductRating`` and ``ProductView`` adjust the counters with
+single ``F()`` updates so concurrent requests never lose increments.  Bulk
+operations bypass signals, so ``reconcile_product_aggregates`` recomputes the
+counters from the source tables (see the ``reconcile_product_aggregates``
+management command).
+"""
+from django.db.models import (
+    Avg, Case, Count, F, FloatField, IntegerField, OuterRef, Subquery, Sum,
+    Value, When
+)
+from django.db.models.functions import Cast, Coalesce
+
+from .cache_versions import bump_catalog, bump_product_stats, bump_product_views
+from .models import Product, ProductRating, ProductView
+from .search import mark_all_products_dirty, mark_products_dirty
+from .search_index import MAX_INCREMENTAL_CHANGES
+
+
+def _average(rating_sum, rating_count):
+    return Cast(rating_sum, FloatField()) / rating_count
+
+
+def record_rating_added(product_id, rating):
+    Product.objects.filter(pk=product_id).update(
+        rating_count=F('rating_count') + 1,
+        rating_sum=F('rating_sum') + rating,
+        average_rating=_average(F('rating_sum') + rating, F('rating_count') + 1),
+    )
+
+
+def record_rating_changed(product_id, old_rating, new_rating):
+    delta = new_rating - old_rating
+    if not delta:
+        return
+    Product.objects.filter(pk=product_id, rating_count__gt=0).update(
+        rating_sum=F('rating_sum') + delta,
+        average_rating=_average(F('rating_sum') + delta, F('rating_count')),
+    )
+
+
+def record_rating_removed(product_id, rating):
+    Product.objects.filter(pk=product_id, rating_count__gt=0).update(
+        rating_count=F('rating_count') - 1,
+        rating_sum=F('rating_sum') - rating,
+        average_rating=Case(
+            When(rating_count=1, then=Value(None)),
+            default=_average(F('rating_sum') - rating, F('rating_count') - 1),
+            output_field=FloatField(),
+        ),
+    )
+
+
+def record_view_added(product_id, count=1):
+    Product.objects.filter(pk=product_id).update(total_views=F('total_views') + count)
+
+
+def record_views_added(counts):
+    """Apply ``{product_id: count}`` with one UPDATE per distinct count"""
+    by_count = {}
+    for product_id, count in counts.items():
+        by_count.setdefault(count, []).append(product_id)
+    for count, product_ids in by_count.items():
+        Product.objects.filter(pk__in=product_ids).update(total_views=F('total_views') + count)
+
+
+def record_view_removed(product_id, count=1):
+    Product.objects.filter(pk=product_id, total_views__gte=count).update(
+        total_views=F('total_views') - count
+    )
+
+
+def _aggregate_subquery(queryset, aggregate):
+    return Subquery(
+        queryset.filter(product=OuterRef('pk'))
+        .values('product')
+        .annotate(value=aggregate)
+        .values('value')[:1]
+    )
+
+
+def reconcile_product_aggregates(queryset=None):
+    """Recompute the counters from the source tables; returns rows updated"""
+    if queryset is None:
+        queryset = Product.objects.all()
+
+    updated = queryset.update(
+        rating_count=Coalesce(
+            _aggregate_subquery(ProductRating.objects, Count('id')), 0,
+            output_field=IntegerField()
+        ),
+        rating_sum=Coalesce(
+            _aggregate_subquery(ProductRating.objects, Sum('rating')), 0,
+            output_field=IntegerField()
+        ),
+        average_rating=_aggregate_subquery(ProductRating.objects, Avg('rating')),
+        total_views=Coalesce(
+            _aggregate_subquery(ProductView.objects, Count('id')), 0,
+            output_field=IntegerField()
+        ),
+    )
+    # Rows changed without signals; drop every validator that covers them
+    # and re-read the rating facets
+    product_ids = list(queryset.values_list('pk', flat=True))
+    bump_catalog()
+    bump_product_stats(*product_ids)
+    bump_product_views()
+    if len(product_ids) > MAX_INCREMENTAL_CHANGES:
+        mark_all_products_dirty()
+    else:
+        mark_products_dirty(*product_ids)
+    return updated
@@ -1,10 +1,13 @@
 import numpy as np
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
-from django.db.models import Count, Avg, F, Q
+from django.db.models import Count, Avg, F, Q, Case, When, FloatField
+from django.db.models.functions import Coalesce
 from django.core.cache import cache
 from django.utils import timezone
 from datetime import timedelta
+from . import basket_matrix
+from .cache_versions import versioned_key, LONG_TTL
 from .models import (
     Product, UserInteraction, Recommendation, 
     SeasonalRecommendation, ProductAttribute,
@@ -12,6 +15,13 @@ from .models import (
     ProductSimilarity
 )
 
+# Preference scores are weighted by the age of each interaction, so they are
+# recomputed at least this often even when no version is bumped
+PREFERENCES_TTL = 60 * 60
+
+# Seasonal products get this boost over other co-purchased candidates
+SEASONAL_BOOST = 1.5
+
 class AIRecommendationEngine:
     def __init__(self):
         self.tfidf = TfidfVectorizer(
@@ -22,7 +32,7 @@ class AIRecommendationEngine:
         
     def prepare_content_features(self):
         """Prepare content features using product descriptions and attributes"""
-        cache_key = 'content_features'
+        cache_key = versioned_key('content_features', catalog=True)
         cached_data = cache.get(cache_key)
         
         if cached_data:
@@ -45,14 +55,14 @@ class AIRecommendationEngine:
             
         features = self.tfidf.fit_transform(descriptions)
         
-        # Cache the results for 1 hour
-        cache.set(cache_key, (features, products), 3600)
+        # Invalidated by catalog version bumps
+        cache.set(cache_key, (features, products), LONG_TTL)
         
         return features, products
         
     def get_user_preferences(self, user_id):
         """Get user preferences based on interactions with time decay"""
-        cache_key = f'user_preferences_{user_id}'
+        cache_key = versioned_key(f'user_preferences_{user_id}', user_ids=[user_id])
         cached_prefs = cache.get(cache_key)
         
         if cached_prefs:
@@ -89,14 +99,19 @@ class AIRecommendationEngine:
             interaction_score=Avg('weighted_score')
         ).order_by('-interaction_score')
         
-        # Cache for 15 minutes
-        cache.set(cache_key, preferences, 900)
+        # Invalidated by the user's interaction version; the time weights
+        # shift on their own, so the entry also expires
+        cache.set(cache_key, preferences, PREFERENCES_TTL)
         
         return preferences
         
     def get_similar_products(self, product_id, n=5):
         """Find similar products based on content and collaborative data"""
-        cache_key = f'similar_products_{product_id}_{n}'
+        cache_key = versioned_key(
+            f'similar_products_{product_id}_{n}',
+            product_ids=[product_id],
+            catalog=True
+        )
         cached_similar = cache.get(cache_key)
         
         if cached_similar:
@@ -124,19 +139,30 @@ class AIRecommendationEngine:
                 ) for i in similar_indices if products[i].id != product_id
             ])
         
-        # Cache for 1 hour
-        cache.set(cache_key, similar_products, 3600)
+        # Invalidated by product and catalog version bumps
+        cache.set(cache_key, similar_products, LONG_TTL)
         
         return similar_products
         
     def get_collaborative_recommendations(self, user_id, n=5):
         """Get recommendations based on similar users with seasonal adjustments"""
-        cache_key = f'collab_recommendations_{user_id}_{n}'
+        cache_key = versioned_key(
+            f'collab_recommendations_{user_id}_{n}',
+            user_ids=[user_id],
+            catalog=True
+        )
         cached_recs = cache.get(cache_key)
         
         if cached_recs:
             return cached_recs
-            
+        
+        matrix = basket_matrix.get_basket_matrix()
+        if matrix is not None:
+            recommended_products = self._co_purchased_recommendations(matrix, user_id, n)
+            cache.set(cache_key, recommended_products, 1800)
+            return recommended_products
+        
+        # Matrix still building: score the products of similar users in SQL
         user_prefs = self.get_user_preferences(user_id)
         if not user_prefs:
             return []
@@ -172,17 +198,44 @@ class AIRecommendationEngine:
         ).annotate(
             rec_score=Count('userinteraction') * (
                 Case(
-                    When(seasonal_recommendations=current_season, then=1.5),
+                    When(seasonal_recommendations=current_season, then=SEASONAL_BOOST),
                     default=1.0,
                     output_field=FloatField(),
                 )
             )
         ).order_by('-rec_score')[:n]
         
-        # Cache for 30 minutes
+        # Other users' activity doesn't bump this key, so keep the 30 minute expiry
         cache.set(cache_key, recommended_products, 1800)
         
         return recommended_products
+    
+    def _co_purchased_recommendations(self, matrix, user_id, n):
+        """Products bought together with the user's carts and purchases, seasonal ones boosted"""
+        basket = matrix.basket(user_id)
+        if not basket:
+            return []
+        # Read twice as many so boosted seasonal products just past the top n
+        # can still make it
+        candidates = dict(matrix.co_purchased(basket, 2 * n))
+        seasonal = set(SeasonalRecommendation.objects.filter(
+            start_date__lte=timezone.now(),
+            end_date__gte=timezone.now(),
+            is_active=True,
+            products__in=candidates
+        ).values_list('products', flat=True))
+        for product_id in seasonal:
+            candidates[product_id] *= SEASONAL_BOOST
+        
+        top = sorted(candidates.items(), key=lambda x: x[1], reverse=True)[:n]
+        products = Product.objects.in_bulk([product_id for product_id, _ in top])
+        recommended_products = []
+        for product_id, score in top:
+            product = products.get(product_id)
+            if product is not None:
+                product.rec_score = score
+                recommended_products.append(product)
+        return recommended_products
         
     def get_personalized_recommendations(self, user_id, n=8):
         """Get hybrid recommendations with explanations"""
@@ -0,0 +1,129 @@
+"""
+Products indexed by their (attribute name, value) pairs.
+
+Each normalized pair maps to a sorted array of the products that have it.
+Similar products are those sharing the most pairs, each shared pair counted
+with its inverse document frequency so a rare attribute ("material:
+titanium") outweighs a common one ("condition: new").  Scoring adds the
+posting lists of the product's own pairs into one dense score array; there
+are no joins, and the index follows attribute edits through the same cache
+change log as the search index.
+"""
+import threading
+
+import numpy as np
+
+from .models import ProductAttribute
+from .search_index import LiveIndex
+
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 50
+
+
+def normalize_pair(name, value):
+    return ' '.join(name.lower().split()), ' '.join(value.lower().split())
+
+
+class AttributeIndex:
+    def __init__(self):
+        self._postings = {}
+        self._compiled = {}
+        self._doc_pairs = {}
+        self.lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._doc_pairs)
+
+    def __contains__(self, doc_id):
+        return doc_id in self._doc_pairs
+
+    def add(self, doc_id, pairs, meta=None):
+        """Index (or re-index) ``doc_id`` with its ``(name, value)`` pairs"""
+        with self.lock:
+            self.remove(doc_id)
+            pairs = tuple(dict.fromkeys(normalize_pair(name, value) for name, value in pairs))
+            if not pairs:
+                return
+            for pair in pairs:
+                self._postings.setdefault(pair, set()).add(doc_id)
+                self._compiled.pop(pair, None)
+            self._doc_pairs[doc_id] = pairs
+
+    def remove(self, doc_id):
+        with self.lock:
+            for pair in self._doc_pairs.pop(doc_id, ()):
+                postings = self._postings[pair]
+                postings.discard(doc_id)
+                self._compiled.pop(pair, None)
+                if not postings:
+                    del self._postings[pair]
+
+    def pairs(self, doc_id):
+        return self._doc_pairs.get(doc_id, ())
+
+    def _compile(self, pair):
+        compiled = self._compiled.get(pair)
+        if compiled is None:
+            postings = self._postings[pair]
+            compiled = self._compiled[pair] = np.sort(
+                np.fromiter(postings, dtype=np.int64, count=len(postings))
+            )
+        return compiled
+
+    def similar(self, doc_id, limit=DEFAULT_LIMIT):
+        """
+        Return up to ``limit`` ``(doc_id, score)`` pairs sharing attributes
+        with ``doc_id``, highest IDF-weighted overlap first (ties newest
+        first).
+        """
+        with self.lock:
+            n = len(self._doc_pairs)
+            postings = [self._compile(pair) for pair in self._doc_pairs.get(doc_id, ())]
+            postings = [ids for ids in postings if len(ids) > 1]
+            if not postings:
+                return []
+            # Dense accumulator: each posting list holds a product once, so
+            # plain fancy-index adds are exact and no sort is needed
+            scores = np.zeros(max(int(ids[-1]) for ids in postings) + 1)
+            for ids in postings:
+                scores[ids] += np.log(1.0 + (n - len(ids) + 0.5) / (len(ids) + 0.5))
+            scores[doc_id] = 0.0
+            candidates = np.flatnonzero(scores)
+            if len(candidates) > limit:
+                # Keep every candidate tied with the cut-off so ties break by id
+                threshold = np.partition(scores[candidates], len(candidates) - limit)[len(candidates) - limit]
+                candidates = candidates[scores[candidates] >= threshold]
+            order = np.lexsort((-candidates, -scores[candidates]))[:limit]
+            candidates = candidates[order]
+            return list(zip(candidates.tolist(), scores[candidates].tolist()))
+
+
+def _load_attributes(ids):
+    queryset = ProductAttribute.objects.order_by('product_id')
+    if ids is not None:
+        queryset = queryset.filter(product_id__in=ids)
+    product_id, pairs = None, []
+    for row in queryset.values_list('product_id', 'name', 'value').iterator(chunk_size=5000):
+        if row[0] != product_id:
+            if pairs:
+                yield product_id, pairs, None
+            product_id, pairs = row[0], []
+        pairs.append(row[1:])
+    if pairs:
+        yield product_id, pairs, None
+
+
+_live_index = LiveIndex('product-attributes', None, _load_attributes, index_factory=AttributeIndex)
+
+
+def get_index():
+    return _live_index.get()
+
+
+def mark_products_dirty(*product_ids):
+    _live_index.mark_dirty(*product_ids)
+
+
+def similar_product_ids(product_id, limit=DEFAULT_LIMIT):
+    """``[(product_id, score)]`` for products with the most (rare) attributes in common"""
+    return get_index().similar(int(product_id), limit)
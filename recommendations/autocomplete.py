@@ -0,0 +1,174 @@
+"""
+Type-ahead completions from a compact in-memory prefix structure.
+
+Suggestions come from product names (also matched from each later word, so
+"head" finds "Wireless Headphones"), tag names and popular
+``SearchHistory`` queries.  They are stored as one sorted list of
+lowercased keys with parallel NumPy arrays of weights and suggestion
+numbers; a lookup is two bisections plus a top-k over the matching slice.
+Short prefixes, whose slices are large, have their top suggestions
+precomputed.  Each process rebuilds its structure in the background every
+``REFRESH_INTERVAL`` seconds.
+"""
+import bisect
+import logging
+import math
+import threading
+import time
+
+import numpy as np
+from django.db import close_old_connections
+from django.db.models import Count
+from django.db.models.functions import Lower
+
+from .models import Product, ProductTag, SearchHistory
+
+logger = logging.getLogger(__name__)
+
+REFRESH_INTERVAL = 5 * 60
+MAX_SUGGESTIONS = 20
+PRECOMPUTED_PREFIX_LENGTH = 2
+MAX_QUERIES = 5000
+MIN_QUERY_COUNT = 2
+QUERY_MAX_LENGTH = 100
+
+PRODUCT = 'product'
+TAG = 'tag'
+QUERY = 'query'
+
+
+class Completer:
+    def __init__(self, suggestions=()):
+        """``suggestions``: iterable of ``(text, kind, object_id, weight)``"""
+        self.suggestions = []
+        entries = []
+        seen = {}
+        for text, kind, object_id, weight in suggestions:
+            text = ' '.join((text or '').split())
+            if not text:
+                continue
+            # Products are distinct even when their names match; the same tag
+            # or query text is suggested once, with the best weight
+            identity = (kind, object_id if kind == PRODUCT else text.lower())
+            number = seen.get(identity)
+            if number is not None:
+                previous = self.suggestions[number]
+                self.suggestions[number] = previous[:3] + (max(previous[3], weight),)
+                continue
+            number = seen[identity] = len(self.suggestions)
+            self.suggestions.append((text, kind, object_id, weight))
+
+            words = text.lower().split()
+            starts = range(len(words)) if kind == PRODUCT else range(1)
+            for start in starts:
+                entries.append((' '.join(words[start:]), number))
+
+        entries.sort()
+        self.keys = [key for key, _ in entries]
+        self.numbers = np.array([number for _, number in entries], dtype=np.int32)
+        weights = np.array([s[3] for s in self.suggestions], dtype=np.float32)
+        self.weights = weights[self.numbers] if len(entries) else np.empty(0, dtype=np.float32)
+        self.built_at = time.time()
+
+        self.precomputed = {}
+        for length in range(1, PRECOMPUTED_PREFIX_LENGTH + 1):
+            prefixes = {key[:length] for key in self.keys if len(key) >= length}
+            for prefix in prefixes:
+                self.precomputed[prefix] = self._scan(prefix, MAX_SUGGESTIONS)
+
+    @classmethod
+    def build(cls):
+        def suggestions():
+            for pk, name, views in Product.objects.values_list('pk', 'name', 'total_views').iterator():
+                yield name, PRODUCT, pk, 1.0 + math.log1p(views)
+            tags = ProductTag.objects.annotate(product_count=Count('products')).values_list(
+                'pk', 'name', 'product_count'
+            )
+            for pk, name, product_count in tags:
+                yield name, TAG, pk, 1.0 + math.log1p(product_count)
+            queries = SearchHistory.objects.annotate(normalized=Lower('query')).values(
+                'normalized'
+            ).annotate(searches=Count('id')).filter(
+                searches__gte=MIN_QUERY_COUNT
+            ).order_by('-searches').values_list('normalized', 'searches')[:MAX_QUERIES]
+            for query, searches in queries:
+                if len(query) <= QUERY_MAX_LENGTH:
+                    yield query, QUERY, None, 1.0 + 2.0 * math.log1p(searches)
+        return cls(suggestions())
+
+    def _range(self, prefix):
+        lo = bisect.bisect_left(self.keys, prefix)
+        hi = bisect.bisect_left(self.keys, prefix + '\U0010ffff', lo)
+        return lo, hi
+
+    def _scan(self, prefix, k):
+        lo, hi = self._range(prefix)
+        if lo == hi:
+            return []
+        weights = self.weights[lo:hi]
+        numbers = self.numbers[lo:hi]
+        # A suggestion can match through several of its words; the slice is
+        # over-fetched so duplicates don't crowd the top k out
+        fetch = min(len(weights), k * 3)
+        top = np.argpartition(-weights, fetch - 1)[:fetch] if fetch < len(weights) else np.arange(len(weights))
+        ranked = top[np.lexsort((numbers[top], -weights[top]))]
+        result = []
+        for number in numbers[ranked].tolist():
+            if number not in result:
+                result.append(number)
+                if len(result) == k:
+                    break
+        return result
+
+    def complete(self, prefix, k=10):
+        """Return up to ``k`` ``(text, kind, object_id)`` suggestions, best first"""
+        prefix = ' '.join((prefix or '').lower().split())
+        if not prefix:
+            return []
+        k = min(k, MAX_SUGGESTIONS)
+        numbers = self.precomputed.get(prefix)
+        if numbers is None:
+            numbers = self._scan(prefix, k)
+        return [self.suggestions[number][:3] for number in numbers[:k]]
+
+
+_completer = None
+_refreshing = False
+_lock = threading.Lock()
+
+
+def _refresh():
+    global _completer, _refreshing
+    try:
+        _completer = Completer.build()
+    except Exception:
+        # Keep serving the old suggestions and retry after another interval
+        _completer.built_at = time.time()
+        logger.exception('Failed to rebuild autocomplete suggestions')
+    finally:
+        _refreshing = False
+        close_old_connections()
+
+
+def get_completer():
+    """
+    Return the process-wide completer.  The first call builds it; later
+    calls refresh a stale one in the background and keep serving the old.
+    """
+    global _completer, _refreshing
+    if _completer is None:
+        with _lock:
+            if _completer is None:
+                _completer = Completer.build()
+        return _completer
+
+    if time.time() - _completer.built_at > REFRESH_INTERVAL and not _refreshing:
+        with _lock:
+            if not _refreshing:
+                _refreshing = True
+                threading.Thread(target=_refresh, name='autocomplete-refresh', daemon=True).start()
+    return _completer
+
+
+def complete(prefix, k=10):
+    return get_completer().complete(prefix, k)
@@ -0,0 +1,66 @@
+"""
+Process-wide structures that are built off the request path.
+
+A request asks for the current structure and gets whatever has been built
+so far, possibly ``None`` before the first build finishes.  If it is missing
+or stale, one daemon thread rebuilds it while the old one keeps being
+served, so no request ever waits for a full build.  Structures that go stale
+often can set ``min_interval`` so bursts of changes cost one rebuild rather
+than one per change.
+"""
+import logging
+import threading
+import time
+
+from django.db import close_old_connections
+
+logger = logging.getLogger(__name__)
+
+# After a failed build, wait this long before trying again
+RETRY_INTERVAL = 60
+
+
+class BackgroundBuilt:
+    def __init__(self, name, build, is_stale, min_interval=0):
+        self.name = name
+        self.build = build
+        self.is_stale = is_stale
+        self.min_interval = min_interval
+        self.value = None
+        self.started_at = None
+        self.failed_at = None
+        self._building = False
+        self._lock = threading.Lock()
+
+    def get(self):
+        """Return the current structure, starting a rebuild if it is missing or stale"""
+        value = self.value
+        if value is None:
+            self.start()
+        elif self.is_stale(value) and time.time() - self.started_at >= self.min_interval:
+            self.start()
+        return value
+
+    def start(self):
+        if self._building:
+            return
+        if self.failed_at is not None and time.time() - self.failed_at < RETRY_INTERVAL:
+            return
+        with self._lock:
+            if self._building:
+                return
+            self._building = True
+            self.started_at = time.time()
+        threading.Thread(target=self._run, name=self.name, daemon=True).start()
+
+    def _run(self):
+        try:
+            self.value = self.build()
+            self.failed_at = None
+        except Exception:
+            # Keep serving the old structure
+            self.failed_at = time.time()
+            logger.exception('Failed to build %s', self.name)
+        finally:
+            self._building = False
+            close_old_connections()
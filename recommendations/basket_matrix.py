@@ -0,0 +1,171 @@
+"""
+Sparse co-purchase model built from carts and purchases.
+
+A binary user x product basket matrix is built from ``CartItem`` lines and
+``UserInteraction`` purchases (checkout empties the cart, so finished
+baskets only survive as purchases) and turned into an item x item
+co-occurrence matrix (``B.T @ B``).  Products bought together with a basket
+are then a single sparse row-sum over the products in it.  Products added to
+a cart or bought are applied incrementally as co-occurrence deltas, which
+are folded into the CSR matrix once enough of them accumulate; removals are
+picked up by the next rebuild.
+
+Each process builds its matrix in the background (see ``background``); until
+the first build finishes ``get_basket_matrix`` returns None.
+"""
+import threading
+import time
+from collections import defaultdict
+from itertools import chain
+
+import numpy as np
+from scipy.sparse import coo_matrix, csr_matrix
+
+from .background import BackgroundBuilt
+from .models import CartItem, UserInteraction
+
+# Full rebuild picks up purchases made in other processes, and deletions
+REBUILD_INTERVAL = 60 * 60
+COMPACT_THRESHOLD = 10000
+
+
+class BasketMatrix:
+    def __init__(self, pairs=()):
+        self.baskets = defaultdict(set)
+        for user_id, product_id in pairs:
+            self.baskets[user_id].add(product_id)
+
+        self.product_ids = sorted({pid for basket in self.baskets.values() for pid in basket})
+        self.product_index = {pid: i for i, pid in enumerate(self.product_ids)}
+        user_index = {uid: i for i, uid in enumerate(self.baskets)}
+
+        rows, cols = [], []
+        for user_id, basket in self.baskets.items():
+            for product_id in basket:
+                rows.append(user_index[user_id])
+                cols.append(self.product_index[product_id])
+
+        n = len(self.product_ids)
+        basket_matrix = csr_matrix(
+            (np.ones(len(rows), dtype=np.float64), (rows, cols)),
+            shape=(len(user_index), n)
+        )
+        cooccurrence = (basket_matrix.T @ basket_matrix).tocsr()
+        cooccurrence.setdiag(0)
+        cooccurrence.eliminate_zeros()
+
+        self.cooccurrence = cooccurrence
+        self.pending = defaultdict(float)
+        self.built_at = time.time()
+        self.lock = threading.Lock()
+
+    @classmethod
+    def build(cls):
+        cart_items = CartItem.objects.values_list('cart__user_id', 'product_id').iterator()
+        purchases = UserInteraction.objects.filter(
+            interaction_type='purchase'
+        ).values_list('user_id', 'product_id').iterator()
+        return cls(chain(cart_items, purchases))
+
+    def _position(self, product_id):
+        if product_id not in self.product_index:
+            self.product_index[product_id] = len(self.product_ids)
+            self.product_ids.append(product_id)
+        return self.product_index[product_id]
+
+    def _apply(self, user_id, product_id, delta):
+        i = self._position(product_id)
+        for other_id in self.baskets[user_id]:
+            if other_id == product_id:
+                continue
+            j = self.product_index[other_id]
+            self.pending[(i, j)] += delta
+            self.pending[(j, i)] += delta
+        if len(self.pending) >= COMPACT_THRESHOLD:
+            self._compact()
+
+    def _compact(self):
+        n = len(self.product_ids)
+        cooccurrence = self.cooccurrence
+        if cooccurrence.shape[0] < n:
+            cooccurrence = cooccurrence.copy()
+            cooccurrence.resize((n, n))
+
+        if self.pending:
+            keys = list(self.pending)
+            values = [self.pending[key] for key in keys]
+            rows = [i for i, _ in keys]
+            cols = [j for _, j in keys]
+            delta = coo_matrix((values, (rows, cols)), shape=(n, n)).tocsr()
+            cooccurrence = (cooccurrence + delta).tocsr()
+            cooccurrence.eliminate_zeros()
+            self.pending.clear()
+
+        self.cooccurrence = cooccurrence
+
+    def add_item(self, user_id, product_id):
+        with self.lock:
+            if product_id in self.baskets[user_id]:
+                return
+            self._apply(user_id, product_id, 1.0)
+            self.baskets[user_id].add(product_id)
+
+    def basket(self, user_id):
+        """Return the products in the user's carts and purchases"""
+        with self.lock:
+            return list(self.baskets.get(user_id, ()))
+
+    def co_purchased(self, product_ids, limit=10):
+        """
+        Return up to ``limit`` (product_id, co_purchase_count) pairs for
+        products bought together with ``product_ids``, best first.
+        """
+        with self.lock:
+            rows = [self.product_index[pid] for pid in product_ids if pid in self.product_index]
+            if not rows:
+                return []
+
+            n = len(self.product_ids)
+            base_rows = [i for i in rows if i < self.cooccurrence.shape[0]]
+            scores = np.zeros(n, dtype=np.float64)
+            if base_rows:
+                row_sum = np.asarray(self.cooccurrence[base_rows].sum(axis=0)).ravel()
+                scores[:len(row_sum)] = row_sum
+
+            if self.pending:
+                row_set = set(rows)
+                for (i, j), delta in self.pending.items():
+                    if i in row_set:
+                        scores[j] += delta
+
+            scores[rows] = 0
+            candidates = np.flatnonzero(scores > 0)
+            if len(candidates) > limit:
+                candidates = candidates[np.argpartition(-scores[candidates], limit)[:limit]]
+            candidates = candidates[np.argsort(-scores[candidates], kind='stable')]
+            return [(self.product_ids[j], float(scores[j])) for j in candidates]
+
+
+_matrix = BackgroundBuilt(
+    'basket-matrix',
+    BasketMatrix.build,
+    lambda matrix: time.time() - matrix.built_at > REBUILD_INTERVAL
+)
+
+
+def get_basket_matrix():
+    """Return the process-wide basket matrix; None until its first build finishes"""
+    return _matrix.get()
+
+
+def record_items(user_id, product_ids):
+    """Apply several cart lines or purchases of one user; no-op until the matrix is first built"""
+    matrix = _matrix.value
+    if matrix is not None:
+        for product_id in product_ids:
+            matrix.add_item(user_id, product_id)
+
+
+def record_item(user_id, product_id):
+    """Apply a cart line or purchase to the loaded matrix; no-op until it is first built"""
+    record_items(user_id, [product_id])
@@ -0,0 +1,145 @@
+"""
+Namespaced cache versions used to invalidate derived data on writes.
+
+Cached values embed the current version of every namespace they depend on
+(the global catalog, a product, a user).  Model signals bump those versions
+when the underlying rows change, so old entries simply stop being addressed
+and can be stored with long TTLs instead of relying on short expiry.
+Versions only invalidate across processes if every worker shares the cache
+(``REDIS_URL``, see ``CACHES`` in settings).
+"""
+import time
+
+from django.core.cache import cache
+
+CATALOG = 'catalog'
+# Rating aggregates and view counters shown in product listings; kept apart
+# from CATALOG so engagement does not invalidate similarity features, and
+# from each other because views are flushed far more often than ratings
+# change.  Each product's own aggregates also have a namespace
+# (``product_stats_namespace``), apart from the product's, for the same reason.
+PRODUCT_STATS = 'product-stats'
+PRODUCT_VIEWS = 'product-views'
+VERSION_KEY_PREFIX = 'cache_version'
+
+# Derived entries are invalidated by version bumps, so they can live long
+LONG_TTL = 60 * 60 * 24 * 7
+
+
+def catalog_namespace():
+    return CATALOG
+
+
+def product_namespace(product_id):
+    return f'product:{product_id}'
+
+
+def product_stats_namespace(product_id):
+    return f'product-stats:{product_id}'
+
+
+def user_namespace(user_id):
+    return f'user:{user_id}'
+
+
+def recommendations_namespace(user_id):
+    # Stored recommendations are engine output, written on every request
+    # that computes them; kept apart so they don't drop the user's inputs
+    return f'recommendations:{user_id}'
+
+
+def recently_viewed_namespace(user_id):
+    # Bumped on every product view, so kept apart from the user's namespace
+    return f'recently-viewed:{user_id}'
+
+
+def _version_key(namespace):
+    return f'{VERSION_KEY_PREFIX}:{namespace}'
+
+
+def _initial_version():
+    # Seed from the clock so an evicted counter never restarts at a value
+    # that older cached entries were written under
+    return int(time.time() * 1000)
+
+
+def get_versions(*namespaces):
+    """Return the current version for each namespace, creating missing ones"""
+    keys = {_version_key(ns): ns for ns in namespaces}
+    found = cache.get_many(list(keys))
+
+    versions = {}
+    for key, namespace in keys.items():
+        version = found.get(key)
+        if version is None:
+            version = _initial_version()
+            if not cache.add(key, version, None):
+                version = cache.get(key, version)
+        versions[namespace] = version
+    return versions
+
+
+def get_version(namespace):
+    return get_versions(namespace)[namespace]
+
+
+def bump_version(*namespaces):
+    """Invalidate everything cached under the given namespaces"""
+    for namespace in namespaces:
+        key = _version_key(namespace)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, _initial_version(), None)
+
+
+def bump_catalog():
+    bump_version(CATALOG)
+
+
+def bump_product_stats(*product_ids):
+    """Invalidate listings showing rating aggregates, and those of ``product_ids``"""
+    bump_version(PRODUCT_STATS, *(product_stats_namespace(pid) for pid in product_ids))
+
+
+def bump_product_views(*product_ids):
+    """Invalidate listings showing view counters, and those of ``product_ids``"""
+    bump_version(PRODUCT_VIEWS, *(product_stats_namespace(pid) for pid in product_ids))
+
+
+def bump_product(*product_ids):
+    bump_version(*(product_namespace(pid) for pid in product_ids))
+
+
+def bump_user(*user_ids):
+    bump_version(*(user_namespace(uid) for uid in user_ids))
+
+
+def bump_recommendations(*user_ids):
+    bump_version(*(recommendations_namespace(uid) for uid in user_ids))
+
+
+def bump_recently_viewed(user_id):
+    bump_version(recently_viewed_namespace(user_id))
+
+
+def versioned_key(base, product_ids=(), user_ids=(), catalog=False):
+    """
+    Build a cache key for ``base`` that embeds the versions it depends on.
+
+    Example::
+
+        key = versioned_key(f'user_preferences_{user_id}', user_ids=[user_id])
+    """
+    namespaces = []
+    if catalog:
+        namespaces.append(CATALOG)
+    namespaces.extend(product_namespace(pid) for pid in product_ids)
+    namespaces.extend(user_namespace(uid) for uid in user_ids)
+
+    if not namespaces:
+        return base
+
+    versions = get_versions(*namespaces)
+    suffix = '.'.join(str(versions[ns]) for ns in namespaces)
+    return f'{base}:v{suffix}'
@@ -0,0 +1,118 @@
+"""
+Conditional GET support for API viewsets.
+
+Responses carry an ``ETag`` derived from the cache-version counters of the
+data they are built from (see ``cache_versions``), plus the request path and
+rendered format.  A matching ``If-None-Match`` is answered with ``304 Not
+Modified`` before any queryset is evaluated or serialized.
+
+Rating aggregates and view counters move much more often than the catalog,
+so their namespaces only join the validator of responses that render one of
+their fields (``STATS_FIELDS``); a card listing without ``total_views`` stays
+valid across view flushes.
+"""
+import hashlib
+
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import quote_etag
+from rest_framework import serializers
+
+from .cache_versions import CATALOG, PRODUCT_STATS, PRODUCT_VIEWS, get_versions, user_namespace
+
+STATS_FIELDS = {
+    PRODUCT_STATS: {'average_rating', 'rating_count', 'ratings'},
+    PRODUCT_VIEWS: {'total_views'},
+}
+
+
+def rendered_field_names(serializer):
+    """Names of the fields ``serializer`` renders, at any depth"""
+    names = set()
+    for name, field in serializer.fields.items():
+        names.add(name)
+        nested = field.child if isinstance(field, serializers.ListSerializer) else field
+        if isinstance(nested, serializers.BaseSerializer):
+            names |= rendered_field_names(nested)
+    return names
+
+
+class NotModified(Exception):
+    def __init__(self, response):
+        super().__init__()
+        self.response = response
+
+
+class ConditionalGetMixin:
+    """
+    Viewset mixin answering conditional ``list``/``retrieve`` requests.
+
+    * ``etag_namespaces``: version namespaces the payload depends on; the
+      stats namespaces are added when the serializer renders their fields
+    * ``etag_per_user``: the payload is personalized; the user's namespace
+      joins the validator and responses are marked private
+
+    Custom actions opt in by calling ``check_not_modified()`` first.
+    """
+    etag_namespaces = (CATALOG,)
+    etag_per_user = False
+
+    def get_etag_namespaces(self):
+        namespaces = list(self.etag_namespaces)
+        rendered = rendered_field_names(self.get_serializer())
+        namespaces.extend(ns for ns, fields in STATS_FIELDS.items() if fields & rendered)
+        if self.etag_per_user:
+            namespaces.append(user_namespace(self.request.user.pk))
+        return namespaces
+
+    def get_etag_parts(self):
+        request = self.request
+        parts = [
+            type(self).__name__,
+            self.action,
+            request.get_full_path(),
+            getattr(request, 'accepted_media_type', ''),
+        ]
+        if self.etag_per_user:
+            parts.append(request.user.pk)
+        return parts
+
+    def get_etag(self):
+        namespaces = self.get_etag_namespaces()
+        versions = get_versions(*namespaces)
+        parts = self.get_etag_parts() + [versions[ns] for ns in namespaces]
+        digest = hashlib.md5(':'.join(map(str, parts)).encode('utf-8')).hexdigest()
+        return quote_etag(digest)
+
+    def check_not_modified(self):
+        """Raise ``NotModified`` when the client already holds this representation"""
+        if self.request.method not in ('GET', 'HEAD'):
+            return
+        self._etag = self.get_etag()
+        response = get_conditional_response(self.request, etag=self._etag)
+        if response is not None:
+            raise NotModified(response)
+
+    def list(self, request, *args, **kwargs):
+        self.check_not_modified()
+        return super().list(request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        self.check_not_modified()
+        return super().retrieve(request, *args, **kwargs)
+
+    def handle_exception(self, exc):
+        if isinstance(exc, NotModified):
+            return exc.response
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        etag = getattr(self, '_etag', None)
+        if etag and response.status_code in (200, 304):
+            response['ETag'] = etag
+            # Clients and CDNs must revalidate, which is cheap with the ETag
+            patch_cache_control(response, no_cache=True)
+            if self.etag_per_user:
+                patch_cache_control(response, private=True)
+                patch_vary_headers(response, ('Authorization', 'Cookie'))
+        return response
@@ -1,11 +1,22 @@
+import heapq
 import numpy as np
 from scipy.sparse import csr_matrix
 from sklearn.metrics.pairwise import cosine_similarity
-from django.db.models import Count
+from django.db.models import Count, F, Window
+from django.db.models.functions import RowNumber
 from django.utils import timezone
 from datetime import timedelta
+from . import basket_matrix, event_log, recently_viewed
+from .cache_versions import bump_recommendations
 from .models import Product, UserInteraction, ProductSimilarity, Recommendation
 
+INTERACTION_WEIGHTS = {
+    'view': 1,
+    'cart': 2,
+    'wishlist': 3,
+    'purchase': 4
+}
+
 class RecommendationEngine:
     def __init__(self):
         self.similarity_matrix = None
@@ -33,12 +44,7 @@ class RecommendationEngine:
             item_idx = self.product_index[interaction['product_id']]
             
             # Weight different interaction types
-            weight = {
-                'view': 1,
-                'cart': 2,
-                'wishlist': 3,
-                'purchase': 4
-            }.get(interaction['interaction_type'], 1)
+            weight = INTERACTION_WEIGHTS.get(interaction['interaction_type'], 1)
             
             rows.append(user_idx)
             cols.append(item_idx)
@@ -91,7 +97,20 @@ class RecommendationEngine:
     
     def get_frequently_bought_together(self, product_id, n=5):
         """Get products frequently bought together"""
-        # Find users who bought this product
+        matrix = basket_matrix.get_basket_matrix()
+        if matrix is not None:
+            # One sparse row of the co-purchase matrix; only the top n are loaded
+            top = matrix.co_purchased([int(product_id)], n)
+            products = Product.objects.in_bulk([pid for pid, _ in top])
+            together = []
+            for pid, purchase_count in top:
+                product = products.get(pid)
+                if product is not None:
+                    product.purchase_count = int(purchase_count)
+                    together.append(product)
+            return together
+        
+        # Matrix still building: find users who bought this product
         users = UserInteraction.objects.filter(
             product_id=product_id,
             interaction_type='purchase'
@@ -109,39 +128,48 @@ class RecommendationEngine:
     
     def get_personalized_recommendations(self, user_id, n=10):
         """Get personalized recommendations for a user"""
-        # Get user's recent interactions
-        recent_interactions = UserInteraction.objects.filter(
-            user_id=user_id,
-            timestamp__gte=timezone.now() - timedelta(days=30)
-        ).select_related('product')
+        # Get user's recent interaction counts from the daily rollups
+        recent_counts = event_log.user_product_counts(
+            user_id, timezone.now() - timedelta(days=30)
+        )
+        # Views the queue consumer hasn't rolled up yet still seed from the ring
+        counted = {product_id for product_id, _ in recent_counts}
+        for product_id in recently_viewed.get_product_ids(user_id):
+            if product_id not in counted:
+                recent_counts[product_id, 'view'] = 1
+        
+        # Each seed's top similar products, read for all seeds in one query
+        similar_by_seed = {}
+        similar_rows = ProductSimilarity.objects.filter(
+            product_a_id__in={product_id for product_id, _ in recent_counts}
+        ).annotate(
+            rank=Window(
+                RowNumber(),
+                partition_by=F('product_a_id'),
+                order_by=F('similarity_score').desc()
+            )
+        ).filter(rank__lte=5).values_list('product_a_id', 'product_b_id', 'similarity_score')
+        for seed_id, similar_id, similarity in similar_rows:
+            similar_by_seed.setdefault(seed_id, []).append((similar_id, similarity))
         
         # Calculate recommendation scores
         product_scores = {}
         
-        for interaction in recent_interactions:
-            similar_products = self.get_similar_products(interaction.product_id)
-            
-            for similar in similar_products:
-                weight = {
-                    'view': 1,
-                    'cart': 2,
-                    'wishlist': 3,
-                    'purchase': 4
-                }.get(interaction.interaction_type, 1)
-                
-                score = similar.similarity_score * weight
-                product_scores[similar.product_b_id] = product_scores.get(similar.product_b_id, 0) + score
-        
-        # Sort and return top N recommendations
-        sorted_products = sorted(
-            product_scores.items(),
-            key=lambda x: x[1],
-            reverse=True
-        )
+        for (product_id, interaction_type), count in recent_counts.items():
+            weight = INTERACTION_WEIGHTS.get(interaction_type, 1)
+            for similar_id, similarity in similar_by_seed.get(product_id, ()):
+                score = similarity * weight * count
+                product_scores[similar_id] = product_scores.get(similar_id, 0) + score
+        
+        # Only the top N products are loaded
+        top = heapq.nlargest(n, product_scores.items(), key=lambda x: x[1])
+        products = Product.objects.in_bulk([product_id for product_id, _ in top])
         
         recommendations = []
-        for product_id, score in sorted_products[:n]:
-            product = Product.objects.get(id=product_id)
+        for product_id, score in top:
+            product = products.get(product_id)
+            if product is None:
+                continue
             explanation = f"Based on your interest in similar products"
             
             recommendations.append(
@@ -155,17 +183,23 @@ class RecommendationEngine:
             )
         
         Recommendation.objects.bulk_create(recommendations)
+        # bulk_create skips the signals
+        bump_recommendations(user_id)
         return recommendations
     
     def get_trending_products(self, n=10, days=7):
         """Get trending products based on recent interactions"""
         recent_date = timezone.now() - timedelta(days=days)
         
-        return Product.objects.filter(
-            userinteraction__timestamp__gte=recent_date
-        ).annotate(
-            interaction_count=Count('userinteraction')
-        ).order_by('-interaction_count')[:n]
+        top = event_log.top_products(recent_date, n=n)
+        products = Product.objects.in_bulk([product_id for product_id, _ in top])
+        trending = []
+        for product_id, interaction_count in top:
+            product = products.get(product_id)
+            if product is not None:
+                product.interaction_count = interaction_count
+                trending.append(product)
+        return trending
     
     def handle_cold_start(self, user_id=None, n=10):
         """Handle cold start problem for new users or products"""
@@ -0,0 +1,477 @@
+"""
+Append-only interaction event log with hourly and daily rollups.
+
+Every interaction is queued on the ``interaction`` topic of the event
+queue; the consumer appends it as one JSON line to a monthly partition file
+(``interactions-YYYY-MM.ndjson`` under ``INTERACTION_LOG_DIR``) and counts
+it into ``ProductInteractionRollup``/``UserInteractionRollup`` buckets.  Engines
+read windows such as "last 7 days" from the rollups instead of scanning
+``UserInteraction`` by timestamp; only the part of a window older than the
+first rollup bucket (right after deploy, before ``rebuild_interaction_rollups``
+has backfilled) is counted from ``UserInteraction``.  Old partitions and rollup buckets are
+dropped by ``prune_interaction_log``; rollups can be rebuilt from the
+partitions with ``rebuild_interaction_rollups``.
+"""
+import json
+import logging
+import os
+import threading
+from datetime import datetime, timedelta, timezone as dt_timezone
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Count, F, Sum
+from django.utils import timezone
+
+from . import event_queue
+from .models import (
+    AppliedEventOffset, InteractionRollup, Product, ProductInteractionRollup,
+    UserInteraction, UserInteractionRollup
+)
+
+logger = logging.getLogger(__name__)
+
+INTERACTION_TOPIC = 'interaction'
+# AppliedEventOffset stages of the interaction consumer
+ROLLUP_STAGE = 'interaction-rollups'
+LOG_STAGE = 'interaction-log'
+PARTITION_PREFIX = 'interactions-'
+PARTITION_SUFFIX = '.ndjson'
+
+# Retention defaults; override with INTERACTION_LOG_RETENTION_MONTHS,
+# HOURLY_ROLLUP_RETENTION_DAYS and DAILY_ROLLUP_RETENTION_DAYS
+LOG_RETENTION_MONTHS = 3
+HOURLY_RETENTION_DAYS = 7
+DAILY_RETENTION_DAYS = 400
+
+# Windows up to this long are answered from hourly buckets
+HOURLY_WINDOW_LIMIT = timedelta(hours=48)
+
+_write_lock = threading.Lock()
+
+
+def log_dir():
+    configured = getattr(settings, 'INTERACTION_LOG_DIR', None)
+    if configured:
+        return Path(configured)
+    return Path(getattr(settings, 'BASE_DIR', '.')) / 'var' / 'interaction_log'
+
+
+def partition_name(when):
+    when = when.astimezone(dt_timezone.utc)
+    return f'{PARTITION_PREFIX}{when:%Y-%m}{PARTITION_SUFFIX}'
+
+
+def partition_month(path):
+    """Return the ``(year, month)`` a partition file covers, or ``None``"""
+    name = Path(path).name
+    if not (name.startswith(PARTITION_PREFIX) and name.endswith(PARTITION_SUFFIX)):
+        return None
+    try:
+        stamp = datetime.strptime(name[len(PARTITION_PREFIX):-len(PARTITION_SUFFIX)], '%Y-%m')
+    except ValueError:
+        return None
+    return stamp.year, stamp.month
+
+
+def partitions():
+    """All partition files, oldest first"""
+    directory = log_dir()
+    if not directory.is_dir():
+        return []
+    found = [(partition_month(path), path) for path in directory.iterdir()]
+    return [path for month, path in sorted(found) if month]
+
+
+def hour_bucket(when):
+    return when.astimezone(dt_timezone.utc).replace(minute=0, second=0, microsecond=0)
+
+
+def day_bucket(when):
+    return hour_bucket(when).replace(hour=0)
+
+
+def _to_payload(event):
+    user_id, product_id, interaction_type, when, count = event
+    return {
+        'ts': when.isoformat(),
+        'user': user_id,
+        'product': product_id,
+        'type': interaction_type,
+        'count': count,
+    }
+
+
+def _from_payload(payload):
+    return (
+        payload['user'], payload['product'], payload['type'],
+        datetime.fromisoformat(payload['ts']), payload.get('count', 1),
+    )
+
+
+def _append(events):
+    by_partition = {}
+    for event in events:
+        line = json.dumps(_to_payload(event), separators=(',', ':'))
+        by_partition.setdefault(partition_name(event[3]), []).append(line + '\n')
+
+    directory = log_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    with _write_lock:
+        for name, lines in by_partition.items():
+            # O_APPEND keeps whole lines intact across worker processes
+            with open(directory / name, 'a', encoding='utf-8') as handle:
+                handle.write(''.join(lines))
+
+
+def _existing(events):
+    """Drop events of products or users deleted since they were recorded"""
+    product_ids = set(Product.objects.filter(
+        pk__in={event[1] for event in events}
+    ).values_list('pk', flat=True))
+    user_ids = set(User.objects.filter(
+        pk__in={event[0] for event in events}
+    ).values_list('pk', flat=True))
+    return [event for event in events if event[0] in user_ids and event[1] in product_ids]
+
+
+def _increment(model, key_fields, counts):
+    """Add ``{key_tuple: count}`` to ``model`` rows keyed by ``key_fields``"""
+    if not counts:
+        return
+    lookup = {f'{field}__in': {key[i] for key in counts} for i, field in enumerate(key_fields)}
+
+    def existing_rows():
+        rows = model.objects.filter(**lookup).values_list('pk', *key_fields)
+        return {tuple(row[1:]): row[0] for row in rows}
+
+    existing = existing_rows()
+    missing = [key for key in counts if key not in existing]
+    if missing:
+        # Insert at zero, then add like any other row so concurrent writers
+        # never overwrite each other's counts
+        model.objects.bulk_create(
+            [model(count=0, **dict(zip(key_fields, key))) for key in missing],
+            ignore_conflicts=True
+        )
+        existing = existing_rows()
+
+    by_count = {}
+    for key, count in counts.items():
+        by_count.setdefault(count, []).append(existing[key])
+    for count, pks in by_count.items():
+        model.objects.filter(pk__in=pks).update(count=F('count') + count)
+
+
+def apply_rollups(events):
+    """Count ``(user_id, product_id, interaction_type, when, count)`` events into the rollups"""
+    product_counts = {}
+    user_counts = {}
+    for user_id, product_id, interaction_type, when, count in events:
+        for granularity, bucket in (
+            (InteractionRollup.HOURLY, hour_bucket(when)),
+            (InteractionRollup.DAILY, day_bucket(when)),
+        ):
+            product_key = (product_id, interaction_type, granularity, bucket)
+            product_counts[product_key] = product_counts.get(product_key, 0) + count
+            user_key = (user_id, product_id, interaction_type, granularity, bucket)
+            user_counts[user_key] = user_counts.get(user_key, 0) + count
+
+    with transaction.atomic():
+        _increment(
+            ProductInteractionRollup,
+            ('product_id', 'interaction_type', 'granularity', 'bucket'),
+            product_counts
+        )
+        _increment(
+            UserInteractionRollup,
+            ('user_id', 'product_id', 'interaction_type', 'granularity', 'bucket'),
+            user_counts
+        )
+
+
+def record_events(events):
+    """
+    Queue events for the log and the rollups.
+
+    ``events`` is an iterable of ``(user_id, product_id, interaction_type,
+    when[, count])`` tuples.  They are published to the event queue after
+    the surrounding transaction commits, so rolled-back interactions are
+    never counted; ``consume_events`` then runs ``apply_interaction_events``.
+    """
+    payloads = [_to_payload(tuple(event) + (1,) * (5 - len(event))) for event in events]
+    if not payloads:
+        return
+
+    def publish():
+        try:
+            event_queue.publish(INTERACTION_TOPIC, payloads)
+        except Exception:
+            logger.exception('Failed to queue %d interaction events', len(payloads))
+
+    transaction.on_commit(publish)
+
+
+def _unapplied(stage, batch):
+    """
+    Return the events of ``batch`` that ``stage`` hasn't applied yet and
+    mark the whole batch applied; call inside the stage's transaction.
+    """
+    watermark, _ = AppliedEventOffset.objects.select_for_update().get_or_create(
+        name=f'{stage}:{batch.queue_id}'
+    )
+    events = [
+        _from_payload(payload)
+        for offset, payload in zip(batch.offsets, batch.payloads)
+        if offset > watermark.offset
+    ]
+    if batch.offsets[-1] > watermark.offset:
+        watermark.offset = batch.offsets[-1]
+        watermark.save(update_fields=['offset', 'updated_at'])
+    return _existing(events)
+
+
+def reset_applied(queue_id, offset):
+    """
+    Lower every stage's watermark for ``queue_id`` so events from ``offset``
+    on are applied again; returns the number of stages moved.  Replayed
+    events are counted and appended a second time, so clear what they
+    rebuild first.
+    """
+    return AppliedEventOffset.objects.filter(
+        name__endswith=f':{queue_id}', offset__gte=offset
+    ).update(offset=max(offset - 1, 0))
+
+
+@event_queue.handler(INTERACTION_TOPIC)
+def apply_interaction_events(batch):
+    # Delivery is at-least-once: each stage records the last offset it
+    # applied in the transaction that applies it, so a redelivered batch
+    # only writes what was missed
+    with transaction.atomic():
+        events = _unapplied(ROLLUP_STAGE, batch)
+        if events:
+            apply_rollups(events)
+    with transaction.atomic():
+        events = _unapplied(LOG_STAGE, batch)
+        if events:
+            # A failed append rolls the offset back; only a crash between
+            # the append and the commit can repeat lines
+            _append(events)
+
+
+def record_interaction(interaction):
+    record_events([(
+        interaction.user_id,
+        interaction.product_id,
+        interaction.interaction_type,
+        interaction.timestamp or timezone.now(),
+    )])
+
+
+def read_partition(path):
+    """Yield ``(user_id, product_id, interaction_type, when, count)`` from one partition"""
+    with open(path, encoding='utf-8') as handle:
+        for line in handle:
+            try:
+                yield _from_payload(json.loads(line))
+            except (ValueError, KeyError):
+                # A torn final line from a crashed writer
+                continue
+
+
+def rebuild_partition(path, batch_size=10000):
+    """Recount the rollup buckets of one monthly partition from its events"""
+    year, month = partition_month(path)
+    start = datetime(year, month, 1, tzinfo=dt_timezone.utc)
+    end = datetime(year + month // 12, month % 12 + 1, 1, tzinfo=dt_timezone.utc)
+
+    def apply(batch):
+        batch = _existing(batch)
+        apply_rollups(batch)
+        return len(batch)
+
+    with transaction.atomic():
+        for model in (ProductInteractionRollup, UserInteractionRollup):
+            model.objects.filter(bucket__gte=start, bucket__lt=end).delete()
+        total = 0
+        batch = []
+        for event in read_partition(path):
+            batch.append(event)
+            if len(batch) >= batch_size:
+                total += apply(batch)
+                batch = []
+        if batch:
+            total += apply(batch)
+    return total
+
+
+def first_logged_at():
+    """Timestamp of the oldest event still in the log, or ``None``"""
+    for path in partitions():
+        # Backfilled events are appended after newer ones, so scan the
+        # whole oldest partition
+        oldest = min((event[3] for event in read_partition(path)), default=None)
+        if oldest is not None:
+            return oldest
+    return None
+
+
+def backfill_from_interactions(batch_size=10000):
+    """
+    Append ``UserInteraction`` rows older than the log to their partitions,
+    so rollups can be rebuilt for data recorded before the log existed.
+    Returns the number of events written.
+    """
+    queryset = UserInteraction.objects.order_by('timestamp', 'pk')
+    started = first_logged_at()
+    if started is not None:
+        queryset = queryset.filter(timestamp__lt=started)
+
+    total = 0
+    batch = []
+    for user_id, product_id, interaction_type, when in queryset.values_list(
+        'user_id', 'product_id', 'interaction_type', 'timestamp'
+    ).iterator(chunk_size=batch_size):
+        batch.append((user_id, product_id, interaction_type, when, 1))
+        if len(batch) >= batch_size:
+            _append(batch)
+            total += len(batch)
+            batch = []
+    if batch:
+        _append(batch)
+        total += len(batch)
+    return total
+
+
+def _window(since, until=None):
+    until = until or timezone.now()
+    if until - since <= HOURLY_WINDOW_LIMIT:
+        return InteractionRollup.HOURLY, hour_bucket(since), until
+    return InteractionRollup.DAILY, day_bucket(since), until
+
+
+def product_rollups(since, until=None, interaction_types=None):
+    """``ProductInteractionRollup`` rows covering ``since``..``until``"""
+    granularity, start, until = _window(since, until)
+    queryset = ProductInteractionRollup.objects.filter(
+        granularity=granularity, bucket__gte=start, bucket__lte=until
+    )
+    if interaction_types:
+        queryset = queryset.filter(interaction_type__in=interaction_types)
+    return queryset
+
+
+def user_rollups(user_id, since, until=None, interaction_types=None):
+    """``UserInteractionRollup`` rows for one user covering ``since``..``until``"""
+    granularity, start, until = _window(since, until)
+    queryset = UserInteractionRollup.objects.filter(
+        user_id=user_id, granularity=granularity, bucket__gte=start, bucket__lte=until
+    )
+    if interaction_types:
+        queryset = queryset.filter(interaction_type__in=interaction_types)
+    return queryset
+
+
+def _first_bucket(model, granularity):
+    return model.objects.filter(granularity=granularity).order_by(
+        'bucket'
+    ).values_list('bucket', flat=True).first()
+
+
+def _window_counts(model, fields, since, interaction_types=None, **filters):
+    """
+    Rows of ``fields`` plus ``total`` counting interactions since ``since``,
+    possibly several per group.  Rollups answer from their first bucket on;
+    anything earlier (all of it while they are empty) comes from
+    ``UserInteraction``.
+    """
+    granularity, start, until = _window(since)
+    first_bucket = _first_bucket(model, granularity)
+    rows = []
+    if first_bucket is None or first_bucket > since:
+        raw = UserInteraction.objects.filter(timestamp__gte=since, **filters)
+        if first_bucket is not None:
+            raw = raw.filter(timestamp__lt=first_bucket)
+        if interaction_types:
+            raw = raw.filter(interaction_type__in=interaction_types)
+        rows.extend(raw.values(*fields).annotate(total=Count('id')).order_by())
+    if first_bucket is not None:
+        rollups = model.objects.filter(
+            granularity=granularity, bucket__gte=max(start, first_bucket), bucket__lte=until, **filters
+        )
+        if interaction_types:
+            rollups = rollups.filter(interaction_type__in=interaction_types)
+        rows.extend(rollups.values(*fields).annotate(total=Sum('count')).order_by())
+    return rows
+
+
+def top_products(since, n=10, interaction_types=None, weights=None):
+    """
+    Return ``[(product_id, score)]`` for the most active products since
+    ``since``; ``weights`` maps interaction types to multipliers.
+    """
+    rows = _window_counts(
+        ProductInteractionRollup, ('product_id', 'interaction_type'), since, interaction_types
+    )
+
+    scores = {}
+    for row in rows:
+        weight = weights.get(row['interaction_type'], 1) if weights else 1
+        scores[row['product_id']] = scores.get(row['product_id'], 0) + row['total'] * weight
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:n]
+
+
+def user_product_counts(user_id, since):
+    """Return ``{(product_id, interaction_type): count}`` for one user since ``since``"""
+    rows = _window_counts(
+        UserInteractionRollup, ('product_id', 'interaction_type'), since, user_id=user_id
+    )
+    counts = {}
+    for row in rows:
+        key = (row['product_id'], row['interaction_type'])
+        counts[key] = counts.get(key, 0) + row['total']
+    return counts
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def prune(now=None, dry_run=False):
+    """
+    Apply the retention policy.  Returns ``(partitions_removed,
+    hourly_rows_deleted, daily_rows_deleted)``.
+    """
+    now = now or timezone.now()
+    current = now.astimezone(dt_timezone.utc)
+    keep_months = _setting('INTERACTION_LOG_RETENTION_MONTHS', LOG_RETENTION_MONTHS)
+    month_index = current.year * 12 + current.month - 1 - keep_months
+
+    expired = []
+    for path in partitions():
+        year, month = partition_month(path)
+        if year * 12 + month - 1 <= month_index:
+            expired.append(path)
+
+    hourly_cutoff = hour_bucket(now - timedelta(
+        days=_setting('HOURLY_ROLLUP_RETENTION_DAYS', HOURLY_RETENTION_DAYS)
+    ))
+    daily_cutoff = day_bucket(now - timedelta(
+        days=_setting('DAILY_ROLLUP_RETENTION_DAYS', DAILY_RETENTION_DAYS)
+    ))
+    counts = [0, 0]
+    for index, (granularity, cutoff) in enumerate((
+        (InteractionRollup.HOURLY, hourly_cutoff),
+        (InteractionRollup.DAILY, daily_cutoff),
+    )):
+        for model in (ProductInteractionRollup, UserInteractionRollup):
+            queryset = model.objects.filter(granularity=granularity, bucket__lt=cutoff)
+            counts[index] += queryset.count() if dry_run else queryset.delete()[0]
+
+    if not dry_run:
+        for path in expired:
+            os.remove(path)
+    return len(expired), counts[0], counts[1]
@@ -0,0 +1,228 @@
+"""
+Durable local event queue for work derived from user interactions.
+
+Requests only append events to an SQLite file next to the project
+(``EVENT_QUEUE_PATH``); derived structures such as the interaction rollups
+are maintained by handlers registered with ``@handler(topic)`` and run by
+the ``consume_events`` management command.
+
+Delivery is at-least-once: a consumer's offset only advances after every
+handler for a batch has returned, so a crash or a failing handler makes the
+batch run again.  Handlers get the events' offsets and the queue's id so
+they can record what they have applied and skip redeliveries.  Each named consumer keeps its own offset, which can be
+moved with ``seek`` to replay retained events.
+"""
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections import namedtuple
+from pathlib import Path
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONSUMER = 'default'
+# Consumed events are kept this long so they can be replayed
+RETENTION_SECONDS = 60 * 60 * 24 * 7
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    "offset" INTEGER PRIMARY KEY AUTOINCREMENT,
+    topic TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS consumers (
+    name TEXT PRIMARY KEY,
+    "offset" INTEGER NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+# What a handler receives: the payloads of one topic in offset order, their
+# offsets, and the id of the queue file (offsets restart with a new file)
+Batch = namedtuple('Batch', ['queue_id', 'offsets', 'payloads'])
+
+_handlers = {}
+
+
+def handler(topic):
+    """
+    Register ``func(batch)`` for ``topic``.  It receives a ``Batch`` with
+    every event of that topic in a consumed batch and must tolerate
+    redelivery.
+    """
+    def register(func):
+        _handlers.setdefault(topic, []).append(func)
+        return func
+    return register
+
+
+def queue_path():
+    configured = getattr(settings, 'EVENT_QUEUE_PATH', None)
+    if configured:
+        return Path(configured)
+    return Path(getattr(settings, 'BASE_DIR', '.')) / 'var' / 'event_queue.sqlite3'
+
+
+class EventQueue:
+    def __init__(self, path):
+        self.path = Path(path)
+        self._local = threading.local()
+
+    @property
+    def connection(self):
+        # sqlite3 connections can't cross threads or forks
+        conn = getattr(self._local, 'connection', None)
+        if conn is None or self._local.pid != os.getpid():
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.executescript(_SCHEMA)
+            conn.execute(
+                "INSERT OR IGNORE INTO meta (key, value) VALUES ('queue_id', ?)",
+                (uuid.uuid4().hex,)
+            )
+            self._local.connection = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    @property
+    def queue_id(self):
+        return self.connection.execute(
+            "SELECT value FROM meta WHERE key = 'queue_id'"
+        ).fetchone()[0]
+
+    def publish(self, topic, payloads):
+        """Append payloads to ``topic`` in one transaction; returns the last offset"""
+        now = time.time()
+        rows = [(topic, json.dumps(payload, separators=(',', ':')), now) for payload in payloads]
+        if not rows:
+            return None
+        conn = self.connection
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')
+            conn.executemany('INSERT INTO events (topic, payload, created_at) VALUES (?, ?, ?)', rows)
+            return conn.execute('SELECT MAX("offset") FROM events').fetchone()[0]
+
+    def committed(self, consumer=DEFAULT_CONSUMER):
+        row = self.connection.execute(
+            'SELECT "offset" FROM consumers WHERE name = ?', (consumer,)
+        ).fetchone()
+        return row[0] if row else 0
+
+    def commit(self, consumer, offset):
+        conn = self.connection
+        with conn:
+            conn.execute(
+                'INSERT INTO consumers (name, "offset", updated_at) VALUES (?, ?, ?) '
+                'ON CONFLICT(name) DO UPDATE SET "offset" = excluded."offset", '
+                'updated_at = excluded.updated_at',
+                (consumer, offset, time.time())
+            )
+
+    def seek(self, consumer, offset):
+        """Make ``offset`` the next event ``consumer`` receives"""
+        self.commit(consumer, max(offset - 1, 0))
+
+    def fetch(self, consumer=DEFAULT_CONSUMER, limit=500, topics=None):
+        """Return up to ``limit`` ``(offset, topic, payload)`` rows after the committed offset"""
+        sql = 'SELECT "offset", topic, payload FROM events WHERE "offset" > ?'
+        params = [self.committed(consumer)]
+        if topics:
+            sql += f' AND topic IN ({", ".join("?" * len(topics))})'
+            params.extend(topics)
+        sql += ' ORDER BY "offset" LIMIT ?'
+        params.append(limit)
+        return [
+            (offset, topic, json.loads(payload))
+            for offset, topic, payload in self.connection.execute(sql, params)
+        ]
+
+    def lag(self, consumer=DEFAULT_CONSUMER, topics=None):
+        """
+        Return ``{'head', 'committed', 'pending', 'oldest_pending_age'}``;
+        the age (seconds) is ``None`` when the consumer is caught up.
+        """
+        committed = self.committed(consumer)
+        sql = (
+            'SELECT (SELECT MAX("offset") FROM events), COUNT(*), MIN(created_at) '
+            'FROM events WHERE "offset" > ?'
+        )
+        params = [committed]
+        if topics:
+            sql += f' AND topic IN ({", ".join("?" * len(topics))})'
+            params.extend(topics)
+        head, pending, oldest = self.connection.execute(sql, params).fetchone()
+        return {
+            'head': head or committed,
+            'committed': committed,
+            'pending': pending,
+            'oldest_pending_age': time.time() - oldest if oldest is not None else None,
+        }
+
+    def trim(self, retention=RETENTION_SECONDS):
+        """Delete events every consumer has processed and that are past retention"""
+        conn = self.connection
+        with conn:
+            row = conn.execute('SELECT MIN("offset") FROM consumers').fetchone()
+            if row[0] is None:
+                return 0
+            return conn.execute(
+                'DELETE FROM events WHERE "offset" <= ? AND created_at < ?',
+                (row[0], time.time() - retention)
+            ).rowcount
+
+    def consume(self, consumer=DEFAULT_CONSUMER, limit=500, topics=None):
+        """
+        Dispatch one batch to the registered handlers and commit it.
+        Returns the number of events processed; handler errors propagate and
+        leave the offset unchanged.
+        """
+        events = self.fetch(consumer, limit, topics)
+        if not events:
+            return 0
+
+        queue_id = self.queue_id
+        by_topic = {}
+        for offset, topic, payload in events:
+            offsets, payloads = by_topic.setdefault(topic, ([], []))
+            offsets.append(offset)
+            payloads.append(payload)
+        for topic, (offsets, payloads) in by_topic.items():
+            funcs = _handlers.get(topic)
+            if not funcs:
+                logger.warning('No handler for %d events on topic %r', len(payloads), topic)
+            for func in funcs or ():
+                func(Batch(queue_id, offsets, payloads))
+
+        self.commit(consumer, events[-1][0])
+        return len(events)
+
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def get_queue():
+    global _queue
+    path = queue_path()
+    if _queue is None or _queue.path != path:
+        with _queue_lock:
+            if _queue is None or _queue.path != path:
+                _queue = EventQueue(path)
+    return _queue
+
+
+def publish(topic, payloads):
+    return get_queue().publish(topic, payloads)
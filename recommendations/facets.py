@@ -0,0 +1,100 @@
+"""
+Facet values for indexed products.
+
+Loaders put the result of ``product_facets`` in each document's
+``meta['facets']``; the search index keeps one row per product and value
+and counts them over a result set with ``SearchIndex.facet_counts``.
+Values are plain ints, strings and bools so counts serialize as they are:
+
+* ``category``: the product's category and all of its ancestors
+* ``price``: the price bucket label, e.g. ``'25-50'`` or ``'1000+'``
+* ``tag``: tag ids
+* ``rating``: every whole-star band (``4`` is "4 stars and up") the
+  average rating reaches; unrated products have none
+* ``in_stock``: ``True`` or ``False``
+
+Nothing here imports models, so the storefront can facet its own products.
+"""
+import bisect
+
+CATEGORY = 'category'
+PRICE = 'price'
+TAG = 'tag'
+RATING = 'rating'
+IN_STOCK = 'in_stock'
+
+FACETS = (CATEGORY, PRICE, TAG, RATING, IN_STOCK)
+
+PRICE_BUCKETS = (0, 25, 50, 100, 250, 500, 1000)
+RATING_BANDS = (1, 2, 3, 4)
+
+
+def price_bucket(price):
+    position = max(bisect.bisect_right(PRICE_BUCKETS, float(price)) - 1, 0)
+    if position == len(PRICE_BUCKETS) - 1:
+        return f'{PRICE_BUCKETS[position]}+'
+    return f'{PRICE_BUCKETS[position]}-{PRICE_BUCKETS[position + 1]}'
+
+
+PRICE_BUCKET_LABELS = tuple(price_bucket(low) for low in PRICE_BUCKETS)
+
+
+def rating_bands(average_rating):
+    if average_rating is None:
+        return []
+    return [band for band in RATING_BANDS if average_rating >= band]
+
+
+def category_path(category_id, parents):
+    """
+    Return ``category_id`` followed by its ancestors; ``parents`` maps
+    category ids to parent ids.
+    """
+    path = []
+    while category_id is not None and category_id not in path:
+        path.append(category_id)
+        category_id = parents.get(category_id)
+    return path
+
+
+def product_facets(category_id, price, stock, parents=None, tag_ids=(), average_rating=None):
+    facets = {
+        CATEGORY: category_path(category_id, parents or {}),
+        PRICE: [price_bucket(price)],
+        IN_STOCK: [stock > 0],
+    }
+    if tag_ids:
+        facets[TAG] = list(tag_ids)
+    bands = rating_bands(average_rating)
+    if bands:
+        facets[RATING] = bands
+    return facets
+
+
+def parse_selections(params, facets=FACETS):
+    """
+    Read facet selections from a ``QueryDict`` (``?category=3&price=25-50``,
+    repeated parameters select several values) into ``{facet: values}``.
+    Raises ``ValueError`` for malformed values.
+    """
+    selections = {}
+    for facet in facets:
+        values = [value for value in params.getlist(facet) if value != '']
+        if not values:
+            continue
+        if facet in (CATEGORY, TAG, RATING):
+            try:
+                values = [int(value) for value in values]
+            except ValueError:
+                raise ValueError(f'{facet} must be an integer')
+        elif facet == IN_STOCK:
+            flags = {'true': True, '1': True, 'false': False, '0': False}
+            if any(value.lower() not in flags for value in values):
+                raise ValueError('in_stock must be true or false')
+            values = [flags[value.lower()] for value in values]
+        elif facet == PRICE:
+            unknown = [value for value in values if value not in PRICE_BUCKET_LABELS]
+            if unknown:
+                raise ValueError(f'Unknown price bucket: {unknown[0]}')
+        selections[facet] = values
+    return selections
@@ -0,0 +1,139 @@
+"""
+Sparse fieldsets for API serializers.
+
+Clients shape responses with query parameters:
+
+* ``?fields=id,name,price`` keeps only the listed fields
+* ``?shape=card`` swaps the relations declared in ``Meta.card_fields`` (at
+  any depth) for their compact card versions
+
+Without either parameter every serializer renders its full representation.
+
+Serializers also declare which relations and aggregates each field needs,
+so viewsets can ``select_related``/``prefetch_related``/``annotate`` exactly
+what the requested shape reads and nothing more.
+"""
+from django.db.models import Prefetch
+from rest_framework import serializers
+
+CARD = 'card'
+
+
+def parse_list_param(value):
+    if not value:
+        return []
+    return [item.strip() for item in value.split(',') if item.strip()]
+
+
+class SparseFieldsetMixin:
+    """
+    Serializer mixin driven by these optional ``Meta`` attributes:
+
+    * ``card_fields``: ``{name: (serializer_class, kwargs)}``; the compact
+      version of a relation, used instead of the declared field for
+      ``?shape=card``
+    * ``select_related_fields``/``prefetch_related_fields``:
+      ``{field_name: [lookup, ...]}`` for relations read by plain fields
+    * ``annotated_fields``: ``{field_name: expression}`` for counts and other
+      aggregates; the field reads the annotation when it is present
+
+    Nested serializers using the mixin contribute their own lookups; nested
+    lists with annotations are loaded through a ``Prefetch`` queryset.
+    """
+
+    def __init__(self, *args, **kwargs):
+        fields = kwargs.pop('fields', None)
+        shape = kwargs.pop('shape', None)
+        super().__init__(*args, **kwargs)
+
+        request = self.context.get('request')
+        if request is not None:
+            if 'fields' in request.query_params:
+                fields = parse_list_param(request.query_params['fields'])
+            shape = request.query_params.get('shape', shape)
+
+        if shape == CARD:
+            self.apply_card_shape()
+        if fields:
+            self.apply_fields(fields)
+
+    def apply_card_shape(self):
+        for name, (serializer_class, options) in getattr(self.Meta, 'card_fields', {}).items():
+            if name in self.fields:
+                self.fields[name] = serializer_class(**options)
+
+        # Nested serializers are built before the request is reachable
+        for field in self.fields.values():
+            nested = field.child if isinstance(field, serializers.ListSerializer) else field
+            if isinstance(nested, SparseFieldsetMixin):
+                nested.apply_card_shape()
+
+    def apply_fields(self, fields):
+        allowed = set(fields)
+        for name in list(self.fields):
+            if name not in allowed:
+                self.fields.pop(name)
+
+    def get_annotations(self):
+        annotated = getattr(self.Meta, 'annotated_fields', {})
+        return {name: expression for name, expression in annotated.items() if name in self.fields}
+
+    def get_related_lookups(self, prefix='', in_prefetch=False):
+        """Return the (select_related, prefetch_related) lookups the active fields need"""
+        select_map = getattr(self.Meta, 'select_related_fields', {})
+        prefetch_map = getattr(self.Meta, 'prefetch_related_fields', {})
+        selects, prefetches = [], []
+
+        for name, field in self.fields.items():
+            for lookup in select_map.get(name, ()):
+                (prefetches if in_prefetch else selects).append(prefix + lookup)
+            for lookup in prefetch_map.get(name, ()):
+                prefetches.append(prefix + lookup)
+
+            many = isinstance(field, serializers.ListSerializer)
+            nested = field.child if many else field
+            if not isinstance(nested, SparseFieldsetMixin) or field.source == '*':
+                continue
+
+            path = prefix + field.source.replace('.', '__')
+            nested_in_prefetch = in_prefetch or many
+            annotations = nested.get_annotations()
+            if nested_in_prefetch and annotations:
+                queryset = nested.Meta.model._default_manager.annotate(**annotations)
+                prefetches.append(Prefetch(path, queryset=queryset))
+            else:
+                (prefetches if nested_in_prefetch else selects).append(path)
+            nested_selects, nested_prefetches = nested.get_related_lookups(
+                path + '__', nested_in_prefetch
+            )
+            selects.extend(nested_selects)
+            prefetches.extend(nested_prefetches)
+
+        return selects, prefetches
+
+    def setup_queryset(self, queryset):
+        selects, prefetches = self.get_related_lookups()
+        annotations = self.get_annotations()
+        if annotations:
+            queryset = queryset.annotate(**annotations)
+        if selects:
+            queryset = queryset.select_related(*selects)
+        if prefetches:
+            queryset = queryset.prefetch_related(*prefetches)
+        return queryset
+
+
+class SparseFieldsetViewMixin:
+    """
+    Viewset mixin that loads only the relations the requested shape reads.
+    Custom actions that build their own querysets call ``setup_queryset``.
+    """
+
+    def setup_queryset(self, queryset):
+        serializer = self.get_serializer()
+        if isinstance(serializer, SparseFieldsetMixin):
+            queryset = serializer.setup_queryset(queryset)
+        return queryset
+
+    def filter_queryset(self, queryset):
+        return self.setup_queryset(super().filter_queryset(queryset))
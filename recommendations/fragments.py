@@ -0,0 +1,119 @@
+"""
+Per-object fragment cache for product payloads.
+
+Each product's serialized representation is cached under its id,
+``updated_at``, product cache version, product stats version (bumped when
+its rating or view counters move) and the serializer's shape.  The product
+version is bumped by every model the payload embeds: its category, tags
+(linked, unlinked, renamed or deleted), attributes and ratings, and the
+username of each rater.  The same product rendered by list, detail,
+recommendation and collection responses is serialized once.  List
+serializers fetch and store fragments in bulk with ``get_many``/``set_many``.
+"""
+import hashlib
+
+from django.core.cache import cache
+from django.db import models
+from django.utils.functional import cached_property
+from rest_framework import serializers
+
+from .cache_versions import LONG_TTL, get_versions, product_namespace, product_stats_namespace
+
+
+def serializer_shape(serializer):
+    """Describe the fields (and nested fields) a serializer renders"""
+    parts = []
+    for name, field in serializer.fields.items():
+        nested = field.child if isinstance(field, serializers.ListSerializer) else field
+        if isinstance(nested, serializers.BaseSerializer):
+            parts.append(f'{name}[{type(nested).__name__}:{serializer_shape(nested)}]')
+        else:
+            parts.append(name)
+    return ','.join(parts)
+
+
+class ProductFragmentMixin:
+    """Serializer mixin caching the representation of each ``Product``"""
+
+    @cached_property
+    def fragment_shape(self):
+        shape = f'{type(self).__name__}:{serializer_shape(self)}'
+        request = self.context.get('request')
+        if request is not None:
+            # Image URLs are absolute and depend on the host
+            shape += f'@{request.scheme}://{request.get_host()}'
+        return hashlib.md5(shape.encode('utf-8')).hexdigest()
+
+    def get_fragment_keys(self, instances):
+        namespaces = {
+            obj.pk: (product_namespace(obj.pk), product_stats_namespace(obj.pk))
+            for obj in instances
+        }
+        versions = get_versions(*(ns for pair in namespaces.values() for ns in pair))
+        return {
+            obj.pk: 'product_fragment:{}:{}:{}:{}.{}'.format(
+                self.fragment_shape, obj.pk,
+                obj.updated_at.timestamp() if obj.updated_at else 0,
+                *(versions[ns] for ns in namespaces[obj.pk]),
+            )
+            for obj in instances
+        }
+
+    def prime_fragments(self, instances):
+        """Load the fragments for ``instances`` in one round trip"""
+        self._fragment_keys = self.get_fragment_keys(instances)
+        self._fragments = cache.get_many(list(self._fragment_keys.values()))
+        self._new_fragments = {}
+
+    def flush_fragments(self):
+        if getattr(self, '_new_fragments', None):
+            cache.set_many(self._new_fragments, LONG_TTL)
+        self._fragment_keys = self._fragments = self._new_fragments = None
+
+    def to_representation(self, instance):
+        primed = getattr(self, '_fragment_keys', None)
+        if primed and instance.pk in primed:
+            key = primed[instance.pk]
+            data = self._fragments.get(key)
+            if data is None:
+                data = self._new_fragments[key] = super().to_representation(instance)
+            return data
+
+        key = self.get_fragment_keys([instance])[instance.pk]
+        data = cache.get(key)
+        if data is None:
+            data = super().to_representation(instance)
+            cache.set(key, data, LONG_TTL)
+        return data
+
+
+class FragmentListSerializer(serializers.ListSerializer):
+    """
+    Batch the fragment lookups of a list: either the children are products
+    themselves, or they nest a single product (recommendations, collection
+    items, recently viewed) whose fragments are primed for the whole list.
+    """
+
+    def get_fragment_targets(self, instances):
+        if isinstance(self.child, ProductFragmentMixin):
+            return [(self.child, instances)]
+
+        targets = []
+        for field in self.child.fields.values():
+            if isinstance(field, ProductFragmentMixin) and field.source != '*':
+                related = [field.get_attribute(obj) for obj in instances]
+                targets.append((field, [obj for obj in related if obj is not None]))
+        return targets
+
+    def to_representation(self, data):
+        iterable = data.all() if isinstance(data, models.manager.BaseManager) else data
+        instances = list(iterable)
+
+        targets = self.get_fragment_targets(instances)
+        for serializer, objs in targets:
+            serializer.prime_fragments(objs)
+        try:
+            return [self.child.to_representation(item) for item in instances]
+        finally:
+            for serializer, _ in targets:
+                serializer.flush_fragments()
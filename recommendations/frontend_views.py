@@ -4,12 +4,18 @@ from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.forms import UserCreationForm
 from django.urls import reverse_lazy
-from django.http import JsonResponse
+from django.http import Http404, JsonResponse
+from django.views.decorators.http import require_POST
 from django.contrib import messages
-from .models import Product, Category, Recommendation, Cart, CartItem, PersonalizedDiscount, UserSegment, UserSegmentMembership, UserProfile, Order
+from common import cart_service
+from .pagination import InvalidCursor, KeysetPaginator, RankedPaginator
+from .facets import CATEGORY
+from .search import facet_counts, search_results
+from .models import Product, Category, Recommendation, Cart, CartItem, PersonalizedDiscount, UserSegment, UserSegmentMembership, Order
 from django.contrib.auth.models import User
-from django.db.models import Q, Count
+from django.db.models import Count
 from django.utils import timezone
+import json
 
 class HomeView(TemplateView):
     template_name = 'home.html'
@@ -33,23 +39,58 @@ class ProductListView(ListView):
     context_object_name = 'products'
     paginate_by = 12
 
+    search_ids = None
+
     def get_queryset(self):
         queryset = Product.objects.all()
         category_id = self.request.GET.get('category')
         search = self.request.GET.get('search')
         
+        if search:
+            # Ranked ids from the search index; only the page shown is loaded
+            try:
+                category = int(category_id) if category_id else None
+            except ValueError:
+                category = None
+            self.search_ids, _ = search_results(search, category=category)
+            return queryset
         if category_id:
             queryset = queryset.filter(category_id=category_id)
-        if search:
-            queryset = queryset.filter(
-                Q(name__icontains=search) | 
-                Q(description__icontains=search)
-            )
-        return queryset.order_by('-created_at')
+        return queryset
+
+    def paginate_queryset(self, queryset, page_size):
+        if self.search_ids is not None:
+            paginator = RankedPaginator(self.search_ids, Product.objects.all(), page_size)
+        else:
+            # Keyset pages: no COUNT(*), and deep pages cost the same as the first
+            paginator = KeysetPaginator(queryset, ('-created_at', '-id'), page_size)
+        try:
+            page = paginator.page(self.request.GET.get('cursor'))
+        except InvalidCursor:
+            page = paginator.page()
+        return paginator, page, page.items, page.has_next or page.has_previous
+
+    def get_page_url(self, cursor):
+        params = self.request.GET.copy()
+        params.pop('page', None)
+        params['cursor'] = cursor
+        return '?' + params.urlencode()
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
+        # Category counts (subcategories included) for the current search
+        _, counts = facet_counts(self.request.GET.get('search'))
+        category_counts = counts.get(CATEGORY, {})
         context['categories'] = Category.objects.all()
+        for category in context['categories']:
+            category.product_count = category_counts.get(category.pk, 0)
+
+        page = context['page_obj']
+        if page is not None:
+            if page.previous_cursor:
+                context['previous_page_url'] = self.get_page_url(page.previous_cursor)
+            if page.next_cursor:
+                context['next_page_url'] = self.get_page_url(page.next_cursor)
         
         # Get selected category
         category_id = self.request.GET.get('category')
@@ -77,8 +118,9 @@ class CartView(LoginRequiredMixin, TemplateView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         cart, created = Cart.objects.get_or_create(user=self.request.user)
-        context['cart_items'] = cart.items.all()
-        context['total'] = sum(item.product.price * item.quantity for item in cart.items.all())
+        context['cart'] = cart
+        context['cart_items'] = cart.items.select_related('product')
+        context['total'] = cart.subtotal
         return context
 
 class DiscountListView(ListView):
@@ -88,22 +130,18 @@ class DiscountListView(ListView):
     def get_queryset(self):
         return Product.objects.filter(discount__gt=0).order_by('-discount')
 
-class ProfileView(LoginRequiredMixin, DetailView):
-    model = UserProfile
+class ProfileView(LoginRequiredMixin, TemplateView):
     template_name = 'profile.html'
-    context_object_name = 'profile'
-    
-    def get_object(self):
-        return self.request.user.userprofile
 
 class ProfileUpdateView(LoginRequiredMixin, UpdateView):
-    model = UserProfile
+    # This app has no profile model, so the account itself is edited
+    model = User
     template_name = 'profile_edit.html'
-    fields = ['avatar', 'bio', 'phone_number', 'address']
+    fields = ['first_name', 'last_name', 'email']
     success_url = reverse_lazy('profile')
     
     def get_object(self):
-        return self.request.user.userprofile
+        return self.request.user
 
 class OrderListView(LoginRequiredMixin, ListView):
     model = Order
@@ -123,51 +161,63 @@ class RegisterView(CreateView):
         messages.success(self.request, 'Account created successfully! Please login.')
         return response
 
+def _cart_json(cart, **extra):
+    return JsonResponse({
+        'cart_total': float(cart.subtotal),
+        'cart_items': cart.item_count,
+        **extra
+    })
+
 @login_required
+@require_POST
 def add_to_cart(request, product_id):
-    product = get_object_or_404(Product, id=product_id)
-    cart_item, created = CartItem.objects.get_or_create(
-        user=request.user,
-        product=product,
-        defaults={'quantity': 1}
-    )
-    if not created:
-        cart_item.quantity += 1
-        cart_item.save()
+    try:
+        quantity = int(request.POST.get('quantity', 1))
+    except ValueError:
+        return JsonResponse({'error': 'Invalid quantity'}, status=400)
+    
+    cart = Cart.objects.filter(user=request.user).order_by('pk').first()
+    if cart is None:
+        cart = Cart.objects.create(user=request.user)
+    try:
+        cart_service.add_item(cart, product_id, quantity, limit_to_stock=True)
+    except Product.DoesNotExist:
+        raise Http404('Product not found')
+    except cart_service.CartError as e:
+        return JsonResponse({'error': str(e)}, status=400)
     
-    messages.success(request, f'{product.name} added to cart!')
-    return JsonResponse({'status': 'success'})
+    messages.success(request, 'Product added to cart!')
+    return _cart_json(cart, status='success')
 
 @login_required
+@require_POST
 def remove_from_cart(request, cart_item_id):
-    cart_item = get_object_or_404(CartItem, id=cart_item_id, user=request.user)
-    cart = cart_item.cart
-    cart_item.delete()
-    
-    return JsonResponse({
-        'cart_total': float(cart.get_total()),
-        'cart_items': cart.get_items_count()
-    })
+    cart = get_object_or_404(Cart, items=cart_item_id, user=request.user)
+    try:
+        cart_service.remove_item(cart, item_id=cart_item_id)
+    except CartItem.DoesNotExist:
+        raise Http404('Item not found')
+    return _cart_json(cart)
 
 @login_required
+@require_POST
 def update_cart_quantity(request, cart_item_id):
-    cart_item = get_object_or_404(CartItem, id=cart_item_id, user=request.user)
     try:
         data = json.loads(request.body)
         quantity = int(data.get('quantity', 1))
-        if quantity < 1:
-            return JsonResponse({'error': 'Quantity must be at least 1'})
-        
-        cart_item.quantity = quantity
-        cart_item.save()
-        
-        cart = cart_item.cart
-        return JsonResponse({
-            'cart_total': float(cart.get_total()),
-            'cart_items': cart.get_items_count()
-        })
-    except (ValueError, json.JSONDecodeError):
+    except (ValueError, TypeError, json.JSONDecodeError):
         return JsonResponse({'error': 'Invalid quantity'}, status=400)
+    if quantity < 1:
+        return JsonResponse({'error': 'Quantity must be at least 1'}, status=400)
+    
+    cart = get_object_or_404(Cart, items=cart_item_id, user=request.user)
+    try:
+        line = cart_service.set_quantity(cart, quantity, item_id=cart_item_id, limit_to_stock=True)
+    except CartItem.DoesNotExist:
+        raise Http404('Item not found')
+    except cart_service.CartError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    return _cart_json(cart, item_total=float(line.total))
 
 @login_required
 def checkout(request):
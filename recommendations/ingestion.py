@@ -0,0 +1,124 @@
+"""
+Batched ingestion of client interaction events.
+
+Events are validated in Python, products are checked with a single query,
+and every valid event is inserted with one ``bulk_create`` inside a single
+transaction.  Each event gets its own status so clients can retry only the
+ones that failed.
+"""
+from datetime import datetime
+
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from . import basket_matrix, event_log
+from .cache_versions import bump_user
+from .models import Product, UserInteraction
+
+INTERACTION_TYPES = frozenset(value for value, _ in UserInteraction.INTERACTION_TYPES)
+BULK_CREATE_BATCH_SIZE = 1000
+
+
+class InvalidEvent(Exception):
+    def __init__(self, errors):
+        super().__init__(errors)
+        self.errors = errors
+
+
+def _parse_timestamp(value):
+    if value is None or value == '':
+        return None
+    parsed = parse_datetime(value) if isinstance(value, str) else None
+    if not isinstance(parsed, datetime):
+        raise ValueError
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def parse_event(event):
+    """Return ``(product_id, interaction_type, client_timestamp)`` for one event"""
+    if not isinstance(event, dict):
+        raise InvalidEvent({'non_field_errors': ['Expected an object.']})
+
+    errors = {}
+    product_id = event.get('product')
+    if isinstance(product_id, bool) or not isinstance(product_id, (int, str)):
+        errors['product'] = ['A valid integer is required.']
+    else:
+        try:
+            product_id = int(product_id)
+        except ValueError:
+            errors['product'] = ['A valid integer is required.']
+
+    interaction_type = event.get('interaction_type')
+    if interaction_type not in INTERACTION_TYPES:
+        errors['interaction_type'] = [f'"{interaction_type}" is not a valid choice.']
+
+    try:
+        client_timestamp = _parse_timestamp(event.get('timestamp'))
+    except (TypeError, ValueError):
+        errors['timestamp'] = ['Datetime has wrong format. Use ISO 8601.']
+
+    if errors:
+        raise InvalidEvent(errors)
+    return product_id, interaction_type, client_timestamp
+
+
+def ingest_interactions(user, events):
+    """
+    Store a batch of ``{"product", "interaction_type", "timestamp"}`` events
+    for ``user`` and return one status dict per event, in order.
+    """
+    results = [None] * len(events)
+    valid = []
+    for index, event in enumerate(events):
+        try:
+            valid.append((index,) + parse_event(event))
+        except InvalidEvent as e:
+            results[index] = {'index': index, 'status': 'error', 'errors': e.errors}
+
+    existing = set(
+        Product.objects.filter(pk__in={product_id for _, product_id, _, _ in valid})
+        .values_list('pk', flat=True)
+    ) if valid else set()
+
+    interactions = []
+    for index, product_id, interaction_type, client_timestamp in valid:
+        if product_id not in existing:
+            results[index] = {
+                'index': index,
+                'status': 'error',
+                'errors': {'product': [f'Invalid pk "{product_id}" - object does not exist.']},
+            }
+            continue
+        interactions.append((index, UserInteraction(
+            user=user,
+            product_id=product_id,
+            interaction_type=interaction_type,
+            client_timestamp=client_timestamp,
+        )))
+
+    if interactions:
+        with transaction.atomic():
+            UserInteraction.objects.bulk_create(
+                [interaction for _, interaction in interactions],
+                batch_size=BULK_CREATE_BATCH_SIZE
+            )
+            # bulk_create skips post_save, so do what the signals would have
+            event_log.record_events(
+                (user.pk, interaction.product_id, interaction.interaction_type, interaction.timestamp)
+                for _, interaction in interactions
+            )
+            purchased = [
+                interaction.product_id for _, interaction in interactions
+                if interaction.interaction_type == 'purchase'
+            ]
+            if purchased:
+                transaction.on_commit(lambda: basket_matrix.record_items(user.pk, purchased))
+        bump_user(user.pk)
+
+    for index, interaction in interactions:
+        results[index] = {'index': index, 'status': 'created', 'id': interaction.pk}
+    return results
@@ -0,0 +1,103 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+from recommendations import event_log, event_queue
+
+class Command(BaseCommand):
+    help = 'Process queued interaction events with the registered handlers'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--consumer',
+            default=event_queue.DEFAULT_CONSUMER,
+            help='Consumer name; each name keeps its own offset'
+        )
+        parser.add_argument(
+            '--topic',
+            action='append',
+            dest='topics',
+            help='Only process the given topic (repeatable); use a separate --consumer'
+        )
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=1.0,
+            help='Seconds to wait when the queue is empty'
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Drain the queue and exit instead of polling'
+        )
+        parser.add_argument(
+            '--from-offset',
+            type=int,
+            help='Replay: move the consumer so this offset is processed next; events a handler already applied are skipped unless --reset-applied'
+        )
+        parser.add_argument(
+            '--reset-applied',
+            action='store_true',
+            help='With --from-offset: also apply events handlers have already applied; '
+                 'clear the rollups and log they rebuild first'
+        )
+        parser.add_argument(
+            '--lag',
+            action='store_true',
+            help='Print the consumer lag and exit'
+        )
+
+    def write_lag(self, queue, consumer, topics):
+        lag = queue.lag(consumer, topics)
+        age = lag['oldest_pending_age']
+        self.stdout.write(
+            f"{consumer}: committed={lag['committed']} head={lag['head']} "
+            f"pending={lag['pending']} oldest_pending_age="
+            f"{'-' if age is None else f'{age:.1f}s'}"
+        )
+
+    def handle(self, *args, **options):
+        queue = event_queue.get_queue()
+        consumer = options['consumer']
+
+        if options['lag']:
+            self.write_lag(queue, consumer, options['topics'])
+            return
+
+        if options['from_offset'] is not None:
+            if options['from_offset'] < 1:
+                raise CommandError('--from-offset must be a positive offset')
+            queue.seek(consumer, options['from_offset'])
+            if options['reset_applied']:
+                stages = event_log.reset_applied(queue.queue_id, options['from_offset'])
+                self.stdout.write(f"Reset {stages} applied offsets to {options['from_offset'] - 1}")
+            self.stdout.write(f"{consumer} will resume at offset {options['from_offset']}")
+        elif options['reset_applied']:
+            raise CommandError('--reset-applied needs --from-offset')
+
+        processed = 0
+        while True:
+            try:
+                count = queue.consume(consumer, options['batch_size'], options['topics'])
+            except Exception as e:
+                # The batch stays uncommitted and is delivered again
+                if options['once']:
+                    raise CommandError(f'Handler failed: {e}') from e
+                self.stderr.write(f'Handler failed, retrying: {e}')
+                time.sleep(options['poll_interval'])
+                continue
+            finally:
+                close_old_connections()
+
+            processed += count
+            if count:
+                continue
+            if options['once']:
+                break
+            queue.trim()
+            time.sleep(options['poll_interval'])
+
+        queue.trim()
+        self.write_lag(queue, consumer, options['topics'])
+        self.stdout.write(self.style.SUCCESS(f'Processed {processed} events'))
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from recommendations import event_log
+
+class Command(BaseCommand):
+    help = 'Drop expired interaction log partitions and rollup buckets'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report what would be removed without deleting anything'
+        )
+
+    def handle(self, *args, **options):
+        partitions, hourly, daily = event_log.prune(dry_run=options['dry_run'])
+        verb = 'Would remove' if options['dry_run'] else 'Removed'
+        self.stdout.write(self.style.SUCCESS(
+            f'{verb} {partitions} log partitions, {hourly} hourly and {daily} daily rollup rows'
+        ))
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand, CommandError
+from recommendations import event_log
+
+class Command(BaseCommand):
+    help = 'Recount interaction rollups from the monthly event log partitions'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--month',
+            action='append',
+            dest='months',
+            help='Only rebuild the given YYYY-MM partition (repeatable)'
+        )
+        parser.add_argument(
+            '--backfill',
+            action='store_true',
+            help='First log UserInteraction rows recorded before the event log existed'
+        )
+
+    def handle(self, *args, **options):
+        if options['backfill']:
+            written = event_log.backfill_from_interactions()
+            self.stdout.write(f'Backfilled {written} events from UserInteraction')
+
+        paths = event_log.partitions()
+        if options['months']:
+            wanted = {f'{event_log.PARTITION_PREFIX}{month}{event_log.PARTITION_SUFFIX}' for month in options['months']}
+            paths = [path for path in paths if path.name in wanted]
+            missing = wanted - {path.name for path in paths}
+            if missing:
+                raise CommandError(f'No log partition for: {", ".join(sorted(missing))}')
+
+        for path in paths:
+            total = event_log.rebuild_partition(path)
+            self.stdout.write(f'{path.name}: {total} events')
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt rollups from {len(paths)} partitions'))
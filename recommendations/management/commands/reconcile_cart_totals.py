@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from common.cart_totals import reconcile_cart_totals
+from recommendations.models import Cart
+
+class Command(BaseCommand):
+    help = 'Recompute denormalized cart item counts and subtotals'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--cart',
+            type=int,
+            action='append',
+            dest='cart_ids',
+            help='Only reconcile the given cart id (repeatable)'
+        )
+
+    def handle(self, *args, **options):
+        queryset = Cart.objects.all()
+        if options['cart_ids']:
+            queryset = queryset.filter(pk__in=options['cart_ids'])
+
+        updated = reconcile_cart_totals(queryset)
+        self.stdout.write(self.style.SUCCESS(f'Reconciled totals for {updated} carts'))
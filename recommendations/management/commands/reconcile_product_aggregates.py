@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from recommendations.aggregates import reconcile_product_aggregates
+from recommendations.models import Product
+
+class Command(BaseCommand):
+    help = 'Recompute denormalized product rating and view counters'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--product',
+            type=int,
+            action='append',
+            dest='product_ids',
+            help='Only reconcile the given product id (repeatable)'
+        )
+
+    def handle(self, *args, **options):
+        queryset = Product.objects.all()
+        if options['product_ids']:
+            queryset = queryset.filter(pk__in=options['product_ids'])
+
+        updated = reconcile_product_aggregates(queryset)
+        self.stdout.write(self.style.SUCCESS(f'Reconciled aggregates for {updated} products'))
@@ -0,0 +1,65 @@
+from django.db import migrations, models
+from django.db.models import Avg, Count, Sum
+
+
+def populate_aggregates(apps, schema_editor):
+    Product = apps.get_model("recommendations", "Product")
+    ProductRating = apps.get_model("recommendations", "ProductRating")
+    ProductView = apps.get_model("recommendations", "ProductView")
+
+    ratings = {
+        row["product"]: row
+        for row in ProductRating.objects.values("product").annotate(
+            count=Count("id"), total=Sum("rating"), average=Avg("rating")
+        )
+    }
+    views = dict(
+        ProductView.objects.values("product")
+        .annotate(count=Count("id"))
+        .values_list("product", "count")
+    )
+
+    products = []
+    for product in Product.objects.all().only("id"):
+        rating = ratings.get(product.id)
+        product.rating_count = rating["count"] if rating else 0
+        product.rating_sum = rating["total"] if rating else 0
+        product.average_rating = rating["average"] if rating else None
+        product.total_views = views.get(product.id, 0)
+        products.append(product)
+
+    Product.objects.bulk_update(
+        products,
+        ["rating_count", "rating_sum", "average_rating", "total_views"],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("recommendations", "0010_product_featured"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="product",
+            name="rating_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="product",
+            name="rating_sum",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="product",
+            name="average_rating",
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="product",
+            name="total_views",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(populate_aggregates, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,24 @@
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("recommendations", "0011_product_rating_and_view_aggregates"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(fields=["created_at", "id"], name="recommendat_created_7d2725_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="productview",
+            index=models.Index(fields=["user", "last_viewed"], name="recommendat_user_id_b591f7_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="recommendation",
+            index=models.Index(fields=["user", "created_at"], name="recommendat_user_id_5442b4_idx"),
+        ),
+    ]
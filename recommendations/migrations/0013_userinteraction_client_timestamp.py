@@ -0,0 +1,15 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("recommendations", "0012_keyset_pagination_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="userinteraction",
+            name="client_timestamp",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,57 @@
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recommendations', '0013_userinteraction_client_timestamp'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductInteractionRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('interaction_type', models.CharField(choices=[('view', 'View'), ('cart', 'Add to Cart'), ('wishlist', 'Add to Wishlist'), ('purchase', 'Purchase')], max_length=10)),
+                ('granularity', models.CharField(choices=[('hour', 'Hourly'), ('day', 'Daily')], max_length=4)),
+                ('bucket', models.DateTimeField()),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='interaction_rollups', to='recommendations.product')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='UserInteractionRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('interaction_type', models.CharField(choices=[('view', 'View'), ('cart', 'Add to Cart'), ('wishlist', 'Add to Wishlist'), ('purchase', 'Purchase')], max_length=10)),
+                ('granularity', models.CharField(choices=[('hour', 'Hourly'), ('day', 'Daily')], max_length=4)),
+                ('bucket', models.DateTimeField()),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='user_interaction_rollups', to='recommendations.product')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='interaction_rollups', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='productinteractionrollup',
+            index=models.Index(fields=['granularity', 'bucket'], name='recommendat_granula_f4e328_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='productinteractionrollup',
+            unique_together={('product', 'interaction_type', 'granularity', 'bucket')},
+        ),
+        migrations.AddIndex(
+            model_name='userinteractionrollup',
+            index=models.Index(fields=['user', 'granularity', 'bucket'], name='recommendat_user_id_b13ef3_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userinteractionrollup',
+            index=models.Index(fields=['granularity', 'bucket'], name='recommendat_granula_d89521_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='userinteractionrollup',
+            unique_together={('user', 'product', 'interaction_type', 'granularity', 'bucket')},
+        ),
+    ]
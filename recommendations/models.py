@@ -32,8 +32,18 @@ class Product(models.Model):
     rating = models.DecimalField(max_digits=3, decimal_places=1, default=0.0)
     stock = models.IntegerField(default=0)
     featured = models.BooleanField(default=False)
+    # Denormalized from ProductRating/ProductView, kept in sync by signals
+    rating_count = models.PositiveIntegerField(default=0)
+    rating_sum = models.PositiveIntegerField(default=0)
+    average_rating = models.FloatField(null=True, blank=True)
+    total_views = models.PositiveIntegerField(default=0)
     created_at = models.DateTimeField(default=timezone.now)
     updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at', 'id']),
+        ]
     
     @property
     def original_price(self):
@@ -56,6 +66,8 @@ class UserInteraction(models.Model):
     product = models.ForeignKey(Product, on_delete=models.CASCADE)
     interaction_type = models.CharField(max_length=10, choices=INTERACTION_TYPES)
     timestamp = models.DateTimeField(auto_now_add=True)
+    # When the event happened on the client; batched events arrive late
+    client_timestamp = models.DateTimeField(null=True, blank=True)
     
     class Meta:
         indexes = [
@@ -63,6 +75,53 @@ class UserInteraction(models.Model):
             models.Index(fields=['timestamp']),
         ]
 
+class InteractionRollup(models.Model):
+    # Interaction counts per time bucket, maintained by recommendations.event_log
+    HOURLY = 'hour'
+    DAILY = 'day'
+    GRANULARITIES = (
+        (HOURLY, 'Hourly'),
+        (DAILY, 'Daily'),
+    )
+
+    interaction_type = models.CharField(max_length=10, choices=UserInteraction.INTERACTION_TYPES)
+    granularity = models.CharField(max_length=4, choices=GRANULARITIES)
+    bucket = models.DateTimeField()
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        abstract = True
+
+class ProductInteractionRollup(InteractionRollup):
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='interaction_rollups')
+
+    class Meta:
+        unique_together = ('product', 'interaction_type', 'granularity', 'bucket')
+        indexes = [
+            models.Index(fields=['granularity', 'bucket']),
+        ]
+
+class UserInteractionRollup(InteractionRollup):
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='interaction_rollups')
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='user_interaction_rollups')
+
+    class Meta:
+        unique_together = ('user', 'product', 'interaction_type', 'granularity', 'bucket')
+        indexes = [
+            models.Index(fields=['user', 'granularity', 'bucket']),
+            models.Index(fields=['granularity', 'bucket']),
+        ]
+
+class AppliedEventOffset(models.Model):
+    # Last event queue offset a consumer stage has applied, saved in the same
+    # transaction as its writes so redelivered events are skipped
+    name = models.CharField(max_length=100, unique=True)
+    offset = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} @ {self.offset}"
+
 class ProductSimilarity(models.Model):
     product_a = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='similarities_as_a')
     product_b = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='similarities_as_b')
@@ -99,6 +158,7 @@ class Recommendation(models.Model):
         indexes = [
             models.Index(fields=['user', 'recommendation_type', 'score']),
             models.Index(fields=['created_at']),
+            models.Index(fields=['user', 'created_at']),
         ]
 
 class ProductRating(models.Model):
@@ -133,6 +193,7 @@ class ProductView(models.Model):
         indexes = [
             models.Index(fields=['product', 'view_count']),
             models.Index(fields=['last_viewed']),
+            models.Index(fields=['user', 'last_viewed']),
         ]
 
 class SearchHistory(models.Model):
@@ -195,13 +256,17 @@ class PriceAlert(models.Model):
         unique_together = ('user', 'product', 'alert_type')
 
 class RecentlyViewed(models.Model):
+    # Snapshot of the cached per-user ring in recommendations.recently_viewed
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     product = models.ForeignKey(Product, on_delete=models.CASCADE)
-    viewed_at = models.DateTimeField(auto_now=True)
+    viewed_at = models.DateTimeField(default=timezone.now)
     
     class Meta:
         ordering = ['-viewed_at']
         unique_together = ('user', 'product')
+        indexes = [
+            models.Index(fields=['user', '-viewed_at']),
+        ]
 
 class SeasonalRecommendation(models.Model):
     SEASON_TYPES = (
@@ -429,14 +494,17 @@ class Discount(models.Model):
 
 class Cart(models.Model):
     user = models.ForeignKey('auth.User', on_delete=models.CASCADE)
+    # Denormalized from CartItem, kept in sync by signals
+    item_count = models.PositiveIntegerField(default=0)
+    subtotal = models.DecimalField(max_digits=12, decimal_places=2, default=0)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     def get_total(self):
-        return sum(item.get_total() for item in self.items.all())
+        return self.subtotal
     
     def get_items_count(self):
-        return sum(item.quantity for item in self.items.all())
+        return self.item_count
     
     def __str__(self):
         return f"Cart for {self.user.username}"
@@ -0,0 +1,326 @@
+"""
+Keyset (cursor) pagination.
+
+Pages are addressed by the ordering values of the last row seen rather than
+by an offset, so every page is a range scan on an index and deep pages cost
+the same as the first one.  No total count is computed.  Cursors are opaque
+base64 tokens; ordering always ends in ``id`` so positions are unique.  A
+cursor whose values don't fit the ordering fields is answered with a 404,
+like any other unknown cursor.
+
+API contract: the list endpoints that use ``KeysetPagination`` (products,
+recommendations, user interactions, product views and search history) used
+to return a bare JSON array of every row.  They now return one page as
+``{"next": <url|null>, "previous": <url|null>, "results": [...]}``, with no
+``count``; clients follow ``next`` for more rows and may pass
+``?page_size=`` (at most 1000).  Other list endpoints are unchanged.
+"""
+import base64
+import binascii
+import json
+from collections import OrderedDict
+from datetime import date, datetime, time
+from decimal import Decimal
+from uuid import UUID
+
+from django.core.exceptions import ValidationError
+from django.db.models import BooleanField, F, Q
+from rest_framework.exceptions import NotFound
+from rest_framework.filters import OrderingFilter
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def _encode_value(value):
+    if isinstance(value, (datetime, date, time)):
+        # Full precision: truncated microseconds would skip or repeat rows
+        return value.isoformat()
+    if isinstance(value, (Decimal, UUID)):
+        return str(value)
+    return value
+
+
+def encode_cursor(values, reverse=False):
+    payload = json.dumps({'v': [_encode_value(v) for v in values], 'r': int(reverse)})
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor):
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        values, reverse = payload['v'], bool(payload.get('r'))
+    except (TypeError, ValueError, KeyError, AttributeError, binascii.Error):
+        raise InvalidCursor(cursor)
+    if not isinstance(values, list):
+        raise InvalidCursor(cursor)
+    return values, reverse
+
+
+class KeysetPage:
+    def __init__(self, items, ordering, has_next, has_previous):
+        self.items = items
+        self.ordering = ordering
+        self.has_next = has_next
+        self.has_previous = has_previous
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+    def _position(self, obj):
+        return [getattr(obj, name) for name, _ in self.ordering]
+
+    @property
+    def next_cursor(self):
+        if not self.has_next or not self.items:
+            return None
+        return encode_cursor(self._position(self.items[-1]))
+
+    @property
+    def previous_cursor(self):
+        if not self.has_previous or not self.items:
+            return None
+        return encode_cursor(self._position(self.items[0]), reverse=True)
+
+
+class KeysetPaginator:
+    """
+    Paginate ``queryset`` by ``ordering`` (e.g. ``['-created_at', '-id']``).
+    Nullable fields sort their nulls last in both directions.
+    """
+
+    def __init__(self, queryset, ordering, page_size):
+        self.queryset = queryset
+        self.page_size = page_size
+
+        ordering = list(ordering)
+        if ordering[-1].lstrip('-') not in ('id', 'pk'):
+            ordering.append('-id' if ordering[0].startswith('-') else 'id')
+
+        opts = queryset.model._meta
+        self.fields = []
+        self.model_fields = []
+        for item in ordering:
+            name = item.lstrip('-')
+            field = opts.pk if name == 'pk' else opts.get_field(name)
+            self.fields.append((field.attname, item.startswith('-'), field.null))
+            self.model_fields.append(field)
+
+    @property
+    def ordering(self):
+        return [(name, descending) for name, descending, _ in self.fields]
+
+    def _parse_values(self, cursor, values):
+        """Convert cursor values with their fields; InvalidCursor if one doesn't fit"""
+        if len(values) != len(self.fields):
+            raise InvalidCursor(cursor)
+        parsed = []
+        for field, value in zip(self.model_fields, values):
+            if value is None:
+                if not field.null:
+                    raise InvalidCursor(cursor)
+                parsed.append(None)
+                continue
+            # JSON decodes to str/int/float/bool/list/dict; only scalars are
+            # positions, and bools only for boolean fields
+            if isinstance(value, (list, dict)) or (
+                isinstance(value, bool) and not isinstance(field, BooleanField)
+            ):
+                raise InvalidCursor(cursor)
+            try:
+                parsed.append(field.to_python(value))
+            except (ValidationError, TypeError, ValueError):
+                raise InvalidCursor(cursor)
+        return parsed
+
+    def _order_by(self, reverse):
+        expressions = []
+        for name, descending, nullable in self.fields:
+            if reverse:
+                descending = not descending
+            if not nullable:
+                expressions.append(f'-{name}' if descending else name)
+                continue
+            nulls = {'nulls_first': True} if reverse else {'nulls_last': True}
+            expressions.append(F(name).desc(**nulls) if descending else F(name).asc(**nulls))
+        return expressions
+
+    def _beyond(self, name, descending, nullable, value, reverse):
+        """Rows strictly past ``value`` on one field, in the paging direction"""
+        if value is None:
+            # Nulls sort last: moving forward nothing follows them, moving
+            # back every non-null row precedes them
+            return Q(**{f'{name}__isnull': False}) if reverse else None
+        lookup = 'lt' if descending != reverse else 'gt'
+        condition = Q(**{f'{name}__{lookup}': value})
+        if nullable and not reverse:
+            condition |= Q(**{f'{name}__isnull': True})
+        return condition
+
+    def _position_filter(self, values, reverse):
+        condition = Q()
+        equal = Q()
+        for (name, descending, nullable), value in zip(self.fields, values):
+            beyond = self._beyond(name, descending, nullable, value, reverse)
+            if beyond is not None:
+                condition |= equal & beyond
+            if value is None:
+                equal &= Q(**{f'{name}__isnull': True})
+            else:
+                equal &= Q(**{name: value})
+        return condition
+
+    def page(self, cursor=None):
+        values, reverse = None, False
+        if cursor:
+            values, reverse = decode_cursor(cursor)
+            values = self._parse_values(cursor, values)
+
+        queryset = self.queryset.order_by(*self._order_by(reverse))
+        if values is not None:
+            queryset = queryset.filter(self._position_filter(values, reverse))
+
+        items = list(queryset[:self.page_size + 1])
+        has_more = len(items) > self.page_size
+        items = items[:self.page_size]
+
+        if reverse:
+            items.reverse()
+            return KeysetPage(items, self.ordering, has_next=True, has_previous=has_more)
+        return KeysetPage(items, self.ordering, has_next=has_more, has_previous=values is not None)
+
+
+class RankedPage:
+    """A page of a precomputed ranking; cursors carry the offset"""
+
+    def __init__(self, items, offset, page_size, total):
+        self.items = items
+        self.offset = offset
+        self.page_size = page_size
+        self.has_next = offset + page_size < total
+        self.has_previous = offset > 0
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+    @property
+    def next_cursor(self):
+        return encode_cursor([self.offset + self.page_size]) if self.has_next else None
+
+    @property
+    def previous_cursor(self):
+        if not self.has_previous:
+            return None
+        return encode_cursor([max(self.offset - self.page_size, 0)], reverse=True)
+
+
+class RankedPaginator:
+    """
+    Paginate an ordered list of ids (e.g. search results), loading only the
+    requested page with ``queryset.in_bulk``.
+    """
+
+    def __init__(self, ids, queryset, page_size):
+        self.ids = ids
+        self.queryset = queryset
+        self.page_size = page_size
+
+    def page(self, cursor=None):
+        offset = 0
+        if cursor:
+            values, _ = decode_cursor(cursor)
+            if len(values) != 1 or type(values[0]) is not int or values[0] < 0:
+                raise InvalidCursor(cursor)
+            offset = values[0]
+
+        ids = self.ids[offset:offset + self.page_size]
+        found = self.queryset.in_bulk(ids)
+        items = [found[pk] for pk in ids if pk in found]
+        return RankedPage(items, offset, self.page_size, len(self.ids))
+
+
+class KeysetPagination(BasePagination):
+    """
+    DRF pagination over ``view.keyset_ordering`` (or a client ``?ordering=``
+    when the view uses ``OrderingFilter``), returning next/previous cursor
+    links and no count.  Ranked ids a filter leaves on ``view.search_ids``
+    are paged in that order instead.
+    """
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+    cursor_query_param = 'cursor'
+    ordering = ('-created_at', '-id')
+
+    def get_ordering(self, request, queryset, view):
+        for backend in getattr(view, 'filter_backends', ()):
+            if issubclass(backend, OrderingFilter):
+                ordering = backend().get_ordering(request, queryset, view)
+                if ordering and backend.ordering_param in request.query_params:
+                    return ordering
+        return getattr(view, 'keyset_ordering', self.ordering)
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        search_ids = getattr(view, 'search_ids', None)
+        if search_ids is not None:
+            # Ranked search results (see ProductSearchFilter) page by offset
+            paginator = RankedPaginator(search_ids, queryset, self.get_page_size(request))
+        else:
+            paginator = KeysetPaginator(
+                queryset, self.get_ordering(request, queryset, view), self.get_page_size(request)
+            )
+        try:
+            self.page = paginator.page(request.query_params.get(self.cursor_query_param))
+        except InvalidCursor:
+            raise NotFound('Invalid cursor')
+        return self.page.items
+
+    def _link(self, cursor):
+        if cursor is None:
+            return None
+        return replace_query_param(self.base_url, self.cursor_query_param, cursor)
+
+    def get_next_link(self):
+        return self._link(self.page.next_cursor)
+
+    def get_previous_link(self):
+        if self.page.has_previous and self.page.previous_cursor is None:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self._link(self.page.previous_cursor)
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
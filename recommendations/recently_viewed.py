@@ -0,0 +1,165 @@
+"""
+Per-user recently viewed products, kept as a capped ring in the cache.
+
+Each user's ring holds the last ``RECENTLY_VIEWED_LIMIT`` ``(product_id,
+viewed_at)`` pairs, newest first, under a single cache key.  Product views
+push onto it in the request; the view buffer snapshots the rings of users
+it flushes into ``RecentlyViewed``, which is only read back when a ring
+has been evicted.  Readers hydrate the ids with one ``in_bulk``.
+
+Pushes read, edit and write the ring under a short per-user lock taken with
+``cache.add`` (atomic on every backend), so concurrent views of one user
+don't overwrite each other; a push that can't get the lock is dropped
+rather than written unlocked.  Each push bumps the user's recently viewed
+cache version, not the user's own, so browsing doesn't invalidate the
+user's other cached data.
+"""
+import logging
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone as dt_timezone
+
+from django.core.cache import cache
+from django.utils import timezone
+
+from .cache_versions import LONG_TTL, bump_recently_viewed
+from .models import Product, RecentlyViewed
+
+logger = logging.getLogger(__name__)
+
+RECENTLY_VIEWED_LIMIT = 50
+KEY_PREFIX = 'recently_viewed'
+# A crashed holder's lock expires after LOCK_TIMEOUT seconds; waiters give
+# up after LOCK_WAIT seconds
+LOCK_TIMEOUT = 5
+LOCK_WAIT = 0.5
+LOCK_POLL = 0.005
+
+
+def _key(user_id):
+    return f'{KEY_PREFIX}:{user_id}'
+
+
+def _decode(entries):
+    return [(product_id, datetime.fromtimestamp(stamp, dt_timezone.utc)) for product_id, stamp in entries]
+
+
+class RingLocked(Exception):
+    pass
+
+
+@contextmanager
+def _ring_lock(key):
+    lock_key = f'{key}:lock'
+    deadline = time.monotonic() + LOCK_WAIT
+    while not cache.add(lock_key, 1, LOCK_TIMEOUT):
+        if time.monotonic() >= deadline:
+            raise RingLocked(key)
+        time.sleep(LOCK_POLL)
+    try:
+        yield
+    finally:
+        cache.delete(lock_key)
+
+
+def _load(user_id, limit=RECENTLY_VIEWED_LIMIT):
+    rows = RecentlyViewed.objects.filter(user_id=user_id).order_by(
+        '-viewed_at'
+    ).values_list('product_id', 'viewed_at')[:limit]
+    entries = [(product_id, viewed_at.timestamp()) for product_id, viewed_at in rows]
+    cache.set(_key(user_id), entries, LONG_TTL)
+    return entries
+
+
+def push(user_id, product_id, when=None):
+    """Move ``product_id`` to the front of the user's ring"""
+    try:
+        user_id, product_id = int(user_id), int(product_id)
+    except (TypeError, ValueError):
+        return
+    key = _key(user_id)
+    stamp = (when or timezone.now()).timestamp()
+    try:
+        with _ring_lock(key):
+            entries = cache.get(key)
+            if entries is None:
+                entries = _load(user_id)
+            entries = [(product_id, stamp)] + [entry for entry in entries if entry[0] != product_id]
+            cache.set(key, entries[:RECENTLY_VIEWED_LIMIT], LONG_TTL)
+    except RingLocked:
+        # Writing without the lock could drop another push's entry
+        logger.warning('Recently viewed ring of user %s is busy; dropped view of %s', user_id, product_id)
+        return
+    bump_recently_viewed(user_id)
+
+
+def get_entries(user_id, limit=RECENTLY_VIEWED_LIMIT):
+    """Return ``[(product_id, viewed_at)]`` newest first"""
+    entries = cache.get(_key(user_id))
+    if entries is None:
+        entries = _load(user_id)
+    return _decode(entries[:limit])
+
+
+def get_product_ids(user_id, limit=RECENTLY_VIEWED_LIMIT):
+    return [product_id for product_id, _ in get_entries(user_id, limit)]
+
+
+def get_recently_viewed(user_id, limit=RECENTLY_VIEWED_LIMIT, queryset=None):
+    """
+    Return unsaved ``RecentlyViewed`` instances with their products loaded
+    by one ``in_bulk``; products deleted since the view are skipped.
+    """
+    entries = get_entries(user_id, limit)
+    if queryset is None:
+        queryset = Product.objects.select_related('category')
+    product_ids = [product_id for product_id, _ in entries]
+    products = queryset.in_bulk(product_ids)
+    return [
+        RecentlyViewed(user_id=user_id, product=products[product_id], viewed_at=viewed_at)
+        for product_id, viewed_at in entries
+        if product_id in products
+    ]
+
+
+def snapshot(user_ids):
+    """
+    Write the cached rings of ``user_ids`` to ``RecentlyViewed`` and drop
+    rows that fell off them.  Users whose ring was evicted are skipped.
+    """
+    found = cache.get_many([_key(user_id) for user_id in user_ids])
+    rings = {
+        user_id: _decode(found[_key(user_id)])
+        for user_id in user_ids if _key(user_id) in found
+    }
+    if not rings:
+        return
+
+    product_ids = set(Product.objects.filter(
+        pk__in={product_id for ring in rings.values() for product_id, _ in ring}
+    ).values_list('pk', flat=True))
+    keep = {
+        (user_id, product_id)
+        for user_id, ring in rings.items() for product_id, _ in ring
+        if product_id in product_ids
+    }
+
+    RecentlyViewed.objects.bulk_create(
+        [
+            RecentlyViewed(user_id=user_id, product_id=product_id, viewed_at=viewed_at)
+            for user_id, ring in rings.items()
+            for product_id, viewed_at in ring
+            if product_id in product_ids
+        ],
+        update_conflicts=True,
+        unique_fields=['user', 'product'],
+        update_fields=['viewed_at']
+    )
+    stale = [
+        pk for pk, user_id, product_id in RecentlyViewed.objects.filter(
+            user_id__in=rings
+        ).values_list('pk', 'user_id', 'product_id')
+        if (user_id, product_id) not in keep
+    ]
+    if stale:
+        RecentlyViewed.objects.filter(pk__in=stale).delete()
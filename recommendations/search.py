@@ -0,0 +1,195 @@
+"""
+Product search over the in-process BM25 index.
+
+Products are indexed on name, description, tags, category and attributes;
+``mark_products_dirty`` (called from the model signals) queues them to be
+re-read, so every process picks up catalog edits incrementally.  Searches
+return ranked product ids, which callers hydrate or filter on.  The same
+index carries each product's facet values (see ``facets``) so facet counts
+for a result set need no ``GROUP BY`` queries.
+
+``search_results`` caches ranked ids and counts per normalized query, so
+popular searches (and the counts recorded in search history) skip the
+index entirely.
+"""
+import hashlib
+
+import numpy as np
+from django.core.cache import cache
+from rest_framework import filters
+from rest_framework.exceptions import ValidationError
+
+from .cache_versions import LONG_TTL, versioned_key
+from .facets import product_facets
+from .models import Category, Product
+from .search_index import LiveIndex, parse_query
+
+FIELD_WEIGHTS = {
+    'name': 3.0,
+    'tags': 2.0,
+    'category': 2.0,
+    'attributes': 1.0,
+    'description': 1.0,
+}
+# Id lists bound into SQL (``pk__in``) stay below database parameter limits;
+# re-ordering a search binds every match, so it is refused beyond this
+MAX_FILTER_RESULTS = 1000
+# Longer result lists are cached truncated, with their full count
+MAX_CACHED_RESULTS = 5000
+
+
+def _load_products(ids):
+    queryset = Product.objects.select_related('category').prefetch_related('tags', 'attributes')
+    if ids is not None:
+        queryset = queryset.filter(pk__in=ids)
+    parents = dict(Category.objects.values_list('pk', 'parent_id'))
+    for product in queryset.iterator(chunk_size=2000):
+        fields = {
+            'name': product.name,
+            'description': product.description,
+            'category': product.category.name,
+            'tags': ' '.join(tag.name for tag in product.tags.all()),
+            'attributes': ' '.join(
+                f'{attribute.name} {attribute.value}' for attribute in product.attributes.all()
+            ),
+        }
+        meta = {
+            'category': product.category_id,
+            'price': float(product.price),
+            'stock': product.stock,
+            'facets': product_facets(
+                product.category_id, product.price, product.stock, parents,
+                tag_ids=[tag.pk for tag in product.tags.all()],
+                average_rating=product.average_rating,
+            ),
+        }
+        yield product.pk, fields, meta
+
+
+_live_index = LiveIndex('products', FIELD_WEIGHTS, _load_products)
+
+
+def get_index():
+    return _live_index.get()
+
+
+def mark_products_dirty(*product_ids):
+    _live_index.mark_dirty(*product_ids)
+
+
+def mark_all_products_dirty():
+    _live_index.mark_all_dirty()
+
+
+def _filter(category=None, min_price=None, max_price=None, in_stock=None):
+    categories = None
+    if category not in (None, ''):
+        categories = {int(c) for c in category} if isinstance(category, (list, tuple, set)) else {int(category)}
+
+    if categories is None and min_price is None and max_price is None and in_stock is None:
+        return None
+
+    def accept(meta):
+        if categories is not None and meta['category'] not in categories:
+            return False
+        if min_price is not None and meta['price'] < min_price:
+            return False
+        if max_price is not None and meta['price'] > max_price:
+            return False
+        if in_stock is not None and (meta['stock'] > 0) != in_stock:
+            return False
+        return True
+    return accept
+
+
+def search_product_ids(query, limit=None, facets=None, **filters):
+    """
+    Return ids of products matching every word of ``query`` (the last one
+    as a prefix), best match first.  Filters: ``category`` (id or ids),
+    ``min_price``, ``max_price``, ``in_stock``; ``facets`` takes facet
+    selections (``{facet: values}``).
+    """
+    index = get_index()
+    within = index.facet_ids(facets) if facets else None
+    return index.search(query, filter_func=_filter(**filters), limit=limit, within=within)
+
+
+def _normalize(value):
+    if isinstance(value, (list, tuple, set)):
+        return sorted(_normalize(v) for v in value)
+    if isinstance(value, dict):
+        return sorted((k, _normalize(v)) for k, v in value.items())
+    return value
+
+
+def _results_key(query, facets, filters):
+    # Word order doesn't change an AND match; prefix flags do
+    terms = sorted(set(parse_query(query)))
+    normalized = repr((terms, _normalize(facets or {}), _normalize({
+        name: value for name, value in filters.items() if value not in (None, '')
+    })))
+    digest = hashlib.md5(normalized.encode()).hexdigest()
+    # The catalog version covers edits; the index position covers edits
+    # whose index update had not committed when the version was bumped
+    return versioned_key(f'search_results:{digest}:{_live_index.seq}', catalog=True)
+
+
+def search_results(query, limit=None, facets=None, **filters):
+    """
+    Cached ``search_product_ids``: returns ``(ids, count)`` where ``count``
+    is the number of matches regardless of ``limit``.
+    """
+    get_index()
+    key = _results_key(query, facets, filters)
+    cached = cache.get(key)
+    if cached is not None:
+        ids, count = cached
+        if len(ids) == count or (limit is not None and limit <= len(ids)):
+            return ids[:limit], count
+
+    ids = search_product_ids(query, facets=facets, **filters)
+    cache.set(key, (ids[:MAX_CACHED_RESULTS], len(ids)), LONG_TTL)
+    return ids[:limit], len(ids)
+
+
+def facet_counts(query=None, facets=None):
+    """
+    Return ``(total, {facet: {value: count}})`` for the products matching
+    ``query`` and the ``facets`` selections (all products when neither is
+    given).
+    """
+    index = get_index()
+    ids = index.facet_ids(facets) if facets else None
+    if query:
+        matched, _ = index.match(query)
+        ids = matched if ids is None else np.intersect1d(matched, ids, assume_unique=True)
+    total = len(index) if ids is None else len(ids)
+    return total, index.facet_counts(ids)
+
+
+class ProductSearchFilter(filters.SearchFilter):
+    """
+    ``?search=`` backed by the index instead of ``icontains`` joins.
+
+    Without ``?ordering=`` the ranked ids are left on ``view.search_ids``
+    for the paginator, which loads one page at a time in rank order, so
+    every match is reachable.  With an ordering the matches are filtered
+    in SQL, which is only done for up to ``MAX_FILTER_RESULTS`` of them.
+    """
+    ordering_param = filters.OrderingFilter.ordering_param
+
+    def filter_queryset(self, request, queryset, view):
+        query = ' '.join(self.get_search_terms(request))
+        if not query:
+            return queryset
+        if self.ordering_param not in request.query_params:
+            view.search_ids, _ = search_results(query)
+            return queryset
+        ids, count = search_results(query, limit=MAX_FILTER_RESULTS + 1)
+        if count > MAX_FILTER_RESULTS:
+            raise ValidationError({self.ordering_param: [
+                f'The search matches {count} products; only up to '
+                f'{MAX_FILTER_RESULTS} can be re-ordered. Refine the search '
+                f'or drop the ordering to page through them by relevance.'
+            ]})
+        return queryset.filter(pk__in=ids)
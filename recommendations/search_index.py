@@ -0,0 +1,465 @@
+"""
+In-process inverted index with BM25 ranking.
+
+Documents are products described by weighted text fields plus a few filter
+values.  Each token maps to the products containing it with their weighted
+term frequencies; postings are compiled to sorted NumPy arrays on first use,
+so a query is a handful of vectorised unions and intersections and its cost
+depends on the matching postings rather than on catalog size.
+
+``LiveIndex`` keeps one index per process in sync with the database: writers
+call ``mark_dirty`` (usually from model signals), which appends product ids
+to a change log in the shared cache, and readers replay new log entries
+before searching.  Only when the log has gaps (eviction, too many changes)
+is the index rebuilt from scratch, in the background while the old index
+keeps serving; only a process's first index is built in the request.
+
+Documents can also carry facet values (``meta['facets']``, mapping a facet
+name to the values the document has).  They are kept as two parallel
+arrays, one row per document and value, so counting every facet value over
+a result set is a single masked ``bincount``.
+
+Nothing here imports models, so both the API app and the storefront can
+build an index over their own ``Product``.
+"""
+import bisect
+import re
+import threading
+import time
+from collections import Counter
+
+import numpy as np
+from django.core.cache import cache
+from django.db import transaction
+
+from .background import BackgroundBuilt
+
+K1 = 1.2
+B = 0.75
+MAX_PREFIX_EXPANSIONS = 50
+MAX_INCREMENTAL_CHANGES = 1000
+# Change log entries outlive the widest gap an index replays; an index
+# further behind than this rebuilds anyway
+CHANGE_LOG_TTL = 60 * 60 * 24
+MIN_FACET_CAPACITY = 1024
+
+_TOKEN_RE = re.compile(r'\w+')
+
+
+def tokenize(text):
+    return _TOKEN_RE.findall((text or '').lower())
+
+
+def parse_query(query):
+    """
+    Split a query into ``(token, is_prefix)`` terms.  The last word is a
+    prefix (so partially typed queries match) as is any word ending in ``*``.
+    """
+    words = (query or '').lower().split()
+    terms = []
+    for position, word in enumerate(words):
+        prefix = word.endswith('*') or position == len(words) - 1
+        for token in tokenize(word):
+            terms.append((token, False))
+        if prefix and terms:
+            terms[-1] = (terms[-1][0], True)
+    return terms
+
+
+class SearchIndex:
+    def __init__(self, field_weights):
+        self.field_weights = dict(field_weights)
+        self._postings = {}
+        self._terms = []
+        self._doc_terms = {}
+        self._doc_length = {}
+        self._meta = {}
+        self._total_length = 0.0
+        self._compiled = {}
+        # Facet rows: document id and value code per row; removed documents
+        # leave rows with code -1 until the arrays are compacted
+        self._facet_values = []
+        self._facet_codes_by_value = {}
+        self._facet_docs = np.empty(0, dtype=np.int64)
+        self._facet_codes = np.empty(0, dtype=np.int32)
+        self._facet_size = 0
+        self._facet_dead = 0
+        self._facet_rows = {}
+        self.lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._doc_terms)
+
+    def __contains__(self, doc_id):
+        return doc_id in self._doc_terms
+
+    @property
+    def average_length(self):
+        return self._total_length / len(self._doc_terms) if self._doc_terms else 0.0
+
+    def _weighted_terms(self, fields):
+        frequencies = Counter()
+        for field, text in fields.items():
+            weight = self.field_weights.get(field, 1.0)
+            for token in tokenize(text):
+                frequencies[token] += weight
+        return frequencies
+
+    def add(self, doc_id, fields, meta=None):
+        """
+        Index (or re-index) ``doc_id``; ``fields`` maps field names to text.
+        ``meta['facets']``, if present, maps facet names to iterables of values.
+        """
+        meta = dict(meta or {})
+        facets = meta.pop('facets', None)
+        with self.lock:
+            self.remove(doc_id)
+            if facets:
+                self._add_facets(doc_id, facets)
+            frequencies = self._weighted_terms(fields)
+            for token, frequency in frequencies.items():
+                postings = self._postings.get(token)
+                if postings is None:
+                    postings = self._postings[token] = {}
+                    bisect.insort(self._terms, token)
+                postings[doc_id] = frequency
+                self._compiled.pop(token, None)
+            length = float(sum(frequencies.values()))
+            self._doc_terms[doc_id] = tuple(frequencies)
+            self._doc_length[doc_id] = length
+            self._meta[doc_id] = meta
+            self._total_length += length
+
+    def remove(self, doc_id):
+        with self.lock:
+            tokens = self._doc_terms.pop(doc_id, None)
+            if tokens is None:
+                return
+            for token in tokens:
+                postings = self._postings[token]
+                del postings[doc_id]
+                self._compiled.pop(token, None)
+                if not postings:
+                    del self._postings[token]
+                    del self._terms[bisect.bisect_left(self._terms, token)]
+            self._total_length -= self._doc_length.pop(doc_id)
+            del self._meta[doc_id]
+            self._remove_facets(doc_id)
+
+    def _add_facets(self, doc_id, facets):
+        codes = []
+        for facet, values in facets.items():
+            for value in values:
+                code = self._facet_codes_by_value.get((facet, value))
+                if code is None:
+                    code = self._facet_codes_by_value[facet, value] = len(self._facet_values)
+                    self._facet_values.append((facet, value))
+                codes.append(code)
+        if not codes:
+            return
+        start = self._facet_size
+        end = start + len(codes)
+        if end > len(self._facet_docs):
+            self._resize_facets(max(end, 2 * len(self._facet_docs), MIN_FACET_CAPACITY))
+        self._facet_docs[start:end] = doc_id
+        self._facet_codes[start:end] = codes
+        self._facet_size = end
+        self._facet_rows[doc_id] = (start, end)
+
+    def _resize_facets(self, capacity):
+        docs = np.empty(capacity, dtype=np.int64)
+        codes = np.empty(capacity, dtype=np.int32)
+        docs[:self._facet_size] = self._facet_docs[:self._facet_size]
+        codes[:self._facet_size] = self._facet_codes[:self._facet_size]
+        self._facet_docs, self._facet_codes = docs, codes
+
+    def _remove_facets(self, doc_id):
+        rows = self._facet_rows.pop(doc_id, None)
+        if rows is None:
+            return
+        start, end = rows
+        self._facet_codes[start:end] = -1
+        self._facet_dead += end - start
+        if self._facet_dead * 2 > self._facet_size:
+            self._compact_facets()
+
+    def _compact_facets(self):
+        live = self._facet_codes[:self._facet_size] >= 0
+        docs = self._facet_docs[:self._facet_size][live]
+        codes = self._facet_codes[:self._facet_size][live]
+        # A document's rows stay contiguous, so its first row and row count
+        # give its new range
+        doc_ids, starts, counts = np.unique(docs, return_index=True, return_counts=True)
+        self._facet_rows = {
+            doc_id: (start, start + count)
+            for doc_id, start, count in zip(doc_ids.tolist(), starts.tolist(), counts.tolist())
+        }
+        self._facet_size = len(docs)
+        self._facet_dead = 0
+        capacity = max(2 * self._facet_size, MIN_FACET_CAPACITY)
+        self._facet_docs = np.empty(capacity, dtype=np.int64)
+        self._facet_codes = np.empty(capacity, dtype=np.int32)
+        self._facet_docs[:self._facet_size] = docs
+        self._facet_codes[:self._facet_size] = codes
+
+    def facet_counts(self, ids=None):
+        """
+        Count documents per facet value among ``ids`` (every document when
+        ``None``) in one pass; returns ``{facet: {value: count}}`` without
+        zero counts.
+        """
+        with self.lock:
+            docs = self._facet_docs[:self._facet_size]
+            codes = self._facet_codes[:self._facet_size]
+            mask = codes >= 0
+            if ids is not None:
+                ids = np.asarray(ids, dtype=np.int64)
+                if not len(ids) or not len(docs):
+                    return {}
+                member = np.zeros(max(int(docs.max()), int(ids.max())) + 1, dtype=bool)
+                member[ids] = True
+                mask &= member[docs]
+            counts = np.bincount(codes[mask], minlength=len(self._facet_values))
+            result = {}
+            for code in np.flatnonzero(counts).tolist():
+                facet, value = self._facet_values[code]
+                result.setdefault(facet, {})[value] = int(counts[code])
+            return result
+
+    def facet_ids(self, selections):
+        """
+        Return the sorted ids of documents having, for every facet in
+        ``selections`` (``{facet: values}``), at least one of its values.
+        """
+        with self.lock:
+            docs = self._facet_docs[:self._facet_size]
+            codes = self._facet_codes[:self._facet_size]
+            ids = None
+            for facet, values in selections.items():
+                wanted = [
+                    self._facet_codes_by_value[facet, value] for value in values
+                    if (facet, value) in self._facet_codes_by_value
+                ]
+                if not wanted:
+                    return np.empty(0, dtype=np.int64)
+                # Lookup tables instead of sorting: selected codes, then the
+                # documents of the matching rows
+                selected = np.zeros(len(self._facet_values) + 1, dtype=bool)
+                selected[wanted] = True
+                found = np.zeros(int(docs.max()) + 1, dtype=bool)
+                found[docs[selected[codes]]] = True
+                matched = np.flatnonzero(found)
+                ids = matched if ids is None else np.intersect1d(ids, matched, assume_unique=True)
+            if ids is None:
+                ids = np.sort(np.fromiter(self._doc_terms, dtype=np.int64, count=len(self._doc_terms)))
+            return ids
+
+    def meta(self, doc_id):
+        return self._meta.get(doc_id)
+
+    def expand(self, prefix, limit=MAX_PREFIX_EXPANSIONS):
+        """Indexed tokens starting with ``prefix``, most frequent first"""
+        start = bisect.bisect_left(self._terms, prefix)
+        matches = []
+        for token in self._terms[start:]:
+            if not token.startswith(prefix):
+                break
+            matches.append(token)
+        if len(matches) > limit:
+            matches.sort(key=lambda token: len(self._postings[token]), reverse=True)
+            matches = matches[:limit]
+        return matches
+
+    def _compile(self, token):
+        compiled = self._compiled.get(token)
+        if compiled is None:
+            postings = self._postings[token]
+            ids = np.fromiter(postings, dtype=np.int64, count=len(postings))
+            order = np.argsort(ids)
+            ids = ids[order]
+            frequencies = np.fromiter(postings.values(), dtype=np.float64, count=len(postings))[order]
+            lengths = np.fromiter(
+                (self._doc_length[doc_id] for doc_id in ids.tolist()),
+                dtype=np.float64, count=len(ids)
+            )
+            compiled = self._compiled[token] = (ids, frequencies, lengths)
+        return compiled
+
+    def _bm25(self, token):
+        ids, frequencies, lengths = self._compile(token)
+        n = len(self._doc_terms)
+        idf = np.log(1.0 + (n - len(ids) + 0.5) / (len(ids) + 0.5))
+        norm = K1 * (1.0 - B + B * lengths / (self.average_length or 1.0))
+        return ids, idf * frequencies * (K1 + 1.0) / (frequencies + norm)
+
+    def _match_term(self, token, is_prefix):
+        tokens = self.expand(token) if is_prefix else ([token] if token in self._postings else [])
+        if not tokens:
+            return None
+        if len(tokens) == 1:
+            return self._bm25(tokens[0])
+        scored = [self._bm25(t) for t in tokens]
+        ids, inverse = np.unique(np.concatenate([s[0] for s in scored]), return_inverse=True)
+        return ids, np.bincount(inverse, weights=np.concatenate([s[1] for s in scored]))
+
+    def match(self, query):
+        """
+        Return ``(ids, scores)`` arrays for documents matching every term of
+        ``query``, sorted by id.
+        """
+        terms = parse_query(query)
+        empty = (np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64))
+        if not terms:
+            return empty
+        with self.lock:
+            ids = scores = None
+            for token, is_prefix in terms:
+                matched = self._match_term(token, is_prefix)
+                if matched is None:
+                    return empty
+                if ids is None:
+                    ids, scores = matched
+                    continue
+                ids, left, right = np.intersect1d(ids, matched[0], assume_unique=True, return_indices=True)
+                scores = scores[left] + matched[1][right]
+                if not len(ids):
+                    return empty
+            return ids, scores
+
+    def search(self, query, filter_func=None, limit=None, within=None):
+        """
+        Return matching ids ranked by BM25 (ties newest id first).
+        ``filter_func(meta)`` drops documents whose metadata it rejects and
+        ``within`` (sorted ids, e.g. from ``facet_ids``) restricts the match.
+        """
+        ids, scores = self.match(query)
+        if within is not None and len(ids):
+            keep = np.isin(ids, within, assume_unique=True)
+            ids, scores = ids[keep], scores[keep]
+        if filter_func is not None and len(ids):
+            keep = np.fromiter(
+                (filter_func(self._meta[doc_id]) for doc_id in ids.tolist()),
+                dtype=bool, count=len(ids)
+            )
+            ids, scores = ids[keep], scores[keep]
+        order = np.lexsort((-ids, -scores))
+        if limit is not None:
+            order = order[:limit]
+        return ids[order].tolist()
+
+
+def _initial_seq():
+    # Never restart at a sequence number an index may already have seen
+    return int(time.time() * 1000)
+
+
+class LiveIndex:
+    """
+    A per-process ``SearchIndex`` kept current through a change log in the
+    cache.  ``load(ids)`` yields ``(doc_id, fields, meta)`` for the given
+    ids, or for every document when ``ids`` is ``None``.  Another index with
+    the same ``add``/``remove`` interface can be kept instead by passing
+    ``index_factory``.
+    """
+
+    def __init__(self, name, field_weights, load, index_factory=None):
+        self.name = name
+        self.field_weights = field_weights
+        self.load = load
+        self.index_factory = index_factory or (lambda: SearchIndex(self.field_weights))
+        self._index = None
+        self._seq = 0
+        self._lock = threading.Lock()
+        # Rebuilds are started explicitly when the change log can't be replayed
+        self._rebuilt = BackgroundBuilt(f'{name}-index', self._build, lambda built: False)
+        self._adopted = None
+
+    @property
+    def seq(self):
+        """Change log position the index has applied (after ``get``)"""
+        return self._seq
+
+    @property
+    def _seq_key(self):
+        return f'search_index:{self.name}:seq'
+
+    def _change_key(self, seq):
+        return f'search_index:{self.name}:change:{seq}'
+
+    def mark_dirty(self, *doc_ids):
+        """
+        Queue ``doc_ids`` to be re-read by every process's index once the
+        current transaction commits.
+        """
+        doc_ids = list(dict.fromkeys(doc_ids))
+        if doc_ids:
+            transaction.on_commit(lambda: self._log_changes(doc_ids))
+
+    def mark_all_dirty(self):
+        """Make every process rebuild its index once the transaction commits"""
+        transaction.on_commit(lambda: cache.set(self._seq_key, _initial_seq(), None))
+
+    def _log_changes(self, doc_ids):
+        try:
+            last = cache.incr(self._seq_key, len(doc_ids))
+        except ValueError:
+            # Counter evicted: restarting from the clock makes every index
+            # see a jump and rebuild
+            cache.set(self._seq_key, _initial_seq(), None)
+            return
+        first = last - len(doc_ids) + 1
+        cache.set_many({
+            self._change_key(first + i): doc_id for i, doc_id in enumerate(doc_ids)
+        }, CHANGE_LOG_TTL)
+
+    def _current_seq(self):
+        seq = cache.get(self._seq_key)
+        if seq is None:
+            cache.add(self._seq_key, _initial_seq(), None)
+            seq = cache.get(self._seq_key, 0)
+        return seq
+
+    def _build(self):
+        # Changes logged while loading are replayed on top, which is harmless
+        seq = self._current_seq()
+        index = self.index_factory()
+        for doc_id, fields, meta in self.load(None):
+            index.add(doc_id, fields, meta)
+        return index, seq
+
+    def _replay(self, seq):
+        keys = [self._change_key(s) for s in range(self._seq + 1, seq + 1)]
+        changes = cache.get_many(keys)
+        if len(changes) != len(keys):
+            return False
+        dirty = set(changes.values())
+        found = set()
+        for doc_id, fields, meta in self.load(dirty):
+            self._index.add(doc_id, fields, meta)
+            found.add(doc_id)
+        for doc_id in dirty - found:
+            self._index.remove(doc_id)
+        self._seq = seq
+        return True
+
+    def get(self):
+        """
+        Return the index with every logged change applied, or the last one
+        built while a rebuild runs in the background.
+        """
+        seq = self._current_seq()
+        built = self._rebuilt.value
+        if self._index is not None and built is self._adopted and seq == self._seq:
+            return self._index
+
+        with self._lock:
+            built = self._rebuilt.value
+            if built is not self._adopted:
+                self._index, self._seq = self._adopted = built
+            if self._index is None:
+                self._index, self._seq = self._build()
+            if seq != self._seq and not (
+                self._seq < seq <= self._seq + MAX_INCREMENTAL_CHANGES and self._replay(seq)
+            ):
+                self._rebuilt.start()
+            return self._index
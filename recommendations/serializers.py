@@ -1,5 +1,7 @@
+from django.db.models import Count
 from rest_framework import serializers
-from django.db.models import Avg
+from .fieldsets import SparseFieldsetMixin
+from .fragments import FragmentListSerializer, ProductFragmentMixin
 from .models import (
     Product, Category, UserInteraction, Recommendation,
     ProductRating, ProductView, SearchHistory, ProductTag,
@@ -24,13 +26,14 @@ class ProductAttributeSerializer(serializers.ModelSerializer):
         model = ProductAttribute
         fields = ['id', 'name', 'value', 'attribute_type']
 
-class ProductRatingSerializer(serializers.ModelSerializer):
+class ProductRatingSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     username = serializers.CharField(source='user.username', read_only=True)
     
     class Meta:
         model = ProductRating
         fields = ['id', 'username', 'rating', 'review', 'created_at']
         read_only_fields = ['user']
+        select_related_fields = {'username': ['user']}
 
 class RecommendationExplanationSerializer(serializers.ModelSerializer):
     class Meta:
@@ -40,11 +43,9 @@ class RecommendationExplanationSerializer(serializers.ModelSerializer):
             'confidence_score', 'supporting_data', 'created_at'
         ]
 
-class ProductSerializer(serializers.ModelSerializer):
+class ProductSerializer(ProductFragmentMixin, SparseFieldsetMixin, serializers.ModelSerializer):
     category = CategorySerializer()
-    average_rating = serializers.SerializerMethodField()
     ratings = ProductRatingSerializer(many=True, read_only=True)
-    total_views = serializers.SerializerMethodField()
     tags = ProductTagSerializer(many=True, read_only=True)
     attributes = ProductAttributeSerializer(many=True, read_only=True)
     
@@ -52,24 +53,37 @@ class ProductSerializer(serializers.ModelSerializer):
         model = Product
         fields = [
             'id', 'name', 'description', 'price', 'category', 'image', 
-            'discount', 'rating', 'stock', 'average_rating', 'ratings', 
-            'total_views', 'tags', 'attributes', 'created_at', 'updated_at'
+            'discount', 'rating', 'stock', 'average_rating', 'rating_count',
+            'ratings', 'total_views', 'tags', 'attributes', 'created_at', 'updated_at'
         ]
+        # Maintained from ProductRating/ProductView writes
+        read_only_fields = ['average_rating', 'rating_count', 'total_views']
+        select_related_fields = {'category': ['category']}
+        prefetch_related_fields = {'tags': ['tags'], 'attributes': ['attributes']}
+        list_serializer_class = FragmentListSerializer
+
+class ProductCardSerializer(ProductFragmentMixin, SparseFieldsetMixin, serializers.ModelSerializer):
+    """Compact product representation, used with ?shape=card"""
+    category_name = serializers.CharField(source='category.name', read_only=True)
     
-    def get_average_rating(self, obj):
-        return obj.ratings.aggregate(Avg('rating'))['rating__avg']
-    
-    def get_total_views(self, obj):
-        return obj.views.count()
+    class Meta:
+        model = Product
+        fields = [
+            'id', 'name', 'price', 'discount', 'image', 'category_name',
+            'stock', 'average_rating', 'rating_count'
+        ]
+        read_only_fields = fields
+        select_related_fields = {'category_name': ['category']}
+        list_serializer_class = FragmentListSerializer
 
 class UserInteractionSerializer(serializers.ModelSerializer):
     class Meta:
         model = UserInteraction
-        fields = ['id', 'product', 'interaction_type', 'timestamp']
+        fields = ['id', 'product', 'interaction_type', 'timestamp', 'client_timestamp']
         read_only_fields = ['user', 'timestamp']
 
-class RecommendationSerializer(serializers.ModelSerializer):
-    product = ProductSerializer()
+class RecommendationSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    product = ProductSerializer(read_only=True)
     explanations = RecommendationExplanationSerializer(many=True, read_only=True)
     
     class Meta:
@@ -79,6 +93,9 @@ class RecommendationSerializer(serializers.ModelSerializer):
             'explanation', 'explanations', 'created_at'
         ]
         read_only_fields = ['user', 'created_at']
+        card_fields = {'product': (ProductCardSerializer, {'read_only': True})}
+        prefetch_related_fields = {'explanations': ['explanations']}
+        list_serializer_class = FragmentListSerializer
 
 class ProductViewSerializer(serializers.ModelSerializer):
     product_name = serializers.CharField(source='product.name', read_only=True)
@@ -114,15 +131,19 @@ class PriceAlertSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['user', 'created_at', 'last_notified']
 
-class RecentlyViewedSerializer(serializers.ModelSerializer):
-    product = ProductSerializer()
+class RecentlyViewedSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    product = ProductSerializer(read_only=True)
     
     class Meta:
         model = RecentlyViewed
-        fields = ['id', 'product', 'viewed_at']
+        # Entries come from the cache ring and have no row of their own;
+        # they are keyed by product.id
+        fields = ['product', 'viewed_at']
         read_only_fields = ['user', 'viewed_at']
+        card_fields = {'product': (ProductCardSerializer, {'read_only': True})}
+        list_serializer_class = FragmentListSerializer
 
-class SeasonalRecommendationSerializer(serializers.ModelSerializer):
+class SeasonalRecommendationSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     products = ProductSerializer(many=True, read_only=True)
     
     class Meta:
@@ -131,6 +152,7 @@ class SeasonalRecommendationSerializer(serializers.ModelSerializer):
             'id', 'name', 'season_type', 'products',
             'start_date', 'end_date', 'is_active', 'priority'
         ]
+        card_fields = {'products': (ProductCardSerializer, {'many': True, 'read_only': True})}
 
 class MLModelSerializer(serializers.ModelSerializer):
     class Meta:
@@ -168,7 +190,7 @@ class ABTestSerializer(serializers.ModelSerializer):
             'variants', 'created_at', 'updated_at'
         ]
 
-class UserSegmentSerializer(serializers.ModelSerializer):
+class UserSegmentSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     member_count = serializers.SerializerMethodField()
     
     class Meta:
@@ -177,8 +199,11 @@ class UserSegmentSerializer(serializers.ModelSerializer):
             'id', 'name', 'description', 'rules',
             'is_active', 'member_count', 'created_at', 'updated_at'
         ]
+        annotated_fields = {'member_count': Count('usersegmentmembership', distinct=True)}
     
     def get_member_count(self, obj):
+        if hasattr(obj, 'member_count'):
+            return obj.member_count
         return obj.usersegmentmembership_set.count()
 
 class UserSegmentMembershipSerializer(serializers.ModelSerializer):
@@ -192,14 +217,16 @@ class UserSegmentMembershipSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['user', 'joined_at', 'updated_at']
 
-class ProductCollectionItemSerializer(serializers.ModelSerializer):
-    product = ProductSerializer()
+class ProductCollectionItemSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    product = ProductSerializer(read_only=True)
     
     class Meta:
         model = ProductCollectionItem
         fields = ['id', 'product', 'position', 'added_at']
+        card_fields = {'product': (ProductCardSerializer, {'read_only': True})}
+        list_serializer_class = FragmentListSerializer
 
-class ProductCollectionSerializer(serializers.ModelSerializer):
+class ProductCollectionSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     items = ProductCollectionItemSerializer(
         source='productcollectionitem_set',
         many=True,
@@ -214,11 +241,14 @@ class ProductCollectionSerializer(serializers.ModelSerializer):
             'is_active', 'start_date', 'end_date', 'rules',
             'items', 'product_count', 'created_at', 'updated_at'
         ]
+        annotated_fields = {'product_count': Count('products', distinct=True)}
     
     def get_product_count(self, obj):
+        if hasattr(obj, 'product_count'):
+            return obj.product_count
         return obj.products.count()
 
-class PersonalizedDiscountSerializer(serializers.ModelSerializer):
+class PersonalizedDiscountSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     segments = UserSegmentSerializer(many=True, read_only=True)
     products = ProductSerializer(many=True, read_only=True)
     collections = ProductCollectionSerializer(many=True, read_only=True)
@@ -232,9 +262,11 @@ class PersonalizedDiscountSerializer(serializers.ModelSerializer):
             'max_uses', 'current_uses', 'is_active',
             'rules', 'created_at'
         ]
+        card_fields = {'products': (ProductCardSerializer, {'many': True, 'read_only': True})}
 
 class CartItemSerializer(serializers.ModelSerializer):
     product = ProductSerializer()
+    subtotal = serializers.DecimalField(source='get_total', max_digits=12, decimal_places=2, read_only=True)
     
     class Meta:
         model = CartItem
@@ -242,19 +274,23 @@ class CartItemSerializer(serializers.ModelSerializer):
 
 class CartSerializer(serializers.ModelSerializer):
     items = CartItemSerializer(many=True, read_only=True)
+    total_price = serializers.DecimalField(source='subtotal', max_digits=12, decimal_places=2, read_only=True)
     
     class Meta:
         model = Cart
-        fields = ['id', 'user', 'items', 'total_price', 'created_at', 'updated_at']
+        fields = ['id', 'user', 'items', 'item_count', 'subtotal', 'total_price', 'created_at', 'updated_at']
+        read_only_fields = ['item_count', 'subtotal']
 
 class UserPreferenceSerializer(serializers.ModelSerializer):
     class Meta:
         model = UserPreference
         fields = ['id', 'user', 'category', 'weight', 'last_interaction']
 
-class RecommendationSerializer(serializers.ModelSerializer):
-    product = ProductSerializer()
+class RecommendationSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    product = ProductSerializer(read_only=True)
     
     class Meta:
         model = Recommendation
         fields = ['id', 'user', 'product', 'score', 'explanation', 'created_at']
+        card_fields = {'product': (ProductCardSerializer, {'read_only': True})}
+        list_serializer_class = FragmentListSerializer
@@ -0,0 +1,261 @@
+from django.contrib.auth.models import User
+from django.db.models.signals import post_init, pre_save, post_save, pre_delete, post_delete, m2m_changed
+from django.db import transaction
+from django.dispatch import receiver
+
+from common import cart_service, cart_totals
+
+from . import aggregates, attribute_index, basket_matrix, event_log
+from .search import mark_products_dirty
+from .cache_versions import (
+    bump_catalog, bump_product, bump_product_stats, bump_product_views, bump_recommendations,
+    bump_user
+)
+from .models import (
+    Category, Product, ProductTag, ProductAttribute, SeasonalRecommendation,
+    ProductCollection, ProductCollectionItem, UserInteraction, ProductRating,
+    ProductView, RecentlyViewed, Cart, CartItem, UserPreference,
+    UserSegmentMembership, Recommendation
+)
+
+# Catalog-wide changes: anything that can alter similarity, listings or
+# seasonal picks for every user
+
+@receiver([post_save, post_delete], sender=Category)
+@receiver([post_save, post_delete], sender=SeasonalRecommendation)
+@receiver([post_save, post_delete], sender=ProductCollection)
+def invalidate_catalog(sender, instance, **kwargs):
+    bump_catalog()
+
+@receiver(post_save, sender=Category)
+def invalidate_category_products(sender, instance, **kwargs):
+    # Product payloads embed the category
+    bump_product(*instance.products.values_list('pk', flat=True))
+
+@receiver([post_save, post_delete], sender=Product)
+def invalidate_product(sender, instance, **kwargs):
+    bump_product(instance.pk)
+    bump_catalog()
+
+@receiver([post_save, post_delete], sender=ProductAttribute)
+@receiver([post_save, post_delete], sender=ProductCollectionItem)
+def invalidate_product_relation(sender, instance, **kwargs):
+    bump_product(instance.product_id)
+    bump_catalog()
+
+@receiver(post_save, sender=ProductTag)
+@receiver(pre_delete, sender=ProductTag)
+def invalidate_tag_products(sender, instance, **kwargs):
+    # Product payloads embed tag names; deleting a tag drops its links
+    # without m2m_changed, so its products are read before the delete
+    if instance.pk:
+        bump_product(*instance.products.values_list('pk', flat=True))
+    bump_catalog()
+
+@receiver(post_save, sender=User)
+def invalidate_rater_products(sender, instance, created, update_fields=None, **kwargs):
+    # Ratings in product payloads show the rater's username; logins only
+    # save last_login
+    if created or (update_fields is not None and 'username' not in update_fields):
+        return
+    rated = ProductRating.objects.filter(user=instance).values_list('product_id', flat=True)
+    product_ids = set(rated)
+    if product_ids:
+        bump_product(*product_ids)
+        bump_product_stats()
+
+@receiver(m2m_changed, sender=ProductTag.products.through)
+@receiver(m2m_changed, sender=SeasonalRecommendation.products.through)
+def invalidate_product_m2m(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if isinstance(instance, Product):
+        bump_product(instance.pk)
+    elif pk_set:
+        bump_product(*pk_set)
+    bump_catalog()
+
+# Search index: queue products whose indexed text or filters changed
+
+@receiver([post_save, post_delete], sender=Product)
+def reindex_product(sender, instance, **kwargs):
+    mark_products_dirty(instance.pk)
+
+@receiver(post_save, sender=Category)
+def reindex_category_products(sender, instance, **kwargs):
+    # Category facets include ancestors, so subcategories' products change too
+    category_ids = level = [instance.pk]
+    while level:
+        level = list(Category.objects.filter(parent__in=level).exclude(
+            pk__in=category_ids
+        ).values_list('pk', flat=True))
+        category_ids = category_ids + level
+    mark_products_dirty(*Product.objects.filter(
+        category__in=category_ids
+    ).values_list('pk', flat=True))
+
+@receiver([post_save, post_delete], sender=ProductAttribute)
+def reindex_attribute_product(sender, instance, **kwargs):
+    mark_products_dirty(instance.product_id)
+    attribute_index.mark_products_dirty(instance.product_id)
+
+@receiver(post_save, sender=ProductTag)
+@receiver(pre_delete, sender=ProductTag)
+def reindex_tag_products(sender, instance, **kwargs):
+    if instance.pk:
+        mark_products_dirty(*instance.products.values_list('pk', flat=True))
+
+@receiver([post_save, post_delete], sender=ProductRating)
+def reindex_rated_product(sender, instance, **kwargs):
+    # Rating bands are a facet; the aggregates are updated without signals
+    previous = getattr(instance, '_previous_rating', None)
+    if previous and previous[0] != instance.product_id:
+        mark_products_dirty(previous[0])
+    mark_products_dirty(instance.product_id)
+
+@receiver(m2m_changed, sender=ProductTag.products.through)
+def reindex_tagged_products(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    if isinstance(instance, Product):
+        mark_products_dirty(instance.pk)
+    elif action == 'pre_clear':
+        mark_products_dirty(*instance.products.values_list('pk', flat=True))
+    elif pk_set:
+        mark_products_dirty(*pk_set)
+
+# Per-user interaction data: only that user's derived data goes stale, plus
+# the product payload when its ratings or aggregates change
+
+@receiver([post_save, post_delete], sender=UserInteraction)
+@receiver([post_save, post_delete], sender=RecentlyViewed)
+@receiver([post_save, post_delete], sender=UserSegmentMembership)
+def invalidate_user(sender, instance, **kwargs):
+    bump_user(instance.user_id)
+
+@receiver([post_save, post_delete], sender=Recommendation)
+def invalidate_recommendations(sender, instance, **kwargs):
+    # Engines store their output on every call; that must not invalidate
+    # the preferences and candidates cached under the user's version
+    bump_recommendations(instance.user_id)
+
+@receiver([post_save, post_delete], sender=ProductRating)
+def invalidate_user_and_product(sender, instance, **kwargs):
+    bump_user(instance.user_id)
+    bump_product(instance.product_id)
+    bump_product_stats(instance.product_id)
+
+@receiver([post_save, post_delete], sender=ProductView)
+def invalidate_product_views(sender, instance, **kwargs):
+    # Only the view counters change; similarity and the user's data don't
+    bump_product_views(instance.product_id)
+
+@receiver([post_save, post_delete], sender=UserPreference)
+@receiver([post_save, post_delete], sender=Cart)
+def invalidate_user_profile(sender, instance, **kwargs):
+    bump_user(instance.user_id)
+
+def _cart_user_id(item):
+    if CartItem.cart.is_cached(item):
+        return item.cart.user_id
+    return Cart.objects.filter(pk=item.cart_id).values_list('user_id', flat=True).first()
+
+@receiver([post_save, post_delete], sender=CartItem)
+def invalidate_cart_item(sender, instance, **kwargs):
+    user_id = _cart_user_id(instance)
+    if user_id:
+        bump_user(user_id)
+
+@receiver(cart_service.cart_changed, sender=Cart)
+def invalidate_changed_cart(sender, cart, **kwargs):
+    bump_user(cart.user_id)
+
+# Interaction event log and hourly/daily rollups
+
+@receiver(post_save, sender=UserInteraction)
+def log_interaction(sender, instance, created, **kwargs):
+    if created:
+        event_log.record_interaction(instance)
+
+# Cart lines and purchases are folded into the loaded co-purchase matrix;
+# other processes pick them up at their next rebuild
+
+@receiver(post_save, sender=UserInteraction)
+def record_purchase(sender, instance, created, **kwargs):
+    if created and instance.interaction_type == 'purchase':
+        transaction.on_commit(
+            lambda: basket_matrix.record_item(instance.user_id, instance.product_id)
+        )
+
+@receiver(post_save, sender=CartItem)
+def record_cart_item(sender, instance, created, **kwargs):
+    if created:
+        user_id = _cart_user_id(instance)
+        transaction.on_commit(lambda: basket_matrix.record_item(user_id, instance.product_id))
+
+@receiver(cart_service.cart_changed, sender=Cart)
+def record_cart_line(sender, cart, line, **kwargs):
+    transaction.on_commit(lambda: basket_matrix.record_item(cart.user_id, line.product_id))
+
+# Denormalized Product.rating_*/total_views counters
+
+@receiver(pre_save, sender=ProductRating)
+def remember_previous_rating(sender, instance, **kwargs):
+    instance._previous_rating = None
+    if instance.pk:
+        instance._previous_rating = ProductRating.objects.filter(
+            pk=instance.pk
+        ).values_list('product_id', 'rating').first()
+
+@receiver(post_save, sender=ProductRating)
+def update_rating_aggregates(sender, instance, created, **kwargs):
+    previous = getattr(instance, '_previous_rating', None)
+    if created or previous is None:
+        aggregates.record_rating_added(instance.product_id, instance.rating)
+        return
+
+    previous_product_id, previous_rating = previous
+    if previous_product_id != instance.product_id:
+        aggregates.record_rating_removed(previous_product_id, previous_rating)
+        aggregates.record_rating_added(instance.product_id, instance.rating)
+    else:
+        aggregates.record_rating_changed(instance.product_id, previous_rating, instance.rating)
+
+@receiver(post_delete, sender=ProductRating)
+def remove_rating_aggregates(sender, instance, **kwargs):
+    aggregates.record_rating_removed(instance.product_id, instance.rating)
+
+@receiver(post_save, sender=ProductView)
+def update_view_aggregates(sender, instance, created, **kwargs):
+    if created:
+        aggregates.record_view_added(instance.product_id)
+
+@receiver(post_delete, sender=ProductView)
+def remove_view_aggregates(sender, instance, **kwargs):
+    aggregates.record_view_removed(instance.product_id)
+
+# Denormalized Cart.item_count/subtotal
+
+@receiver(post_init, sender=CartItem)
+def remember_previous_cart_item(sender, instance, **kwargs):
+    cart_totals.remember_item(instance)
+
+@receiver(post_save, sender=CartItem)
+def update_cart_totals(sender, instance, created, **kwargs):
+    cart_totals.item_saved(instance, created)
+
+@receiver(post_delete, sender=CartItem)
+def remove_cart_totals(sender, instance, **kwargs):
+    cart_totals.item_deleted(instance)
+
+@receiver(pre_save, sender=Product)
+def remember_product_price(sender, instance, update_fields=None, **kwargs):
+    cart_totals.remember_price(instance, update_fields)
+
+@receiver(post_save, sender=Product)
+def reprice_carts(sender, instance, created, update_fields=None, **kwargs):
+    # Subtotals are at current prices; carts holding the product are recomputed
+    if created or (update_fields is not None and 'price' not in update_fields):
+        return
+    if cart_totals.price_changed(instance):
+        cart_totals.reconcile_cart_totals(Cart.objects.filter(items__product=instance))
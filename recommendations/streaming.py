@@ -0,0 +1,55 @@
+"""
+Helpers for batch endpoints that stream newline-delimited JSON.
+
+Rows are encoded and sent as they are produced, so a large batch never has
+to be held in memory as a single response body.
+"""
+import json
+
+from django.http import StreamingHttpResponse
+from rest_framework.utils.encoders import JSONEncoder
+
+from .fieldsets import parse_list_param
+
+NDJSON_CONTENT_TYPE = 'application/x-ndjson'
+
+
+def ndjson_response(rows):
+    lines = (json.dumps(row, cls=JSONEncoder) + '\n' for row in rows)
+    return StreamingHttpResponse(lines, content_type=NDJSON_CONTENT_TYPE)
+
+
+def _parse_id(value):
+    # int() would also take True, 1.5 and ' 1 '; ids are integers or digit strings
+    if isinstance(value, bool) or not isinstance(value, (int, str)):
+        raise ValueError(value)
+    return int(value)
+
+
+def get_id_list(request, name, limit):
+    """
+    Read unique integer ids from a JSON body list (POST) or a comma-separated
+    query parameter (GET), preserving order.  Raises ``ValueError`` with a
+    client-facing message.
+    """
+    if request.method == 'POST':
+        if not isinstance(request.data, dict):
+            raise ValueError('Request body must be a JSON object')
+        values = request.data.get(name)
+    else:
+        values = parse_list_param(request.query_params.get(name))
+
+    if not isinstance(values, list) or not values:
+        raise ValueError(f'{name} must be a non-empty list of ids')
+    try:
+        ids = list(dict.fromkeys(_parse_id(value) for value in values))
+    except ValueError:
+        raise ValueError(f'{name} must contain only integer ids')
+    if len(ids) > limit:
+        raise ValueError(f'At most {limit} {name} per request')
+    return ids
+
+
+def chunked(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
@@ -0,0 +1,1109 @@
+import io
+import json
+import os
+import tempfile
+import time
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from common import cart_service, cart_totals
+from common.buffered_counter import BufferedCounter
+from recommendations import (
+    aggregates, attribute_index, autocomplete, basket_matrix, event_log, event_queue,
+    recently_viewed, search, search_index, token_index, view_buffer
+)
+from recommendations.ai_engine import AIRecommendationEngine
+from recommendations.background import BackgroundBuilt
+from recommendations.cache_versions import (
+    CATALOG, PRODUCT_STATS, PRODUCT_VIEWS, get_version, product_namespace, product_stats_namespace,
+    recommendations_namespace, user_namespace
+)
+from recommendations.engine import RecommendationEngine
+from recommendations.pagination import encode_cursor
+from recommendations.search_index import LiveIndex
+from recommendations.views import ProductViewSet
+from recommendations.models import (
+    AppliedEventOffset, Cart, CartItem, Category, PersonalizedDiscount, Product, ProductAttribute,
+    ProductCollection, ProductCollectionItem, ProductInteractionRollup, ProductRating, ProductSimilarity,
+    ProductTag, ProductView, Recommendation, SearchHistory, SeasonalRecommendation, UserInteraction,
+    UserInteractionRollup, UserSegment, UserSegmentMembership
+)
+
+# Interactions are appended to the event log and queue; keep them out of the tree
+TEST_DATA_DIR = tempfile.mkdtemp()
+
+
+@override_settings(
+    INTERACTION_LOG_DIR=os.path.join(TEST_DATA_DIR, 'interactions'),
+    EVENT_QUEUE_PATH=os.path.join(TEST_DATA_DIR, 'events.sqlite3'),
+)
+class RecommendationsTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.category = Category.objects.create(name='Audio')
+        self.user = User.objects.create(username='shopper')
+
+    def make_product(self, name='Speaker', price=10, **kwargs):
+        return Product.objects.create(name=name, category=self.category, price=price, **kwargs)
+
+
+@override_settings(ROOT_URLCONF='recommendations.urls')
+class ApiTestCase(RecommendationsTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+
+
+class CacheVersionTests(RecommendationsTestCase):
+    def assertBumped(self, namespace, write):
+        before = get_version(namespace)
+        write()
+        self.assertNotEqual(get_version(namespace), before, namespace)
+
+    def assertNotBumped(self, namespace, write):
+        before = get_version(namespace)
+        write()
+        self.assertEqual(get_version(namespace), before, namespace)
+
+    def test_product_save_bumps_product_and_catalog(self):
+        product = self.make_product()
+        product.name = 'Bass Speaker'
+        self.assertBumped(product_namespace(product.pk), product.save)
+        self.assertBumped(CATALOG, product.save)
+
+    def test_interaction_bumps_user(self):
+        product = self.make_product()
+        self.assertBumped(user_namespace(self.user.pk), lambda: UserInteraction.objects.create(
+            user=self.user, product=product, interaction_type='view'
+        ))
+
+    def test_stored_recommendation_keeps_user_version(self):
+        product = self.make_product()
+
+        def recommend():
+            Recommendation.objects.create(
+                user=self.user, product=product, recommendation_type='personal',
+                score=0.5, explanation=''
+            )
+        self.assertNotBumped(user_namespace(self.user.pk), recommend)
+        self.assertBumped(recommendations_namespace(self.user.pk), recommend)
+
+    def test_view_only_bumps_view_counters(self):
+        product = self.make_product()
+
+        def view():
+            ProductView.objects.update_or_create(user=self.user, product=product)
+        self.assertNotBumped(product_namespace(product.pk), view)
+        self.assertNotBumped(user_namespace(self.user.pk), view)
+        self.assertBumped(product_stats_namespace(product.pk), view)
+        self.assertBumped(PRODUCT_VIEWS, view)
+        self.assertNotBumped(PRODUCT_STATS, view)
+
+    def test_rating_bumps_product_and_user(self):
+        product = self.make_product()
+
+        def rate():
+            ProductRating.objects.update_or_create(user=self.user, product=product, defaults={'rating': 4})
+        self.assertBumped(product_namespace(product.pk), rate)
+        self.assertBumped(user_namespace(self.user.pk), rate)
+        self.assertBumped(PRODUCT_STATS, rate)
+
+
+class TokenIndexTests(RecommendationsTestCase):
+    def setUp(self):
+        super().setUp()
+        self.speaker = self.make_product('Wireless Bass Speaker', price=50, description='Portable bluetooth speaker')
+        self.twin = self.make_product('Wireless Bass Speaker Mini', price=45, description='Portable bluetooth speaker')
+        self.cable = self.make_product('Audio Cable', price=5, description='Copper wire')
+        other = Category.objects.create(name='Garden')
+        self.hose = Product.objects.create(name='Hose', category=other, price=50)
+
+    def test_index_ranks_matching_text_first(self):
+        index = token_index.ProductTokenIndex.build()
+        ranked = [pk for pk, _ in index.similar(self.speaker.pk)]
+        self.assertEqual(ranked[0], self.twin.pk)
+        self.assertNotIn(self.speaker.pk, ranked)
+
+    def test_cold_worker_falls_back_to_category(self):
+        with mock.patch.object(token_index._index, 'value', None), \
+                mock.patch.object(token_index._index, 'start') as start:
+            ranked = [pk for pk, _ in token_index.similar(self.speaker.pk)]
+        start.assert_called_once()
+        self.assertEqual(ranked, [self.twin.pk, self.cable.pk])
+
+    def test_product_added_after_build_falls_back_to_category(self):
+        index = token_index.ProductTokenIndex([], version=None)
+        with mock.patch.object(token_index, 'get_index', return_value=index):
+            ranked = [pk for pk, _ in token_index.similar(self.cable.pk)]
+        self.assertEqual(ranked, [self.twin.pk, self.speaker.pk])
+
+    def test_stale_index_is_served_between_rebuilds(self):
+        built = BackgroundBuilt('test', build=None, is_stale=lambda value: True, min_interval=60)
+        built.value = 'old'
+        built.started_at = time.time()
+        with mock.patch.object(built, 'start') as start:
+            self.assertEqual(built.get(), 'old')
+            start.assert_not_called()
+            built.started_at -= 60
+            self.assertEqual(built.get(), 'old')
+            start.assert_called_once()
+
+
+class PersonalizedRecommendationTests(RecommendationsTestCase):
+    def test_scores_similar_products_by_weighted_seed_counts(self):
+        seed_a, seed_b, near, far = (self.make_product(name) for name in 'ABCD')
+        for product_a, product_b, score in [(seed_a, near, 0.5), (seed_a, far, 0.1), (seed_b, far, 0.9)]:
+            ProductSimilarity.objects.create(product_a=product_a, product_b=product_b, similarity_score=score)
+        counts = {(seed_a.pk, 'purchase'): 1, (seed_b.pk, 'view'): 2}
+
+        with mock.patch('recommendations.event_log.user_product_counts', return_value=counts):
+            recommendations = RecommendationEngine().get_personalized_recommendations(self.user.pk)
+
+        # far: 0.1 * 4 + 0.9 * 1 * 2 = 2.2; near: 0.5 * 4 = 2.0
+        self.assertEqual([r.product for r in recommendations], [far, near])
+        self.assertAlmostEqual(recommendations[0].score, 2.2)
+        self.assertEqual(Recommendation.objects.filter(user=self.user).count(), 2)
+
+    def test_only_top_n_are_kept(self):
+        seed, near, far = (self.make_product(name) for name in 'ABC')
+        ProductSimilarity.objects.create(product_a=seed, product_b=near, similarity_score=0.8)
+        ProductSimilarity.objects.create(product_a=seed, product_b=far, similarity_score=0.2)
+
+        with mock.patch('recommendations.event_log.user_product_counts', return_value={(seed.pk, 'view'): 1}):
+            recommendations = RecommendationEngine().get_personalized_recommendations(self.user.pk, n=1)
+
+        self.assertEqual([r.product for r in recommendations], [near])
+
+
+class BasketMatrixTests(RecommendationsTestCase):
+    def setUp(self):
+        super().setUp()
+        self.phone, self.case, self.charger, self.cable = (
+            self.make_product(name) for name in ('Phone', 'Case', 'Charger', 'Cable')
+        )
+        self.other = User.objects.create(username='other')
+        # Two baskets hold phone and case, one phone and charger
+        cart = Cart.objects.create(user=self.other)
+        CartItem.objects.create(cart=cart, product=self.phone)
+        CartItem.objects.create(cart=cart, product=self.case)
+        third = User.objects.create(username='third')
+        for product in (self.phone, self.case, self.charger):
+            UserInteraction.objects.create(user=third, product=product, interaction_type='purchase')
+
+    def test_built_from_cart_lines_and_purchases(self):
+        matrix = basket_matrix.BasketMatrix.build()
+        self.assertEqual(matrix.co_purchased([self.phone.pk]), [(self.case.pk, 2.0), (self.charger.pk, 1.0)])
+
+    def test_cart_writes_are_applied_incrementally(self):
+        matrix = basket_matrix.BasketMatrix.build()
+        cart = Cart.objects.create(user=self.user)
+        with mock.patch.object(basket_matrix._matrix, 'value', matrix), \
+                self.captureOnCommitCallbacks(execute=True):
+            cart_service.add_item(cart, self.phone.pk)
+            CartItem.objects.create(cart=cart, product=self.cable)
+        self.assertCountEqual(matrix.basket(self.user.pk), [self.phone.pk, self.cable.pk])
+        self.assertIn((self.cable.pk, 1.0), matrix.co_purchased([self.phone.pk]))
+
+    def test_collaborative_recommendations_come_from_the_matrix(self):
+        today = timezone.now().date()
+        season = SeasonalRecommendation.objects.create(
+            name='Winter', season_type='winter', start_date=today - timedelta(days=1),
+            end_date=today + timedelta(days=1)
+        )
+        season.products.add(self.charger)
+        UserInteraction.objects.create(user=self.user, product=self.phone, interaction_type='purchase')
+        matrix = basket_matrix.BasketMatrix.build()
+
+        with mock.patch.object(basket_matrix._matrix, 'value', matrix):
+            recommended = AIRecommendationEngine().get_collaborative_recommendations(self.user.pk)
+
+        self.assertEqual(recommended, [self.case, self.charger])
+        self.assertEqual([p.rec_score for p in recommended], [2.0, 1.5])
+
+
+class ProductAggregateTests(RecommendationsTestCase):
+    def assertCounters(self, product, rating_count, rating_sum, average_rating, total_views=0):
+        product.refresh_from_db()
+        self.assertEqual(
+            (product.rating_count, product.rating_sum, product.average_rating, product.total_views),
+            (rating_count, rating_sum, average_rating, total_views)
+        )
+
+    def test_rating_writes_move_the_counters(self):
+        product = self.make_product()
+        rating = ProductRating.objects.create(user=self.user, product=product, rating=4)
+        ProductRating.objects.create(user=User.objects.create(username='other'), product=product, rating=2)
+        self.assertCounters(product, 2, 6, 3.0)
+
+        rating.rating = 5
+        rating.save()
+        self.assertCounters(product, 2, 7, 3.5)
+
+        rating.delete()
+        self.assertCounters(product, 1, 2, 2.0)
+
+    def test_rating_moved_between_products(self):
+        first, second = self.make_product('First'), self.make_product('Second')
+        rating = ProductRating.objects.create(user=self.user, product=first, rating=3)
+        rating.product = second
+        rating.save()
+        self.assertCounters(first, 0, 0, None)
+        self.assertCounters(second, 1, 3, 3.0)
+
+    def test_view_writes_move_the_counters(self):
+        product = self.make_product()
+        view = ProductView.objects.create(user=self.user, product=product)
+        self.assertCounters(product, 0, 0, None, total_views=1)
+        view.delete()
+        self.assertCounters(product, 0, 0, None, total_views=0)
+
+    def test_reconcile_repairs_drift(self):
+        product = self.make_product()
+        ProductRating.objects.create(user=self.user, product=product, rating=4)
+        ProductView.objects.create(user=self.user, product=product)
+        Product.objects.filter(pk=product.pk).update(rating_count=7, rating_sum=1, average_rating=0.1, total_views=9)
+
+        self.assertEqual(aggregates.reconcile_product_aggregates(), 1)
+        self.assertCounters(product, 1, 4, 4.0, total_views=1)
+
+
+class SparseFieldsetTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.product = self.make_product()
+        ProductRating.objects.create(user=self.user, product=self.product, rating=5)
+
+    def test_full_representation_by_default(self):
+        product = self.client.get('/api/products/').json()['results'][0]
+        self.assertEqual(product['ratings'][0]['rating'], 5)
+        self.assertIn('tags', product)
+
+    def test_fields_trims_the_payload(self):
+        response = self.client.get('/api/products/', {'fields': 'id,name'})
+        self.assertEqual(response.json()['results'], [{'id': self.product.pk, 'name': 'Speaker'}])
+
+    def test_card_shape(self):
+        product = self.client.get('/api/products/', {'shape': 'card'}).json()['results'][0]
+        self.assertEqual(product['category_name'], 'Audio')
+        self.assertEqual(product['rating_count'], 1)
+        self.assertNotIn('ratings', product)
+
+    def test_card_shape_queries_do_not_grow_with_ratings(self):
+        for i in range(5):
+            product = self.make_product(f'Speaker {i}')
+            ProductRating.objects.create(user=self.user, product=product, rating=3)
+        with self.assertNumQueries(1):
+            self.client.get('/api/products/', {'shape': 'card'})
+
+
+class KeysetPaginationTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.products = [self.make_product(f'Speaker {i}') for i in range(5)]
+
+    def test_pages_cover_every_row_once(self):
+        seen = []
+        response = self.client.get('/api/products/', {'page_size': 2, 'fields': 'id'}).json()
+        self.assertIsNone(response['previous'])
+        while True:
+            seen.extend(product['id'] for product in response['results'])
+            if response['next'] is None:
+                break
+            response = self.client.get(response['next']).json()
+        # Newest first, ties on created_at broken by id
+        self.assertEqual(seen, sorted((p.pk for p in self.products), reverse=True))
+
+    def test_previous_returns_to_the_earlier_page(self):
+        first = self.client.get('/api/products/', {'page_size': 2, 'fields': 'id'}).json()
+        second = self.client.get(first['next']).json()
+        self.assertEqual(self.client.get(second['previous']).json()['results'], first['results'])
+
+    def test_client_ordering(self):
+        response = self.client.get('/api/products/', {'ordering': 'name', 'page_size': 2, 'fields': 'name'}).json()
+        second = self.client.get(response['next']).json()
+        self.assertEqual([p['name'] for p in second['results']], ['Speaker 2', 'Speaker 3'])
+
+    def test_tampered_cursors_are_not_found(self):
+        cursors = ['garbage', encode_cursor(['x', 'y']), encode_cursor([1, 2]), encode_cursor([[1], {}]),
+                   encode_cursor([None, 1]), encode_cursor([True, 1]), encode_cursor([1])]
+        for cursor in cursors:
+            with self.subTest(cursor=cursor):
+                response = self.client.get('/api/products/', {'cursor': cursor})
+                self.assertEqual(response.status_code, 404)
+
+
+class ConditionalGetTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.product = self.make_product()
+
+    def assertNotModified(self, params, write=None):
+        etag = self.client.get('/api/products/', params)['ETag']
+        if write is not None:
+            write()
+        response = self.client.get('/api/products/', params, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def assertModified(self, params, write):
+        etag = self.client.get('/api/products/', params)['ETag']
+        write()
+        response = self.client.get('/api/products/', params, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def view(self):
+        viewer = User.objects.create(username=f'viewer{User.objects.count()}')
+        ProductView.objects.create(user=viewer, product=self.product)
+
+    def rate(self):
+        rater = User.objects.create(username=f'rater{User.objects.count()}')
+        ProductRating.objects.create(user=rater, product=self.product, rating=4)
+
+    def test_unchanged_listing_is_not_modified(self):
+        self.assertNotModified({})
+
+    def test_catalog_change_modifies_every_listing(self):
+        def rename():
+            self.product.name = 'Bass Speaker'
+            self.product.save()
+        self.assertModified({'shape': 'card'}, rename)
+
+    def test_view_flush_only_modifies_listings_showing_views(self):
+        self.assertModified({}, self.view)
+        self.assertNotModified({'shape': 'card'}, self.view)
+
+    def test_rating_modifies_listings_showing_ratings(self):
+        self.assertModified({'shape': 'card'}, self.rate)
+
+    def test_listing_without_stats_ignores_them(self):
+        self.assertNotModified({'fields': 'id,name'}, self.rate)
+
+
+class FragmentTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.product = self.make_product()
+        self.tag = ProductTag.objects.create(name='wireless')
+        self.tag.products.add(self.product)
+        ProductRating.objects.create(user=self.user, product=self.product, rating=5)
+
+    def get_product(self):
+        # Fresh validators each time, so only the fragment cache can go stale
+        return self.client.get(f'/api/products/{self.product.pk}/').json()
+
+    def test_unchanged_product_is_served_from_its_fragment(self):
+        self.get_product()
+        with mock.patch('rest_framework.serializers.Serializer.to_representation') as render:
+            self.client.get('/api/products/')
+        render.assert_not_called()
+
+    def test_tag_rename_reaches_the_payload(self):
+        self.get_product()
+        self.tag.name = 'bluetooth'
+        self.tag.save()
+        self.assertEqual(self.get_product()['tags'], [{'id': self.tag.pk, 'name': 'bluetooth'}])
+
+    def test_tag_delete_reaches_the_payload(self):
+        self.get_product()
+        self.tag.delete()
+        self.assertEqual(self.get_product()['tags'], [])
+
+    def test_attribute_change_reaches_the_payload(self):
+        self.get_product()
+        ProductAttribute.objects.create(product=self.product, name='colour', value='black', attribute_type='text')
+        self.assertEqual(self.get_product()['attributes'][0]['value'], 'black')
+
+    def test_category_rename_reaches_the_payload(self):
+        self.get_product()
+        self.category.name = 'Hi-Fi'
+        self.category.save()
+        self.assertEqual(self.get_product()['category']['name'], 'Hi-Fi')
+
+    def test_rater_rename_reaches_the_payload(self):
+        self.get_product()
+        self.user.username = 'audiophile'
+        self.user.save()
+        self.assertEqual(self.get_product()['ratings'][0]['username'], 'audiophile')
+
+
+class BulkProductTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.products = [self.make_product(f'Speaker {i}') for i in range(5)]
+        self.client.force_authenticate(self.user)
+
+    def read_rows(self, response):
+        return [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+
+    def test_streams_rows_in_request_order_across_chunks(self):
+        ids = [p.pk for p in reversed(self.products)] + [0]
+        with mock.patch.object(ProductViewSet, 'bulk_chunk_size', 2):
+            response = self.client.post('/api/products/bulk/', {'ids': ids}, format='json')
+        rows = self.read_rows(response)
+        self.assertEqual([row['id'] for row in rows], ids)
+        self.assertEqual(rows[0]['name'], 'Speaker 4')
+        self.assertEqual(rows[-1], {'id': 0, 'error': 'Product not found'})
+
+    def test_get_takes_comma_separated_ids(self):
+        response = self.client.get('/api/products/bulk/', {'ids': f'{self.products[0].pk},{self.products[1].pk}'})
+        self.assertEqual(len(self.read_rows(response)), 2)
+
+    def test_rejects_bad_ids(self):
+        bodies = [[1, 2], {'ids': [True]}, {'ids': [1.5]}, {'ids': [[1]]}, {'ids': []}, {'ids': 'x'},
+                  {'ids': list(range(1, ProductViewSet.max_bulk_products + 2))}]
+        for body in bodies:
+            with self.subTest(body=body):
+                response = self.client.post('/api/products/bulk/', body, format='json')
+                self.assertEqual(response.status_code, 400)
+
+
+class InteractionIngestionTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.product = self.make_product()
+        self.client.force_authenticate(self.user)
+
+    def ingest(self, events):
+        return self.client.post('/api/user-interactions/batch/', events, format='json')
+
+    def test_reports_a_status_per_event(self):
+        response = self.ingest({'events': [
+            {'product': self.product.pk, 'interaction_type': 'view', 'timestamp': '2026-01-02T03:04:05Z'},
+            {'product': 0, 'interaction_type': 'view'},
+            {'product': True, 'interaction_type': 'like'},
+            {'product': str(self.product.pk), 'interaction_type': 'cart'},
+        ]}).json()
+
+        self.assertEqual((response['created'], response['failed']), (2, 2))
+        self.assertEqual([r['status'] for r in response['results']], ['created', 'error', 'error', 'created'])
+        self.assertIn('product', response['results'][1]['errors'])
+        self.assertEqual(set(response['results'][2]['errors']), {'product', 'interaction_type'})
+
+        first = UserInteraction.objects.get(pk=response['results'][0]['id'])
+        self.assertEqual(first.client_timestamp.isoformat(), '2026-01-02T03:04:05+00:00')
+        self.assertEqual(UserInteraction.objects.filter(user=self.user).count(), 2)
+
+    def test_checks_products_with_one_query_and_inserts_in_bulk(self):
+        events = [{'product': self.product.pk, 'interaction_type': 'view'}] * 50
+        # One existence query and one insert, inside a savepoint
+        with self.assertNumQueries(4):
+            self.ingest(events)
+        self.assertEqual(UserInteraction.objects.count(), 50)
+
+    def test_purchases_reach_the_basket_matrix(self):
+        matrix = basket_matrix.BasketMatrix()
+        with mock.patch.object(basket_matrix._matrix, 'value', matrix), \
+                self.captureOnCommitCallbacks(execute=True):
+            self.ingest([{'product': self.product.pk, 'interaction_type': 'purchase'}])
+        self.assertEqual(matrix.basket(self.user.pk), [self.product.pk])
+
+    def test_bumps_the_user_version(self):
+        before = get_version(user_namespace(self.user.pk))
+        self.ingest([{'product': self.product.pk, 'interaction_type': 'view'}])
+        self.assertNotEqual(get_version(user_namespace(self.user.pk)), before)
+
+    def test_rejects_bodies_without_events(self):
+        for body in ({}, [], {'events': 'x'}):
+            with self.subTest(body=body):
+                self.assertEqual(self.ingest(body).status_code, 400)
+
+
+class NestedPrefetchTests(ApiTestCase):
+    def make_collection(self):
+        collection = ProductCollection.objects.create(name='Picks', collection_type='manual')
+        for position in range(3):
+            product = self.make_product(f'Speaker {collection.pk}.{position}')
+            ProductRating.objects.create(user=self.user, product=product, rating=4)
+            ProductTag.objects.create(name='audio').products.add(product)
+            ProductCollectionItem.objects.create(collection=collection, product=product, position=position)
+        return collection
+
+    def make_segment(self):
+        segment = UserSegment.objects.create(name='Fans', description='')
+        for i in range(3):
+            member = User.objects.create(username=f'member{segment.pk}.{i}')
+            UserSegmentMembership.objects.create(user=member, segment=segment)
+        return segment
+
+    def make_discount(self):
+        now = timezone.now()
+        discount = PersonalizedDiscount.objects.create(
+            name='Ten off', description='', discount_type='percentage', value=10,
+            start_date=now, end_date=now + timedelta(days=1)
+        )
+        discount.segments.add(self.make_segment())
+        discount.collections.add(self.make_collection())
+        discount.products.add(self.make_product(f'Extra {discount.pk}'))
+        return discount
+
+    def count_queries(self, url, make, n):
+        for _ in range(n):
+            make()
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def assertConstantQueries(self, url, make):
+        few = self.count_queries(url, make, 2)
+        many = self.count_queries(url, make, 5)
+        self.assertEqual(few, many)
+
+    def test_collections(self):
+        self.assertConstantQueries('/api/product-collections/', self.make_collection)
+
+    def test_segment_member_counts(self):
+        self.assertConstantQueries('/api/user-segments/', self.make_segment)
+        segment = self.client.get('/api/user-segments/').json()[0]
+        self.assertEqual(segment['member_count'], 3)
+
+    def test_discounts(self):
+        self.assertConstantQueries('/api/personalized-discounts/', self.make_discount)
+
+
+@mock.patch.object(BufferedCounter, '_ensure_worker')
+class ViewBufferTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.product = self.make_product()
+        self.buffer = BufferedCounter('test-views', view_buffer._write_views)
+
+    def test_flush_applies_buffered_counts(self, ensure_worker):
+        for _ in range(3):
+            self.buffer.add((self.user.pk, self.product.pk))
+        self.buffer.add((self.user.pk, 0))
+        self.assertEqual(self.buffer.flush(), 2)
+
+        self.assertEqual(ProductView.objects.get(user=self.user, product=self.product).view_count, 3)
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.total_views, 1)
+
+        self.buffer.add((self.user.pk, self.product.pk))
+        self.buffer.flush()
+        self.assertEqual(ProductView.objects.get(user=self.user, product=self.product).view_count, 4)
+
+    def test_events_and_bumps_follow_the_commit(self, ensure_worker):
+        self.buffer.add((self.user.pk, self.product.pk))
+        before = get_version(PRODUCT_VIEWS)
+        with mock.patch.object(event_queue, 'publish') as publish:
+            with self.captureOnCommitCallbacks() as callbacks:
+                self.buffer.flush()
+            publish.assert_not_called()
+            self.assertEqual(get_version(PRODUCT_VIEWS), before)
+            for callback in callbacks:
+                callback()
+        self.assertEqual(publish.call_count, 1)
+        self.assertNotEqual(get_version(PRODUCT_VIEWS), before)
+
+    def test_failed_write_keeps_the_views_buffered(self, ensure_worker):
+        self.buffer.add((self.user.pk, self.product.pk))
+        with mock.patch.object(aggregates, 'record_views_added', side_effect=RuntimeError), \
+                self.assertRaises(RuntimeError):
+            self.buffer.flush()
+        self.assertFalse(ProductView.objects.exists())
+        self.assertEqual(self.buffer.flush(), 1)
+        self.assertEqual(ProductView.objects.get().view_count, 1)
+
+    def test_product_get_does_not_write(self, ensure_worker):
+        self.client.force_authenticate(self.user)
+        with mock.patch.object(view_buffer, '_buffer', self.buffer), \
+                CaptureQueriesContext(connection) as queries:
+            self.client.get(f'/api/products/{self.product.pk}/')
+        writes = [q['sql'] for q in queries if not q['sql'].startswith('SELECT')]
+        self.assertEqual(writes, [])
+        self.assertEqual(self.buffer.flush(), 1)
+
+
+
+
+class SearchTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        # A fresh per-process index for each test, built on first use
+        self.index = LiveIndex('test-products', search.FIELD_WEIGHTS, search._load_products)
+        patcher = mock.patch.object(search, '_live_index', self.index)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.garden = Category.objects.create(name='Garden')
+        self.cable = self.make_product('Copper Cable', price=5, stock=3)
+        self.speaker = self.make_product('Speaker', price=50, description='Ships with a copper cable')
+        self.hose = Product.objects.create(name='Garden Hose', category=self.garden, price=20)
+
+    def ids(self, response):
+        return [item['id'] for item in response.data['results']]
+
+    def test_search_pages_through_every_match_by_rank(self):
+        with mock.patch.object(search, 'MAX_FILTER_RESULTS', 1):
+            response = self.client.get('/api/products/', {'search': 'copper cable', 'page_size': 1})
+            self.assertEqual(self.ids(response), [self.cable.pk])
+            response = self.client.get(response.data['next'])
+        self.assertEqual(self.ids(response), [self.speaker.pk])
+        self.assertIsNone(response.data['next'])
+
+    def test_ordering_sorts_the_matches(self):
+        response = self.client.get('/api/products/', {'search': 'cable', 'ordering': '-price'})
+        self.assertEqual(self.ids(response), [self.speaker.pk, self.cable.pk])
+
+    def test_ordering_more_matches_than_can_be_filtered_is_refused(self):
+        with mock.patch.object(search, 'MAX_FILTER_RESULTS', 1):
+            response = self.client.get('/api/products/', {'search': 'cable', 'ordering': 'price'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('ordering', response.data)
+
+    def test_prefix_and_filters(self):
+        self.assertEqual(search.search_product_ids('cop'), [self.cable.pk, self.speaker.pk])
+        self.assertEqual(search.search_product_ids('cable', in_stock=True), [self.cable.pk])
+        self.assertEqual(search.search_product_ids('cable', max_price=10), [self.cable.pk])
+        self.assertEqual(search.search_product_ids('cable hose'), [])
+
+    def test_changes_are_replayed_from_the_log(self):
+        self.assertEqual(search.search_product_ids('hose'), [self.hose.pk])
+        with mock.patch.object(search_index.cache, 'set_many', wraps=cache.set_many) as set_many, \
+                self.captureOnCommitCallbacks(execute=True):
+            self.hose.name = 'Garden Sprinkler'
+            self.hose.save()
+        self.assertEqual(set_many.call_args.args[1], search_index.CHANGE_LOG_TTL)
+
+        with mock.patch.object(self.index, '_build') as build:
+            self.assertEqual(search.search_product_ids('sprinkler'), [self.hose.pk])
+        build.assert_not_called()
+        self.assertEqual(search.search_product_ids('hose'), [])
+
+    def test_gap_in_the_log_rebuilds_in_the_background(self):
+        old = search.get_index()
+        cache.incr(self.index._seq_key)
+        with mock.patch.object(self.index._rebuilt, 'start') as start:
+            self.assertIs(search.get_index(), old)
+        start.assert_called_once()
+
+        self.index._rebuilt.value = self.index._build()
+        self.assertIsNot(search.get_index(), old)
+        self.assertEqual(self.index.seq, cache.get(self.index._seq_key))
+
+
+
+
+class SearchResultCacheTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        index = LiveIndex('test-products', search.FIELD_WEIGHTS, search._load_products)
+        patcher = mock.patch.object(search, '_live_index', index)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.cable = self.make_product('Copper Cable')
+        self.wire = self.make_product('Copper Wire', description='Thin cable')
+        self.hose = Product.objects.create(
+            name='Cable Reel', category=Category.objects.create(name='Garden'), price=10
+        )
+
+    def test_normalized_queries_share_cached_results(self):
+        ids, count = search.search_results('copper cable')
+        with mock.patch.object(search, 'search_product_ids') as search_product_ids:
+            self.assertEqual(search.search_results('  Copper   CABLE ', limit=1), (ids[:1], count))
+            self.assertEqual(search.search_results('COPPER cable'), (ids, count))
+        search_product_ids.assert_not_called()
+        self.assertEqual(count, 2)
+
+        # Filters are part of the key
+        self.assertEqual(search.search_results('cable', category=self.category.pk)[1], 2)
+        self.assertEqual(search.search_results('cable')[1], 3)
+
+    def test_catalog_changes_invalidate_cached_results(self):
+        self.assertEqual(search.search_results('reel'), ([self.hose.pk], 1))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.hose.name = 'Hose Reel'
+            self.hose.save()
+            self.make_product('Cable Reel')
+        self.assertEqual(search.search_results('cable reel')[1], 1)
+        self.assertEqual(search.search_results('reel')[1], 2)
+
+    def test_search_history_reuses_the_cached_count(self):
+        self.client.force_authenticate(self.user)
+        search.search_results('cable', category=self.category.pk)
+        with mock.patch.object(search, 'search_product_ids') as search_product_ids:
+            response = self.client.post(
+                '/api/search-history/', {'query': 'Cable', 'category': self.category.pk}, format='json'
+            )
+        search_product_ids.assert_not_called()
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['results_count'], 2)
+
+class FacetTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        index = LiveIndex('test-products', search.FIELD_WEIGHTS, search._load_products)
+        patcher = mock.patch.object(search, '_live_index', index)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.electronics = Category.objects.create(name='Electronics')
+        Category.objects.filter(pk=self.category.pk).update(parent=self.electronics)
+        self.garden = Category.objects.create(name='Garden')
+        self.tag = ProductTag.objects.create(name='wireless')
+        self.cable = self.make_product('Copper Cable', price=5, stock=3)
+        self.cable.tags.add(self.tag)
+        ProductRating.objects.create(user=self.user, product=self.cable, rating=5)
+        self.speaker = self.make_product('Copper Speaker', price=60)
+        self.hose = Product.objects.create(name='Garden Hose', category=self.garden, price=30)
+
+    def counts(self, params):
+        response = self.client.get('/api/products/facets/', params)
+        self.assertEqual(response.status_code, 200)
+        facets = {
+            facet: {entry['value']: entry['count'] for entry in entries}
+            for facet, entries in response.data['facets'].items()
+        }
+        return response.data['count'], facets
+
+    def test_counts_every_facet_in_one_pass(self):
+        count, facets = self.counts({})
+        self.assertEqual(count, 3)
+        self.assertEqual(facets, {
+            'category': {self.electronics.pk: 2, self.category.pk: 2, self.garden.pk: 1},
+            'price': {'0-25': 1, '25-50': 1, '50-100': 1},
+            'in_stock': {True: 1, False: 2},
+            'tag': {self.tag.pk: 1},
+            'rating': {1: 1, 2: 1, 3: 1, 4: 1},
+        })
+
+    def test_selections_and_search_narrow_the_counts(self):
+        count, facets = self.counts({'category': self.electronics.pk, 'in_stock': 'false'})
+        self.assertEqual(count, 1)
+        self.assertEqual(facets['price'], {'50-100': 1})
+
+        count, facets = self.counts({'search': 'copper', 'price': ['0-25', '25-50']})
+        self.assertEqual(count, 1)
+        self.assertEqual(facets['tag'], {self.tag.pk: 1})
+
+    def test_names_and_invalid_selections(self):
+        response = self.client.get('/api/products/facets/', {'search': 'hose'})
+        self.assertEqual(response.data['facets']['category'], [
+            {'value': self.garden.pk, 'count': 1, 'name': 'Garden'}
+        ])
+        for params in ({'price': 'cheap'}, {'category': 'audio'}, {'in_stock': 'maybe'}):
+            self.assertEqual(self.client.get('/api/products/facets/', params).status_code, 400)
+
+class AttributeIndexTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        index = LiveIndex('test-attributes', None, attribute_index._load_attributes,
+                          index_factory=attribute_index.AttributeIndex)
+        patcher = mock.patch.object(attribute_index, '_live_index', index)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.bike, self.twin, self.other = (self.make_product(name) for name in ('Bike', 'Twin', 'Other'))
+        for product, material in ((self.bike, 'Titanium'), (self.twin, 'titanium '), (self.other, 'Steel')):
+            ProductAttribute.objects.create(product=product, name='Material', value=material)
+            ProductAttribute.objects.create(product=product, name='Condition', value='New')
+
+    def test_rare_shared_attributes_rank_first(self):
+        ranked = [pk for pk, _ in attribute_index.similar_product_ids(self.bike.pk)]
+        self.assertEqual(ranked, [self.twin.pk, self.other.pk])
+
+        response = self.client.get(f'/api/products/{self.bike.pk}/similar_by_attributes/', {'limit': 1})
+        self.assertEqual([item['id'] for item in response.data], [self.twin.pk])
+        response = self.client.get(f'/api/products/{self.bike.pk}/similar_by_attributes/', {'limit': 'x'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_pairs_match_together_not_independently(self):
+        # Name of one pair with the value of another is no match
+        odd = self.make_product('Odd')
+        ProductAttribute.objects.create(product=odd, name='Condition', value='Titanium')
+        ProductAttribute.objects.create(product=odd, name='Material', value='New')
+        self.assertNotIn(odd.pk, dict(attribute_index.similar_product_ids(self.bike.pk)))
+
+    def test_attribute_edits_reach_the_index(self):
+        attribute_index.get_index()
+        with self.captureOnCommitCallbacks(execute=True):
+            ProductAttribute.objects.filter(product=self.other, name='Material').update(value='Titanium')
+            ProductAttribute.objects.get(product=self.other, name='Material').save()
+        scores = dict(attribute_index.similar_product_ids(self.bike.pk))
+        self.assertEqual(scores[self.other.pk], scores[self.twin.pk])
+
+
+class AutocompleteTests(ApiTestCase):
+    def test_same_named_products_stay_separate(self):
+        completer = autocomplete.Completer([
+            ('Wireless Headphones', autocomplete.PRODUCT, 1, 1.0),
+            ('Wireless  Headphones', autocomplete.PRODUCT, 2, 2.0),
+            ('wireless', autocomplete.TAG, 7, 1.0),
+            ('Wireless', autocomplete.TAG, 7, 3.0),
+        ])
+        self.assertEqual(completer.complete('WIRE'), [
+            ('wireless', autocomplete.TAG, 7),
+            ('Wireless Headphones', autocomplete.PRODUCT, 2),
+            ('Wireless Headphones', autocomplete.PRODUCT, 1),
+        ])
+        self.assertEqual(completer.complete('head', 1), [('Wireless Headphones', autocomplete.PRODUCT, 2)])
+        self.assertEqual(completer.complete('  '), [])
+
+    def test_endpoint_suggests_products_tags_and_repeated_queries(self):
+        speaker = self.make_product('Bass Speaker')
+        tag = ProductTag.objects.create(name='bass boost')
+        for query in ('Bass guitar', 'bass GUITAR', 'bassoon'):
+            SearchHistory.objects.create(user=self.user, query=query, results_count=0)
+        with mock.patch.object(autocomplete, '_completer', None):
+            response = self.client.get('/api/products/autocomplete/', {'q': 'bass'})
+            self.assertEqual(self.client.get('/api/products/autocomplete/', {'limit': 'x'}).status_code, 400)
+
+        suggestions = {(item['text'], item['type'], item['id']) for item in response.data['suggestions']}
+        self.assertEqual(suggestions, {
+            ('Bass Speaker', 'product', speaker.pk), ('bass boost', 'tag', tag.pk),
+            ('bass guitar', 'query', None),
+        })
+
+
+@mock.patch.object(BufferedCounter, '_ensure_worker')
+class RecentlyViewedTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.speaker, self.cable = self.make_product('Speaker'), self.make_product('Cable')
+        self.client.force_authenticate(self.user)
+
+    def test_ring_keeps_the_latest_view_of_each_product_first(self, ensure_worker):
+        for product in (self.speaker, self.cable, self.speaker):
+            recently_viewed.push(self.user.pk, product.pk)
+        self.assertEqual(recently_viewed.get_product_ids(self.user.pk), [self.speaker.pk, self.cable.pk])
+
+        with mock.patch.object(recently_viewed, 'RECENTLY_VIEWED_LIMIT', 1):
+            recently_viewed.push(self.user.pk, self.cable.pk)
+        self.assertEqual(recently_viewed.get_product_ids(self.user.pk), [self.cable.pk])
+
+    def test_busy_ring_drops_the_push(self, ensure_worker):
+        recently_viewed.push(self.user.pk, self.speaker.pk)
+        cache.add(f'{recently_viewed._key(self.user.pk)}:lock', 1)
+        with mock.patch.object(recently_viewed, 'LOCK_WAIT', 0), \
+                self.assertLogs('recommendations.recently_viewed', 'WARNING'):
+            recently_viewed.push(self.user.pk, self.cable.pk)
+        self.assertEqual(recently_viewed.get_product_ids(self.user.pk), [self.speaker.pk])
+
+    def test_list_renders_ring_entries_without_ids(self, ensure_worker):
+        self.client.get(f'/api/products/{self.cable.pk}/')
+        self.client.get(f'/api/products/{self.speaker.pk}/')
+        self.client.get('/api/products/0/')
+
+        response = self.client.get('/api/recently-viewed/')
+        self.assertEqual([item['product']['id'] for item in response.data], [self.speaker.pk, self.cable.pk])
+        self.assertEqual(set(response.data[0]), {'product', 'viewed_at'})
+
+    def test_views_modify_the_list_etag(self, ensure_worker):
+        etag = self.client.get('/api/recently-viewed/')['ETag']
+        response = self.client.get('/api/recently-viewed/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        self.client.get(f'/api/products/{self.speaker.pk}/')
+        response = self.client.get('/api/recently-viewed/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+class RollupWindowTests(RecommendationsTestCase):
+    def setUp(self):
+        super().setUp()
+        self.now = timezone.now()
+        self.week_ago = self.now - timedelta(days=7)
+        self.speaker, self.cable = self.make_product('Speaker'), self.make_product('Cable')
+
+    def interact(self, product, interaction_type, days_ago):
+        interaction = UserInteraction.objects.create(user=self.user, product=product, interaction_type=interaction_type)
+        UserInteraction.objects.filter(pk=interaction.pk).update(timestamp=self.now - timedelta(days=days_ago))
+
+    def test_empty_rollups_fall_back_to_interactions(self):
+        self.interact(self.speaker, 'view', 1)
+        self.interact(self.speaker, 'purchase', 2)
+        self.interact(self.cable, 'view', 3)
+        self.interact(self.cable, 'view', 10)
+
+        self.assertEqual(event_log.top_products(self.week_ago), [(self.speaker.pk, 2), (self.cable.pk, 1)])
+        self.assertEqual(event_log.user_product_counts(self.user.pk, self.week_ago), {
+            (self.speaker.pk, 'view'): 1, (self.speaker.pk, 'purchase'): 1, (self.cable.pk, 'view'): 1,
+        })
+
+    def test_rollups_answer_from_their_first_bucket(self):
+        # Before deploy: only in UserInteraction
+        self.interact(self.cable, 'view', 3)
+        # After deploy: logged and rolled up, and also in UserInteraction
+        self.interact(self.speaker, 'view', 0)
+        event_log.apply_rollups([(self.user.pk, self.speaker.pk, 'view', self.now, 5)])
+
+        self.assertEqual(event_log.top_products(self.week_ago), [(self.speaker.pk, 5), (self.cable.pk, 1)])
+        self.assertEqual(event_log.user_product_counts(self.user.pk, self.week_ago), {
+            (self.speaker.pk, 'view'): 5, (self.cable.pk, 'view'): 1,
+        })
+
+    def test_weights_and_type_filters(self):
+        event_log.apply_rollups([
+            (self.user.pk, self.speaker.pk, 'view', self.now, 3),
+            (self.user.pk, self.cable.pk, 'purchase', self.now, 1),
+        ])
+        self.assertEqual(
+            event_log.top_products(self.week_ago, weights={'purchase': 4}),
+            [(self.cable.pk, 4), (self.speaker.pk, 3)]
+        )
+        self.assertEqual(event_log.top_products(self.week_ago, interaction_types=['view']), [(self.speaker.pk, 3)])
+
+
+class EventQueueTests(RecommendationsTestCase):
+    def setUp(self):
+        super().setUp()
+        directory = tempfile.mkdtemp(dir=TEST_DATA_DIR)
+        settings_override = override_settings(
+            INTERACTION_LOG_DIR=os.path.join(directory, 'interactions'),
+            EVENT_QUEUE_PATH=os.path.join(directory, 'events.sqlite3'),
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.queue = event_queue.get_queue()
+        self.product = self.make_product()
+
+    def record_views(self, count):
+        with self.captureOnCommitCallbacks(execute=True):
+            event_log.record_events([(self.user.pk, self.product.pk, 'view', timezone.now())] * count)
+
+    def consume(self, *args):
+        call_command('consume_events', '--once', *args, stdout=io.StringIO())
+
+    def rolled_up_views(self):
+        return event_log.top_products(timezone.now() - timedelta(days=1))
+
+    def logged_lines(self):
+        return sum(1 for path in event_log.partitions() for _ in event_log.read_partition(path))
+
+    def test_failed_handler_leaves_the_batch_pending(self):
+        seen = []
+
+        def flaky(batch):
+            seen.append(batch.payloads)
+            if len(seen) == 1:
+                raise RuntimeError
+
+        self.queue.publish('test', [{'n': 1}, {'n': 2}])
+        with mock.patch.dict(event_queue._handlers, {'test': [flaky]}):
+            with self.assertRaises(RuntimeError):
+                self.queue.consume()
+            self.assertEqual(self.queue.lag()['pending'], 2)
+            self.assertEqual(self.queue.consume(), 2)
+        self.assertEqual(seen, [[{'n': 1}, {'n': 2}]] * 2)
+        self.assertEqual(self.queue.lag()['pending'], 0)
+
+    def test_redelivered_events_are_applied_once(self):
+        self.record_views(3)
+        self.consume()
+        self.queue.seek(event_queue.DEFAULT_CONSUMER, 1)
+        self.record_views(1)
+        self.consume()
+
+        self.assertEqual(self.rolled_up_views(), [(self.product.pk, 4)])
+        self.assertEqual(self.logged_lines(), 4)
+
+    def test_replay_with_reset_applied_rebuilds_the_rollups(self):
+        self.record_views(3)
+        self.consume()
+        ProductInteractionRollup.objects.all().delete()
+        UserInteractionRollup.objects.all().delete()
+        for path in event_log.partitions():
+            path.unlink()
+
+        # The stages' watermarks still cover the replayed events
+        self.consume('--from-offset', '1')
+        self.assertEqual(self.rolled_up_views(), [])
+
+        self.consume('--from-offset', '2', '--reset-applied')
+        self.assertEqual(self.rolled_up_views(), [(self.product.pk, 2)])
+        self.assertEqual(self.logged_lines(), 2)
+        self.assertEqual(
+            set(AppliedEventOffset.objects.values_list('offset', flat=True)), {3}
+        )
+
+
+class CartTotalsTests(RecommendationsTestCase):
+    def setUp(self):
+        super().setUp()
+        self.cart = Cart.objects.create(user=self.user)
+        self.speaker = self.make_product('Speaker', price=Decimal('20.00'))
+        self.cable = self.make_product('Cable', price=Decimal('2.50'))
+
+    def assertTotals(self, cart, item_count, subtotal):
+        cart.refresh_from_db()
+        self.assertEqual((cart.item_count, cart.subtotal), (item_count, Decimal(subtotal)))
+
+    def test_line_changes_recompute_the_cart(self):
+        line = CartItem.objects.create(cart=self.cart, product=self.speaker, quantity=2)
+        CartItem.objects.create(cart=self.cart, product=self.cable)
+        self.assertTotals(self.cart, 3, '42.50')
+
+        line.quantity = 1
+        line.save()
+        self.assertTotals(self.cart, 2, '22.50')
+        line.delete()
+        self.assertTotals(self.cart, 1, '2.50')
+
+    def test_moving_a_line_recomputes_both_carts(self):
+        other = Cart.objects.create(user=self.user)
+        CartItem.objects.create(cart=self.cart, product=self.cable)
+        line = CartItem.objects.get(cart=self.cart)
+        line.cart = other
+        line.save()
+        self.assertTotals(self.cart, 0, '0.00')
+        self.assertTotals(other, 1, '2.50')
+
+    def test_carts_are_repriced_only_when_the_price_changes(self):
+        CartItem.objects.create(cart=self.cart, product=self.speaker, quantity=2)
+        with mock.patch.object(cart_totals, 'reconcile_cart_totals') as reconcile:
+            self.speaker.name = 'Bass Speaker'
+            self.speaker.save()
+            self.speaker.save(update_fields=['name'])
+        reconcile.assert_not_called()
+
+        self.speaker.price = Decimal('15.00')
+        self.speaker.save()
+        self.assertTotals(self.cart, 2, '30.00')
+
+    def test_reconcile_command_repairs_drift(self):
+        CartItem.objects.create(cart=self.cart, product=self.cable, quantity=4)
+        Cart.objects.filter(pk=self.cart.pk).update(item_count=0, subtotal=0)
+        call_command('reconcile_cart_totals', '--cart', str(self.cart.pk), stdout=io.StringIO())
+        self.assertTotals(self.cart, 4, '10.00')
+
+
+class CartApiTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(self.user)
+        self.product = self.make_product(price=Decimal('2.50'), stock=3)
+
+    def post(self, action, **data):
+        return self.client.post(f'/api/cart/{action}/', data, format='json')
+
+    def test_add_returns_totals_from_the_write(self):
+        self.post('add', product_id=self.product.pk)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.post('add', product_id=self.product.pk, quantity=2)
+        # The cart lookup plus the service's increments and read-back
+        statements = [q for q in queries if 'SAVEPOINT' not in q['sql']]
+        self.assertLessEqual(len(statements), 4)
+        self.assertEqual(response.data['item_count'], 3)
+        self.assertEqual(response.data['subtotal'], '7.50')
+        self.assertEqual(response.data['item']['subtotal'], '7.50')
+
+    def test_writes_are_limited_to_stock(self):
+        self.post('add', product_id=self.product.pk, quantity=2)
+        self.assertEqual(self.post('add', product_id=self.product.pk, quantity=2).status_code, 400)
+        self.assertEqual(self.post('update_item', product_id=self.product.pk, quantity=4).status_code, 400)
+        self.assertEqual(CartItem.objects.get().quantity, 2)
+        self.assertEqual(self.post('add', product_id=0).status_code, 404)
+
+    def test_zero_quantity_removes_the_item(self):
+        self.post('add', product_id=self.product.pk)
+        response = self.post('update_item', product_id=self.product.pk, quantity=0)
+        self.assertEqual((response.data['item_count'], response.data['subtotal']), (0, '0.00'))
+        self.assertFalse(CartItem.objects.exists())
+        self.assertEqual(self.post('remove', product_id=self.product.pk).status_code, 404)
@@ -0,0 +1,216 @@
+"""
+In-process similarity index for products.
+
+Name and description tokens are summarised as MinHash signatures and banded
+for locality sensitive hashing, so a lookup only scores products that share
+at least one band with the query product.  Category and price buckets top up
+the candidate list when the text is too sparse to produce enough matches.
+Scoring runs vectorised over the candidate rows; nothing is serialized here.
+
+Each process builds its index in the background (see ``background``) and
+rebuilds it after the catalog cache version changes, at most once every
+``REBUILD_INTERVAL`` seconds; the previous index is served meanwhile.  Before
+the first build finishes, and for products added since the last one, lookups
+fall back to the nearest prices in the same category.
+"""
+import re
+import zlib
+
+import numpy as np
+from django.db.models import F
+from django.db.models.functions import Abs
+
+from .background import BackgroundBuilt
+from .cache_versions import CATALOG, get_version
+from .models import Product
+
+NUM_PERM = 32
+BANDS = 16
+ROWS_PER_BAND = NUM_PERM // BANDS
+
+# Mersenne prime keeps (a * h + b) inside int64 for 31-bit token hashes
+_PRIME = (1 << 31) - 1
+_EMPTY = np.uint32(_PRIME)
+
+WEIGHTS = {'category': 0.3, 'price': 0.2, 'name': 0.2, 'description': 0.3}
+MAX_BUCKET_CANDIDATES = 200
+
+# Catalog writes bump the version on every save; rebuild at most this often
+REBUILD_INTERVAL = 5 * 60
+
+_TOKEN_RE = re.compile(r'\w+')
+
+_rng = np.random.RandomState(42)
+_PERM_A = _rng.randint(1, _PRIME, size=NUM_PERM).astype(np.int64)
+_PERM_B = _rng.randint(0, _PRIME, size=NUM_PERM).astype(np.int64)
+
+
+def tokenize(text):
+    return set(_TOKEN_RE.findall((text or '').lower()))
+
+
+def minhash_many(token_sets):
+    """Return an (n, NUM_PERM) signature matrix for a list of token sets"""
+    lengths = np.fromiter((len(t) for t in token_sets), dtype=np.int64, count=len(token_sets))
+    sigs = np.full((len(token_sets), NUM_PERM), _EMPTY, dtype=np.uint32)
+    nonempty = lengths > 0
+    if not nonempty.any():
+        return sigs
+
+    hashes = np.fromiter(
+        (zlib.crc32(tok.encode('utf-8')) & _PRIME for tokens in token_sets for tok in tokens),
+        dtype=np.int64,
+        count=int(lengths.sum())
+    )
+    offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))[nonempty]
+    for p in range(NUM_PERM):
+        permuted = (_PERM_A[p] * hashes + _PERM_B[p]) % _PRIME
+        sigs[nonempty, p] = np.minimum.reduceat(permuted, offsets)
+    return sigs
+
+
+def price_buckets(prices):
+    # Log-scale buckets: 0-1, 1-3, 3-7, 7-15, ...
+    return np.log2(np.maximum(prices, 0) + 1).astype(np.int64)
+
+
+class _PostingColumn:
+    """Sorted view over one integer key column for range lookups"""
+
+    def __init__(self, keys):
+        self.order = np.argsort(keys, kind='stable')
+        self.keys = keys[self.order]
+
+    def lookup(self, key):
+        lo = np.searchsorted(self.keys, key, side='left')
+        hi = np.searchsorted(self.keys, key, side='right')
+        return self.order[lo:hi]
+
+
+class ProductTokenIndex:
+    def __init__(self, rows=(), version=None):
+        rows = list(rows)
+        self.version = version
+        self.ids = np.array([r['id'] for r in rows], dtype=np.int64)
+        self.position = {pid: i for i, pid in enumerate(self.ids.tolist())}
+        self.prices = np.array([float(r['price']) for r in rows], dtype=np.float64)
+
+        self.categories = np.array([r['category_id'] for r in rows], dtype=np.int64)
+
+        self.name_sigs = minhash_many([tokenize(r['name']) for r in rows])
+        self.desc_sigs = minhash_many([tokenize(r['description']) for r in rows])
+
+        # One posting column per (field, band); empty signatures get the
+        # sentinel key -1 so they never collide with real bands
+        self.band_keys = np.hstack([self._band_hashes(self.name_sigs),
+                                    self._band_hashes(self.desc_sigs)])
+        self.band_columns = [_PostingColumn(self.band_keys[:, c])
+                             for c in range(self.band_keys.shape[1])]
+
+        self.bucket_keys = self.categories * 1024 + price_buckets(self.prices)
+        self.bucket_column = _PostingColumn(self.bucket_keys)
+
+    @classmethod
+    def build(cls):
+        # Read the version first so changes made during the build make it stale
+        version = get_version(CATALOG)
+        rows = Product.objects.values('id', 'name', 'description', 'category_id', 'price').iterator()
+        return cls(rows, version)
+
+    @staticmethod
+    def _band_hashes(sigs):
+        bands = sigs.reshape(len(sigs), BANDS, ROWS_PER_BAND).astype(np.int64)
+        keys = np.zeros((len(sigs), BANDS), dtype=np.int64)
+        for r in range(ROWS_PER_BAND):
+            keys = keys * _PRIME + bands[:, :, r]
+        keys[sigs[:, 0] == _EMPTY] = -1
+        return keys
+
+    def candidates(self, i, n):
+        found = [column.lookup(key)
+                 for column, key in zip(self.band_columns, self.band_keys[i])
+                 if key != -1]
+        rows = np.unique(np.concatenate(found)) if found else np.empty(0, dtype=np.int64)
+
+        if len(rows) <= n:
+            # Text too sparse: top up from the same category and nearby prices
+            base = self.bucket_keys[i]
+            nearby = [self.bucket_column.lookup(key)[:MAX_BUCKET_CANDIDATES]
+                      for key in (base, base - 1, base + 1)]
+            rows = np.unique(np.concatenate([rows] + nearby))
+
+        return rows[rows != i]
+
+    def score(self, i, rows):
+        """Weighted similarity of row ``i`` against ``rows``"""
+        category = (self.categories[rows] == self.categories[i]).astype(np.float64)
+        price = 1.0 / (1.0 + np.abs(self.prices[rows] - self.prices[i]))
+        # Fraction of agreeing MinHash slots estimates Jaccard similarity;
+        # empty token sets never agree with anything
+        name = ((self.name_sigs[rows] == self.name_sigs[i]) &
+                (self.name_sigs[rows] != _EMPTY)).mean(axis=1)
+        desc = ((self.desc_sigs[rows] == self.desc_sigs[i]) &
+                (self.desc_sigs[rows] != _EMPTY)).mean(axis=1)
+        return (
+            WEIGHTS['category'] * category +
+            WEIGHTS['price'] * price +
+            WEIGHTS['name'] * name +
+            WEIGHTS['description'] * desc
+        )
+
+    def similar(self, product_id, n=5):
+        """Return up to ``n`` (product_id, similarity) pairs, best first"""
+        i = self.position.get(product_id)
+        if i is None:
+            return []
+
+        rows = self.candidates(i, n)
+        if not len(rows):
+            return []
+
+        scores = self.score(i, rows)
+        if len(rows) > n:
+            top = np.argpartition(-scores, n)[:n]
+        else:
+            top = np.arange(len(rows))
+        top = top[np.argsort(-scores[top], kind='stable')]
+        return [(int(self.ids[rows[t]]), float(scores[t])) for t in top]
+
+
+_index = BackgroundBuilt(
+    'product-token-index',
+    ProductTokenIndex.build,
+    lambda index: index.version != get_version(CATALOG),
+    min_interval=REBUILD_INTERVAL
+)
+
+
+def get_index():
+    """Return the process-wide index; None until its first build finishes"""
+    return _index.get()
+
+
+def similar_in_category(product_id, n=5):
+    """Score the same-category products closest in price, for products the index lacks"""
+    product = Product.objects.filter(pk=product_id).values('category_id', 'price').first()
+    if product is None:
+        return []
+    neighbours = (
+        Product.objects.filter(category_id=product['category_id'])
+        .exclude(pk=product_id)
+        .annotate(distance=Abs(F('price') - product['price']))
+        .order_by('distance', 'id')
+        .values_list('id', 'distance')[:n]
+    )
+    return [
+        (pk, WEIGHTS['category'] + WEIGHTS['price'] / (1.0 + float(distance)))
+        for pk, distance in neighbours
+    ]
+
+
+def similar(product_id, n=5):
+    """Return up to ``n`` (product_id, similarity) pairs, best first"""
+    index = get_index()
+    if index is None or product_id not in index.position:
+        return similar_in_category(product_id, n)
+    return index.similar(product_id, n)
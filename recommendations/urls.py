@@ -43,9 +43,4 @@ urlpatterns = [
     
     # Discounts and Recommendations
     path('discounts/', frontend_views.DiscountListView.as_view(), name='discounts'),
-    
-    # Additional frontend URLs
-    path('cart/', views.view_cart, name='view_cart'),
-    path('products/', views.product_list, name='product_list'),
-    path('products/<int:product_id>/', views.product_detail, name='product_detail'),
 ]
@@ -0,0 +1,100 @@
+"""
+Write-behind product view counting.
+
+``record_product_view`` only touches an in-process buffer, so product GETs
+never write to the database.  A background thread flushes the buffered
+(user, product) increments every few seconds (or sooner once the buffer
+fills up): missing ``ProductView`` rows are inserted, counts are applied
+with ``F('view_count') + n`` updates grouped by increment, the viewers'
+recently viewed rings are snapshotted to ``RecentlyViewed``, and the views
+go to the interaction event log as ``view`` events.  Buffering, retries and
+the exit flush come from ``common.buffered_counter``.
+"""
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import F
+
+from common.buffered_counter import BufferedCounter
+
+from . import aggregates, event_log, recently_viewed
+from .cache_versions import bump_product_views, bump_user
+from .models import Product, ProductView
+
+
+def _write_views(pending):
+    user_ids = {user_id for user_id, _ in pending}
+    product_ids = {product_id for _, product_id in pending}
+
+    # Drop views of products or users deleted since they were recorded
+    product_ids &= set(Product.objects.filter(pk__in=product_ids).values_list('pk', flat=True))
+    user_ids &= set(User.objects.filter(pk__in=user_ids).values_list('pk', flat=True))
+    pending = {
+        key: value for key, value in pending.items()
+        if key[0] in user_ids and key[1] in product_ids
+    }
+    if not pending:
+        return
+
+    def existing_views():
+        rows = ProductView.objects.filter(
+            user_id__in=user_ids, product_id__in=product_ids
+        ).values_list('pk', 'user_id', 'product_id')
+        return {(user_id, product_id): pk for pk, user_id, product_id in rows}
+
+    with transaction.atomic():
+        existing = existing_views()
+        missing = [key for key in pending if key not in existing]
+        if missing:
+            # Insert at zero so concurrent flushers can't double count;
+            # every pair then gets the same F() increment below
+            ProductView.objects.bulk_create(
+                [ProductView(user_id=u, product_id=p, view_count=0) for u, p in missing],
+                ignore_conflicts=True
+            )
+            existing = existing_views()
+
+        groups = {}
+        for key, (count, _, when) in pending.items():
+            group = groups.setdefault(count, [[], when])
+            group[0].append(existing[key])
+            group[1] = max(group[1], when)
+        for count, (pks, when) in groups.items():
+            ProductView.objects.filter(pk__in=pks).update(
+                view_count=F('view_count') + count,
+                last_viewed=when
+            )
+
+        recently_viewed.snapshot(user_ids)
+
+        new_views = {}
+        for _, product_id in missing:
+            new_views[product_id] = new_views.get(product_id, 0) + 1
+        aggregates.record_views_added(new_views)
+
+        # Published with the counts or not at all
+        event_log.record_events(
+            (user_id, product_id, 'view', when, count)
+            for (user_id, product_id), (count, _, when) in pending.items()
+        )
+
+        # Bulk writes skip the model signals.  Robust, so a cache error
+        # after the commit can't put the written views back in the buffer
+        def bump():
+            bump_user(*user_ids)
+            bump_product_views(*product_ids)
+        transaction.on_commit(bump, robust=True)
+
+
+_buffer = BufferedCounter('view-buffer', _write_views)
+
+
+def record_product_view(user_id, product_id):
+    try:
+        key = (int(user_id), int(product_id))
+    except (TypeError, ValueError):
+        return
+    _buffer.add(key)
+
+
+def flush_product_views():
+    return _buffer.flush()
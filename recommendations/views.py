@@ -3,10 +3,17 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django.shortcuts import get_object_or_404, render
-from django.db.models import Count, Q
+from django.http import JsonResponse
+from django.contrib.auth.decorators import login_required
+from django.db.models import Count, Q, F, Window
+from django.db.models.functions import RowNumber
 from django.utils import timezone
 from django.db import transaction
 from datetime import timedelta
+from collections import defaultdict
+
+from common import cart_service
+
 from .models import (
     Product, UserInteraction, Recommendation,
     ProductRating, ProductView, SearchHistory,
@@ -14,9 +21,24 @@ from .models import (
     ABTest, UserSegment, ProductCollection, PersonalizedDiscount,
     RecommendationExplanation, Category, ProductCollectionItem, Discount, Cart, CartItem
 )
+from . import attribute_index, event_log, recently_viewed, token_index
+from .ai_engine import AIRecommendationEngine
+from .autocomplete import MAX_SUGGESTIONS, complete
 from .engine import RecommendationEngine
+from .cache_versions import (
+    CATALOG, product_namespace, product_stats_namespace, recently_viewed_namespace,
+    recommendations_namespace
+)
+from .conditional import ConditionalGetMixin, NotModified
+from .fieldsets import CARD, SparseFieldsetMixin, SparseFieldsetViewMixin
+from .ingestion import ingest_interactions
+from .pagination import KeysetPagination
+from .facets import CATEGORY, TAG, parse_selections
+from .search import ProductSearchFilter, facet_counts, search_results
+from .streaming import chunked, get_id_list, ndjson_response
+from .view_buffer import record_product_view
 from .serializers import (
-    ProductSerializer, UserInteractionSerializer,
+    ProductSerializer, ProductCardSerializer, UserInteractionSerializer,
     RecommendationSerializer, ProductRatingSerializer,
     ProductViewSerializer, SearchHistorySerializer,
     ProductTagSerializer, PriceAlertSerializer, RecentlyViewedSerializer,
@@ -24,45 +46,126 @@ from .serializers import (
     ABTestSerializer, UserSegmentSerializer, ProductCollectionSerializer,
     PersonalizedDiscountSerializer, RecommendationExplanationSerializer,
     UserSegmentMembershipSerializer, ProductCollectionItemSerializer,
-    CategorySerializer
+    CategorySerializer, CartSerializer
 )
 
-class ProductViewSet(viewsets.ModelViewSet):
+class ProductViewSet(ConditionalGetMixin, SparseFieldsetViewMixin, viewsets.ModelViewSet):
     queryset = Product.objects.all()
     serializer_class = ProductSerializer
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
-    search_fields = ['name', 'description', 'category__name', 'tags__name']
+    filter_backends = [ProductSearchFilter, filters.OrderingFilter]
     ordering_fields = ['created_at', 'price', 'name', 'average_rating']
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    pagination_class = KeysetPagination
+    keyset_ordering = ('-created_at', '-id')
+    max_bulk_products = 500
+    bulk_chunk_size = 100
+    
+    def get_serializer_class(self):
+        # Products render in full unless the client asks for the compact card
+        if self.request.query_params.get('shape') == CARD:
+            return ProductCardSerializer
+        return super().get_serializer_class()
+    
+    def get_etag_namespaces(self):
+        # A single product only changes with its own versions (or the catalog's)
+        if self.action == 'retrieve':
+            product_id = self.kwargs[self.lookup_field]
+            return [CATALOG, product_namespace(product_id), product_stats_namespace(product_id)]
+        return super().get_etag_namespaces()
     
     def retrieve(self, request, *args, **kwargs):
-        instance = self.get_object()
+        # Only views of a product that exists are recorded, a 304 included
+        try:
+            response = super().retrieve(request, *args, **kwargs)
+        except NotModified:
+            self.record_view()
+            raise
+        self.record_view()
+        return response
+    
+    def record_view(self):
+        # Buffered and written in the background, so the GET itself never writes
+        user = self.request.user
+        if user.is_authenticated:
+            product_id = self.kwargs[self.lookup_url_kwarg or self.lookup_field]
+            record_product_view(user.pk, product_id)
+            recently_viewed.push(user.pk, product_id)
+    
+    @action(detail=False, methods=['get', 'post'])
+    def bulk(self, request):
+        # Detail payloads streamed as NDJSON in request order, one query per
+        # chunk so only a chunk of products is held at a time
+        try:
+            ids = get_id_list(request, 'ids', self.max_bulk_products)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
         
-        # Record product view and recently viewed
-        if request.user.is_authenticated:
-            # Update view count
-            view, created = ProductView.objects.get_or_create(
-                user=request.user,
-                product=instance,
-                defaults={'view_count': 1}
-            )
-            if not created:
-                view.view_count += 1
-                view.save()
-            
-            # Update recently viewed
-            RecentlyViewed.objects.get_or_create(
-                user=request.user,
-                product=instance
-            )
+        queryset = self.setup_queryset(Product.objects.all())
         
-        serializer = self.get_serializer(instance)
-        return Response(serializer.data)
+        def rows():
+            for chunk in chunked(ids, self.bulk_chunk_size):
+                products = queryset.in_bulk(chunk)
+                found = [products[pk] for pk in chunk if pk in products]
+                data = iter(self.get_serializer(found, many=True).data)
+                for pk in chunk:
+                    yield next(data) if pk in products else {'id': pk, 'error': 'Product not found'}
+        
+        return ndjson_response(rows())
+    
+    @action(detail=False, methods=['get'])
+    def autocomplete(self, request):
+        # Served from an in-memory prefix structure; never touches the database
+        prefix = request.query_params.get('q', '')
+        try:
+            limit = int(request.query_params.get('limit', 10))
+        except ValueError:
+            return Response({'error': 'limit must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+        limit = max(1, min(limit, MAX_SUGGESTIONS))
+        
+        suggestions = [
+            {'text': text, 'type': kind, 'id': object_id}
+            for text, kind, object_id in complete(prefix, limit)
+        ]
+        return Response({'query': prefix, 'suggestions': suggestions})
+    
+    @action(detail=False, methods=['get'])
+    def facets(self, request):
+        # Counts for every facet value over the search results, from the index
+        try:
+            selections = parse_selections(request.query_params)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        total, counts = facet_counts(request.query_params.get('search'), selections)
+        names = {
+            CATEGORY: dict(Category.objects.filter(
+                pk__in=list(counts.get(CATEGORY, ()))
+            ).values_list('pk', 'name')),
+            TAG: dict(ProductTag.objects.filter(
+                pk__in=list(counts.get(TAG, ()))
+            ).values_list('pk', 'name')),
+        }
+        facets = {}
+        for facet, values in counts.items():
+            facets[facet] = []
+            for value, count in sorted(values.items(), key=lambda item: (-item[1], str(item[0]))):
+                entry = {'value': value, 'count': count}
+                if facet in names:
+                    entry['name'] = names[facet].get(value)
+                facets[facet].append(entry)
+        return Response({'count': total, 'selected': selections, 'facets': facets})
     
     @action(detail=True, methods=['get'])
     def similar_products(self, request, pk=None):
+        # Precomputed similarities first; the token index covers products that
+        # have none yet.  Only the ranked products are loaded.
+        product = self.get_object()
         engine = RecommendationEngine()
-        similar_products = engine.get_similar_products(pk)
+        ranked = list(engine.get_similar_products(product.pk).values_list('product_b_id', flat=True))
+        if not ranked:
+            ranked = [pk for pk, _ in token_index.similar(product.pk)]
+        products = self.setup_queryset(Product.objects.all()).in_bulk(ranked)
+        similar_products = [products[pk] for pk in ranked if pk in products]
         serializer = self.get_serializer(similar_products, many=True)
         return Response(serializer.data)
     
@@ -96,11 +199,17 @@ class ProductViewSet(viewsets.ModelViewSet):
     
     @action(detail=True)
     def similar_by_attributes(self, request, pk=None):
+        # Ranked from the in-memory attribute index; only the results are loaded
         product = self.get_object()
-        similar_products = Product.objects.filter(
-            attributes__name__in=product.attributes.values_list('name', flat=True),
-            attributes__value__in=product.attributes.values_list('value', flat=True)
-        ).exclude(id=product.id).distinct()
+        try:
+            limit = int(request.query_params.get('limit', attribute_index.DEFAULT_LIMIT))
+        except ValueError:
+            return Response({'error': 'limit must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+        limit = max(1, min(limit, attribute_index.MAX_LIMIT))
+        
+        ranked = attribute_index.similar_product_ids(product.pk, limit)
+        products = self.setup_queryset(Product.objects.all()).in_bulk([pk for pk, _ in ranked])
+        similar_products = [products[pk] for pk, _ in ranked if pk in products]
         
         serializer = self.get_serializer(similar_products, many=True)
         return Response(serializer.data)
@@ -111,12 +220,13 @@ class ProductViewSet(viewsets.ModelViewSet):
         # You would need to implement price tracking in a separate model
         return Response({"message": "Price history feature coming soon"})
 
-class CategoryViewSet(viewsets.ModelViewSet):
+class CategoryViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    etag_namespaces = (CATALOG,)
 
-class ProductCollectionViewSet(viewsets.ModelViewSet):
+class ProductCollectionViewSet(ConditionalGetMixin, SparseFieldsetViewMixin, viewsets.ModelViewSet):
     queryset = ProductCollection.objects.all()
     serializer_class = ProductCollectionSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
@@ -163,14 +273,56 @@ class ProductCollectionViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(collection)
         return Response(serializer.data)
 
-class RecommendationViewSet(viewsets.ModelViewSet):
+class RecommendationViewSet(ConditionalGetMixin, SparseFieldsetViewMixin, viewsets.ModelViewSet):
     queryset = Recommendation.objects.all()
     serializer_class = RecommendationSerializer
     permission_classes = [IsAuthenticated]
+    etag_per_user = True
+    pagination_class = KeysetPagination
+    keyset_ordering = ('-created_at', '-id')
+    max_batch_users = 1000
+    
+    def get_etag_namespaces(self):
+        return super().get_etag_namespaces() + [recommendations_namespace(self.request.user.pk)]
     
     def get_queryset(self):
         return Recommendation.objects.filter(user=self.request.user)
     
+    @action(detail=False, methods=['get', 'post'], permission_classes=[permissions.IsAdminUser])
+    def batch(self, request):
+        # Each user's top-N precomputed recommendations, one NDJSON line per user
+        try:
+            user_ids = get_id_list(request, 'user_ids', self.max_batch_users)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            limit = int(request.data.get('limit') or request.query_params.get('limit') or 10)
+        except (TypeError, ValueError):
+            return Response({'error': 'limit must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+        limit = max(1, min(limit, 50))
+        
+        ranked = self.setup_queryset(Recommendation.objects.all()).annotate(
+            rank=Window(
+                expression=RowNumber(),
+                partition_by=[F('user_id')],
+                order_by=[F('score').desc(), F('id').asc()]
+            )
+        )
+        
+        def rows():
+            for chunk in chunked(user_ids, 100):
+                recommendations = list(
+                    ranked.filter(user_id__in=chunk, rank__lte=limit).order_by('user_id', 'rank')
+                )
+                data = self.get_serializer(recommendations, many=True).data
+                by_user = defaultdict(list)
+                for recommendation, item in zip(recommendations, data):
+                    by_user[recommendation.user_id].append(item)
+                for user_id in chunk:
+                    yield {'user_id': user_id, 'recommendations': by_user[user_id]}
+        
+        return ndjson_response(rows())
+    
     @action(detail=False, methods=['get'])
     def personalized(self, request):
         engine = RecommendationEngine()
@@ -197,16 +349,19 @@ class RecommendationViewSet(viewsets.ModelViewSet):
     
     @action(detail=False, methods=['get'])
     def trending(self, request):
-        # Get trending products based on views and interactions in the last 7 days
+        # Get trending products based on views and interactions in the last 7 days,
+        # read from the hourly/daily rollups rather than the raw tables
         last_week = timezone.now() - timedelta(days=7)
-        trending_products = Product.objects.filter(
-            Q(views__last_viewed__gte=last_week) |
-            Q(userinteraction__timestamp__gte=last_week)
-        ).annotate(
-            activity_count=Count('views') + Count('userinteraction')
-        ).order_by('-activity_count')[:10]
+        top_ids = [product_id for product_id, _ in event_log.top_products(last_week, n=10)]
+        serializer_class = ProductSerializer
+        if request.query_params.get('shape') == CARD:
+            serializer_class = ProductCardSerializer
+        context = self.get_serializer_context()
+        
+        products = serializer_class(context=context).setup_queryset(Product.objects.all()).in_bulk(top_ids)
+        trending_products = [products[pk] for pk in top_ids if pk in products]
         
-        serializer = ProductSerializer(trending_products, many=True)
+        serializer = serializer_class(trending_products, many=True, context=context)
         return Response(serializer.data)
     
     @action(detail=False, methods=['get'])
@@ -219,10 +374,10 @@ class RecommendationViewSet(viewsets.ModelViewSet):
             )
         
         # Get recommendations based on category and user's past interactions
-        recommendations = Recommendation.objects.filter(
+        recommendations = self.setup_queryset(Recommendation.objects.filter(
             user=request.user,
             product__category_id=category_id
-        ).order_by('-score')[:10]
+        )).order_by('-score')[:10]
         
         serializer = self.get_serializer(recommendations, many=True)
         return Response(serializer.data)
@@ -231,13 +386,41 @@ class UserInteractionViewSet(viewsets.ModelViewSet):
     queryset = UserInteraction.objects.all()
     serializer_class = UserInteractionSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
+    keyset_ordering = ('-timestamp', '-id')
+    max_batch_events = 5000
     
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
+    
+    @action(detail=False, methods=['post'])
+    def batch(self, request):
+        # Accepts a JSON array of events, or {"events": [...]}
+        events = request.data.get('events') if isinstance(request.data, dict) else request.data
+        if not isinstance(events, list) or not events:
+            return Response(
+                {'error': 'events must be a non-empty list'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(events) > self.max_batch_events:
+            return Response(
+                {'error': f'At most {self.max_batch_events} events per request'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        results = ingest_interactions(request.user, events)
+        created = sum(1 for result in results if result['status'] == 'created')
+        return Response({
+            'created': created,
+            'failed': len(results) - created,
+            'results': results
+        })
 
 class ProductViewViewSet(viewsets.ReadOnlyModelViewSet):
     serializer_class = ProductViewSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
+    keyset_ordering = ('-last_viewed', '-id')
     
     def get_queryset(self):
         return ProductView.objects.filter(user=self.request.user)
@@ -245,18 +428,19 @@ class ProductViewViewSet(viewsets.ReadOnlyModelViewSet):
 class SearchHistoryViewSet(viewsets.ModelViewSet):
     serializer_class = SearchHistorySerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
+    keyset_ordering = ('-timestamp', '-id')
     
     def get_queryset(self):
         return SearchHistory.objects.filter(user=self.request.user)
     
     def perform_create(self, serializer):
-        serializer.save(
-            user=self.request.user,
-            results_count=Product.objects.filter(
-                Q(name__icontains=serializer.validated_data['query']) |
-                Q(description__icontains=serializer.validated_data['query'])
-            ).count()
+        # Usually already cached by the search this entry records
+        category = serializer.validated_data.get('category')
+        _, results_count = search_results(
+            serializer.validated_data['query'], limit=0, category=category.pk if category else None
         )
+        serializer.save(user=self.request.user, results_count=results_count)
 
 class ProductTagViewSet(viewsets.ModelViewSet):
     queryset = ProductTag.objects.all()
@@ -286,24 +470,44 @@ class PriceAlertViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(alerts, many=True)
         return Response(serializer.data)
 
-class RecentlyViewedViewSet(viewsets.ReadOnlyModelViewSet):
+class RecentlyViewedViewSet(ConditionalGetMixin, SparseFieldsetViewMixin, viewsets.ReadOnlyModelViewSet):
     serializer_class = RecentlyViewedSerializer
     permission_classes = [IsAuthenticated]
+    etag_per_user = True
     
     def get_queryset(self):
         return RecentlyViewed.objects.filter(user=self.request.user)
+    
+    def get_etag_namespaces(self):
+        return super().get_etag_namespaces() + [recently_viewed_namespace(self.request.user.pk)]
+    
+    def list(self, request, *args, **kwargs):
+        # Served from the cached ring; products are hydrated with one in_bulk
+        self.check_not_modified()
+        queryset = Product.objects.all()
+        product_field = self.get_serializer().fields.get('product')
+        if isinstance(product_field, SparseFieldsetMixin):
+            queryset = product_field.setup_queryset(queryset)
+        items = recently_viewed.get_recently_viewed(request.user.pk, queryset=queryset)
+        serializer = self.get_serializer(items, many=True)
+        return Response(serializer.data)
 
-class SeasonalRecommendationViewSet(viewsets.ReadOnlyModelViewSet):
+class SeasonalRecommendationViewSet(ConditionalGetMixin, SparseFieldsetViewMixin, viewsets.ReadOnlyModelViewSet):
     queryset = SeasonalRecommendation.objects.filter(is_active=True)
     serializer_class = SeasonalRecommendationSerializer
     
+    def get_etag_parts(self):
+        # Which seasons are current also changes with the date
+        return super().get_etag_parts() + [timezone.now().date()]
+    
     @action(detail=False)
     def current(self, request):
+        self.check_not_modified()
         today = timezone.now().date()
-        current_seasons = self.queryset.filter(
+        current_seasons = self.setup_queryset(self.queryset.filter(
             start_date__lte=today,
             end_date__gte=today
-        ).order_by('-priority')
+        )).order_by('-priority')
         serializer = self.get_serializer(current_seasons, many=True)
         return Response(serializer.data)
 
@@ -360,7 +564,7 @@ class ABTestViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(test)
         return Response(serializer.data)
 
-class UserSegmentViewSet(viewsets.ModelViewSet):
+class UserSegmentViewSet(SparseFieldsetViewMixin, viewsets.ModelViewSet):
     queryset = UserSegment.objects.all()
     serializer_class = UserSegmentSerializer
     
@@ -392,7 +596,7 @@ class UserSegmentViewSet(viewsets.ModelViewSet):
         # In reality, you would evaluate the user against segment.rules
         return random.random()  # For demo purposes
 
-class PersonalizedDiscountViewSet(viewsets.ModelViewSet):
+class PersonalizedDiscountViewSet(SparseFieldsetViewMixin, viewsets.ModelViewSet):
     queryset = PersonalizedDiscount.objects.all()
     serializer_class = PersonalizedDiscountSerializer
     
@@ -406,13 +610,13 @@ class PersonalizedDiscountViewSet(viewsets.ModelViewSet):
             user=request.user
         ).values_list('segment_id', flat=True)
         
-        discounts = self.queryset.filter(
+        discounts = self.setup_queryset(self.queryset).filter(
             Q(segments__id__in=user_segments) |
             Q(segments__isnull=True),
             is_active=True,
             start_date__lte=now,
             end_date__gte=now,
-            current_uses__lt=models.F('max_uses')
+            current_uses__lt=F('max_uses')
         ).distinct()
         
         serializer = self.get_serializer(discounts, many=True)
@@ -457,91 +661,100 @@ class PersonalizedDiscountViewSet(viewsets.ModelViewSet):
             'savings': original_price - discounted_price
         })
 
-from django.shortcuts import get_object_or_404
-from django.http import JsonResponse
-from django.contrib.auth.decorators import login_required
-from django.views.decorators.http import require_POST
-from django.shortcuts import redirect
-from django.contrib import messages
-import json
-from .models import Product, Cart, CartItem
-
-@login_required
-@require_POST
-def add_to_cart(request, product_id):
-    product = get_object_or_404(Product, id=product_id)
-    cart, created = Cart.objects.get_or_create(user=request.user)
-    
-    cart_item, created = CartItem.objects.get_or_create(
-        cart=cart,
-        product=product,
-        defaults={'quantity': 1}
-    )
-    
-    if not created:
-        cart_item.quantity += 1
-        cart_item.save()
-    
-    if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
-        return JsonResponse({
-            'success': True,
-            'message': f'{product.name} added to cart',
-            'cart_total': float(cart.get_total()),
-            'cart_items': cart.get_items_count()
-        })
+class CartViewSet(viewsets.ReadOnlyModelViewSet):
+    serializer_class = CartSerializer
+    permission_classes = [IsAuthenticated]
     
-    messages.success(request, f'{product.name} added to cart')
-    return redirect('products')
-
-@login_required
-@require_POST
-def remove_from_cart(request, item_id):
-    cart_item = get_object_or_404(CartItem, id=item_id, cart__user=request.user)
-    cart = cart_item.cart
-    cart_item.delete()
+    def get_queryset(self):
+        return Cart.objects.filter(user=self.request.user).prefetch_related('items__product')
     
-    return JsonResponse({
-        'success': True,
-        'message': 'Item removed from cart',
-        'cart_total': float(cart.get_total()),
-        'cart_items': cart.get_items_count()
-    })
-
-@login_required
-@require_POST
-def update_cart_quantity(request, item_id):
-    cart_item = get_object_or_404(CartItem, id=item_id, cart__user=request.user)
+    def get_cart(self, create=False):
+        cart = Cart.objects.filter(user=self.request.user).order_by('pk').first()
+        if cart is None and create:
+            cart = Cart.objects.create(user=self.request.user)
+        return cart
     
-    try:
-        data = json.loads(request.body)
-        quantity = int(data.get('quantity', 1))
-        if quantity < 1:
-            return JsonResponse({
-                'success': False,
-                'error': 'Quantity must be at least 1'
-            }, status=400)
+    def cart_response(self, cart, line=None):
+        # Totals come back from the write itself; the cart is not re-serialized.
+        # Amounts are strings, as CartSerializer renders them
+        return Response({
+            'cart_id': cart.pk,
+            'item_count': cart.item_count,
+            'subtotal': f'{cart.subtotal:.2f}',
+            'item': line and {
+                'id': line.item_id,
+                'product_id': line.product_id,
+                'quantity': line.quantity,
+                'subtotal': f'{line.total:.2f}',
+            },
+        })
+    
+    @action(detail=False, methods=['post'])
+    def add(self, request):
+        try:
+            product_id = int(request.data.get('product_id'))
+            quantity = int(request.data.get('quantity', 1))
+        except (TypeError, ValueError):
+            return Response(
+                {'error': 'product_id and quantity must be integers'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         
-        cart_item.quantity = quantity
-        cart_item.save()
+        cart = self.get_cart(create=True)
+        try:
+            line = cart_service.add_item(cart, product_id, quantity, limit_to_stock=True)
+        except Product.DoesNotExist:
+            return Response({'error': 'Product not found'}, status=status.HTTP_404_NOT_FOUND)
+        except cart_service.CartError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return self.cart_response(cart, line)
+    
+    @action(detail=False, methods=['post'])
+    def update_item(self, request):
+        """Set an item's quantity (``item_id`` or ``product_id``); 0 removes it"""
+        try:
+            lookup = self.item_lookup(request)
+            quantity = int(request.data.get('quantity'))
+        except (TypeError, ValueError):
+            return Response(
+                {'error': 'item_id or product_id, and quantity, must be integers'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         
-        cart = cart_item.cart
-        return JsonResponse({
-            'success': True,
-            'message': 'Cart updated',
-            'cart_total': float(cart.get_total()),
-            'cart_items': cart.get_items_count()
-        })
-    except (ValueError, json.JSONDecodeError):
-        return JsonResponse({
-            'success': False,
-            'error': 'Invalid quantity'
-        }, status=400)
-
-from django.shortcuts import get_object_or_404
-from django.http import JsonResponse
-from django.contrib.auth.decorators import login_required
-from .models import Product, Cart, CartItem
-from .ai_engine import AIRecommendationEngine
+        cart = self.get_cart()
+        try:
+            if cart is None:
+                raise CartItem.DoesNotExist
+            line = cart_service.set_quantity(cart, quantity, limit_to_stock=True, **lookup)
+        except CartItem.DoesNotExist:
+            return Response({'error': 'Item not found in cart'}, status=status.HTTP_404_NOT_FOUND)
+        except cart_service.CartError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return self.cart_response(cart, line)
+    
+    @action(detail=False, methods=['post'])
+    def remove(self, request):
+        try:
+            lookup = self.item_lookup(request)
+        except (TypeError, ValueError):
+            return Response(
+                {'error': 'item_id or product_id must be an integer'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        cart = self.get_cart()
+        try:
+            if cart is None:
+                raise CartItem.DoesNotExist
+            cart_service.remove_item(cart, **lookup)
+        except CartItem.DoesNotExist:
+            return Response({'error': 'Item not found in cart'}, status=status.HTTP_404_NOT_FOUND)
+        return self.cart_response(cart)
+    
+    def item_lookup(self, request):
+        if request.data.get('item_id') is not None:
+            return {'item_id': int(request.data['item_id'])}
+        return {'product_id': int(request.data.get('product_id'))}
 
 @login_required
 def get_recommendations(request):
@@ -564,4336 +777,3 @@ def get_recommendations(request):
             'explanation': 'Recommended based on your interests and similar users',
         })
     return JsonResponse({'recommendations': recommendations})
-
-@login_required
-def add_to_cart(request, product_id):
-    if request.method == 'POST':
-        product = get_object_or_404(Product, id=product_id)
-        cart, created = Cart.objects.get_or_create(user=request.user)
-        
-        cart_item, created = CartItem.objects.get_or_create(
-            cart=cart,
-            product=product,
-            defaults={'quantity': 1}
-        )
-        
-        if not created:
-            cart_item.quantity += 1
-            cart_item.save()
-        
-        # Calculate cart total
-        cart_total = sum(item.product.price * item.quantity for item in cart.items.all())
-        cart_items = cart.items.count()
-        
-        return JsonResponse({
-            'message': f'Added {product.name} to cart',
-            'cart_total': f'{cart_total:.2f}',
-            'cart_items': cart_items
-        })
-    
-    return JsonResponse({'error': 'Invalid request method'}, status=400)
-
-@login_required
-def remove_from_cart(request, product_id):
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Item removed from cart',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-@login_required
-def update_cart_item(request, product_id):
-    try:
-        quantity = int(request.POST.get('quantity', 1))
-    except ValueError:
-        return JsonResponse({'error': 'Invalid quantity'}, status=400)
-    
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    
-    if quantity > 0:
-        cart_item.quantity = quantity
-        cart_item.save()
-    else:
-        cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Cart updated',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-from django.shortcuts import get_object_or_404
-from django.http import JsonResponse
-from django.contrib.auth.decorators import login_required
-from .models import Product, Cart, CartItem
-
-@login_required
-def get_recommendations(request):
-    # Simple recommendation: return 4 random products
-    products = Product.objects.order_by('?')[:4]
-    recommendations = []
-    for product in products:
-        recommendations.append({
-            'id': product.id,
-            'name': product.name,
-            'price': str(product.price),
-            'description': product.description,
-            'image_url': product.image.url if product.image else None,
-        })
-    return JsonResponse({'recommendations': recommendations})
-
-@login_required
-def add_to_cart(request, product_id):
-    if request.method == 'POST':
-        product = get_object_or_404(Product, id=product_id)
-        cart, created = Cart.objects.get_or_create(user=request.user)
-        
-        cart_item, created = CartItem.objects.get_or_create(
-            cart=cart,
-            product=product,
-            defaults={'quantity': 1}
-        )
-        
-        if not created:
-            cart_item.quantity += 1
-            cart_item.save()
-        
-        # Calculate cart total
-        cart_total = sum(item.product.price * item.quantity for item in cart.items.all())
-        cart_items = cart.items.count()
-        
-        return JsonResponse({
-            'message': f'Added {product.name} to cart',
-            'cart_total': f'{cart_total:.2f}',
-            'cart_items': cart_items
-        })
-    
-    return JsonResponse({'error': 'Invalid request method'}, status=400)
-
-@login_required
-def remove_from_cart(request, product_id):
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Item removed from cart',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-@login_required
-def update_cart_item(request, product_id):
-    try:
-        quantity = int(request.POST.get('quantity', 1))
-    except ValueError:
-        return JsonResponse({'error': 'Invalid quantity'}, status=400)
-    
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    
-    if quantity > 0:
-        cart_item.quantity = quantity
-        cart_item.save()
-    else:
-        cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Cart updated',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-from django.shortcuts import get_object_or_404
-from django.http import JsonResponse
-from django.contrib.auth.decorators import login_required
-from .models import Product, Cart, CartItem
-
-@login_required
-def get_recommendations(request):
-    # Simple recommendation: return 4 random products
-    products = Product.objects.order_by('?')[:4]
-    recommendations = []
-    for product in products:
-        recommendations.append({
-            'id': product.id,
-            'name': product.name,
-            'price': str(product.price),
-            'description': product.description,
-            'image_url': product.image.url if product.image else None,
-        })
-    return JsonResponse({'recommendations': recommendations})
-
-@login_required
-def add_to_cart(request, product_id):
-    if request.method == 'POST':
-        product = get_object_or_404(Product, id=product_id)
-        cart, created = Cart.objects.get_or_create(user=request.user)
-        
-        cart_item, created = CartItem.objects.get_or_create(
-            cart=cart,
-            product=product,
-            defaults={'quantity': 1}
-        )
-        
-        if not created:
-            cart_item.quantity += 1
-            cart_item.save()
-        
-        # Calculate cart total
-        cart_total = sum(item.product.price * item.quantity for item in cart.items.all())
-        cart_items = cart.items.count()
-        
-        return JsonResponse({
-            'message': f'Added {product.name} to cart',
-            'cart_total': f'{cart_total:.2f}',
-            'cart_items': cart_items
-        })
-    
-    return JsonResponse({'error': 'Invalid request method'}, status=400)
-
-@login_required
-def remove_from_cart(request, product_id):
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Item removed from cart',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-@login_required
-def update_cart_item(request, product_id):
-    try:
-        quantity = int(request.POST.get('quantity', 1))
-    except ValueError:
-        return JsonResponse({'error': 'Invalid quantity'}, status=400)
-    
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    
-    if quantity > 0:
-        cart_item.quantity = quantity
-        cart_item.save()
-    else:
-        cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Cart updated',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-from django.shortcuts import get_object_or_404
-from django.http import JsonResponse
-from django.contrib.auth.decorators import login_required
-from .models import Product, Cart, CartItem
-
-@login_required
-def get_recommendations(request):
-    # Simple recommendation: return 4 random products
-    products = Product.objects.order_by('?')[:4]
-    recommendations = []
-    for product in products:
-        recommendations.append({
-            'id': product.id,
-            'name': product.name,
-            'price': str(product.price),
-            'description': product.description,
-            'image_url': product.image.url if product.image else None,
-        })
-    return JsonResponse({'recommendations': recommendations})
-
-@login_required
-def add_to_cart(request, product_id):
-    if request.method == 'POST':
-        product = get_object_or_404(Product, id=product_id)
-        cart, created = Cart.objects.get_or_create(user=request.user)
-        
-        cart_item, created = CartItem.objects.get_or_create(
-            cart=cart,
-            product=product,
-            defaults={'quantity': 1}
-        )
-        
-        if not created:
-            cart_item.quantity += 1
-            cart_item.save()
-        
-        # Calculate cart total
-        cart_total = sum(item.product.price * item.quantity for item in cart.items.all())
-        cart_items = cart.items.count()
-        
-        return JsonResponse({
-            'message': f'Added {product.name} to cart',
-            'cart_total': f'{cart_total:.2f}',
-            'cart_items': cart_items
-        })
-    
-    return JsonResponse({'error': 'Invalid request method'}, status=400)
-
-@login_required
-def remove_from_cart(request, product_id):
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Item removed from cart',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-@login_required
-def update_cart_item(request, product_id):
-    try:
-        quantity = int(request.POST.get('quantity', 1))
-    except ValueError:
-        return JsonResponse({'error': 'Invalid quantity'}, status=400)
-    
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    
-    if quantity > 0:
-        cart_item.quantity = quantity
-        cart_item.save()
-    else:
-        cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Cart updated',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-from django.shortcuts import get_object_or_404
-from django.http import JsonResponse
-from django.contrib.auth.decorators import login_required
-from .models import Product, Cart, CartItem
-
-@login_required
-def get_recommendations(request):
-    # Simple recommendation: return 4 random products
-    products = Product.objects.order_by('?')[:4]
-    recommendations = []
-    for product in products:
-        recommendations.append({
-            'id': product.id,
-            'name': product.name,
-            'price': str(product.price),
-            'description': product.description,
-            'image_url': product.image.url if product.image else None,
-        })
-    return JsonResponse({'recommendations': recommendations})
-
-@login_required
-def add_to_cart(request, product_id):
-    if request.method == 'POST':
-        product = get_object_or_404(Product, id=product_id)
-        cart, created = Cart.objects.get_or_create(user=request.user)
-        
-        cart_item, created = CartItem.objects.get_or_create(
-            cart=cart,
-            product=product,
-            defaults={'quantity': 1}
-        )
-        
-        if not created:
-            cart_item.quantity += 1
-            cart_item.save()
-        
-        # Calculate cart total
-        cart_total = sum(item.product.price * item.quantity for item in cart.items.all())
-        cart_items = cart.items.count()
-        
-        return JsonResponse({
-            'message': f'Added {product.name} to cart',
-            'cart_total': f'{cart_total:.2f}',
-            'cart_items': cart_items
-        })
-    
-    return JsonResponse({'error': 'Invalid request method'}, status=400)
-
-@login_required
-def remove_from_cart(request, product_id):
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Item removed from cart',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-@login_required
-def update_cart_item(request, product_id):
-    try:
-        quantity = int(request.POST.get('quantity', 1))
-    except ValueError:
-        return JsonResponse({'error': 'Invalid quantity'}, status=400)
-    
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    
-    if quantity > 0:
-        cart_item.quantity = quantity
-        cart_item.save()
-    else:
-        cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Cart updated',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-from django.shortcuts import get_object_or_404
-from django.http import JsonResponse
-from django.contrib.auth.decorators import login_required
-from .models import Product, Cart, CartItem
-
-@login_required
-def get_recommendations(request):
-    # Simple recommendation: return 4 random products
-    products = Product.objects.order_by('?')[:4]
-    recommendations = []
-    for product in products:
-        recommendations.append({
-            'id': product.id,
-            'name': product.name,
-            'price': str(product.price),
-            'description': product.description,
-            'image_url': product.image.url if product.image else None,
-        })
-    return JsonResponse({'recommendations': recommendations})
-
-@login_required
-def add_to_cart(request, product_id):
-    if request.method == 'POST':
-        product = get_object_or_404(Product, id=product_id)
-        cart, created = Cart.objects.get_or_create(user=request.user)
-        
-        cart_item, created = CartItem.objects.get_or_create(
-            cart=cart,
-            product=product,
-            defaults={'quantity': 1}
-        )
-        
-        if not created:
-            cart_item.quantity += 1
-            cart_item.save()
-        
-        # Calculate cart total
-        cart_total = sum(item.product.price * item.quantity for item in cart.items.all())
-        cart_items = cart.items.count()
-        
-        return JsonResponse({
-            'message': f'Added {product.name} to cart',
-            'cart_total': f'{cart_total:.2f}',
-            'cart_items': cart_items
-        })
-    
-    return JsonResponse({'error': 'Invalid request method'}, status=400)
-
-@login_required
-def remove_from_cart(request, product_id):
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Item removed from cart',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-@login_required
-def update_cart_item(request, product_id):
-    try:
-        quantity = int(request.POST.get('quantity', 1))
-    except ValueError:
-        return JsonResponse({'error': 'Invalid quantity'}, status=400)
-    
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    
-    if quantity > 0:
-        cart_item.quantity = quantity
-        cart_item.save()
-    else:
-        cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Cart updated',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-from django.shortcuts import get_object_or_404
-from django.http import JsonResponse
-from django.contrib.auth.decorators import login_required
-from .models import Product, Cart, CartItem
-
-@login_required
-def get_recommendations(request):
-    # Simple recommendation: return 4 random products
-    products = Product.objects.order_by('?')[:4]
-    recommendations = []
-    for product in products:
-        recommendations.append({
-            'id': product.id,
-            'name': product.name,
-            'price': str(product.price),
-            'description': product.description,
-            'image_url': product.image.url if product.image else None,
-        })
-    return JsonResponse({'recommendations': recommendations})
-
-@login_required
-def add_to_cart(request, product_id):
-    if request.method == 'POST':
-        product = get_object_or_404(Product, id=product_id)
-        cart, created = Cart.objects.get_or_create(user=request.user)
-        
-        cart_item, created = CartItem.objects.get_or_create(
-            cart=cart,
-            product=product,
-            defaults={'quantity': 1}
-        )
-        
-        if not created:
-            cart_item.quantity += 1
-            cart_item.save()
-        
-        # Calculate cart total
-        cart_total = sum(item.product.price * item.quantity for item in cart.items.all())
-        cart_items = cart.items.count()
-        
-        return JsonResponse({
-            'message': f'Added {product.name} to cart',
-            'cart_total': f'{cart_total:.2f}',
-            'cart_items': cart_items
-        })
-    
-    return JsonResponse({'error': 'Invalid request method'}, status=400)
-
-@login_required
-def remove_from_cart(request, product_id):
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Item removed from cart',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-@login_required
-def update_cart_item(request, product_id):
-    try:
-        quantity = int(request.POST.get('quantity', 1))
-    except ValueError:
-        return JsonResponse({'error': 'Invalid quantity'}, status=400)
-    
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    
-    if quantity > 0:
-        cart_item.quantity = quantity
-        cart_item.save()
-    else:
-        cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Cart updated',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-from django.shortcuts import get_object_or_404
-from django.http import JsonResponse
-from django.contrib.auth.decorators import login_required
-from .models import Product, Cart, CartItem
-
-@login_required
-def get_recommendations(request):
-    # Simple recommendation: return 4 random products
-    products = Product.objects.order_by('?')[:4]
-    recommendations = []
-    for product in products:
-        recommendations.append({
-            'id': product.id,
-            'name': product.name,
-            'price': str(product.price),
-            'description': product.description,
-            'image_url': product.image.url if product.image else None,
-        })
-    return JsonResponse({'recommendations': recommendations})
-
-@login_required
-def add_to_cart(request, product_id):
-    if request.method == 'POST':
-        product = get_object_or_404(Product, id=product_id)
-        cart, created = Cart.objects.get_or_create(user=request.user)
-        
-        cart_item, created = CartItem.objects.get_or_create(
-            cart=cart,
-            product=product,
-            defaults={'quantity': 1}
-        )
-        
-        if not created:
-            cart_item.quantity += 1
-            cart_item.save()
-        
-        # Calculate cart total
-        cart_total = sum(item.product.price * item.quantity for item in cart.items.all())
-        cart_items = cart.items.count()
-        
-        return JsonResponse({
-            'message': f'Added {product.name} to cart',
-            'cart_total': f'{cart_total:.2f}',
-            'cart_items': cart_items
-        })
-    
-    return JsonResponse({'error': 'Invalid request method'}, status=400)
-
-@login_required
-def remove_from_cart(request, product_id):
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Item removed from cart',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-@login_required
-def update_cart_item(request, product_id):
-    try:
-        quantity = int(request.POST.get('quantity', 1))
-    except ValueError:
-        return JsonResponse({'error': 'Invalid quantity'}, status=400)
-    
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    
-    if quantity > 0:
-        cart_item.quantity = quantity
-        cart_item.save()
-    else:
-        cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Cart updated',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-from django.shortcuts import get_object_or_404
-from django.http import JsonResponse
-from django.contrib.auth.decorators import login_required
-from .models import Product, Cart, CartItem
-
-@login_required
-def get_recommendations(request):
-    # Simple recommendation: return 4 random products
-    products = Product.objects.order_by('?')[:4]
-    recommendations = []
-    for product in products:
-        recommendations.append({
-            'id': product.id,
-            'name': product.name,
-            'price': str(product.price),
-            'description': product.description,
-            'image_url': product.image.url if product.image else None,
-        })
-    return JsonResponse({'recommendations': recommendations})
-
-@login_required
-def add_to_cart(request, product_id):
-    if request.method == 'POST':
-        product = get_object_or_404(Product, id=product_id)
-        cart, created = Cart.objects.get_or_create(user=request.user)
-        
-        cart_item, created = CartItem.objects.get_or_create(
-            cart=cart,
-            product=product,
-            defaults={'quantity': 1}
-        )
-        
-        if not created:
-            cart_item.quantity += 1
-            cart_item.save()
-        
-        # Calculate cart total
-        cart_total = sum(item.product.price * item.quantity for item in cart.items.all())
-        cart_items = cart.items.count()
-        
-        return JsonResponse({
-            'message': f'Added {product.name} to cart',
-            'cart_total': f'{cart_total:.2f}',
-            'cart_items': cart_items
-        })
-    
-    return JsonResponse({'error': 'Invalid request method'}, status=400)
-
-@login_required
-def remove_from_cart(request, product_id):
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Item removed from cart',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-@login_required
-def update_cart_item(request, product_id):
-    try:
-        quantity = int(request.POST.get('quantity', 1))
-    except ValueError:
-        return JsonResponse({'error': 'Invalid quantity'}, status=400)
-    
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    
-    if quantity > 0:
-        cart_item.quantity = quantity
-        cart_item.save()
-    else:
-        cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Cart updated',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-from django.shortcuts import get_object_or_404
-from django.http import JsonResponse
-from django.contrib.auth.decorators import login_required
-from .models import Product, Cart, CartItem
-
-@login_required
-def get_recommendations(request):
-    # Simple recommendation: return 4 random products
-    products = Product.objects.order_by('?')[:4]
-    recommendations = []
-    for product in products:
-        recommendations.append({
-            'id': product.id,
-            'name': product.name,
-            'price': str(product.price),
-            'description': product.description,
-            'image_url': product.image.url if product.image else None,
-        })
-    return JsonResponse({'recommendations': recommendations})
-
-@login_required
-def add_to_cart(request, product_id):
-    if request.method == 'POST':
-        product = get_object_or_404(Product, id=product_id)
-        cart, created = Cart.objects.get_or_create(user=request.user)
-        
-        cart_item, created = CartItem.objects.get_or_create(
-            cart=cart,
-            product=product,
-            defaults={'quantity': 1}
-        )
-        
-        if not created:
-            cart_item.quantity += 1
-            cart_item.save()
-        
-        # Calculate cart total
-        cart_total = sum(item.product.price * item.quantity for item in cart.items.all())
-        cart_items = cart.items.count()
-        
-        return JsonResponse({
-            'message': f'Added {product.name} to cart',
-            'cart_total': f'{cart_total:.2f}',
-            'cart_items': cart_items
-        })
-    
-    return JsonResponse({'error': 'Invalid request method'}, status=400)
-
-@login_required
-def remove_from_cart(request, product_id):
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Item removed from cart',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-@login_required
-def update_cart_item(request, product_id):
-    try:
-        quantity = int(request.POST.get('quantity', 1))
-    except ValueError:
-        return JsonResponse({'error': 'Invalid quantity'}, status=400)
-    
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    
-    if quantity > 0:
-        cart_item.quantity = quantity
-        cart_item.save()
-    else:
-        cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Cart updated',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-from django.shortcuts import get_object_or_404
-from django.http import JsonResponse
-from django.contrib.auth.decorators import login_required
-from .models import Product, Cart, CartItem
-
-@login_required
-def get_recommendations(request):
-    # Simple recommendation: return 4 random products
-    products = Product.objects.order_by('?')[:4]
-    recommendations = []
-    for product in products:
-        recommendations.append({
-            'id': product.id,
-            'name': product.name,
-            'price': str(product.price),
-            'description': product.description,
-            'image_url': product.image.url if product.image else None,
-        })
-    return JsonResponse({'recommendations': recommendations})
-
-@login_required
-def add_to_cart(request, product_id):
-    if request.method == 'POST':
-        product = get_object_or_404(Product, id=product_id)
-        cart, created = Cart.objects.get_or_create(user=request.user)
-        
-        cart_item, created = CartItem.objects.get_or_create(
-            cart=cart,
-            product=product,
-            defaults={'quantity': 1}
-        )
-        
-        if not created:
-            cart_item.quantity += 1
-            cart_item.save()
-        
-        # Calculate cart total
-        cart_total = sum(item.product.price * item.quantity for item in cart.items.all())
-        cart_items = cart.items.count()
-        
-        return JsonResponse({
-            'message': f'Added {product.name} to cart',
-            'cart_total': f'{cart_total:.2f}',
-            'cart_items': cart_items
-        })
-    
-    return JsonResponse({'error': 'Invalid request method'}, status=400)
-
-@login_required
-def remove_from_cart(request, product_id):
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Item removed from cart',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-@login_required
-def update_cart_item(request, product_id):
-    try:
-        quantity = int(request.POST.get('quantity', 1))
-    except ValueError:
-        return JsonResponse({'error': 'Invalid quantity'}, status=400)
-    
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    
-    if quantity > 0:
-        cart_item.quantity = quantity
-        cart_item.save()
-    else:
-        cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Cart updated',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-from django.shortcuts import get_object_or_404
-from django.http import JsonResponse
-from django.contrib.auth.decorators import login_required
-from .models import Product, Cart, CartItem
-
-@login_required
-def get_recommendations(request):
-    # Simple recommendation: return 4 random products
-    products = Product.objects.order_by('?')[:4]
-    recommendations = []
-    for product in products:
-        recommendations.append({
-            'id': product.id,
-            'name': product.name,
-            'price': str(product.price),
-            'description': product.description,
-            'image_url': product.image.url if product.image else None,
-        })
-    return JsonResponse({'recommendations': recommendations})
-
-@login_required
-def add_to_cart(request, product_id):
-    if request.method == 'POST':
-        product = get_object_or_404(Product, id=product_id)
-        cart, created = Cart.objects.get_or_create(user=request.user)
-        
-        cart_item, created = CartItem.objects.get_or_create(
-            cart=cart,
-            product=product,
-            defaults={'quantity': 1}
-        )
-        
-        if not created:
-            cart_item.quantity += 1
-            cart_item.save()
-        
-        # Calculate cart total
-        cart_total = sum(item.product.price * item.quantity for item in cart.items.all())
-        cart_items = cart.items.count()
-        
-        return JsonResponse({
-            'message': f'Added {product.name} to cart',
-            'cart_total': f'{cart_total:.2f}',
-            'cart_items': cart_items
-        })
-    
-    return JsonResponse({'error': 'Invalid request method'}, status=400)
-
-@login_required
-def remove_from_cart(request, product_id):
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Item removed from cart',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-@login_required
-def update_cart_item(request, product_id):
-    try:
-        quantity = int(request.POST.get('quantity', 1))
-    except ValueError:
-        return JsonResponse({'error': 'Invalid quantity'}, status=400)
-    
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    
-    if quantity > 0:
-        cart_item.quantity = quantity
-        cart_item.save()
-    else:
-        cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Cart updated',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-from django.shortcuts import get_object_or_404
-from django.http import JsonResponse
-from django.contrib.auth.decorators import login_required
-from .models import Product, Cart, CartItem
-
-@login_required
-def get_recommendations(request):
-    # Simple recommendation: return 4 random products
-    products = Product.objects.order_by('?')[:4]
-    recommendations = []
-    for product in products:
-        recommendations.append({
-            'id': product.id,
-            'name': product.name,
-            'price': str(product.price),
-            'description': product.description,
-            'image_url': product.image.url if product.image else None,
-        })
-    return JsonResponse({'recommendations': recommendations})
-
-@login_required
-def add_to_cart(request, product_id):
-    if request.method == 'POST':
-        product = get_object_or_404(Product, id=product_id)
-        cart, created = Cart.objects.get_or_create(user=request.user)
-        
-        cart_item, created = CartItem.objects.get_or_create(
-            cart=cart,
-            product=product,
-            defaults={'quantity': 1}
-        )
-        
-        if not created:
-            cart_item.quantity += 1
-            cart_item.save()
-        
-        # Calculate cart total
-        cart_total = sum(item.product.price * item.quantity for item in cart.items.all())
-        cart_items = cart.items.count()
-        
-        return JsonResponse({
-            'message': f'Added {product.name} to cart',
-            'cart_total': f'{cart_total:.2f}',
-            'cart_items': cart_items
-        })
-    
-    return JsonResponse({'error': 'Invalid request method'}, status=400)
-
-@login_required
-def remove_from_cart(request, product_id):
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Item removed from cart',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-@login_required
-def update_cart_item(request, product_id):
-    try:
-        quantity = int(request.POST.get('quantity', 1))
-    except ValueError:
-        return JsonResponse({'error': 'Invalid quantity'}, status=400)
-    
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    
-    if quantity > 0:
-        cart_item.quantity = quantity
-        cart_item.save()
-    else:
-        cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Cart updated',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-from django.shortcuts import get_object_or_404
-from django.http import JsonResponse
-from django.contrib.auth.decorators import login_required
-from .models import Product, Cart, CartItem
-
-@login_required
-def get_recommendations(request):
-    # Simple recommendation: return 4 random products
-    products = Product.objects.order_by('?')[:4]
-    recommendations = []
-    for product in products:
-        recommendations.append({
-            'id': product.id,
-            'name': product.name,
-            'price': str(product.price),
-            'description': product.description,
-            'image_url': product.image.url if product.image else None,
-        })
-    return JsonResponse({'recommendations': recommendations})
-
-@login_required
-def add_to_cart(request, product_id):
-    if request.method == 'POST':
-        product = get_object_or_404(Product, id=product_id)
-        cart, created = Cart.objects.get_or_create(user=request.user)
-        
-        cart_item, created = CartItem.objects.get_or_create(
-            cart=cart,
-            product=product,
-            defaults={'quantity': 1}
-        )
-        
-        if not created:
-            cart_item.quantity += 1
-            cart_item.save()
-        
-        # Calculate cart total
-        cart_total = sum(item.product.price * item.quantity for item in cart.items.all())
-        cart_items = cart.items.count()
-        
-        return JsonResponse({
-            'message': f'Added {product.name} to cart',
-            'cart_total': f'{cart_total:.2f}',
-            'cart_items': cart_items
-        })
-    
-    return JsonResponse({'error': 'Invalid request method'}, status=400)
-
-@login_required
-def remove_from_cart(request, product_id):
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Item removed from cart',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-@login_required
-def update_cart_item(request, product_id):
-    try:
-        quantity = int(request.POST.get('quantity', 1))
-    except ValueError:
-        return JsonResponse({'error': 'Invalid quantity'}, status=400)
-    
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    
-    if quantity > 0:
-        cart_item.quantity = quantity
-        cart_item.save()
-    else:
-        cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Cart updated',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-from django.shortcuts import get_object_or_404
-from django.http import JsonResponse
-from django.contrib.auth.decorators import login_required
-from .models import Product, Cart, CartItem
-
-@login_required
-def get_recommendations(request):
-    # Simple recommendation: return 4 random products
-    products = Product.objects.order_by('?')[:4]
-    recommendations = []
-    for product in products:
-        recommendations.append({
-            'id': product.id,
-            'name': product.name,
-            'price': str(product.price),
-            'description': product.description,
-            'image_url': product.image.url if product.image else None,
-        })
-    return JsonResponse({'recommendations': recommendations})
-
-@login_required
-def add_to_cart(request, product_id):
-    if request.method == 'POST':
-        product = get_object_or_404(Product, id=product_id)
-        cart, created = Cart.objects.get_or_create(user=request.user)
-        
-        cart_item, created = CartItem.objects.get_or_create(
-            cart=cart,
-            product=product,
-            defaults={'quantity': 1}
-        )
-        
-        if not created:
-            cart_item.quantity += 1
-            cart_item.save()
-        
-        # Calculate cart total
-        cart_total = sum(item.product.price * item.quantity for item in cart.items.all())
-        cart_items = cart.items.count()
-        
-        return JsonResponse({
-            'message': f'Added {product.name} to cart',
-            'cart_total': f'{cart_total:.2f}',
-            'cart_items': cart_items
-        })
-    
-    return JsonResponse({'error': 'Invalid request method'}, status=400)
-
-@login_required
-def remove_from_cart(request, product_id):
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Item removed from cart',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-@login_required
-def update_cart_item(request, product_id):
-    try:
-        quantity = int(request.POST.get('quantity', 1))
-    except ValueError:
-        return JsonResponse({'error': 'Invalid quantity'}, status=400)
-    
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    
-    if quantity > 0:
-        cart_item.quantity = quantity
-        cart_item.save()
-    else:
-        cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Cart updated',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-from django.shortcuts import get_object_or_404
-from django.http import JsonResponse
-from django.contrib.auth.decorators import login_required
-from .models import Product, Cart, CartItem
-
-@login_required
-def get_recommendations(request):
-    # Simple recommendation: return 4 random products
-    products = Product.objects.order_by('?')[:4]
-    recommendations = []
-    for product in products:
-        recommendations.append({
-            'id': product.id,
-            'name': product.name,
-            'price': str(product.price),
-            'description': product.description,
-            'image_url': product.image.url if product.image else None,
-        })
-    return JsonResponse({'recommendations': recommendations})
-
-@login_required
-def add_to_cart(request, product_id):
-    if request.method == 'POST':
-        product = get_object_or_404(Product, id=product_id)
-        cart, created = Cart.objects.get_or_create(user=request.user)
-        
-        cart_item, created = CartItem.objects.get_or_create(
-            cart=cart,
-            product=product,
-            defaults={'quantity': 1}
-        )
-        
-        if not created:
-            cart_item.quantity += 1
-            cart_item.save()
-        
-        # Calculate cart total
-        cart_total = sum(item.product.price * item.quantity for item in cart.items.all())
-        cart_items = cart.items.count()
-        
-        return JsonResponse({
-            'message': f'Added {product.name} to cart',
-            'cart_total': f'{cart_total:.2f}',
-            'cart_items': cart_items
-        })
-    
-    return JsonResponse({'error': 'Invalid request method'}, status=400)
-
-@login_required
-def remove_from_cart(request, product_id):
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Item removed from cart',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-@login_required
-def update_cart_item(request, product_id):
-    try:
-        quantity = int(request.POST.get('quantity', 1))
-    except ValueError:
-        return JsonResponse({'error': 'Invalid quantity'}, status=400)
-    
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    
-    if quantity > 0:
-        cart_item.quantity = quantity
-        cart_item.save()
-    else:
-        cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Cart updated',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-from django.shortcuts import get_object_or_404
-from django.http import JsonResponse
-from django.contrib.auth.decorators import login_required
-from .models import Product, Cart, CartItem
-
-@login_required
-def get_recommendations(request):
-    # Simple recommendation: return 4 random products
-    products = Product.objects.order_by('?')[:4]
-    recommendations = []
-    for product in products:
-        recommendations.append({
-            'id': product.id,
-            'name': product.name,
-            'price': str(product.price),
-            'description': product.description,
-            'image_url': product.image.url if product.image else None,
-        })
-    return JsonResponse({'recommendations': recommendations})
-
-@login_required
-def add_to_cart(request, product_id):
-    if request.method == 'POST':
-        product = get_object_or_404(Product, id=product_id)
-        cart, created = Cart.objects.get_or_create(user=request.user)
-        
-        cart_item, created = CartItem.objects.get_or_create(
-            cart=cart,
-            product=product,
-            defaults={'quantity': 1}
-        )
-        
-        if not created:
-            cart_item.quantity += 1
-            cart_item.save()
-        
-        # Calculate cart total
-        cart_total = sum(item.product.price * item.quantity for item in cart.items.all())
-        cart_items = cart.items.count()
-        
-        return JsonResponse({
-            'message': f'Added {product.name} to cart',
-            'cart_total': f'{cart_total:.2f}',
-            'cart_items': cart_items
-        })
-    
-    return JsonResponse({'error': 'Invalid request method'}, status=400)
-
-@login_required
-def remove_from_cart(request, product_id):
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Item removed from cart',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-@login_required
-def update_cart_item(request, product_id):
-    try:
-        quantity = int(request.POST.get('quantity', 1))
-    except ValueError:
-        return JsonResponse({'error': 'Invalid quantity'}, status=400)
-    
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    
-    if quantity > 0:
-        cart_item.quantity = quantity
-        cart_item.save()
-    else:
-        cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Cart updated',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-from django.shortcuts import get_object_or_404
-from django.http import JsonResponse
-from django.contrib.auth.decorators import login_required
-from .models import Product, Cart, CartItem
-
-@login_required
-def get_recommendations(request):
-    # Simple recommendation: return 4 random products
-    products = Product.objects.order_by('?')[:4]
-    recommendations = []
-    for product in products:
-        recommendations.append({
-            'id': product.id,
-            'name': product.name,
-            'price': str(product.price),
-            'description': product.description,
-            'image_url': product.image.url if product.image else None,
-        })
-    return JsonResponse({'recommendations': recommendations})
-
-@login_required
-def add_to_cart(request, product_id):
-    if request.method == 'POST':
-        product = get_object_or_404(Product, id=product_id)
-        cart, created = Cart.objects.get_or_create(user=request.user)
-        
-        cart_item, created = CartItem.objects.get_or_create(
-            cart=cart,
-            product=product,
-            defaults={'quantity': 1}
-        )
-        
-        if not created:
-            cart_item.quantity += 1
-            cart_item.save()
-        
-        # Calculate cart total
-        cart_total = sum(item.product.price * item.quantity for item in cart.items.all())
-        cart_items = cart.items.count()
-        
-        return JsonResponse({
-            'message': f'Added {product.name} to cart',
-            'cart_total': f'{cart_total:.2f}',
-            'cart_items': cart_items
-        })
-    
-    return JsonResponse({'error': 'Invalid request method'}, status=400)
-
-@login_required
-def remove_from_cart(request, product_id):
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Item removed from cart',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-@login_required
-def update_cart_item(request, product_id):
-    try:
-        quantity = int(request.POST.get('quantity', 1))
-    except ValueError:
-        return JsonResponse({'error': 'Invalid quantity'}, status=400)
-    
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    
-    if quantity > 0:
-        cart_item.quantity = quantity
-        cart_item.save()
-    else:
-        cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Cart updated',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-from django.shortcuts import get_object_or_404
-from django.http import JsonResponse
-from django.contrib.auth.decorators import login_required
-from .models import Product, Cart, CartItem
-
-@login_required
-def get_recommendations(request):
-    # Simple recommendation: return 4 random products
-    products = Product.objects.order_by('?')[:4]
-    recommendations = []
-    for product in products:
-        recommendations.append({
-            'id': product.id,
-            'name': product.name,
-            'price': str(product.price),
-            'description': product.description,
-            'image_url': product.image.url if product.image else None,
-        })
-    return JsonResponse({'recommendations': recommendations})
-
-@login_required
-def add_to_cart(request, product_id):
-    if request.method == 'POST':
-        product = get_object_or_404(Product, id=product_id)
-        cart, created = Cart.objects.get_or_create(user=request.user)
-        
-        cart_item, created = CartItem.objects.get_or_create(
-            cart=cart,
-            product=product,
-            defaults={'quantity': 1}
-        )
-        
-        if not created:
-            cart_item.quantity += 1
-            cart_item.save()
-        
-        # Calculate cart total
-        cart_total = sum(item.product.price * item.quantity for item in cart.items.all())
-        cart_items = cart.items.count()
-        
-        return JsonResponse({
-            'message': f'Added {product.name} to cart',
-            'cart_total': f'{cart_total:.2f}',
-            'cart_items': cart_items
-        })
-    
-    return JsonResponse({'error': 'Invalid request method'}, status=400)
-
-@login_required
-def remove_from_cart(request, product_id):
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Item removed from cart',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-@login_required
-def update_cart_item(request, product_id):
-    try:
-        quantity = int(request.POST.get('quantity', 1))
-    except ValueError:
-        return JsonResponse({'error': 'Invalid quantity'}, status=400)
-    
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    
-    if quantity > 0:
-        cart_item.quantity = quantity
-        cart_item.save()
-    else:
-        cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Cart updated',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-from django.shortcuts import get_object_or_404
-from django.http import JsonResponse
-from django.contrib.auth.decorators import login_required
-from .models import Product, Cart, CartItem
-
-@login_required
-def get_recommendations(request):
-    # Simple recommendation: return 4 random products
-    products = Product.objects.order_by('?')[:4]
-    recommendations = []
-    for product in products:
-        recommendations.append({
-            'id': product.id,
-            'name': product.name,
-            'price': str(product.price),
-            'description': product.description,
-            'image_url': product.image.url if product.image else None,
-        })
-    return JsonResponse({'recommendations': recommendations})
-
-@login_required
-def add_to_cart(request, product_id):
-    if request.method == 'POST':
-        product = get_object_or_404(Product, id=product_id)
-        cart, created = Cart.objects.get_or_create(user=request.user)
-        
-        cart_item, created = CartItem.objects.get_or_create(
-            cart=cart,
-            product=product,
-            defaults={'quantity': 1}
-        )
-        
-        if not created:
-            cart_item.quantity += 1
-            cart_item.save()
-        
-        # Calculate cart total
-        cart_total = sum(item.product.price * item.quantity for item in cart.items.all())
-        cart_items = cart.items.count()
-        
-        return JsonResponse({
-            'message': f'Added {product.name} to cart',
-            'cart_total': f'{cart_total:.2f}',
-            'cart_items': cart_items
-        })
-    
-    return JsonResponse({'error': 'Invalid request method'}, status=400)
-
-@login_required
-def remove_from_cart(request, product_id):
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Item removed from cart',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-@login_required
-def update_cart_item(request, product_id):
-    try:
-        quantity = int(request.POST.get('quantity', 1))
-    except ValueError:
-        return JsonResponse({'error': 'Invalid quantity'}, status=400)
-    
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    
-    if quantity > 0:
-        cart_item.quantity = quantity
-        cart_item.save()
-    else:
-        cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Cart updated',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-from django.shortcuts import get_object_or_404
-from django.http import JsonResponse
-from django.contrib.auth.decorators import login_required
-from .models import Product, Cart, CartItem
-
-@login_required
-def get_recommendations(request):
-    # Simple recommendation: return 4 random products
-    products = Product.objects.order_by('?')[:4]
-    recommendations = []
-    for product in products:
-        recommendations.append({
-            'id': product.id,
-            'name': product.name,
-            'price': str(product.price),
-            'description': product.description,
-            'image_url': product.image.url if product.image else None,
-        })
-    return JsonResponse({'recommendations': recommendations})
-
-@login_required
-def add_to_cart(request, product_id):
-    if request.method == 'POST':
-        product = get_object_or_404(Product, id=product_id)
-        cart, created = Cart.objects.get_or_create(user=request.user)
-        
-        cart_item, created = CartItem.objects.get_or_create(
-            cart=cart,
-            product=product,
-            defaults={'quantity': 1}
-        )
-        
-        if not created:
-            cart_item.quantity += 1
-            cart_item.save()
-        
-        # Calculate cart total
-        cart_total = sum(item.product.price * item.quantity for item in cart.items.all())
-        cart_items = cart.items.count()
-        
-        return JsonResponse({
-            'message': f'Added {product.name} to cart',
-            'cart_total': f'{cart_total:.2f}',
-            'cart_items': cart_items
-        })
-    
-    return JsonResponse({'error': 'Invalid request method'}, status=400)
-
-@login_required
-def remove_from_cart(request, product_id):
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Item removed from cart',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-@login_required
-def update_cart_item(request, product_id):
-    try:
-        quantity = int(request.POST.get('quantity', 1))
-    except ValueError:
-        return JsonResponse({'error': 'Invalid quantity'}, status=400)
-    
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    
-    if quantity > 0:
-        cart_item.quantity = quantity
-        cart_item.save()
-    else:
-        cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Cart updated',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-from django.shortcuts import get_object_or_404
-from django.http import JsonResponse
-from django.contrib.auth.decorators import login_required
-from .models import Product, Cart, CartItem
-
-@login_required
-def get_recommendations(request):
-    # Simple recommendation: return 4 random products
-    products = Product.objects.order_by('?')[:4]
-    recommendations = []
-    for product in products:
-        recommendations.append({
-            'id': product.id,
-            'name': product.name,
-            'price': str(product.price),
-            'description': product.description,
-            'image_url': product.image.url if product.image else None,
-        })
-    return JsonResponse({'recommendations': recommendations})
-
-@login_required
-def add_to_cart(request, product_id):
-    if request.method == 'POST':
-        product = get_object_or_404(Product, id=product_id)
-        cart, created = Cart.objects.get_or_create(user=request.user)
-        
-        cart_item, created = CartItem.objects.get_or_create(
-            cart=cart,
-            product=product,
-            defaults={'quantity': 1}
-        )
-        
-        if not created:
-            cart_item.quantity += 1
-            cart_item.save()
-        
-        # Calculate cart total
-        cart_total = sum(item.product.price * item.quantity for item in cart.items.all())
-        cart_items = cart.items.count()
-        
-        return JsonResponse({
-            'message': f'Added {product.name} to cart',
-            'cart_total': f'{cart_total:.2f}',
-            'cart_items': cart_items
-        })
-    
-    return JsonResponse({'error': 'Invalid request method'}, status=400)
-
-@login_required
-def remove_from_cart(request, product_id):
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Item removed from cart',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-@login_required
-def update_cart_item(request, product_id):
-    try:
-        quantity = int(request.POST.get('quantity', 1))
-    except ValueError:
-        return JsonResponse({'error': 'Invalid quantity'}, status=400)
-    
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    
-    if quantity > 0:
-        cart_item.quantity = quantity
-        cart_item.save()
-    else:
-        cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Cart updated',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-from django.shortcuts import get_object_or_404
-from django.http import JsonResponse
-from django.contrib.auth.decorators import login_required
-from .models import Product, Cart, CartItem
-
-@login_required
-def get_recommendations(request):
-    # Simple recommendation: return 4 random products
-    products = Product.objects.order_by('?')[:4]
-    recommendations = []
-    for product in products:
-        recommendations.append({
-            'id': product.id,
-            'name': product.name,
-            'price': str(product.price),
-            'description': product.description,
-            'image_url': product.image.url if product.image else None,
-        })
-    return JsonResponse({'recommendations': recommendations})
-
-@login_required
-def add_to_cart(request, product_id):
-    if request.method == 'POST':
-        product = get_object_or_404(Product, id=product_id)
-        cart, created = Cart.objects.get_or_create(user=request.user)
-        
-        cart_item, created = CartItem.objects.get_or_create(
-            cart=cart,
-            product=product,
-            defaults={'quantity': 1}
-        )
-        
-        if not created:
-            cart_item.quantity += 1
-            cart_item.save()
-        
-        # Calculate cart total
-        cart_total = sum(item.product.price * item.quantity for item in cart.items.all())
-        cart_items = cart.items.count()
-        
-        return JsonResponse({
-            'message': f'Added {product.name} to cart',
-            'cart_total': f'{cart_total:.2f}',
-            'cart_items': cart_items
-        })
-    
-    return JsonResponse({'error': 'Invalid request method'}, status=400)
-
-@login_required
-def remove_from_cart(request, product_id):
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Item removed from cart',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-@login_required
-def update_cart_item(request, product_id):
-    try:
-        quantity = int(request.POST.get('quantity', 1))
-    except ValueError:
-        return JsonResponse({'error': 'Invalid quantity'}, status=400)
-    
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    
-    if quantity > 0:
-        cart_item.quantity = quantity
-        cart_item.save()
-    else:
-        cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Cart updated',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-from django.shortcuts import get_object_or_404
-from django.http import JsonResponse
-from django.contrib.auth.decorators import login_required
-from .models import Product, Cart, CartItem
-
-@login_required
-def get_recommendations(request):
-    # Simple recommendation: return 4 random products
-    products = Product.objects.order_by('?')[:4]
-    recommendations = []
-    for product in products:
-        recommendations.append({
-            'id': product.id,
-            'name': product.name,
-            'price': str(product.price),
-            'description': product.description,
-            'image_url': product.image.url if product.image else None,
-        })
-    return JsonResponse({'recommendations': recommendations})
-
-@login_required
-def add_to_cart(request, product_id):
-    if request.method == 'POST':
-        product = get_object_or_404(Product, id=product_id)
-        cart, created = Cart.objects.get_or_create(user=request.user)
-        
-        cart_item, created = CartItem.objects.get_or_create(
-            cart=cart,
-            product=product,
-            defaults={'quantity': 1}
-        )
-        
-        if not created:
-            cart_item.quantity += 1
-            cart_item.save()
-        
-        # Calculate cart total
-        cart_total = sum(item.product.price * item.quantity for item in cart.items.all())
-        cart_items = cart.items.count()
-        
-        return JsonResponse({
-            'message': f'Added {product.name} to cart',
-            'cart_total': f'{cart_total:.2f}',
-            'cart_items': cart_items
-        })
-    
-    return JsonResponse({'error': 'Invalid request method'}, status=400)
-
-@login_required
-def remove_from_cart(request, product_id):
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Item removed from cart',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-@login_required
-def update_cart_item(request, product_id):
-    try:
-        quantity = int(request.POST.get('quantity', 1))
-    except ValueError:
-        return JsonResponse({'error': 'Invalid quantity'}, status=400)
-    
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    
-    if quantity > 0:
-        cart_item.quantity = quantity
-        cart_item.save()
-    else:
-        cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Cart updated',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-from django.shortcuts import get_object_or_404
-from django.http import JsonResponse
-from django.contrib.auth.decorators import login_required
-from .models import Product, Cart, CartItem
-
-@login_required
-def get_recommendations(request):
-    # Simple recommendation: return 4 random products
-    products = Product.objects.order_by('?')[:4]
-    recommendations = []
-    for product in products:
-        recommendations.append({
-            'id': product.id,
-            'name': product.name,
-            'price': str(product.price),
-            'description': product.description,
-            'image_url': product.image.url if product.image else None,
-        })
-    return JsonResponse({'recommendations': recommendations})
-
-@login_required
-def add_to_cart(request, product_id):
-    if request.method == 'POST':
-        product = get_object_or_404(Product, id=product_id)
-        cart, created = Cart.objects.get_or_create(user=request.user)
-        
-        cart_item, created = CartItem.objects.get_or_create(
-            cart=cart,
-            product=product,
-            defaults={'quantity': 1}
-        )
-        
-        if not created:
-            cart_item.quantity += 1
-            cart_item.save()
-        
-        # Calculate cart total
-        cart_total = sum(item.product.price * item.quantity for item in cart.items.all())
-        cart_items = cart.items.count()
-        
-        return JsonResponse({
-            'message': f'Added {product.name} to cart',
-            'cart_total': f'{cart_total:.2f}',
-            'cart_items': cart_items
-        })
-    
-    return JsonResponse({'error': 'Invalid request method'}, status=400)
-
-@login_required
-def remove_from_cart(request, product_id):
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Item removed from cart',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-@login_required
-def update_cart_item(request, product_id):
-    try:
-        quantity = int(request.POST.get('quantity', 1))
-    except ValueError:
-        return JsonResponse({'error': 'Invalid quantity'}, status=400)
-    
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    
-    if quantity > 0:
-        cart_item.quantity = quantity
-        cart_item.save()
-    else:
-        cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Cart updated',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-from django.shortcuts import get_object_or_404
-from django.http import JsonResponse
-from django.contrib.auth.decorators import login_required
-from .models import Product, Cart, CartItem
-
-@login_required
-def get_recommendations(request):
-    # Simple recommendation: return 4 random products
-    products = Product.objects.order_by('?')[:4]
-    recommendations = []
-    for product in products:
-        recommendations.append({
-            'id': product.id,
-            'name': product.name,
-            'price': str(product.price),
-            'description': product.description,
-            'image_url': product.image.url if product.image else None,
-        })
-    return JsonResponse({'recommendations': recommendations})
-
-@login_required
-def add_to_cart(request, product_id):
-    if request.method == 'POST':
-        product = get_object_or_404(Product, id=product_id)
-        cart, created = Cart.objects.get_or_create(user=request.user)
-        
-        cart_item, created = CartItem.objects.get_or_create(
-            cart=cart,
-            product=product,
-            defaults={'quantity': 1}
-        )
-        
-        if not created:
-            cart_item.quantity += 1
-            cart_item.save()
-        
-        # Calculate cart total
-        cart_total = sum(item.product.price * item.quantity for item in cart.items.all())
-        cart_items = cart.items.count()
-        
-        return JsonResponse({
-            'message': f'Added {product.name} to cart',
-            'cart_total': f'{cart_total:.2f}',
-            'cart_items': cart_items
-        })
-    
-    return JsonResponse({'error': 'Invalid request method'}, status=400)
-
-@login_required
-def remove_from_cart(request, product_id):
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Item removed from cart',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-@login_required
-def update_cart_item(request, product_id):
-    try:
-        quantity = int(request.POST.get('quantity', 1))
-    except ValueError:
-        return JsonResponse({'error': 'Invalid quantity'}, status=400)
-    
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    
-    if quantity > 0:
-        cart_item.quantity = quantity
-        cart_item.save()
-    else:
-        cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Cart updated',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-from django.shortcuts import get_object_or_404
-from django.http import JsonResponse
-from django.contrib.auth.decorators import login_required
-from .models import Product, Cart, CartItem
-
-@login_required
-def get_recommendations(request):
-    # Simple recommendation: return 4 random products
-    products = Product.objects.order_by('?')[:4]
-    recommendations = []
-    for product in products:
-        recommendations.append({
-            'id': product.id,
-            'name': product.name,
-            'price': str(product.price),
-            'description': product.description,
-            'image_url': product.image.url if product.image else None,
-        })
-    return JsonResponse({'recommendations': recommendations})
-
-@login_required
-def add_to_cart(request, product_id):
-    if request.method == 'POST':
-        product = get_object_or_404(Product, id=product_id)
-        cart, created = Cart.objects.get_or_create(user=request.user)
-        
-        cart_item, created = CartItem.objects.get_or_create(
-            cart=cart,
-            product=product,
-            defaults={'quantity': 1}
-        )
-        
-        if not created:
-            cart_item.quantity += 1
-            cart_item.save()
-        
-        # Calculate cart total
-        cart_total = sum(item.product.price * item.quantity for item in cart.items.all())
-        cart_items = cart.items.count()
-        
-        return JsonResponse({
-            'message': f'Added {product.name} to cart',
-            'cart_total': f'{cart_total:.2f}',
-            'cart_items': cart_items
-        })
-    
-    return JsonResponse({'error': 'Invalid request method'}, status=400)
-
-@login_required
-def remove_from_cart(request, product_id):
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Item removed from cart',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-@login_required
-def update_cart_item(request, product_id):
-    try:
-        quantity = int(request.POST.get('quantity', 1))
-    except ValueError:
-        return JsonResponse({'error': 'Invalid quantity'}, status=400)
-    
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    
-    if quantity > 0:
-        cart_item.quantity = quantity
-        cart_item.save()
-    else:
-        cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Cart updated',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-from django.shortcuts import get_object_or_404
-from django.http import JsonResponse
-from django.contrib.auth.decorators import login_required
-from .models import Product, Cart, CartItem
-
-@login_required
-def get_recommendations(request):
-    # Simple recommendation: return 4 random products
-    products = Product.objects.order_by('?')[:4]
-    recommendations = []
-    for product in products:
-        recommendations.append({
-            'id': product.id,
-            'name': product.name,
-            'price': str(product.price),
-            'description': product.description,
-            'image_url': product.image.url if product.image else None,
-        })
-    return JsonResponse({'recommendations': recommendations})
-
-@login_required
-def add_to_cart(request, product_id):
-    if request.method == 'POST':
-        product = get_object_or_404(Product, id=product_id)
-        cart, created = Cart.objects.get_or_create(user=request.user)
-        
-        cart_item, created = CartItem.objects.get_or_create(
-            cart=cart,
-            product=product,
-            defaults={'quantity': 1}
-        )
-        
-        if not created:
-            cart_item.quantity += 1
-            cart_item.save()
-        
-        # Calculate cart total
-        cart_total = sum(item.product.price * item.quantity for item in cart.items.all())
-        cart_items = cart.items.count()
-        
-        return JsonResponse({
-            'message': f'Added {product.name} to cart',
-            'cart_total': f'{cart_total:.2f}',
-            'cart_items': cart_items
-        })
-    
-    return JsonResponse({'error': 'Invalid request method'}, status=400)
-
-@login_required
-def remove_from_cart(request, product_id):
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Item removed from cart',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-@login_required
-def update_cart_item(request, product_id):
-    try:
-        quantity = int(request.POST.get('quantity', 1))
-    except ValueError:
-        return JsonResponse({'error': 'Invalid quantity'}, status=400)
-    
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    
-    if quantity > 0:
-        cart_item.quantity = quantity
-        cart_item.save()
-    else:
-        cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Cart updated',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-from django.shortcuts import get_object_or_404
-from django.http import JsonResponse
-from django.contrib.auth.decorators import login_required
-from .models import Product, Cart, CartItem
-
-@login_required
-def get_recommendations(request):
-    # Simple recommendation: return 4 random products
-    products = Product.objects.order_by('?')[:4]
-    recommendations = []
-    for product in products:
-        recommendations.append({
-            'id': product.id,
-            'name': product.name,
-            'price': str(product.price),
-            'description': product.description,
-            'image_url': product.image.url if product.image else None,
-        })
-    return JsonResponse({'recommendations': recommendations})
-
-@login_required
-def add_to_cart(request, product_id):
-    if request.method == 'POST':
-        product = get_object_or_404(Product, id=product_id)
-        cart, created = Cart.objects.get_or_create(user=request.user)
-        
-        cart_item, created = CartItem.objects.get_or_create(
-            cart=cart,
-            product=product,
-            defaults={'quantity': 1}
-        )
-        
-        if not created:
-            cart_item.quantity += 1
-            cart_item.save()
-        
-        # Calculate cart total
-        cart_total = sum(item.product.price * item.quantity for item in cart.items.all())
-        cart_items = cart.items.count()
-        
-        return JsonResponse({
-            'message': f'Added {product.name} to cart',
-            'cart_total': f'{cart_total:.2f}',
-            'cart_items': cart_items
-        })
-    
-    return JsonResponse({'error': 'Invalid request method'}, status=400)
-
-@login_required
-def remove_from_cart(request, product_id):
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Item removed from cart',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-@login_required
-def update_cart_item(request, product_id):
-    try:
-        quantity = int(request.POST.get('quantity', 1))
-    except ValueError:
-        return JsonResponse({'error': 'Invalid quantity'}, status=400)
-    
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    
-    if quantity > 0:
-        cart_item.quantity = quantity
-        cart_item.save()
-    else:
-        cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Cart updated',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-from django.shortcuts import get_object_or_404
-from django.http import JsonResponse
-from django.contrib.auth.decorators import login_required
-from .models import Product, Cart, CartItem
-
-@login_required
-def get_recommendations(request):
-    # Simple recommendation: return 4 random products
-    products = Product.objects.order_by('?')[:4]
-    recommendations = []
-    for product in products:
-        recommendations.append({
-            'id': product.id,
-            'name': product.name,
-            'price': str(product.price),
-            'description': product.description,
-            'image_url': product.image.url if product.image else None,
-        })
-    return JsonResponse({'recommendations': recommendations})
-
-@login_required
-def add_to_cart(request, product_id):
-    if request.method == 'POST':
-        product = get_object_or_404(Product, id=product_id)
-        cart, created = Cart.objects.get_or_create(user=request.user)
-        
-        cart_item, created = CartItem.objects.get_or_create(
-            cart=cart,
-            product=product,
-            defaults={'quantity': 1}
-        )
-        
-        if not created:
-            cart_item.quantity += 1
-            cart_item.save()
-        
-        # Calculate cart total
-        cart_total = sum(item.product.price * item.quantity for item in cart.items.all())
-        cart_items = cart.items.count()
-        
-        return JsonResponse({
-            'message': f'Added {product.name} to cart',
-            'cart_total': f'{cart_total:.2f}',
-            'cart_items': cart_items
-        })
-    
-    return JsonResponse({'error': 'Invalid request method'}, status=400)
-
-@login_required
-def remove_from_cart(request, product_id):
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Item removed from cart',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-@login_required
-def update_cart_item(request, product_id):
-    try:
-        quantity = int(request.POST.get('quantity', 1))
-    except ValueError:
-        return JsonResponse({'error': 'Invalid quantity'}, status=400)
-    
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    
-    if quantity > 0:
-        cart_item.quantity = quantity
-        cart_item.save()
-    else:
-        cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Cart updated',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-from django.shortcuts import get_object_or_404
-from django.http import JsonResponse
-from django.contrib.auth.decorators import login_required
-from .models import Product, Cart, CartItem
-
-@login_required
-def get_recommendations(request):
-    # Simple recommendation: return 4 random products
-    products = Product.objects.order_by('?')[:4]
-    recommendations = []
-    for product in products:
-        recommendations.append({
-            'id': product.id,
-            'name': product.name,
-            'price': str(product.price),
-            'description': product.description,
-            'image_url': product.image.url if product.image else None,
-        })
-    return JsonResponse({'recommendations': recommendations})
-
-@login_required
-def add_to_cart(request, product_id):
-    if request.method == 'POST':
-        product = get_object_or_404(Product, id=product_id)
-        cart, created = Cart.objects.get_or_create(user=request.user)
-        
-        cart_item, created = CartItem.objects.get_or_create(
-            cart=cart,
-            product=product,
-            defaults={'quantity': 1}
-        )
-        
-        if not created:
-            cart_item.quantity += 1
-            cart_item.save()
-        
-        # Calculate cart total
-        cart_total = sum(item.product.price * item.quantity for item in cart.items.all())
-        cart_items = cart.items.count()
-        
-        return JsonResponse({
-            'message': f'Added {product.name} to cart',
-            'cart_total': f'{cart_total:.2f}',
-            'cart_items': cart_items
-        })
-    
-    return JsonResponse({'error': 'Invalid request method'}, status=400)
-
-@login_required
-def remove_from_cart(request, product_id):
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Item removed from cart',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-@login_required
-def update_cart_item(request, product_id):
-    try:
-        quantity = int(request.POST.get('quantity', 1))
-    except ValueError:
-        return JsonResponse({'error': 'Invalid quantity'}, status=400)
-    
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    
-    if quantity > 0:
-        cart_item.quantity = quantity
-        cart_item.save()
-    else:
-        cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Cart updated',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-from django.shortcuts import get_object_or_404
-from django.http import JsonResponse
-from django.contrib.auth.decorators import login_required
-from .models import Product, Cart, CartItem
-
-@login_required
-def get_recommendations(request):
-    # Simple recommendation: return 4 random products
-    products = Product.objects.order_by('?')[:4]
-    recommendations = []
-    for product in products:
-        recommendations.append({
-            'id': product.id,
-            'name': product.name,
-            'price': str(product.price),
-            'description': product.description,
-            'image_url': product.image.url if product.image else None,
-        })
-    return JsonResponse({'recommendations': recommendations})
-
-@login_required
-def add_to_cart(request, product_id):
-    if request.method == 'POST':
-        product = get_object_or_404(Product, id=product_id)
-        cart, created = Cart.objects.get_or_create(user=request.user)
-        
-        cart_item, created = CartItem.objects.get_or_create(
-            cart=cart,
-            product=product,
-            defaults={'quantity': 1}
-        )
-        
-        if not created:
-            cart_item.quantity += 1
-            cart_item.save()
-        
-        # Calculate cart total
-        cart_total = sum(item.product.price * item.quantity for item in cart.items.all())
-        cart_items = cart.items.count()
-        
-        return JsonResponse({
-            'message': f'Added {product.name} to cart',
-            'cart_total': f'{cart_total:.2f}',
-            'cart_items': cart_items
-        })
-    
-    return JsonResponse({'error': 'Invalid request method'}, status=400)
-
-@login_required
-def remove_from_cart(request, product_id):
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Item removed from cart',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-@login_required
-def update_cart_item(request, product_id):
-    try:
-        quantity = int(request.POST.get('quantity', 1))
-    except ValueError:
-        return JsonResponse({'error': 'Invalid quantity'}, status=400)
-    
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    
-    if quantity > 0:
-        cart_item.quantity = quantity
-        cart_item.save()
-    else:
-        cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Cart updated',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-from django.shortcuts import get_object_or_404
-from django.http import JsonResponse
-from django.contrib.auth.decorators import login_required
-from .models import Product, Cart, CartItem
-
-@login_required
-def get_recommendations(request):
-    # Simple recommendation: return 4 random products
-    products = Product.objects.order_by('?')[:4]
-    recommendations = []
-    for product in products:
-        recommendations.append({
-            'id': product.id,
-            'name': product.name,
-            'price': str(product.price),
-            'description': product.description,
-            'image_url': product.image.url if product.image else None,
-        })
-    return JsonResponse({'recommendations': recommendations})
-
-@login_required
-def add_to_cart(request, product_id):
-    if request.method == 'POST':
-        product = get_object_or_404(Product, id=product_id)
-        cart, created = Cart.objects.get_or_create(user=request.user)
-        
-        cart_item, created = CartItem.objects.get_or_create(
-            cart=cart,
-            product=product,
-            defaults={'quantity': 1}
-        )
-        
-        if not created:
-            cart_item.quantity += 1
-            cart_item.save()
-        
-        # Calculate cart total
-        cart_total = sum(item.product.price * item.quantity for item in cart.items.all())
-        cart_items = cart.items.count()
-        
-        return JsonResponse({
-            'message': f'Added {product.name} to cart',
-            'cart_total': f'{cart_total:.2f}',
-            'cart_items': cart_items
-        })
-    
-    return JsonResponse({'error': 'Invalid request method'}, status=400)
-
-@login_required
-def remove_from_cart(request, product_id):
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Item removed from cart',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-@login_required
-def update_cart_item(request, product_id):
-    try:
-        quantity = int(request.POST.get('quantity', 1))
-    except ValueError:
-        return JsonResponse({'error': 'Invalid quantity'}, status=400)
-    
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    
-    if quantity > 0:
-        cart_item.quantity = quantity
-        cart_item.save()
-    else:
-        cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Cart updated',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-from django.shortcuts import get_object_or_404
-from django.http import JsonResponse
-from django.contrib.auth.decorators import login_required
-from .models import Product, Cart, CartItem
-
-@login_required
-def get_recommendations(request):
-    # Simple recommendation: return 4 random products
-    products = Product.objects.order_by('?')[:4]
-    recommendations = []
-    for product in products:
-        recommendations.append({
-            'id': product.id,
-            'name': product.name,
-            'price': str(product.price),
-            'description': product.description,
-            'image_url': product.image.url if product.image else None,
-        })
-    return JsonResponse({'recommendations': recommendations})
-
-@login_required
-def add_to_cart(request, product_id):
-    if request.method == 'POST':
-        product = get_object_or_404(Product, id=product_id)
-        cart, created = Cart.objects.get_or_create(user=request.user)
-        
-        cart_item, created = CartItem.objects.get_or_create(
-            cart=cart,
-            product=product,
-            defaults={'quantity': 1}
-        )
-        
-        if not created:
-            cart_item.quantity += 1
-            cart_item.save()
-        
-        # Calculate cart total
-        cart_total = sum(item.product.price * item.quantity for item in cart.items.all())
-        cart_items = cart.items.count()
-        
-        return JsonResponse({
-            'message': f'Added {product.name} to cart',
-            'cart_total': f'{cart_total:.2f}',
-            'cart_items': cart_items
-        })
-    
-    return JsonResponse({'error': 'Invalid request method'}, status=400)
-
-@login_required
-def remove_from_cart(request, product_id):
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Item removed from cart',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-@login_required
-def update_cart_item(request, product_id):
-    try:
-        quantity = int(request.POST.get('quantity', 1))
-    except ValueError:
-        return JsonResponse({'error': 'Invalid quantity'}, status=400)
-    
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    
-    if quantity > 0:
-        cart_item.quantity = quantity
-        cart_item.save()
-    else:
-        cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Cart updated',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-from django.shortcuts import get_object_or_404
-from django.http import JsonResponse
-from django.contrib.auth.decorators import login_required
-from .models import Product, Cart, CartItem
-
-@login_required
-def get_recommendations(request):
-    # Simple recommendation: return 4 random products
-    products = Product.objects.order_by('?')[:4]
-    recommendations = []
-    for product in products:
-        recommendations.append({
-            'id': product.id,
-            'name': product.name,
-            'price': str(product.price),
-            'description': product.description,
-            'image_url': product.image.url if product.image else None,
-        })
-    return JsonResponse({'recommendations': recommendations})
-
-@login_required
-def add_to_cart(request, product_id):
-    if request.method == 'POST':
-        product = get_object_or_404(Product, id=product_id)
-        cart, created = Cart.objects.get_or_create(user=request.user)
-        
-        cart_item, created = CartItem.objects.get_or_create(
-            cart=cart,
-            product=product,
-            defaults={'quantity': 1}
-        )
-        
-        if not created:
-            cart_item.quantity += 1
-            cart_item.save()
-        
-        # Calculate cart total
-        cart_total = sum(item.product.price * item.quantity for item in cart.items.all())
-        cart_items = cart.items.count()
-        
-        return JsonResponse({
-            'message': f'Added {product.name} to cart',
-            'cart_total': f'{cart_total:.2f}',
-            'cart_items': cart_items
-        })
-    
-    return JsonResponse({'error': 'Invalid request method'}, status=400)
-
-@login_required
-def remove_from_cart(request, product_id):
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Item removed from cart',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-@login_required
-def update_cart_item(request, product_id):
-    try:
-        quantity = int(request.POST.get('quantity', 1))
-    except ValueError:
-        return JsonResponse({'error': 'Invalid quantity'}, status=400)
-    
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    
-    if quantity > 0:
-        cart_item.quantity = quantity
-        cart_item.save()
-    else:
-        cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Cart updated',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-from django.shortcuts import get_object_or_404
-from django.http import JsonResponse
-from django.contrib.auth.decorators import login_required
-from .models import Product, Cart, CartItem
-
-@login_required
-def get_recommendations(request):
-    # Simple recommendation: return 4 random products
-    products = Product.objects.order_by('?')[:4]
-    recommendations = []
-    for product in products:
-        recommendations.append({
-            'id': product.id,
-            'name': product.name,
-            'price': str(product.price),
-            'description': product.description,
-            'image_url': product.image.url if product.image else None,
-        })
-    return JsonResponse({'recommendations': recommendations})
-
-@login_required
-def add_to_cart(request, product_id):
-    if request.method == 'POST':
-        product = get_object_or_404(Product, id=product_id)
-        cart, created = Cart.objects.get_or_create(user=request.user)
-        
-        cart_item, created = CartItem.objects.get_or_create(
-            cart=cart,
-            product=product,
-            defaults={'quantity': 1}
-        )
-        
-        if not created:
-            cart_item.quantity += 1
-            cart_item.save()
-        
-        # Calculate cart total
-        cart_total = sum(item.product.price * item.quantity for item in cart.items.all())
-        cart_items = cart.items.count()
-        
-        return JsonResponse({
-            'message': f'Added {product.name} to cart',
-            'cart_total': f'{cart_total:.2f}',
-            'cart_items': cart_items
-        })
-    
-    return JsonResponse({'error': 'Invalid request method'}, status=400)
-
-@login_required
-def remove_from_cart(request, product_id):
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Item removed from cart',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-@login_required
-def update_cart_item(request, product_id):
-    try:
-        quantity = int(request.POST.get('quantity', 1))
-    except ValueError:
-        return JsonResponse({'error': 'Invalid quantity'}, status=400)
-    
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    
-    if quantity > 0:
-        cart_item.quantity = quantity
-        cart_item.save()
-    else:
-        cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Cart updated',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-from django.shortcuts import get_object_or_404
-from django.http import JsonResponse
-from django.contrib.auth.decorators import login_required
-from .models import Product, Cart, CartItem
-
-@login_required
-def get_recommendations(request):
-    # Simple recommendation: return 4 random products
-    products = Product.objects.order_by('?')[:4]
-    recommendations = []
-    for product in products:
-        recommendations.append({
-            'id': product.id,
-            'name': product.name,
-            'price': str(product.price),
-            'description': product.description,
-            'image_url': product.image.url if product.image else None,
-        })
-    return JsonResponse({'recommendations': recommendations})
-
-@login_required
-def add_to_cart(request, product_id):
-    if request.method == 'POST':
-        product = get_object_or_404(Product, id=product_id)
-        cart, created = Cart.objects.get_or_create(user=request.user)
-        
-        cart_item, created = CartItem.objects.get_or_create(
-            cart=cart,
-            product=product,
-            defaults={'quantity': 1}
-        )
-        
-        if not created:
-            cart_item.quantity += 1
-            cart_item.save()
-        
-        # Calculate cart total
-        cart_total = sum(item.product.price * item.quantity for item in cart.items.all())
-        cart_items = cart.items.count()
-        
-        return JsonResponse({
-            'message': f'Added {product.name} to cart',
-            'cart_total': f'{cart_total:.2f}',
-            'cart_items': cart_items
-        })
-    
-    return JsonResponse({'error': 'Invalid request method'}, status=400)
-
-@login_required
-def remove_from_cart(request, product_id):
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Item removed from cart',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-@login_required
-def update_cart_item(request, product_id):
-    try:
-        quantity = int(request.POST.get('quantity', 1))
-    except ValueError:
-        return JsonResponse({'error': 'Invalid quantity'}, status=400)
-    
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    
-    if quantity > 0:
-        cart_item.quantity = quantity
-        cart_item.save()
-    else:
-        cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Cart updated',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-from django.shortcuts import get_object_or_404
-from django.http import JsonResponse
-from django.contrib.auth.decorators import login_required
-from .models import Product, Cart, CartItem
-
-@login_required
-def get_recommendations(request):
-    # Simple recommendation: return 4 random products
-    products = Product.objects.order_by('?')[:4]
-    recommendations = []
-    for product in products:
-        recommendations.append({
-            'id': product.id,
-            'name': product.name,
-            'price': str(product.price),
-            'description': product.description,
-            'image_url': product.image.url if product.image else None,
-        })
-    return JsonResponse({'recommendations': recommendations})
-
-@login_required
-def add_to_cart(request, product_id):
-    if request.method == 'POST':
-        product = get_object_or_404(Product, id=product_id)
-        cart, created = Cart.objects.get_or_create(user=request.user)
-        
-        cart_item, created = CartItem.objects.get_or_create(
-            cart=cart,
-            product=product,
-            defaults={'quantity': 1}
-        )
-        
-        if not created:
-            cart_item.quantity += 1
-            cart_item.save()
-        
-        # Calculate cart total
-        cart_total = sum(item.product.price * item.quantity for item in cart.items.all())
-        cart_items = cart.items.count()
-        
-        return JsonResponse({
-            'message': f'Added {product.name} to cart',
-            'cart_total': f'{cart_total:.2f}',
-            'cart_items': cart_items
-        })
-    
-    return JsonResponse({'error': 'Invalid request method'}, status=400)
-
-@login_required
-def remove_from_cart(request, product_id):
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Item removed from cart',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-@login_required
-def update_cart_item(request, product_id):
-    try:
-        quantity = int(request.POST.get('quantity', 1))
-    except ValueError:
-        return JsonResponse({'error': 'Invalid quantity'}, status=400)
-    
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    
-    if quantity > 0:
-        cart_item.quantity = quantity
-        cart_item.save()
-    else:
-        cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Cart updated',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-from django.shortcuts import get_object_or_404
-from django.http import JsonResponse
-from django.contrib.auth.decorators import login_required
-from .models import Product, Cart, CartItem
-
-@login_required
-def get_recommendations(request):
-    # Simple recommendation: return 4 random products
-    products = Product.objects.order_by('?')[:4]
-    recommendations = []
-    for product in products:
-        recommendations.append({
-            'id': product.id,
-            'name': product.name,
-            'price': str(product.price),
-            'description': product.description,
-            'image_url': product.image.url if product.image else None,
-        })
-    return JsonResponse({'recommendations': recommendations})
-
-@login_required
-def add_to_cart(request, product_id):
-    if request.method == 'POST':
-        product = get_object_or_404(Product, id=product_id)
-        cart, created = Cart.objects.get_or_create(user=request.user)
-        
-        cart_item, created = CartItem.objects.get_or_create(
-            cart=cart,
-            product=product,
-            defaults={'quantity': 1}
-        )
-        
-        if not created:
-            cart_item.quantity += 1
-            cart_item.save()
-        
-        # Calculate cart total
-        cart_total = sum(item.product.price * item.quantity for item in cart.items.all())
-        cart_items = cart.items.count()
-        
-        return JsonResponse({
-            'message': f'Added {product.name} to cart',
-            'cart_total': f'{cart_total:.2f}',
-            'cart_items': cart_items
-        })
-    
-    return JsonResponse({'error': 'Invalid request method'}, status=400)
-
-@login_required
-def remove_from_cart(request, product_id):
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Item removed from cart',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-@login_required
-def update_cart_item(request, product_id):
-    try:
-        quantity = int(request.POST.get('quantity', 1))
-    except ValueError:
-        return JsonResponse({'error': 'Invalid quantity'}, status=400)
-    
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    
-    if quantity > 0:
-        cart_item.quantity = quantity
-        cart_item.save()
-    else:
-        cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Cart updated',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-from django.shortcuts import get_object_or_404
-from django.http import JsonResponse
-from django.contrib.auth.decorators import login_required
-from .models import Product, Cart, CartItem
-
-@login_required
-def get_recommendations(request):
-    # Simple recommendation: return 4 random products
-    products = Product.objects.order_by('?')[:4]
-    recommendations = []
-    for product in products:
-        recommendations.append({
-            'id': product.id,
-            'name': product.name,
-            'price': str(product.price),
-            'description': product.description,
-            'image_url': product.image.url if product.image else None,
-        })
-    return JsonResponse({'recommendations': recommendations})
-
-@login_required
-def add_to_cart(request, product_id):
-    if request.method == 'POST':
-        product = get_object_or_404(Product, id=product_id)
-        cart, created = Cart.objects.get_or_create(user=request.user)
-        
-        cart_item, created = CartItem.objects.get_or_create(
-            cart=cart,
-            product=product,
-            defaults={'quantity': 1}
-        )
-        
-        if not created:
-            cart_item.quantity += 1
-            cart_item.save()
-        
-        # Calculate cart total
-        cart_total = sum(item.product.price * item.quantity for item in cart.items.all())
-        cart_items = cart.items.count()
-        
-        return JsonResponse({
-            'message': f'Added {product.name} to cart',
-            'cart_total': f'{cart_total:.2f}',
-            'cart_items': cart_items
-        })
-    
-    return JsonResponse({'error': 'Invalid request method'}, status=400)
-
-@login_required
-def remove_from_cart(request, product_id):
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Item removed from cart',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-@login_required
-def update_cart_item(request, product_id):
-    try:
-        quantity = int(request.POST.get('quantity', 1))
-    except ValueError:
-        return JsonResponse({'error': 'Invalid quantity'}, status=400)
-    
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    
-    if quantity > 0:
-        cart_item.quantity = quantity
-        cart_item.save()
-    else:
-        cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Cart updated',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-from django.shortcuts import get_object_or_404
-from django.http import JsonResponse
-from django.contrib.auth.decorators import login_required
-from .models import Product, Cart, CartItem
-
-@login_required
-def get_recommendations(request):
-    # Simple recommendation: return 4 random products
-    products = Product.objects.order_by('?')[:4]
-    recommendations = []
-    for product in products:
-        recommendations.append({
-            'id': product.id,
-            'name': product.name,
-            'price': str(product.price),
-            'description': product.description,
-            'image_url': product.image.url if product.image else None,
-        })
-    return JsonResponse({'recommendations': recommendations})
-
-@login_required
-def add_to_cart(request, product_id):
-    if request.method == 'POST':
-        product = get_object_or_404(Product, id=product_id)
-        cart, created = Cart.objects.get_or_create(user=request.user)
-        
-        cart_item, created = CartItem.objects.get_or_create(
-            cart=cart,
-            product=product,
-            defaults={'quantity': 1}
-        )
-        
-        if not created:
-            cart_item.quantity += 1
-            cart_item.save()
-        
-        # Calculate cart total
-        cart_total = sum(item.product.price * item.quantity for item in cart.items.all())
-        cart_items = cart.items.count()
-        
-        return JsonResponse({
-            'message': f'Added {product.name} to cart',
-            'cart_total': f'{cart_total:.2f}',
-            'cart_items': cart_items
-        })
-    
-    return JsonResponse({'error': 'Invalid request method'}, status=400)
-
-@login_required
-def remove_from_cart(request, product_id):
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Item removed from cart',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-@login_required
-def update_cart_item(request, product_id):
-    try:
-        quantity = int(request.POST.get('quantity', 1))
-    except ValueError:
-        return JsonResponse({'error': 'Invalid quantity'}, status=400)
-    
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    
-    if quantity > 0:
-        cart_item.quantity = quantity
-        cart_item.save()
-    else:
-        cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Cart updated',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-from django.shortcuts import get_object_or_404
-from django.http import JsonResponse
-from django.contrib.auth.decorators import login_required
-from .models import Product, Cart, CartItem
-
-@login_required
-def get_recommendations(request):
-    # Simple recommendation: return 4 random products
-    products = Product.objects.order_by('?')[:4]
-    recommendations = []
-    for product in products:
-        recommendations.append({
-            'id': product.id,
-            'name': product.name,
-            'price': str(product.price),
-            'description': product.description,
-            'image_url': product.image.url if product.image else None,
-        })
-    return JsonResponse({'recommendations': recommendations})
-
-@login_required
-def add_to_cart(request, product_id):
-    if request.method == 'POST':
-        product = get_object_or_404(Product, id=product_id)
-        cart, created = Cart.objects.get_or_create(user=request.user)
-        
-        cart_item, created = CartItem.objects.get_or_create(
-            cart=cart,
-            product=product,
-            defaults={'quantity': 1}
-        )
-        
-        if not created:
-            cart_item.quantity += 1
-            cart_item.save()
-        
-        # Calculate cart total
-        cart_total = sum(item.product.price * item.quantity for item in cart.items.all())
-        cart_items = cart.items.count()
-        
-        return JsonResponse({
-            'message': f'Added {product.name} to cart',
-            'cart_total': f'{cart_total:.2f}',
-            'cart_items': cart_items
-        })
-    
-    return JsonResponse({'error': 'Invalid request method'}, status=400)
-
-@login_required
-def remove_from_cart(request, product_id):
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Item removed from cart',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-@login_required
-def update_cart_item(request, product_id):
-    try:
-        quantity = int(request.POST.get('quantity', 1))
-    except ValueError:
-        return JsonResponse({'error': 'Invalid quantity'}, status=400)
-    
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    
-    if quantity > 0:
-        cart_item.quantity = quantity
-        cart_item.save()
-    else:
-        cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Cart updated',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-from django.shortcuts import get_object_or_404
-from django.http import JsonResponse
-from django.contrib.auth.decorators import login_required
-from .models import Product, Cart, CartItem
-
-@login_required
-def get_recommendations(request):
-    # Simple recommendation: return 4 random products
-    products = Product.objects.order_by('?')[:4]
-    recommendations = []
-    for product in products:
-        recommendations.append({
-            'id': product.id,
-            'name': product.name,
-            'price': str(product.price),
-            'description': product.description,
-            'image_url': product.image.url if product.image else None,
-        })
-    return JsonResponse({'recommendations': recommendations})
-
-@login_required
-def add_to_cart(request, product_id):
-    if request.method == 'POST':
-        product = get_object_or_404(Product, id=product_id)
-        cart, created = Cart.objects.get_or_create(user=request.user)
-        
-        cart_item, created = CartItem.objects.get_or_create(
-            cart=cart,
-            product=product,
-            defaults={'quantity': 1}
-        )
-        
-        if not created:
-            cart_item.quantity += 1
-            cart_item.save()
-        
-        # Calculate cart total
-        cart_total = sum(item.product.price * item.quantity for item in cart.items.all())
-        cart_items = cart.items.count()
-        
-        return JsonResponse({
-            'message': f'Added {product.name} to cart',
-            'cart_total': f'{cart_total:.2f}',
-            'cart_items': cart_items
-        })
-    
-    return JsonResponse({'error': 'Invalid request method'}, status=400)
-
-@login_required
-def remove_from_cart(request, product_id):
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Item removed from cart',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-@login_required
-def update_cart_item(request, product_id):
-    try:
-        quantity = int(request.POST.get('quantity', 1))
-    except ValueError:
-        return JsonResponse({'error': 'Invalid quantity'}, status=400)
-    
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    
-    if quantity > 0:
-        cart_item.quantity = quantity
-        cart_item.save()
-    else:
-        cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Cart updated',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-from django.shortcuts import get_object_or_404
-from django.http import JsonResponse
-from django.contrib.auth.decorators import login_required
-from .models import Product, Cart, CartItem
-
-@login_required
-def get_recommendations(request):
-    # Simple recommendation: return 4 random products
-    products = Product.objects.order_by('?')[:4]
-    recommendations = []
-    for product in products:
-        recommendations.append({
-            'id': product.id,
-            'name': product.name,
-            'price': str(product.price),
-            'description': product.description,
-            'image_url': product.image.url if product.image else None,
-        })
-    return JsonResponse({'recommendations': recommendations})
-
-@login_required
-def add_to_cart(request, product_id):
-    if request.method == 'POST':
-        product = get_object_or_404(Product, id=product_id)
-        cart, created = Cart.objects.get_or_create(user=request.user)
-        
-        cart_item, created = CartItem.objects.get_or_create(
-            cart=cart,
-            product=product,
-            defaults={'quantity': 1}
-        )
-        
-        if not created:
-            cart_item.quantity += 1
-            cart_item.save()
-        
-        # Calculate cart total
-        cart_total = sum(item.product.price * item.quantity for item in cart.items.all())
-        cart_items = cart.items.count()
-        
-        return JsonResponse({
-            'message': f'Added {product.name} to cart',
-            'cart_total': f'{cart_total:.2f}',
-            'cart_items': cart_items
-        })
-    
-    return JsonResponse({'error': 'Invalid request method'}, status=400)
-
-@login_required
-def remove_from_cart(request, product_id):
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Item removed from cart',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-@login_required
-def update_cart_item(request, product_id):
-    try:
-        quantity = int(request.POST.get('quantity', 1))
-    except ValueError:
-        return JsonResponse({'error': 'Invalid quantity'}, status=400)
-    
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    
-    if quantity > 0:
-        cart_item.quantity = quantity
-        cart_item.save()
-    else:
-        cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Cart updated',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-from django.shortcuts import get_object_or_404
-from django.http import JsonResponse
-from django.contrib.auth.decorators import login_required
-from .models import Product, Cart, CartItem
-
-@login_required
-def get_recommendations(request):
-    # Simple recommendation: return 4 random products
-    products = Product.objects.order_by('?')[:4]
-    recommendations = []
-    for product in products:
-        recommendations.append({
-            'id': product.id,
-            'name': product.name,
-            'price': str(product.price),
-            'description': product.description,
-            'image_url': product.image.url if product.image else None,
-        })
-    return JsonResponse({'recommendations': recommendations})
-
-@login_required
-def add_to_cart(request, product_id):
-    if request.method == 'POST':
-        product = get_object_or_404(Product, id=product_id)
-        cart, created = Cart.objects.get_or_create(user=request.user)
-        
-        cart_item, created = CartItem.objects.get_or_create(
-            cart=cart,
-            product=product,
-            defaults={'quantity': 1}
-        )
-        
-        if not created:
-            cart_item.quantity += 1
-            cart_item.save()
-        
-        # Calculate cart total
-        cart_total = sum(item.product.price * item.quantity for item in cart.items.all())
-        cart_items = cart.items.count()
-        
-        return JsonResponse({
-            'message': f'Added {product.name} to cart',
-            'cart_total': f'{cart_total:.2f}',
-            'cart_items': cart_items
-        })
-    
-    return JsonResponse({'error': 'Invalid request method'}, status=400)
-
-@login_required
-def remove_from_cart(request, product_id):
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Item removed from cart',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-@login_required
-def update_cart_item(request, product_id):
-    try:
-        quantity = int(request.POST.get('quantity', 1))
-    except ValueError:
-        return JsonResponse({'error': 'Invalid quantity'}, status=400)
-    
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    
-    if quantity > 0:
-        cart_item.quantity = quantity
-        cart_item.save()
-    else:
-        cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Cart updated',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-from django.shortcuts import get_object_or_404
-from django.http import JsonResponse
-from django.contrib.auth.decorators import login_required
-from .models import Product, Cart, CartItem
-
-@login_required
-def get_recommendations(request):
-    # Simple recommendation: return 4 random products
-    products = Product.objects.order_by('?')[:4]
-    recommendations = []
-    for product in products:
-        recommendations.append({
-            'id': product.id,
-            'name': product.name,
-            'price': str(product.price),
-            'description': product.description,
-            'image_url': product.image.url if product.image else None,
-        })
-    return JsonResponse({'recommendations': recommendations})
-
-@login_required
-def add_to_cart(request, product_id):
-    if request.method == 'POST':
-        product = get_object_or_404(Product, id=product_id)
-        cart, created = Cart.objects.get_or_create(user=request.user)
-        
-        cart_item, created = CartItem.objects.get_or_create(
-            cart=cart,
-            product=product,
-            defaults={'quantity': 1}
-        )
-        
-        if not created:
-            cart_item.quantity += 1
-            cart_item.save()
-        
-        # Calculate cart total
-        cart_total = sum(item.product.price * item.quantity for item in cart.items.all())
-        cart_items = cart.items.count()
-        
-        return JsonResponse({
-            'message': f'Added {product.name} to cart',
-            'cart_total': f'{cart_total:.2f}',
-            'cart_items': cart_items
-        })
-    
-    return JsonResponse({'error': 'Invalid request method'}, status=400)
-
-@login_required
-def remove_from_cart(request, product_id):
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Item removed from cart',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-@login_required
-def update_cart_item(request, product_id):
-    try:
-        quantity = int(request.POST.get('quantity', 1))
-    except ValueError:
-        return JsonResponse({'error': 'Invalid quantity'}, status=400)
-    
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    
-    if quantity > 0:
-        cart_item.quantity = quantity
-        cart_item.save()
-    else:
-        cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Cart updated',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-from django.shortcuts import get_object_or_404
-from django.http import JsonResponse
-from django.contrib.auth.decorators import login_required
-from .models import Product, Cart, CartItem
-
-@login_required
-def get_recommendations(request):
-    # Simple recommendation: return 4 random products
-    products = Product.objects.order_by('?')[:4]
-    recommendations = []
-    for product in products:
-        recommendations.append({
-            'id': product.id,
-            'name': product.name,
-            'price': str(product.price),
-            'description': product.description,
-            'image_url': product.image.url if product.image else None,
-        })
-    return JsonResponse({'recommendations': recommendations})
-
-@login_required
-def add_to_cart(request, product_id):
-    if request.method == 'POST':
-        product = get_object_or_404(Product, id=product_id)
-        cart, created = Cart.objects.get_or_create(user=request.user)
-        
-        cart_item, created = CartItem.objects.get_or_create(
-            cart=cart,
-            product=product,
-            defaults={'quantity': 1}
-        )
-        
-        if not created:
-            cart_item.quantity += 1
-            cart_item.save()
-        
-        # Calculate cart total
-        cart_total = sum(item.product.price * item.quantity for item in cart.items.all())
-        cart_items = cart.items.count()
-        
-        return JsonResponse({
-            'message': f'Added {product.name} to cart',
-            'cart_total': f'{cart_total:.2f}',
-            'cart_items': cart_items
-        })
-    
-    return JsonResponse({'error': 'Invalid request method'}, status=400)
-
-@login_required
-def remove_from_cart(request, product_id):
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Item removed from cart',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-@login_required
-def update_cart_item(request, product_id):
-    try:
-        quantity = int(request.POST.get('quantity', 1))
-    except ValueError:
-        return JsonResponse({'error': 'Invalid quantity'}, status=400)
-    
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    
-    if quantity > 0:
-        cart_item.quantity = quantity
-        cart_item.save()
-    else:
-        cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Cart updated',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-from django.shortcuts import get_object_or_404
-from django.http import JsonResponse
-from django.contrib.auth.decorators import login_required
-from .models import Product, Cart, CartItem
-
-@login_required
-def get_recommendations(request):
-    # Simple recommendation: return 4 random products
-    products = Product.objects.order_by('?')[:4]
-    recommendations = []
-    for product in products:
-        recommendations.append({
-            'id': product.id,
-            'name': product.name,
-            'price': str(product.price),
-            'description': product.description,
-            'image_url': product.image.url if product.image else None,
-        })
-    return JsonResponse({'recommendations': recommendations})
-
-@login_required
-def add_to_cart(request, product_id):
-    if request.method == 'POST':
-        product = get_object_or_404(Product, id=product_id)
-        cart, created = Cart.objects.get_or_create(user=request.user)
-        
-        cart_item, created = CartItem.objects.get_or_create(
-            cart=cart,
-            product=product,
-            defaults={'quantity': 1}
-        )
-        
-        if not created:
-            cart_item.quantity += 1
-            cart_item.save()
-        
-        # Calculate cart total
-        cart_total = sum(item.product.price * item.quantity for item in cart.items.all())
-        cart_items = cart.items.count()
-        
-        return JsonResponse({
-            'message': f'Added {product.name} to cart',
-            'cart_total': f'{cart_total:.2f}',
-            'cart_items': cart_items
-        })
-    
-    return JsonResponse({'error': 'Invalid request method'}, status=400)
-
-@login_required
-def remove_from_cart(request, product_id):
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Item removed from cart',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-@login_required
-def update_cart_item(request, product_id):
-    try:
-        quantity = int(request.POST.get('quantity', 1))
-    except ValueError:
-        return JsonResponse({'error': 'Invalid quantity'}, status=400)
-    
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    
-    if quantity > 0:
-        cart_item.quantity = quantity
-        cart_item.save()
-    else:
-        cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Cart updated',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-from django.shortcuts import get_object_or_404
-from django.http import JsonResponse
-from django.contrib.auth.decorators import login_required
-from .models import Product, Cart, CartItem
-
-@login_required
-def get_recommendations(request):
-    # Simple recommendation: return 4 random products
-    products = Product.objects.order_by('?')[:4]
-    recommendations = []
-    for product in products:
-        recommendations.append({
-            'id': product.id,
-            'name': product.name,
-            'price': str(product.price),
-            'description': product.description,
-            'image_url': product.image.url if product.image else None,
-        })
-    return JsonResponse({'recommendations': recommendations})
-
-@login_required
-def add_to_cart(request, product_id):
-    if request.method == 'POST':
-        product = get_object_or_404(Product, id=product_id)
-        cart, created = Cart.objects.get_or_create(user=request.user)
-        
-        cart_item, created = CartItem.objects.get_or_create(
-            cart=cart,
-            product=product,
-            defaults={'quantity': 1}
-        )
-        
-        if not created:
-            cart_item.quantity += 1
-            cart_item.save()
-        
-        # Calculate cart total
-        cart_total = sum(item.product.price * item.quantity for item in cart.items.all())
-        cart_items = cart.items.count()
-        
-        return JsonResponse({
-            'message': f'Added {product.name} to cart',
-            'cart_total': f'{cart_total:.2f}',
-            'cart_items': cart_items
-        })
-    
-    return JsonResponse({'error': 'Invalid request method'}, status=400)
-
-@login_required
-def remove_from_cart(request, product_id):
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Item removed from cart',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-@login_required
-def update_cart_item(request, product_id):
-    try:
-        quantity = int(request.POST.get('quantity', 1))
-    except ValueError:
-        return JsonResponse({'error': 'Invalid quantity'}, status=400)
-    
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    
-    if quantity > 0:
-        cart_item.quantity = quantity
-        cart_item.save()
-    else:
-        cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Cart updated',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-from django.shortcuts import get_object_or_404
-from django.http import JsonResponse
-from django.contrib.auth.decorators import login_required
-from .models import Product, Cart, CartItem
-
-@login_required
-def get_recommendations(request):
-    # Simple recommendation: return 4 random products
-    products = Product.objects.order_by('?')[:4]
-    recommendations = []
-    for product in products:
-        recommendations.append({
-            'id': product.id,
-            'name': product.name,
-            'price': str(product.price),
-            'description': product.description,
-            'image_url': product.image.url if product.image else None,
-        })
-    return JsonResponse({'recommendations': recommendations})
-
-@login_required
-def add_to_cart(request, product_id):
-    if request.method == 'POST':
-        product = get_object_or_404(Product, id=product_id)
-        cart, created = Cart.objects.get_or_create(user=request.user)
-        
-        cart_item, created = CartItem.objects.get_or_create(
-            cart=cart,
-            product=product,
-            defaults={'quantity': 1}
-        )
-        
-        if not created:
-            cart_item.quantity += 1
-            cart_item.save()
-        
-        # Calculate cart total
-        cart_total = sum(item.product.price * item.quantity for item in cart.items.all())
-        cart_items = cart.items.count()
-        
-        return JsonResponse({
-            'message': f'Added {product.name} to cart',
-            'cart_total': f'{cart_total:.2f}',
-            'cart_items': cart_items
-        })
-    
-    return JsonResponse({'error': 'Invalid request method'}, status=400)
-
-@login_required
-def remove_from_cart(request, product_id):
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Item removed from cart',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-@login_required
-def update_cart_item(request, product_id):
-    try:
-        quantity = int(request.POST.get('quantity', 1))
-    except ValueError:
-        return JsonResponse({'error': 'Invalid quantity'}, status=400)
-    
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    
-    if quantity > 0:
-        cart_item.quantity = quantity
-        cart_item.save()
-    else:
-        cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Cart updated',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-from django.shortcuts import get_object_or_404
-from django.http import JsonResponse
-from django.contrib.auth.decorators import login_required
-from .models import Product, Cart, CartItem
-
-@login_required
-def get_recommendations(request):
-    # Simple recommendation: return 4 random products
-    products = Product.objects.order_by('?')[:4]
-    recommendations = []
-    for product in products:
-        recommendations.append({
-            'id': product.id,
-            'name': product.name,
-            'price': str(product.price),
-            'description': product.description,
-            'image_url': product.image.url if product.image else None,
-        })
-    return JsonResponse({'recommendations': recommendations})
-
-@login_required
-def add_to_cart(request, product_id):
-    if request.method == 'POST':
-        product = get_object_or_404(Product, id=product_id)
-        cart, created = Cart.objects.get_or_create(user=request.user)
-        
-        cart_item, created = CartItem.objects.get_or_create(
-            cart=cart,
-            product=product,
-            defaults={'quantity': 1}
-        )
-        
-        if not created:
-            cart_item.quantity += 1
-            cart_item.save()
-        
-        # Calculate cart total
-        cart_total = sum(item.product.price * item.quantity for item in cart.items.all())
-        cart_items = cart.items.count()
-        
-        return JsonResponse({
-            'message': f'Added {product.name} to cart',
-            'cart_total': f'{cart_total:.2f}',
-            'cart_items': cart_items
-        })
-    
-    return JsonResponse({'error': 'Invalid request method'}, status=400)
-
-@login_required
-def remove_from_cart(request, product_id):
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Item removed from cart',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-@login_required
-def update_cart_item(request, product_id):
-    try:
-        quantity = int(request.POST.get('quantity', 1))
-    except ValueError:
-        return JsonResponse({'error': 'Invalid quantity'}, status=400)
-    
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    
-    if quantity > 0:
-        cart_item.quantity = quantity
-        cart_item.save()
-    else:
-        cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Cart updated',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-from django.shortcuts import get_object_or_404
-from django.http import JsonResponse
-from django.contrib.auth.decorators import login_required
-from .models import Product, Cart, CartItem
-
-@login_required
-def get_recommendations(request):
-    # Simple recommendation: return 4 random products
-    products = Product.objects.order_by('?')[:4]
-    recommendations = []
-    for product in products:
-        recommendations.append({
-            'id': product.id,
-            'name': product.name,
-            'price': str(product.price),
-            'description': product.description,
-            'image_url': product.image.url if product.image else None,
-        })
-    return JsonResponse({'recommendations': recommendations})
-
-@login_required
-def add_to_cart(request, product_id):
-    if request.method == 'POST':
-        product = get_object_or_404(Product, id=product_id)
-        cart, created = Cart.objects.get_or_create(user=request.user)
-        
-        cart_item, created = CartItem.objects.get_or_create(
-            cart=cart,
-            product=product,
-            defaults={'quantity': 1}
-        )
-        
-        if not created:
-            cart_item.quantity += 1
-            cart_item.save()
-        
-        # Calculate cart total
-        cart_total = sum(item.product.price * item.quantity for item in cart.items.all())
-        cart_items = cart.items.count()
-        
-        return JsonResponse({
-            'message': f'Added {product.name} to cart',
-            'cart_total': f'{cart_total:.2f}',
-            'cart_items': cart_items
-        })
-    
-    return JsonResponse({'error': 'Invalid request method'}, status=400)
-
-@login_required
-def remove_from_cart(request, product_id):
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Item removed from cart',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-@login_required
-def update_cart_item(request, product_id):
-    try:
-        quantity = int(request.POST.get('quantity', 1))
-    except ValueError:
-        return JsonResponse({'error': 'Invalid quantity'}, status=400)
-    
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    
-    if quantity > 0:
-        cart_item.quantity = quantity
-        cart_item.save()
-    else:
-        cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Cart updated',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-from django.shortcuts import get_object_or_404
-from django.http import JsonResponse
-from django.contrib.auth.decorators import login_required
-from .models import Product, Cart, CartItem
-
-@login_required
-def get_recommendations(request):
-    # Simple recommendation: return 4 random products
-    products = Product.objects.order_by('?')[:4]
-    recommendations = []
-    for product in products:
-        recommendations.append({
-            'id': product.id,
-            'name': product.name,
-            'price': str(product.price),
-            'description': product.description,
-            'image_url': product.image.url if product.image else None,
-        })
-    return JsonResponse({'recommendations': recommendations})
-
-@login_required
-def add_to_cart(request, product_id):
-    if request.method == 'POST':
-        product = get_object_or_404(Product, id=product_id)
-        cart, created = Cart.objects.get_or_create(user=request.user)
-        
-        cart_item, created = CartItem.objects.get_or_create(
-            cart=cart,
-            product=product,
-            defaults={'quantity': 1}
-        )
-        
-        if not created:
-            cart_item.quantity += 1
-            cart_item.save()
-        
-        # Calculate cart total
-        cart_total = sum(item.product.price * item.quantity for item in cart.items.all())
-        cart_items = cart.items.count()
-        
-        return JsonResponse({
-            'message': f'Added {product.name} to cart',
-            'cart_total': f'{cart_total:.2f}',
-            'cart_items': cart_items
-        })
-    
-    return JsonResponse({'error': 'Invalid request method'}, status=400)
-
-@login_required
-def remove_from_cart(request, product_id):
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Item removed from cart',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-@login_required
-def update_cart_item(request, product_id):
-    try:
-        quantity = int(request.POST.get('quantity', 1))
-    except ValueError:
-        return JsonResponse({'error': 'Invalid quantity'}, status=400)
-    
-    cart = get_object_or_404(Cart, user=request.user)
-    cart_item = get_object_or_404(CartItem, cart=cart, product_id=product_id)
-    
-    if quantity > 0:
-        cart_item.quantity = quantity
-        cart_item.save()
-    else:
-        cart_item.delete()
-    
-    return JsonResponse({
-        'message': 'Cart updated',
-        'cart_total': str(cart.get_total()),
-        'cart_items': cart.items.count(),
-    })
-
-from django.shortcuts import get_object_or_404
-from django.http import JsonResponse
-from django.contrib.auth.decorators import login_required
-from .models import Product, Cart, CartItem
-
-@login_required